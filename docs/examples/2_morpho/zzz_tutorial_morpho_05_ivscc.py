@@ -420,6 +420,7 @@ print("correlation with soma depth: %+.2f"
 #     | Attribute | What it is |
 #     |-----------|------------|
 #     | `self.neuron` | the compartment, already subset out (the full neuron for non-compartment classes) |
+#     | `self.arbor` | the same nodes as plain arrays - IDs, parents, coordinates, radii - plus parent distances, node types and segments, each computed once and shared by all feature classes |
 #     | `self.ctx.neuron` | the **whole** neuron, rooted at its soma |
 #     | `self.ctx.dist_to_root` | geodesic distance from every node to the soma, computed once and shared |
 #     | `self.soma`, `self.soma_pos`, `self.soma_radius` | soma node ID, position and radius |
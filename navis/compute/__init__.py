@@ -32,12 +32,15 @@ has to grow a `slurm_partition` keyword::
 import atexit
 
 from .threads import set_num_threads, limit_native_threads
-from .dispatch import (map_tasks, imap_tasks, cpu_count, default_n_workers,
-                       resolve_thread_cap, FailedRun, worker_init_hooks,
-                       picklable_by_reference)
+from .profiling import profile
+from .scaling import (Scaling, declare_scaling, get_scaling, calibrate,
+                      benchmark, load_scaling, save_scaling)
+from .dispatch import (map_tasks, imap_tasks, stream_tasks, cpu_count,
+                       default_n_workers, resolve_thread_cap, resolve_split,
+                       FailedRun, worker_init_hooks, picklable_by_reference)
 from .backends import (ParallelBackend, ExecutorBackend, register_backend,
                        get_backend, list_backends, available_backends,
-                       resolve_backend, set_parallel_backend)
+                       resolve_backend, set_parallel_backend, warm_pool)
 
 
 def shutdown():
@@ -55,7 +58,8 @@ atexit.register(shutdown)
 
 
 #: Names exported to the top-level `navis` namespace.
-__all__ = ['set_parallel_backend', 'list_parallel_backends', 'set_num_threads']
+__all__ = ['set_parallel_backend', 'list_parallel_backends', 'set_num_threads',
+           'warm_pool', 'profile']
 
 
 def list_parallel_backends() -> list:
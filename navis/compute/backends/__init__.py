@@ -36,11 +36,13 @@ from .base import (ParallelBackend, ExecutorBackend, WrappedExecutorBackend,
                    register_backend, get_backend, list_backends,
                    available_backends, resolve_backend, set_parallel_backend,
                    auto_chunksize, adopt_object, apply_overrides)
-from .local import SerialBackend, ThreadBackend, ProcessBackend, shutdown_pool
+from .local import (SerialBackend, ThreadBackend, ProcessBackend, shutdown_pool,
+                    warm_pool)
 from ._pathos import PathosBackend
 from ._joblib import JoblibBackend
 from ._dask import DaskBackend
 from ._submitit import SubmititBackend
+from ._ray import RayBackend
 
 # Register the backends shipped with navis. `serial` must always be present -
 # it is what the dispatcher degrades to when there is nothing to parallelise.
@@ -54,11 +56,13 @@ register_backend(JoblibBackend())
 register_backend(PathosBackend())
 register_backend(DaskBackend())
 register_backend(SubmititBackend())
+register_backend(RayBackend())
 
 __all__ = ['ParallelBackend', 'ExecutorBackend', 'WrappedExecutorBackend',
            'register_backend', 'get_backend', 'list_backends',
            'available_backends', 'resolve_backend', 'set_parallel_backend',
            'SerialBackend', 'ThreadBackend', 'ProcessBackend',
            'PathosBackend', 'JoblibBackend', 'DaskBackend', 'SubmititBackend',
-           'shutdown_pool', 'auto_chunksize', 'adopt_object',
+           'RayBackend',
+           'shutdown_pool', 'warm_pool', 'auto_chunksize', 'adopt_object',
            'apply_overrides']
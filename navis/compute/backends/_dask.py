@@ -24,9 +24,12 @@ do three things the wrapper cannot:
 
 """
 
+import contextlib
 import concurrent.futures as cf
 
 from ... import config
+from .. import store
+from ..store import ObjectStore, SharedRef
 from .base import ParallelBackend, WrappedExecutorBackend, apply_overrides
 
 logger = config.get_logger(__name__)
@@ -136,21 +139,39 @@ class DaskBackend(ParallelBackend):
             logger.debug(f'Could not read the dask cluster size ({e}).')
             return hint
 
+    def object_store(self):
+        """Scatter shared arguments to every worker, ahead of the work.
+
+        Not the default file in shared memory: dask workers are not
+        necessarily on this machine, and a worker that shares our memory
+        (`processes=False`) has nothing to gain.
+        """
+        return DaskStore(self.get_client()) if self.isolated else None
+
     def map(self, func, payloads, *, n_workers, threads=None):
         import distributed
 
         client = self.get_client()
+        payloads = list(payloads)
 
         # Scatter first: a payload is a slice of the neurons, and putting that
         # in the task graph would push all of it through the scheduler. This
         # sends it straight to the workers instead. `hash=False` because
         # hashing megabytes of neuron to deduplicate payloads that are unique
         # by construction is pure cost.
-        scattered = client.scatter(list(payloads), hash=False)
+        scattered = client.scatter(payloads, hash=False)
 
         # `pure=False`: navis functions are not pure (`inplace=`, RNG-driven
         # resampling), so dask must not dedupe or cache calls by their inputs.
-        futures = client.map(func, scattered, pure=False)
+        # Units with shared arguments depend on them, so that dask has them on
+        # the worker before the unit starts - see `DaskRef`.
+        shared = [_scattered[r.key] for r in store.refs(payloads)
+                  if r.key in _scattered]
+        if shared:
+            futures = client.map(_run_with, scattered, run=func,
+                                 shared=shared, pure=False)
+        else:
+            futures = client.map(func, scattered, pure=False)
         try:
             for _, result in distributed.as_completed(futures,
                                                       with_results=True):
@@ -160,7 +181,25 @@ class DaskBackend(ParallelBackend):
             client.cancel(futures, force=True)
             raise
         finally:
-            del scattered, futures
+            del scattered, futures, shared
+
+    @contextlib.contextmanager
+    def submitter(self, func, *, n_workers, threads=None):
+        client = self.get_client()
+        # A `concurrent.futures` front for the client - same `pure=False` as
+        # in `map`, and futures the dispatcher can wait on like any other
+        executor = client.get_executor(pure=False)
+
+        def submit(payload):
+            # Scattered for the same reason as in `map`. In a list: a payload
+            # is a tuple, which `scatter` would otherwise take apart
+            [data] = client.scatter([payload], hash=False)
+            return executor.submit(func, data)
+
+        try:
+            yield submit
+        finally:
+            executor.shutdown(wait=False)
 
 
 def _workers_are_processes(client) -> bool:
@@ -174,3 +213,51 @@ def _workers_are_processes(client) -> bool:
     cluster = getattr(client, 'cluster', None)
     processes = getattr(cluster, 'processes', None)
     return True if processes is None else bool(processes)
+
+
+#: Scattered shared arguments of the runs in flight, by key. Held here so that
+#: `map` can make each unit depend on the ones it needs, and released by
+#: `DaskStore.close`.
+_scattered = {}
+
+
+class DaskRef(SharedRef):
+    """An object scattered to the cluster, by key.
+
+    Not the future itself: the payloads are scattered too, and a future inside
+    scattered data belongs to no client and can never be waited on. Instead
+    `DaskBackend.map` makes each unit depend on the futures it needs, which has
+    dask deliver the data to the worker before the unit starts.
+    """
+
+    def load(self):
+        import distributed
+
+        return distributed.get_worker().data[self.key]
+
+
+class DaskStore(ObjectStore):
+    """Keeps shared arguments on the workers for the length of one run."""
+
+    def __init__(self, client):
+        self.client = client
+        self._keys = []
+
+    def put(self, obj, data):
+        # `broadcast=True`: every worker needs it, and getting it to them up
+        # front beats all of them asking the one worker that has it at once
+        future = self.client.scatter(obj, broadcast=True, hash=False)
+        _scattered[future.key] = future
+        self._keys.append(future.key)
+        return DaskRef(future.key)
+
+    def close(self):
+        # Dropping the last reference is what lets the scheduler release it
+        for key in self._keys:
+            _scattered.pop(key, None)
+        self._keys.clear()
+
+
+def _run_with(payload, run, shared=None):
+    """Call `run(payload)` once `shared` - unused here - is on the worker."""
+    return run(payload)
@@ -0,0 +1,263 @@
+#    This script is part of navis (http://www.github.com/navis-org/navis).
+#    Copyright (C) 2018 Philipp Schlegel
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+
+"""The Ray backend.
+
+Ray is not reachable through a `concurrent.futures.Executor` - it has no
+executor shim, only remote functions and an object store - so it gets a
+backend of its own, much like submitit.
+
+Two things make it worth having over a generic adapter:
+
+- **placement by resources.** Every unit of work asks Ray for as many CPUs as
+  it will run threads, so a node never runs more `workers x threads` than it
+  has cores. That is the same bargain `navis/compute/threads.py` strikes for a
+  local pool, except that here the scheduler keeps it.
+- **the object store.** Each unit of work - neurons and all - is put in Ray's
+  object store, and so is a shared argument such as a volume or a transform,
+  once. A worker reads their numpy arrays (node tables, vertices, points)
+  straight from its node's shared memory, without copying them. Those arrays
+  are read-only, so the backend says as much (`writable_payloads = False`) and
+  a step that changes a neuron copies it first - only that step, and only
+  that neuron.
+
+"""
+
+import pickle
+import contextlib
+
+from typing import Optional
+
+from ... import config
+from .. import store
+from ..store import ObjectStore, SharedRef
+from ..threads import limit_native_threads
+from .base import ParallelBackend, apply_overrides, then
+
+logger = config.get_logger(__name__)
+
+__all__ = ['RayBackend']
+
+#: Why there is nothing to run on. Raised at the point of use, like the dask
+#: backend's equivalent: `ray.init()` may well be called after the backend is
+#: set.
+NO_CLUSTER = (
+    "The 'ray' backend needs a Ray cluster to talk to and none is connected "
+    'in this session. Start or connect to one first:\n'
+    '    import ray\n'
+    "    ray.init()                  # or ray.init(address='auto')\n"
+    "or let navis connect for you:\n"
+    "    navis.set_parallel_backend(RayBackend(address='auto'))"
+)
+
+
+class RayBackend(ParallelBackend):
+    """Run on a Ray cluster.
+
+    Never selected automatically. Connect to (or start) a cluster with Ray's
+    own API and name the backend::
+
+        import ray
+        ray.init()
+
+        with navis.set_parallel_backend('ray'):
+            navis.prune_twigs(nl, 5, parallel=True)
+
+    or have navis connect, and set Ray options for every unit of work::
+
+        be = RayBackend(address='auto', options={'memory': 4 * 1024**3})
+        navis.set_parallel_backend(be)
+
+    Each unit of work reserves one CPU per thread it may use - see
+    `inner_max_num_threads` in [`navis.set_parallel_backend`][] - so Ray only
+    places as many units on a node as it has cores for.
+
+    Parameters
+    ----------
+    address :   str, optional
+                Passed to `ray.init()` if Ray is not yet initialised when work
+                arrives. `None` requires you to have called `ray.init()`.
+    num_cpus :  int
+                CPUs (and hence threads) per unit of work where the thread cap
+                leaves it open - i.e. under the default `"auto"`, which on a
+                cluster means "whatever the scheduler allots".
+    options :   dict, optional
+                Further Ray task options for every unit of work, e.g.
+                `memory`, `num_gpus`, `resources` or `scheduling_strategy`.
+
+    """
+
+    name = 'ray'
+    auto_select = False
+    requires = 'ray'
+
+    isolated = True
+    # Arrays arrive as read-only views into the object store
+    writable_payloads = False
+    pickles_by_value = True     # cloudpickle
+    # Ray decides where a unit runs, and that node's cores are what its threads
+    # compete for - not this machine's. Units reserve CPUs instead; see above.
+    shares_machine = False
+    # Ray re-raises a worker's exception as a `RayTaskError` that subclasses
+    # the original type but carries the whole remote traceback as its message.
+    # Have the worker send failures home as data so callers see their own.
+    marshals_exceptions = False
+    # A task costs a scheduler round trip and an object store entry, same as
+    # on dask - bundle.
+    chunks_per_worker = 8
+
+    def __init__(self, address: Optional[str] = None, *, num_cpus: int = 1,
+                 options: Optional[dict] = None, **overrides):
+        self.address = address
+        self.num_cpus = num_cpus
+        self.options = dict(options or {})
+        self._remote = None
+        apply_overrides(self, **overrides)
+
+    def _ray(self):
+        """Ray, connected."""
+        import ray
+
+        if not ray.is_initialized():
+            if self.address is None:
+                raise ValueError(NO_CLUSTER)
+            ray.init(address=self.address)
+        return ray
+
+    def worker_count(self, hint):
+        """Size units against the cluster's CPUs, not against this machine."""
+        try:
+            import ray
+
+            if not ray.is_initialized():
+                return hint
+            cpus = int(ray.cluster_resources().get('CPU', 0))
+        except Exception as e:
+            logger.debug(f'Could not read the Ray cluster size ({e}).')
+            return hint
+        return max(1, cpus // max(1, self.num_cpus)) if cpus else hint
+
+    def object_store(self):
+        """Shared arguments go in Ray's object store - read without copies."""
+        return RayStore(self._ray())
+
+    def _remote_for(self, threads):
+        """The remote function, reserving a CPU per thread, and that count."""
+        ray = self._ray()
+
+        if self._remote is None:
+            self._remote = ray.remote(_run_on_ray)
+
+        # One CPU per thread the unit may use: this is what keeps Ray from
+        # stacking more threads on a node than it has cores
+        cpus = threads or self.num_cpus
+        return ray, self._remote.options(num_cpus=cpus, **self.options), cpus
+
+    def map(self, func, payloads, *, n_workers, threads=None):
+        ray, remote, cpus = self._remote_for(threads)
+
+        # Shared arguments as top-level arguments: Ray resolves those before
+        # the unit starts, straight from the node's shared memory.
+        refs = [r for r in store.refs(payloads) if r.key in _held]
+        keys = [r.key for r in refs]
+        shared = [_held[k] for k in keys]
+
+        # The payloads go in the object store, too - see the module docstring
+        pending = [remote.remote(func, ray.put(p), cpus, keys, *shared)
+                   for p in payloads]
+        try:
+            while pending:
+                done, pending = ray.wait(pending, num_returns=1)
+                for ref in done:
+                    yield pickle.loads(ray.get(ref))
+        except BaseException:
+            # Don't leave the cluster chewing on work nobody will collect
+            for ref in pending:
+                try:
+                    ray.cancel(ref, force=True)
+                except Exception as e:
+                    logger.debug(f'Could not cancel Ray task {ref}: {e}')
+            raise
+
+    @contextlib.contextmanager
+    def submitter(self, func, *, n_workers, threads=None):
+        ray, remote, cpus = self._remote_for(threads)
+
+        def submit(payload):
+            # No shared arguments: streamed work does not put any in the store
+            ref = remote.remote(func, ray.put(payload), cpus, [])
+            return then(ref.future(), pickle.loads)
+
+        yield submit
+
+
+#: Shared arguments of the runs in flight, by key. Held here so that `map` can
+#: pass the object refs along, and released by `RayStore.close`.
+_held = {}
+
+#: In a worker: the shared arguments Ray resolved for the current unit.
+_delivered = {}
+
+
+class RayRef(SharedRef):
+    """An object in Ray's object store, by key.
+
+    Not the object ref itself: Ray only resolves refs passed as top-level task
+    arguments, not ones nested in a payload. `RayBackend.map` passes them
+    alongside.
+    """
+
+    def load(self):
+        return _delivered[self.key]
+
+
+class RayStore(ObjectStore):
+    """Keeps shared arguments in Ray's object store for one run."""
+
+    def __init__(self, ray):
+        self.ray = ray
+        self._keys = []
+
+    def put(self, obj, data):
+        ref = self.ray.put(obj)
+        key = ref.hex()
+        _held[key] = ref
+        self._keys.append(key)
+        return RayRef(key)
+
+    def close(self):
+        # Dropping the last reference is what lets Ray free it
+        for key in self._keys:
+            _held.pop(key, None)
+        self._keys.clear()
+
+
+def _run_on_ray(func, payload, cpus, keys, *shared):
+    """Run one unit of work in a Ray worker and pickle the result.
+
+    `payload` arrives resolved from the object store, arrays zero-copy. The
+    result is pickled by us: Ray would otherwise hand the parent read-only
+    views, too - and keep the object store entry alive for as long as they
+    are.
+    """
+    import ray
+
+    global _delivered
+    _delivered = dict(zip(keys, shared))
+    # Ray only sets `OMP_NUM_THREADS`, and only when it starts the worker -
+    # navis-fastcore's pool would still take the whole node
+    limit_native_threads(cpus)
+    try:
+        return ray.cloudpickle.dumps(func(payload))
+    finally:
+        _delivered = {}
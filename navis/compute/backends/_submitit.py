@@ -23,7 +23,10 @@ queueing 10,000 jobs; the chunking policy bundles them instead.
 
 """
 
+from pathlib import Path
+
 from ... import config
+from ..store import FileStore
 from .base import ParallelBackend, apply_overrides
 
 logger = config.get_logger(__name__)
@@ -132,6 +135,23 @@ class SubmititBackend(ParallelBackend):
             reasons.append(NO_EXECUTOR)
         return reasons
 
+    def object_store(self):
+        """Put shared arguments next to the job logs.
+
+        submitit needs the log folder to be visible to the jobs - that is
+        how their results come back - so files there are too. Not shared
+        memory: the jobs are probably running on another node.
+        """
+        if self.executor is None or not self.isolated:
+            return None
+        # The folder may be a template (`logs/%j`): use the part of it that
+        # exists before any job does
+        folder = Path(_underlying(self.executor).folder)
+        while '%' in str(folder):
+            folder = folder.parent
+        folder.mkdir(parents=True, exist_ok=True)
+        return FileStore(folder)
+
     def map(self, func, payloads, *, n_workers, threads=None):
         import submitit
 
@@ -23,6 +23,8 @@ Third-party libraries can register their own via :func:`register_backend`.
 
 """
 
+import functools
+import contextlib
 import concurrent.futures as cf
 
 from abc import ABC, abstractmethod
@@ -30,6 +32,7 @@ from importlib.util import find_spec
 from typing import Callable, Iterator, Optional, Sequence, Tuple
 
 from ... import config
+from ..store import FileStore, ObjectStore
 
 logger = config.get_logger(__name__)
 
@@ -91,6 +94,11 @@ class ParallelBackend(ABC):
                     failed" marker plus text (submitit); the dispatcher then
                     brings failures back as data instead, so callers see the
                     same exception they would have seen locally.
+    writable_payloads : bool
+                    Whether a worker's copy of its arguments can be modified.
+                    False where arrays arrive as read-only, zero-copy views
+                    (Ray's object store): an isolated worker then still has to
+                    copy a neuron before changing it.
 
     """
 
@@ -103,6 +111,7 @@ class ParallelBackend(ABC):
     pickles_by_value: bool = False
     shares_machine: bool = True
     marshals_exceptions: bool = True
+    writable_payloads: bool = True
 
     chunks_per_worker: Optional[int] = None
     max_chunk_bytes: int = 128 * 1024 ** 2
@@ -117,6 +126,15 @@ class ParallelBackend(ABC):
     #: just to find out that the object isn't its own.
     adopts: Tuple[str, ...] = ()
 
+    @property
+    def owns_payloads(self) -> bool:
+        """Whether workers get copies of their arguments to modify as they like.
+
+        If so, a caller's `inplace=False` can become an in-place operation in
+        the worker, which saves a copy.
+        """
+        return self.isolated and self.writable_payloads
+
     def __repr__(self):
         return f"<ParallelBackend '{self.name}' (priority={self.priority})>"
 
@@ -216,6 +234,20 @@ class ParallelBackend(ABC):
         """
         return hint
 
+    def object_store(self) -> Optional[ObjectStore]:
+        """Where to put large arguments that many tasks share, for one run.
+
+        The dispatcher hands such arguments to the store once and sends the
+        workers a handle instead - see `navis/compute/store.py`. The default
+        suits workers that are other processes on this machine: a file in
+        shared memory, which they can all read. `None` sends everything
+        inline, which is the only option for workers that share our memory
+        anyway (nothing to save) and for ones we know nothing about.
+        """
+        if self.isolated and self.shares_machine:
+            return FileStore()
+        return None
+
     @abstractmethod
     def map(self, func: Callable, payloads: Sequence, *,
             n_workers: int, threads: Optional[int] = None) -> Iterator:
@@ -236,6 +268,23 @@ class ParallelBackend(ABC):
         cap silently runs the work at the old one.
         """
 
+    @contextlib.contextmanager
+    def submitter(self, func: Callable, *, n_workers: int,
+                  threads: Optional[int] = None):
+        """Run `func` on payloads handed over one at a time.
+
+        Yields `submit(payload) -> concurrent.futures.Future`. That is what a
+        rolling pool of work needs - start the next unit the moment one
+        finishes, rather than a batch at a time through `map` - see
+        `navis.compute.dispatch.stream_tasks`. Everything still running is
+        the caller's to cancel before the block exits.
+
+        Yields None if the backend can only run whole batches. Callers then
+        fall back to `map`, a window at a time. `n_workers` and `threads` are
+        the same as for :meth:`map`.
+        """
+        yield None
+
     def shutdown(self) -> None:
         """Release any persistent resources (e.g. a reused worker pool)."""
 
@@ -276,6 +325,39 @@ class ExecutorBackend(ParallelBackend):
         finally:
             self.release_executor(executor)
 
+    @contextlib.contextmanager
+    def submitter(self, func, *, n_workers, threads=None):
+        executor = self.get_executor(n_workers, threads)
+        try:
+            yield functools.partial(executor.submit, func)
+        finally:
+            self.release_executor(executor)
+
+
+def then(future, func: Callable) -> cf.Future:
+    """A future for `func(future.result())`.
+
+    For a backend whose futures carry something other than the result itself
+    - pickled bytes, or the result plus bookkeeping - to hand out ones that
+    carry the result. Cancelling the new future cancels `future`, too.
+    """
+    out = cf.Future()
+
+    def done(f):
+        if out.cancelled():
+            return
+        if f.cancelled():
+            out.cancel()
+            return
+        try:
+            out.set_result(func(f.result()))
+        except BaseException as e:
+            out.set_exception(e)
+
+    out.add_done_callback(lambda o: o.cancelled() and future.cancel())
+    future.add_done_callback(done)
+    return out
+
 
 class WrappedExecutorBackend(ExecutorBackend):
     """Adapter for an `Executor` instance handed to us by the user.
@@ -672,7 +754,8 @@ def set_parallel_backend(backend=None, *, n_workers=None,
                 a `submitit.Executor` - which is how you point navis at a
                 cluster. Configure it with its own library's API and hand it
                 over; navis deliberately has no `slurm_partition`-style
-                parameters of its own.
+                parameters of its own. Ray has no such object: connect with
+                `ray.init()` and pass `"ray"`.
     n_workers : int, optional
                 Default number of workers. `None` leaves it unchanged.
     inner_max_num_threads : int | "auto", optional
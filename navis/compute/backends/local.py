@@ -14,25 +14,51 @@
 """Dependency-free backends: serial, threads and the stdlib process pool."""
 
 import os
+import sys
+import functools
+import importlib
+import contextlib
 import threading
 import multiprocessing as mp
 import concurrent.futures as cf
 
 from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
 
 from ... import config
-from .base import ParallelBackend, ExecutorBackend, non_forking_context
+from ..dispatch import default_n_workers, init_pool_worker
+from .base import ParallelBackend, ExecutorBackend, non_forking_context, then
+
+try:
+    import resource
+except ImportError:     # Windows
+    resource = None
 
 logger = config.get_logger(__name__)
 
-__all__ = ['SerialBackend', 'ThreadBackend', 'ProcessBackend']
+__all__ = ['SerialBackend', 'ThreadBackend', 'ProcessBackend', 'warm_pool']
 
 #: Seconds an unused process pool is kept alive. Starting one costs ~2s (the
 #: workers re-import navis), so keeping it around makes a sequence of parallel
 #: calls much faster; holding it forever would keep N idle interpreters
-#: resident. Set to 0 to tear the pool down after every call.
+#: resident. Set to 0 to tear the pool down after every call. A pool started
+#: with `warm_pool()` ignores this and stays up until `navis.compute.shutdown()`.
 IDLE_TIMEOUT = 60
 
+#: Modules the workers import before they are handed any work. Under
+#: `forkserver` they are imported once, by the server, and every worker forks
+#: from it with them in place - which turns a ~2s worker start into a fork.
+#: Under `spawn` each worker still imports them itself, but up front rather than
+#: on the clock of the first task.
+PRELOAD = ('navis',)
+
+#: Resident memory (bytes) above which a worker is retired. Workers grow - the
+#: allocator rarely hands memory back, and some libraries cache - so a pool
+#: that lives for the whole session can end up holding a lot of it. Checked
+#: after every call that ran on the pool; if any worker is over, the pool is
+#: replaced before the next call. `None` never recycles.
+MAX_WORKER_MEMORY: Optional[int] = None
+
 
 class SerialBackend(ParallelBackend):
     """Run everything in the calling process, one task after another.
@@ -60,6 +86,20 @@ class SerialBackend(ParallelBackend):
         for payload in payloads:
             yield func(payload)
 
+    @contextlib.contextmanager
+    def submitter(self, func, *, n_workers, threads=None):
+        yield functools.partial(_run_now, func)
+
+
+def _run_now(func, payload) -> cf.Future:
+    """Run `func` right away and return the outcome as a finished future."""
+    future = cf.Future()
+    try:
+        future.set_result(func(payload))
+    except Exception as e:
+        future.set_exception(e)
+    return future
+
 
 class ThreadBackend(ExecutorBackend):
     """Run in threads.
@@ -86,13 +126,32 @@ _POOL = None
 _POOL_KEY = None
 _POOL_TIMER = None
 _POOL_LOCK = threading.RLock()
+#: Whether the pool was started by `warm_pool` and so does not idle out.
+_POOL_PINNED = False
+#: Last resident memory each worker of the current pool reported, by pid.
+_WORKER_RSS = {}
+
+
+def _warm_worker(preload, threads=None):
+    """Pool initializer: cap native threads, then import `preload`."""
+    init_pool_worker(threads=threads)
+    for name in preload:
+        try:
+            importlib.import_module(name)
+        except ImportError as e:
+            logger.debug(f'Worker could not preload "{name}": {e}')
 
 
 def _get_pool(n_workers, threads=None):
     """Return a (possibly reused) process pool."""
-    global _POOL, _POOL_KEY, _POOL_TIMER
+    global _POOL, _POOL_KEY, _POOL_TIMER, _POOL_PINNED
 
     ctx = non_forking_context(mp)
+    if ctx.get_start_method() == 'forkserver':
+        # Only takes effect if the server has not been started yet, i.e. for
+        # the first pool of the session - which is also the only time it's
+        # needed: the server outlives the pools forked from it.
+        ctx.set_forkserver_preload(list(PRELOAD))
     # The pid is part of the key so a forked child never inherits - and then
     # deadlocks on - its parent's pool.
     #
@@ -110,10 +169,18 @@ def _get_pool(n_workers, threads=None):
         if _POOL is not None and _POOL_KEY != key:
             _POOL.shutdown(wait=False)
             _POOL = None
+            _POOL_PINNED = False
+            _WORKER_RSS.clear()
 
         if _POOL is None:
-            _POOL = cf.ProcessPoolExecutor(max_workers=n_workers,
-                                           mp_context=ctx)
+            # The cap goes in at start-up because a worker's thread pools can't
+            # be resized later anyway (see the key) - and this way work that is
+            # submitted to the pool directly, like the readers', is capped too.
+            _POOL = cf.ProcessPoolExecutor(
+                max_workers=n_workers,
+                mp_context=ctx,
+                initializer=functools.partial(_warm_worker, PRELOAD,
+                                              threads=threads))
             _POOL_KEY = key
 
         return _POOL
@@ -127,6 +194,8 @@ def _idle_pool():
         if _POOL_TIMER is not None:
             _POOL_TIMER.cancel()
             _POOL_TIMER = None
+        if _POOL_PINNED:
+            return
         if IDLE_TIMEOUT and _POOL is not None:
             _POOL_TIMER = threading.Timer(IDLE_TIMEOUT, shutdown_pool)
             _POOL_TIMER.daemon = True
@@ -137,7 +206,7 @@ def _idle_pool():
 
 def shutdown_pool():
     """Tear down the shared process pool, if there is one."""
-    global _POOL, _POOL_KEY, _POOL_TIMER
+    global _POOL, _POOL_KEY, _POOL_TIMER, _POOL_PINNED
 
     with _POOL_LOCK:
         if _POOL_TIMER is not None:
@@ -147,6 +216,111 @@ def shutdown_pool():
             _POOL.shutdown(wait=False)
             _POOL = None
             _POOL_KEY = None
+        _POOL_PINNED = False
+        _WORKER_RSS.clear()
+
+
+def warm_pool(n_workers: Optional[int] = None, *, threads=None,
+              max_memory: Optional[int] = None):
+    """Start the process pool now, and keep it until told otherwise.
+
+    The `processes` backend reuses its pool between calls anyway, but starts it
+    on demand and lets it go after `IDLE_TIMEOUT` seconds of nothing to do. A
+    service making many small `parallel=True` calls - or a notebook coming back
+    after a coffee - keeps paying for new workers. A warm pool is started up
+    front, with navis already imported in every worker, and stays up until
+    `navis.compute.shutdown()` (or interpreter exit). Everything that runs on
+    the `processes` backend uses it: `parallel=True` functions, pipelines,
+    NBLAST and the readers.
+
+    Parameters
+    ----------
+    n_workers :     int, optional
+                    Number of workers. Defaults to the same as `parallel=True`.
+                    Calls asking for a different number get a new pool.
+    threads :       int | "auto", optional
+                    Native threads per worker - see
+                    [`navis.set_parallel_backend`][].
+    max_memory :    int, optional
+                    Recycle the workers once one of them holds more than this
+                    many bytes. Defaults to `MAX_WORKER_MEMORY`.
+
+    Examples
+    --------
+    >>> import navis
+    >>> nl = navis.example_neurons(4, kind='skeleton')
+    >>> navis.warm_pool(2)                                      # doctest: +SKIP
+    >>> navis.prune_twigs(nl, 5000, parallel=True, n_cores=2)   # doctest: +SKIP
+
+    """
+    global _POOL_PINNED, MAX_WORKER_MEMORY
+
+    from ..dispatch import resolve_thread_cap
+    from .base import get_backend
+
+    n_workers = n_workers or default_n_workers()
+    # The registered instance, so the cap - and with it the pool's key - comes
+    # out the same as for the calls that are going to use the pool
+    cap = resolve_thread_cap(get_backend('processes'), n_workers,
+                             requested=threads)
+    if max_memory is not None:
+        MAX_WORKER_MEMORY = int(max_memory)
+
+    with _POOL_LOCK:
+        pool = _get_pool(n_workers, cap)
+        _POOL_PINNED = True
+
+    # Workers start on demand, one per submission that finds none idle - so
+    # one submission per worker starts them all. Wait, so that "warm" means it.
+    for f in [pool.submit(_worker_rss) for _ in range(n_workers)]:
+        f.result()
+
+
+def _worker_rss() -> Optional[int]:
+    """Current resident memory of this process in bytes, if we can tell."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    if resource is None:
+        return None
+    # No /proc (macOS): the peak will have to do, which errs towards recycling
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def _measured(func, payload):
+    """Run `func` in a worker and report the worker's memory with the result."""
+    return func(payload), os.getpid(), _worker_rss()
+
+
+def _unmeasured(out):
+    """Undo `_measured`: file the worker's memory, return the result."""
+    result, pid, rss = out
+    _WORKER_RSS[pid] = rss
+    return result
+
+
+def _recycle_if_bloated():
+    """Retire the pool if a worker grew past `MAX_WORKER_MEMORY`."""
+    global _POOL, _POOL_KEY
+
+    if MAX_WORKER_MEMORY is None:
+        return
+    with _POOL_LOCK:
+        fat = {pid: rss for pid, rss in _WORKER_RSS.items()
+               if rss is not None and rss > MAX_WORKER_MEMORY}
+        if not fat or _POOL is None:
+            return
+        logger.debug(f'Recycling the process pool: {len(fat)} worker(s) over '
+                     f'{MAX_WORKER_MEMORY / 1e6:.0f} MB.')
+        # Not `shutdown_pool`: a warm pool stays warm, just with new workers.
+        # Running work (another thread's call) finishes on the old workers.
+        _POOL.shutdown(wait=False)
+        _POOL = None
+        _POOL_KEY = None
+        _WORKER_RSS.clear()
 
 
 class ProcessBackend(ExecutorBackend):
@@ -168,17 +342,32 @@ class ProcessBackend(ExecutorBackend):
 
     def release_executor(self, executor):
         # Pool is shared and outlives this call - just start the idle timer
+        _recycle_if_bloated()
         _idle_pool()
 
     def map(self, func, payloads, *, n_workers, threads=None):
+        measured = functools.partial(_measured, func)
         try:
-            yield from super().map(func, payloads, n_workers=n_workers,
-                                   threads=threads)
+            for out in super().map(measured, payloads, n_workers=n_workers,
+                                   threads=threads):
+                yield _unmeasured(out)
         except BrokenProcessPool:
             # A dead worker (OOM kill, segfault) poisons the whole executor -
             # drop it so the next call gets a fresh one.
             shutdown_pool()
             raise
 
+    @contextlib.contextmanager
+    def submitter(self, func, *, n_workers, threads=None):
+        measured = functools.partial(_measured, func)
+        try:
+            with super().submitter(measured, n_workers=n_workers,
+                                   threads=threads) as submit:
+                yield lambda payload: then(submit(payload), _unmeasured)
+        except BrokenProcessPool:
+            # Same as in `map`
+            shutdown_pool()
+            raise
+
     def shutdown(self):
         shutdown_pool()
@@ -27,22 +27,31 @@ imports are an easy way to break pickling of the functions we ship to workers.
 
 import os
 import sys
+import math
+import time
+import heapq
 import pickle
 import functools
+import itertools
+import threading
 import traceback
+import concurrent.futures as cf
 
 from dataclasses import dataclass
-from typing import (Any, Callable, Iterator, List, NamedTuple, Optional,
-                    Sequence, Tuple)
+from typing import (Any, Callable, Iterable, Iterator, List, NamedTuple,
+                    Optional, Sequence, Tuple)
 
 from .. import config
+from . import profiling
+from . import store as object_store
+from . import scaling as scaling_
 from .threads import limit_native_threads
 
 logger = config.get_logger(__name__)
 
-__all__ = ['map_tasks', 'imap_tasks', 'cpu_count', 'default_n_workers',
-           'resolve_thread_cap', 'FailedRun', 'init_pool_worker',
-           'worker_initializer']
+__all__ = ['map_tasks', 'imap_tasks', 'stream_tasks', 'cpu_count', 'default_n_workers',
+           'resolve_thread_cap', 'resolve_split', 'FailedRun', 'init_pool_worker',
+           'worker_initializer', 'CostModel', 'cost_model', 'plan_chunks']
 
 
 def cpu_count() -> int:
@@ -138,6 +147,52 @@ def resolve_thread_cap(backend, n_workers: Optional[int],
     return max(1, cpu_count() // max(1, n_workers or default_n_workers()))
 
 
+def resolve_split(backend, n_workers: int, requested=None, *,
+                  scaling=None, costs=None) -> Tuple[int, Optional[int]]:
+    """How many workers to run, and how many threads each may use.
+
+    Same as `(n_workers, resolve_thread_cap(...))` - unless the thread cap is
+    "auto" and the function has a scaling profile (see `scaling.py`). Then
+    `n_workers` is only an upper bound, and this machine's cores are split
+    into workers x threads the way the profile says finishes first: a few big
+    neurons through a well-threaded kernel get fewer workers with more
+    threads each.
+
+    Parameters
+    ----------
+    backend :   ParallelBackend
+    n_workers : int
+                How many workers the caller asked for.
+    requested : int | "auto" | None
+                See :func:`resolve_thread_cap`.
+    scaling :   scaling.Scaling, optional
+                The profile of the function about to run.
+    costs :     list of float, optional
+                Estimated cost of each task. None means `n_workers` tasks that
+                are all alike.
+
+    """
+    if requested is None:
+        requested = config.inner_max_num_threads
+
+    # Only where the workers really split this machine's cores - and only if
+    # the backend lets us pick how many there are: a user's executor comes
+    # with its own size, which `worker_count` reports instead of the hint
+    if (scaling is None or requested != 'auto' or not backend.shares_machine
+            or backend.worker_count(n_workers) != n_workers):
+        return n_workers, resolve_thread_cap(backend, n_workers, requested)
+
+    workers, threads = scaling_.plan_split(cpu_count(), scaling,
+                                           costs or [1.] * n_workers,
+                                           max_workers=n_workers)
+    if workers != n_workers:
+        logger.debug(f'Splitting cores into {workers} workers x {threads} '
+                     f'threads rather than {n_workers} workers (parallel '
+                     f'fraction {scaling.parallel_fraction:.2f}, '
+                     f'{scaling.source}).')
+    return workers, threads
+
+
 # --------------------------------------------------------------------------- #
 # Worker context
 # --------------------------------------------------------------------------- #
@@ -288,6 +343,13 @@ class Chunk(NamedTuple):
     #: re-raise and would otherwise lose the worker's frames.
     want_traceback: bool
     tasks: Sequence[Tuple[Callable, Sequence, dict]]
+    #: Time each task, so the parent can learn what its tasks cost. See
+    #: :class:`CostModel`.
+    timed: bool = False
+    #: Record spans for the parent's `navis.profile()`. See `profiling.py`.
+    profile: bool = False
+    #: Some arguments are handles into an object store. See `store.py`.
+    shared: bool = False
 
 
 def _unshare_pbar_lock() -> None:
@@ -391,8 +453,21 @@ def run_chunk(chunk: Chunk):
         hidden, config.pbar_hide = config.pbar_hide, True
 
     results = []
+    durations = [] if chunk.timed else None
+    records = profiling.start_chunk() if chunk.profile else None
+    if records is not None:
+        chunk_span = profiling.Span('chunk', None, chunk=chunk.index)
     try:
-        for func, args, kwargs in chunk.tasks:
+        for slot, task in enumerate(chunk.tasks):
+            if records is not None:
+                n_before = len(records)
+                task_span = profiling.Span('task', None, chunk=chunk.index)
+            func, args, kwargs = (object_store.unwrap(task) if chunk.shared
+                                  else task)
+            # After fetching any shared arguments: that happens once per
+            # worker, and would teach the cost model that whichever task
+            # happened to go first is expensive
+            start = time.perf_counter() if chunk.timed else 0
             try:
                 results.append(func(*args, **kwargs))
             except BaseException as e:
@@ -400,11 +475,27 @@ def run_chunk(chunk: Chunk):
                     raise
                 results.append(_FailedTask(
                     e, traceback.format_exc() if chunk.want_traceback else None))
+            if chunk.timed:
+                durations.append(time.perf_counter() - start)
+            if records is not None:
+                # Position within the chunk; the parent knows which input
+                # that is. Covers the steps recorded while this task ran, too.
+                for r in records[n_before:]:
+                    r.update(task=slot, chunk=chunk.index)
+                # What travelled: a handle, where the argument was shared
+                task_span.stop(records, name=CostModel.key(func), task=slot,
+                               bytes_in=profiling.nbytes(tuple(task[1:])),
+                               bytes_out=profiling.nbytes(results[-1]))
     finally:
         if hidden is not None:
             config.pbar_hide = hidden
+        if records is not None:
+            profiling.stop_chunk()
 
-    return chunk.index, results
+    if records is not None:
+        chunk_span.stop(records)
+
+    return chunk.index, results, durations, records
 
 
 # --------------------------------------------------------------------------- #
@@ -496,6 +587,181 @@ def _serialisation_hint(exc, backend) -> Optional[str]:
     )
 
 
+# --------------------------------------------------------------------------- #
+# Cost model
+# --------------------------------------------------------------------------- #
+# Neurons in a real list vary in size by three orders of magnitude, and so does
+# the work they make. Chunks of equal *count* then finish at wildly different
+# times: the worker that drew the three biggest meshes is still busy long after
+# everyone else has gone idle, and the job takes as long as that one straggler.
+#
+# The fix is the textbook one for scheduling jobs of unequal length: estimate
+# what each task costs, start the most expensive ones first, and - where tasks
+# are bundled - pack bundles to equal estimated cost rather than equal count.
+# The caller supplies sizes (node, vertex or point counts - see
+# `navis.core.core_utils.task_sizes`); this module turns them into costs.
+
+#: Whether to time tasks and learn, per function, how run time scales with
+#: task size. Only applies when the caller supplies sizes.
+LEARN_COSTS = True
+
+
+class CostModel:
+    """Learns how a function's run time scales with the size of its input.
+
+    Sizes alone get the *order* right - a bigger neuron is more work - but not
+    the ratios: for a function that is quadratic in the number of nodes, one
+    neuron ten times the size of another costs a hundred times as much. The
+    model fits `time ~ size ** exponent` per function (a straight line in log-log
+    space) from the tasks it has timed, and estimates cost as `size ** exponent`.
+    Until a function has been seen often enough, the exponent is 1.
+
+    Estimates are relative, not seconds: all the scheduler needs is "how much
+    more work is this than that".
+    """
+
+    #: Timed tasks needed before the fitted exponent is trusted.
+    MIN_SAMPLES = 16
+    #: The fitted exponent is clamped to this range. Timing noise on tiny tasks
+    #: can produce absurd fits, and a wrong exponent hurts more than none.
+    EXPONENT_RANGE = (0.5, 3.0)
+    #: Tasks faster than this (seconds) are dominated by overhead, not by their
+    #: size, and would only drag the fit towards zero.
+    MIN_DURATION = 1e-4
+
+    def __init__(self):
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return f'<CostModel ({len(self._stats)} functions)>'
+
+    @staticmethod
+    def key(func) -> Optional[str]:
+        """What a function's timings are filed under. None if unidentifiable."""
+        while isinstance(func, functools.partial):
+            func = func.func
+        # `_ChainRunner` and friends can say what they stand for
+        key = getattr(func, '__cost_key__', None)
+        if key is not None:
+            return key
+        func = getattr(func, '__func__', func)
+        module = getattr(func, '__module__', None)
+        qualname = getattr(func, '__qualname__', None)
+        if not module or not qualname:
+            return None
+        return f'{module}.{qualname}'
+
+    def exponent(self, key: Optional[str]) -> float:
+        """Fitted exponent for `key`; 1 if there's not enough data."""
+        stats = self._stats.get(key)
+        if stats is None or stats[0] < self.MIN_SAMPLES:
+            return 1.0
+        n, sx, sy, sxx, sxy = stats
+        var = sxx - sx * sx / n
+        # All tasks the same size: nothing to learn a slope from
+        if var <= 1e-9:
+            return 1.0
+        slope = (sxy - sx * sy / n) / var
+        lo, hi = self.EXPONENT_RANGE
+        return min(max(slope, lo), hi)
+
+    def estimate(self, key: Optional[str], sizes: Sequence[float]) -> List[float]:
+        """Estimated relative cost of tasks of the given sizes."""
+        e = self.exponent(key)
+        return [max(float(s), 1.0) ** e for s in sizes]
+
+    def record(self, key: Optional[str], sizes: Sequence[float],
+               durations: Sequence[float]) -> None:
+        """File the timings of finished tasks under `key`."""
+        if key is None:
+            return
+        points = [(math.log(s), math.log(d)) for s, d in zip(sizes, durations)
+                  if s >= 1 and d >= self.MIN_DURATION]
+        if not points:
+            return
+        with self._lock:
+            stats = self._stats.setdefault(key, [0, 0., 0., 0., 0.])
+            for x, y in points:
+                stats[0] += 1
+                stats[1] += x
+                stats[2] += y
+                stats[3] += x * x
+                stats[4] += x * y
+
+    def reset(self) -> None:
+        """Forget everything learned so far."""
+        with self._lock:
+            self._stats.clear()
+
+
+#: The model `map_tasks` consults and trains. Module level, so it keeps
+#: learning across calls for the life of the session.
+cost_model = CostModel()
+
+
+def plan_chunks(costs: Sequence[float], n_chunks: int) -> List[List[int]]:
+    """Pack tasks into `n_chunks` bundles of roughly equal total cost.
+
+    The greedy "longest processing time first" rule: take the tasks from most
+    to least expensive and always add the next one to the currently cheapest
+    bundle. Simple, and never worse than 4/3 of the best possible packing.
+
+    Returns task indices per bundle, most expensive bundle first and, within a
+    bundle, most expensive task first - dispatching in that order means the
+    biggest pieces of work start first and the small ones fill in the gaps.
+    """
+    order = sorted(range(len(costs)), key=costs.__getitem__, reverse=True)
+    n_chunks = max(1, min(int(n_chunks), len(order)))
+    if n_chunks == len(order):
+        return [[i] for i in order]
+
+    bundles = [[] for _ in range(n_chunks)]
+    heap = [(0., b) for b in range(n_chunks)]
+    totals = [0.] * n_chunks
+    for i in order:
+        total, b = heapq.heappop(heap)
+        bundles[b].append(i)
+        totals[b] = total + costs[i]
+        heapq.heappush(heap, (totals[b], b))
+
+    keep = sorted((b for b in range(n_chunks) if bundles[b]),
+                  key=totals.__getitem__, reverse=True)
+    return [bundles[b] for b in keep]
+
+
+def _task_costs(tasks, sizes) -> Tuple[List[float], List[Optional[str]]]:
+    """Estimated cost and cost-model key of each task."""
+    keys = {}
+    task_keys = []
+    for func, _, _ in tasks:
+        # Tasks mostly share one function: look each up once
+        if id(func) not in keys:
+            keys[id(func)] = CostModel.key(func)
+        task_keys.append(keys[id(func)])
+
+    costs = [0.] * len(tasks)
+    by_key = {}
+    for i, k in enumerate(task_keys):
+        by_key.setdefault(k, []).append(i)
+    for k, idx in by_key.items():
+        for i, c in zip(idx, cost_model.estimate(k, [sizes[i] for i in idx])):
+            costs[i] = c
+    return costs, task_keys
+
+
+def _task_scaling(tasks, keys=None):
+    """The scaling profile of the function the tasks run, if they all run one."""
+    if keys is None:
+        funcs = {id(func): func for func, _, _ in tasks}
+        keys = {CostModel.key(func) for func in funcs.values()}
+    else:
+        keys = set(keys)
+    if len(keys) != 1:
+        return None
+    return scaling_.get_scaling(keys.pop())
+
+
 # --------------------------------------------------------------------------- #
 # The dispatcher
 # --------------------------------------------------------------------------- #
@@ -516,6 +782,63 @@ def _iter_completed(backend, payloads, n_workers, threads=None) -> Iterator:
         raise RuntimeError(hint) from e
 
 
+def _resolve_sizes(sizes, tasks, backend) -> Optional[List[float]]:
+    """Materialise the caller's task sizes, if they can make a difference."""
+    # Order only matters where tasks run side by side
+    if sizes is None or not backend.concurrent or len(tasks) < 2:
+        return None
+    if callable(sizes):
+        try:
+            sizes = sizes()
+        except Exception as e:
+            logger.debug(f'Task sizes failed ({e}); scheduling in input order.')
+            return None
+    sizes = [float(s) for s in sizes]
+    if len(sizes) != len(tasks):
+        logger.debug(f'Got {len(sizes)} task sizes for {len(tasks)} tasks; '
+                     'scheduling in input order.')
+        return None
+    return sizes
+
+
+def _learn(positions, results, durations, sizes, keys) -> None:
+    """Feed the timings of a finished unit back into the cost model."""
+    by_key = {}
+    for pos, result, d in zip(positions, results, durations):
+        # A failure says nothing about how long the work takes
+        if isinstance(result, _FailedTask):
+            continue
+        s, t = by_key.setdefault(keys[pos], ([], []))
+        s.append(sizes[pos])
+        t.append(d)
+    for key, (s, t) in by_key.items():
+        cost_model.record(key, s, t)
+
+
+def _file_records(prof, records, positions, dispatched) -> None:
+    """Add a profiled chunk's spans to `prof`, plus the legs it travelled."""
+    arrived = time.time()
+    for r in records:
+        if r.get('task') is not None:
+            r['task'] = positions[r['task']]
+        if r['kind'] == 'chunk':
+            # The worker can't know what the whole run is called; we do
+            r['name'] = dispatched['name']
+            # Neither leg can be timed end to end from one process, but the
+            # clocks of processes on one machine agree well enough
+            finished = r['start'] + r['wall']
+            prof.records.append(dict(
+                kind='queue', name=r['name'], chunk=r['chunk'],
+                start=dispatched['start'],
+                wall=max(0.0, r['start'] - dispatched['start']),
+                pid=dispatched['pid'], tid=dispatched['tid']))
+            prof.records.append(dict(
+                kind='return', name=r['name'], chunk=r['chunk'],
+                start=finished, wall=max(0.0, arrived - finished),
+                pid=dispatched['pid'], tid=dispatched['tid']))
+    prof.records.extend(records)
+
+
 def imap_tasks(tasks: Sequence[Tuple[Callable, Sequence, dict]],
                *,
                backend,
@@ -525,7 +848,8 @@ def imap_tasks(tasks: Sequence[Tuple[Callable, Sequence, dict]],
                desc: Optional[str] = None,
                disable: bool = False,
                threads=None,
-               size_hint: Optional[Callable[[], float]] = None) -> Iterator:
+               size_hint: Optional[Callable[[], float]] = None,
+               sizes=None) -> Iterator:
     """Run `tasks` on `backend`, yielding `(index, result)` as they land.
 
     Same contract as :func:`map_tasks` except for the order: results arrive as
@@ -541,14 +865,10 @@ def imap_tasks(tasks: Sequence[Tuple[Callable, Sequence, dict]],
 
     n_workers = n_workers or default_n_workers()
 
-    cs = backend.chunksize(len(tasks), n_workers,
-                           requested=chunksize, size_hint=size_hint)
-    cs = max(1, int(cs))
-
-    chunks = [tasks[i:i + cs] for i in range(0, len(tasks), cs)]
-    if cs > 1:
-        logger.debug(f"'{backend.name}': {len(tasks)} tasks in {len(chunks)} "
-                     f'units of up to {cs}.')
+    sizes = _resolve_sizes(sizes, tasks, backend)
+    costs = keys = None
+    if sizes is not None:
+        costs, keys = _task_costs(tasks, sizes)
 
     # Only ship the context where it's needed: applying it in-process would
     # clobber the parent's own config - and, for the thread cap, would hobble
@@ -559,31 +879,241 @@ def imap_tasks(tasks: Sequence[Tuple[Callable, Sequence, dict]],
     # capping something that runs here.
     context = cap = None
     if backend.isolated:
-        cap = resolve_thread_cap(backend, n_workers, requested=threads)
+        # Decided before the units are cut: a function that threads well may
+        # run on fewer workers than asked for, and units are sized per worker
+        n_workers, cap = resolve_split(backend, n_workers, requested=threads,
+                                       scaling=_task_scaling(tasks, keys),
+                                       costs=costs or [1.] * len(tasks))
         context = WorkerContext.snapshot(cap)
 
+    cs = backend.chunksize(len(tasks), n_workers,
+                           requested=chunksize, size_hint=size_hint)
+    cs = max(1, int(cs))
+
+    # Which tasks go into which unit, and in what order the units are handed
+    # out. Without sizes that is simply in input order, `cs` at a time.
+    plan = [list(range(i, min(i + cs, len(tasks))))
+            for i in range(0, len(tasks), cs)]
+    if sizes is not None:
+        if chunksize is None:
+            # Same number of units as the backend asked for, but of equal cost
+            # rather than equal count - and the most expensive go out first
+            plan = plan_chunks(costs, len(plan))
+        else:
+            # An explicit chunksize is a promise about how many tasks make a
+            # unit, so keep the units and only change the order they go in
+            plan.sort(key=lambda p: sum(costs[i] for i in p), reverse=True)
+
+    chunks = [[tasks[i] for i in p] for p in plan]
+    if cs > 1:
+        logger.debug(f"'{backend.name}': {len(tasks)} tasks in {len(chunks)} "
+                     f'units of up to {max(len(c) for c in chunks)}.')
+
     # A transport that can't carry an exception home intact (submitit turns
     # every one of them into a generic "job failed") would otherwise make the
     # error a caller sees depend on which backend is configured. Have the
     # worker hand failures back as data instead and raise them here.
     reraises_here = not backend.marshals_exceptions and not omit_failures
-    payloads = [Chunk(index=i, context=context,
-                      catch=omit_failures or reraises_here,
-                      want_traceback=reraises_here, tasks=c)
-                for i, c in enumerate(chunks)]
-
-    with config.tqdm(total=len(tasks), desc=desc, disable=disable,
-                     leave=config.pbar_leave) as pbar:
-        for index, results in _iter_completed(backend, payloads, n_workers,
-                                              threads=cap):
-            pbar.update(len(chunks[index]))
-            for offset, (task, result) in enumerate(zip(chunks[index], results)):
-                if isinstance(result, _FailedTask):
-                    if not omit_failures:
-                        result.reraise()
-                    # Rebuild the full FailedRun here, where the args still live
-                    result = FailedRun(*task, exception=result.exception)
-                yield index * cs + offset, result
+    timed = sizes is not None and LEARN_COSTS
+    prof = profiling.active()
+
+    # A volume or a transform that every task carries goes to each worker once
+    # instead of once per unit, and the units carry a handle. See `store.py`.
+    store = shared = None
+    if backend.isolated and backend.concurrent and len(chunks) > 1:
+        store = backend.object_store()
+
+    try:
+        if store is not None:
+            shared = object_store.share(chunks, store)
+        payloads = [Chunk(index=i, context=context,
+                          catch=omit_failures or reraises_here,
+                          want_traceback=reraises_here,
+                          tasks=c if shared is None else shared[i],
+                          timed=timed, profile=prof is not None,
+                          shared=shared is not None)
+                    for i, c in enumerate(chunks)]
+        del shared
+
+        if prof is not None:
+            dispatched = profiling.Span('dispatch', desc or backend.name,
+                                        backend=backend.name,
+                                        n_tasks=len(tasks),
+                                        n_chunks=len(chunks))
+
+        with config.tqdm(total=len(tasks), desc=desc, disable=disable,
+                         leave=config.pbar_leave) as pbar:
+            for index, results, durations, records in _iter_completed(
+                    backend, payloads, n_workers, threads=cap):
+                pbar.update(len(chunks[index]))
+                if durations:
+                    _learn(plan[index], results, durations, sizes, keys)
+                if records:
+                    _file_records(prof, records, plan[index],
+                                  dispatched.record)
+                for pos, task, result in zip(plan[index], chunks[index],
+                                             results):
+                    if isinstance(result, _FailedTask):
+                        if not omit_failures:
+                            result.reraise()
+                        # Rebuild the full FailedRun here, where the args
+                        # (rather than handles to them) still live
+                        result = FailedRun(*task, exception=result.exception)
+                    yield pos, result
+    finally:
+        # Also when the caller stopped listening halfway
+        if store is not None:
+            store.close()
+
+    if prof is not None:
+        dispatched.stop(prof.records)
+
+
+def stream_tasks(tasks: Iterable[Tuple[Callable, Sequence, dict]],
+                 *,
+                 backend,
+                 max_in_flight: int,
+                 n_workers: Optional[int] = None,
+                 chunksize: Optional[int] = None,
+                 ordered: bool = True,
+                 omit_failures: bool = False,
+                 desc: Optional[str] = None,
+                 threads=None) -> Iterator:
+    """Run a stream of tasks on `backend` with a bounded amount in flight.
+
+    Unlike :func:`imap_tasks`, `tasks` can be any iterable - e.g. a generator
+    reading one neuron at a time - and is only pulled from as work finishes.
+    This is a rolling pool: the next unit starts the moment one is done, so a
+    slow task holds up its own slot and nobody else's. With `ordered=True`,
+    results that finish ahead of a slow one are held back until it lands; they
+    still count against `max_in_flight`, which keeps memory bounded either way.
+
+    A backend that can only run whole batches (see
+    `ParallelBackend.submitter`) gets the stream in windows of `max_in_flight`
+    tasks instead, each of which finishes before the next one starts.
+
+    Parameters
+    ----------
+    tasks :         iterable of (func, args, kwargs)
+    backend :       ParallelBackend
+    max_in_flight : int
+                    Maximum number of tasks submitted but not yet yielded.
+    chunksize :     int, optional
+                    Tasks per unit of work. Defaults to 1.
+    ordered :       bool
+                    Yield results in the order of `tasks` rather than as they
+                    complete.
+
+    See :func:`map_tasks` for the other parameters.
+
+    Yields
+    ------
+    (index, result)
+                    `index` is the position of the task in `tasks`.
+
+    """
+    n_workers = n_workers or default_n_workers()
+    cs = max(1, int(chunksize or 1))
+    # Counted in units of `cs` tasks
+    max_units = max(1, int(max_in_flight) // cs)
+
+    # Same as in `imap_tasks`, minus the scaling profile: there is no knowing
+    # what is still to come
+    context = cap = None
+    if backend.isolated:
+        n_workers, cap = resolve_split(backend, n_workers, requested=threads)
+        context = WorkerContext.snapshot(cap)
+    reraises_here = not backend.marshals_exceptions and not omit_failures
+    prof = profiling.active()
+
+    tasks = iter(tasks)
+    units = ((i, batch) for i, batch in enumerate(
+        iter(lambda: list(itertools.islice(tasks, cs)), [])))
+
+    with backend.submitter(run_chunk, n_workers=n_workers,
+                           threads=cap) as submit:
+        if submit is not None:
+            if prof is not None:
+                dispatched = profiling.Span('dispatch', desc or backend.name,
+                                            backend=backend.name)
+            pending = {}    # future -> unit
+            held = {}       # unit -> results finished ahead of an earlier one
+            batches = {}    # unit -> its tasks, until its results are out
+            nxt = 0         # next unit to yield, if ordered
+            exhausted = False
+            try:
+                while True:
+                    while not exhausted and len(pending) + len(held) < max_units:
+                        unit = next(units, None)
+                        if unit is None:
+                            exhausted = True
+                            break
+                        i, batch = unit
+                        batches[i] = batch
+                        pending[submit(Chunk(
+                            index=i, context=context,
+                            catch=omit_failures or reraises_here,
+                            want_traceback=reraises_here, tasks=batch,
+                            profile=prof is not None))] = i
+                    if not pending:
+                        break
+
+                    done, _ = cf.wait(pending, return_when=cf.FIRST_COMPLETED)
+                    for f in done:
+                        i = pending.pop(f)
+                        try:
+                            _, results, _, records = f.result()
+                        except BaseException as e:
+                            hint = _serialisation_hint(e, backend)
+                            if hint is None:
+                                raise
+                            raise RuntimeError(hint) from e
+                        if records:
+                            _file_records(prof, records,
+                                          range(i * cs, i * cs + len(results)),
+                                          dispatched.record)
+                        if ordered:
+                            held[i] = results
+                        else:
+                            yield from _unit_results(i, cs, batches.pop(i),
+                                                     results, omit_failures)
+                    while nxt in held:
+                        yield from _unit_results(nxt, cs, batches.pop(nxt),
+                                                 held.pop(nxt), omit_failures)
+                        nxt += 1
+            finally:
+                # Also when the caller stopped listening halfway
+                for f in pending:
+                    f.cancel()
+            if prof is not None:
+                dispatched.stop(prof.records)
+            return
+
+    # No way to hand units over one at a time: a window at a time, then
+    for start in itertools.count(0, max_units * cs):
+        window = list(itertools.islice(tasks, max_units * cs))
+        if not window:
+            return
+        results = imap_tasks(window, backend=backend, n_workers=n_workers,
+                             chunksize=chunksize, omit_failures=omit_failures,
+                             desc=desc, disable=True, threads=threads)
+        if ordered:
+            out = [None] * len(window)
+            for pos, result in results:
+                out[pos] = result
+            results = enumerate(out)
+        for pos, result in results:
+            yield start + pos, result
+
+
+def _unit_results(i, cs, batch, results, omit_failures) -> Iterator:
+    """`(index, result)` for the tasks of the `i`-th unit of a stream."""
+    for slot, (task, result) in enumerate(zip(batch, results)):
+        if isinstance(result, _FailedTask):
+            if not omit_failures:
+                result.reraise()
+            result = FailedRun(*task, exception=result.exception)
+        yield i * cs + slot, result
 
 
 def map_tasks(tasks: Sequence[Tuple[Callable, Sequence, dict]],
@@ -595,7 +1125,8 @@ def map_tasks(tasks: Sequence[Tuple[Callable, Sequence, dict]],
               desc: Optional[str] = None,
               disable: bool = False,
               threads=None,
-              size_hint: Optional[Callable[[], float]] = None) -> list:
+              size_hint: Optional[Callable[[], float]] = None,
+              sizes=None) -> list:
     """Run `tasks` on `backend` and return the results in *input* order.
 
     Parameters
@@ -622,6 +1153,14 @@ def map_tasks(tasks: Sequence[Tuple[Callable, Sequence, dict]],
     size_hint :     callable, optional
                     Returns the estimated size of one task in bytes. Only
                     called if the backend's chunking policy needs it.
+    sizes :         list of float | callable, optional
+                    Size of each task, e.g. the number of nodes of the neuron
+                    it processes - or a callable returning them, which is only
+                    called if the backend runs tasks concurrently. With sizes,
+                    the most expensive tasks are dispatched first and bundled
+                    units are packed to equal estimated cost instead of equal
+                    task count. How cost scales with size is learned per
+                    function from earlier runs; see :class:`CostModel`.
 
     Returns
     -------
@@ -635,7 +1174,7 @@ def map_tasks(tasks: Sequence[Tuple[Callable, Sequence, dict]],
     for index, result in imap_tasks(tasks, backend=backend, n_workers=n_workers,
                                     chunksize=chunksize, desc=desc,
                                     disable=disable, size_hint=size_hint,
-                                    threads=threads,
+                                    sizes=sizes, threads=threads,
                                     omit_failures=omit_failures):
         out[index] = result
     return out
@@ -0,0 +1,282 @@
+#    This script is part of navis (http://www.github.com/navis-org/navis).
+#    Copyright (C) 2018 Philipp Schlegel
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+
+"""Where the time goes in a parallel run.
+
+A slow `parallel=True` call or [`navis.Pipeline`][] could be slow for very
+different reasons: one step that dominates, one neuron that dominates, or the
+neurons spending longer in transit than being worked on. A plain profiler run in
+the parent sees none of that - the work happens in other processes. So the
+workers record what they do and send it home with their results:
+
+    with navis.profile() as prof:
+        pipe(nl, parallel=True)
+    prof.to_dataframe()                 # one row per span
+    prof.to_chrome_trace('run.json')    # open in chrome://tracing or Perfetto
+
+Each record is a *span* - something with a start and a duration - of a kind:
+
+    'dispatch'  one call to `map_tasks`, in the parent
+    'queue'     from dispatch until a worker started on a chunk: waiting for a
+                free worker, plus pickling and shipping the chunk
+    'chunk'     a worker running one chunk
+    'task'      one task (usually: one neuron) inside a chunk
+    'step'      one step of a pipeline, for one neuron
+    'batch'     one list-level kernel run over many neurons at once, in the
+                caller's process
+    'return'    from a worker finishing a chunk until its results arrived
+    'assemble'  combining the results, in the parent
+
+Important: this module must not import from `navis.core` or `navis.utils` -
+see the note at the top of `dispatch.py`.
+
+"""
+
+import os
+import sys
+import json
+import time
+import pickle
+import threading
+import contextlib
+
+from pathlib import Path
+from typing import Optional, Union
+
+try:
+    import resource
+except ImportError:     # Windows
+    resource = None
+
+__all__ = ['profile', 'Profile']
+
+#: The profile collecting records in this process, if any. Everything that
+#: records checks this (or `_local.records`) first, so profiling that is off
+#: costs one lookup per call - not per task, and not per step.
+_ACTIVE: Optional['Profile'] = None
+
+#: Where spans go while a worker runs a profiled chunk. Per thread, because the
+#: threads backend runs several chunks side by side in one process.
+_local = threading.local()
+
+
+class Profile:
+    """Spans recorded by [`navis.profile`][].
+
+    Attributes
+    ----------
+    records :   list of dict
+                The raw spans. Times are seconds; `start` is a UNIX timestamp
+                so that spans from different processes line up.
+
+    """
+
+    def __init__(self):
+        self.records = []
+        self.started = time.time()
+
+    def __repr__(self):
+        return f'<Profile with {len(self.records)} spans>'
+
+    def __len__(self):
+        return len(self.records)
+
+    def to_dataframe(self):
+        """One row per span.
+
+        Columns are `kind`, `name`, `start`, `wall` and `cpu` (seconds),
+        `pid`, `tid`, plus where they apply: `task` (position in the input),
+        `chunk`, `peak_rss`, `bytes_in` and `bytes_out` (bytes).
+        """
+        import pandas as pd
+
+        cols = ['kind', 'name', 'task', 'chunk', 'start', 'wall', 'cpu',
+                'peak_rss', 'bytes_in', 'bytes_out', 'pid', 'tid']
+        df = pd.DataFrame.from_records(self.records, columns=cols)
+        df['start'] = df.start - self.started
+        return df.sort_values('start', ignore_index=True)
+
+    def summary(self):
+        """Total time per kind of span and name, slowest first."""
+        df = self.to_dataframe()
+        return (df.groupby(['kind', 'name'], dropna=False)
+                  .agg(n=('wall', 'size'), wall=('wall', 'sum'),
+                       cpu=('cpu', 'sum'), max_wall=('wall', 'max'))
+                  .sort_values('wall', ascending=False))
+
+    def to_chrome_trace(self, filepath: Optional[Union[str, Path]] = None) -> dict:
+        """Export in the Chrome trace event format.
+
+        Open the file in `chrome://tracing` or https://ui.perfetto.dev to see
+        every process and thread on a timeline.
+
+        Parameters
+        ----------
+        filepath :  str | Path, optional
+                    Where to write the trace to. If not given, only return it.
+
+        Returns
+        -------
+        dict
+
+        """
+        events = []
+        for r in self.records:
+            args = {k: v for k, v in r.items()
+                    if k not in ('kind', 'name', 'start', 'wall', 'pid', 'tid')
+                    and v is not None}
+            events.append({
+                'name': str(r['name']),
+                'cat': r['kind'],
+                'ph': 'X',
+                'ts': (r['start'] - self.started) * 1e6,
+                'dur': r['wall'] * 1e6,
+                'pid': r['pid'],
+                'tid': r['tid'],
+                'args': args,
+            })
+        trace = {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+        if filepath is not None:
+            with open(Path(filepath).expanduser(), 'w') as f:
+                json.dump(trace, f)
+
+        return trace
+
+
+@contextlib.contextmanager
+def profile():
+    """Record where the time goes in parallel runs and pipelines.
+
+    Everything dispatched through navis' parallel machinery while the context
+    is open is recorded: per task (i.e. per neuron) and per pipeline step, the
+    wall and CPU time, peak memory of the process running it and the size of
+    what was sent there and back - plus the time spent waiting for workers,
+    in transit and putting the results back together. Works on every backend:
+    workers send their records home with their results.
+
+    Sizes are measured by pickling each task's arguments and result once more,
+    so a profiled run is somewhat slower than the real thing. With no profile
+    open, none of this happens.
+
+    Returns
+    -------
+    Profile
+                The records, once the context has closed. See
+                [`Profile.to_dataframe`][navis.compute.profiling.Profile.to_dataframe]
+                and [`Profile.to_chrome_trace`][navis.compute.profiling.Profile.to_chrome_trace].
+
+    Examples
+    --------
+    >>> import navis
+    >>> nl = navis.example_neurons(2, kind='skeleton')
+    >>> pipe = navis.Pipeline().prune_twigs(5000).resample_skeleton(1000)
+    >>> with navis.profile() as prof:
+    ...     _ = pipe(nl, progress=False)
+    >>> df = prof.to_dataframe()
+    >>> sorted(df[df.kind == 'step'].name.unique())
+    ['prune_twigs', 'resample_skeleton']
+
+    """
+    global _ACTIVE
+
+    prev, _ACTIVE = _ACTIVE, Profile()
+    try:
+        yield _ACTIVE
+    finally:
+        _ACTIVE = prev
+
+
+def active() -> Optional[Profile]:
+    """The profile open in this process, if any."""
+    return _ACTIVE
+
+
+def recording() -> Optional[list]:
+    """Where a span should go right now - or None if nobody is listening.
+
+    Inside a profiled chunk that is the chunk's own list (which travels home
+    with its results); otherwise the profile open in this process.
+    """
+    records = getattr(_local, 'records', None)
+    if records is not None:
+        return records
+    return _ACTIVE.records if _ACTIVE is not None else None
+
+
+def start_chunk() -> list:
+    """Start collecting the spans of a chunk in this thread."""
+    _local.records = []
+    return _local.records
+
+
+def stop_chunk() -> list:
+    """Stop collecting, and hand over what was collected."""
+    records, _local.records = _local.records, None
+    return records
+
+
+class Span:
+    """Measures one span. Cheap enough to use per step.
+
+    Use via [`span`][navis.compute.profiling.span], or directly where a context
+    manager does not fit.
+    """
+
+    __slots__ = ('record', '_t0', '_c0')
+
+    def __init__(self, kind, name, **extra):
+        self.record = dict(kind=kind, name=name, start=time.time(),
+                           pid=os.getpid(), tid=threading.get_ident(), **extra)
+        self._t0 = time.perf_counter()
+        # Per thread, so the threads backend does not bill one task for another
+        self._c0 = time.thread_time()
+
+    def stop(self, records: list, **extra) -> dict:
+        self.record['wall'] = time.perf_counter() - self._t0
+        self.record['cpu'] = time.thread_time() - self._c0
+        self.record['peak_rss'] = peak_rss()
+        self.record.update(extra)
+        records.append(self.record)
+        return self.record
+
+
+@contextlib.contextmanager
+def span(kind, name, **extra):
+    """Record the enclosed block as a span, if anybody is listening."""
+    records = recording()
+    if records is None:
+        yield
+        return
+    s = Span(kind, name, **extra)
+    try:
+        yield
+    finally:
+        s.stop(records)
+
+
+def peak_rss() -> Optional[int]:
+    """Peak resident memory of this process so far, in bytes."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def nbytes(obj) -> Optional[int]:
+    """How big `obj` is on the wire, or None if it does not pickle."""
+    try:
+        return len(pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return None
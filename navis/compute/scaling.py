@@ -0,0 +1,358 @@
+#    This script is part of navis (http://www.github.com/navis-org/navis).
+#    Copyright (C) 2018 Philipp Schlegel
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+
+"""How well a function uses threads - and so how to split the cores.
+
+`navis/compute/threads.py` stops workers x threads from oversubscribing the
+machine, but left to "auto" it always divides it the same way: as many workers
+as `n_cores`, and whatever cores are left over as threads. That is right for a
+function that spends its time in pandas, which a second thread does nothing
+for. It is wrong for one that spends its time in navis-fastcore: heal four big
+skeletons with `n_cores=16` and twelve workers sit idle while the four busy
+ones run on a quarter of the threads they could have had.
+
+So a function can say how much of its work runs on threads - its *parallel
+fraction* `p`, in Amdahl's sense: with `t` threads it runs
+`1 / ((1 - p) + p / t)` times as fast as with one. Either it is declared::
+
+    @navis.compute.scaling.declare_scaling(0.9)
+    def my_func(neuron): ...
+
+or measured on this machine with [`calibrate`][navis.compute.scaling.calibrate]
+(one function) or [`benchmark`][navis.compute.scaling.benchmark] (all declared
+ones). A measured profile beats a declared one.
+
+Under `inner_max_num_threads="auto"`, the dispatcher then picks the split of
+this machine's cores into workers x threads that it expects to finish first,
+from the profile and the tasks' estimated costs - see :func:`plan_split`.
+`n_cores` still caps the number of workers. Functions without a profile are
+split as before.
+
+navis declares profiles where the time goes into a threaded kernel:
+`heal_skeleton` (fastcore's MST) and the built-in NBLAST's blocks - which is
+all of `nblast`, `nblast_smart`, `nblast_allbyall` and `synblast` - whose
+pykdtree queries use OpenMP. Not for `geodesic_matrix`, `dist_to_root` and
+the functions built on them: fastcore runs those kernels on one thread, and a
+function that gains nothing from threads is split the same either way.
+
+Important: this module must not import from `navis.core` or `navis.utils` -
+see the note at the top of `dispatch.py`.
+
+"""
+
+import json
+import time
+import importlib
+import multiprocessing
+import functools
+import threading
+import concurrent.futures as cf
+
+from pathlib import Path
+from typing import Callable, Dict, NamedTuple, Optional, Sequence, Tuple, Union
+
+from .. import config
+
+logger = config.get_logger(__name__)
+
+__all__ = ['Scaling', 'declare_scaling', 'get_scaling', 'plan_split',
+           'calibrate', 'benchmark', 'save_scaling', 'load_scaling']
+
+
+class Scaling(NamedTuple):
+    """How a function's run time responds to threads."""
+
+    #: Share of the run time that is spread over threads: 0 for pure Python
+    #: and pandas, close to 1 for a kernel that parallelises well.
+    parallel_fraction: float
+    #: 'declared' or 'measured'.
+    source: str = 'declared'
+
+    def speedup(self, threads: int) -> float:
+        """How much faster `threads` threads are than one (Amdahl's law)."""
+        p = self.parallel_fraction
+        return 1 / ((1 - p) + p / max(1, threads))
+
+
+#: Function key (see `CostModel.key`) -> its profile.
+_profiles: Dict[str, Scaling] = {}
+_lock = threading.Lock()
+
+
+def _key(func) -> Optional[str]:
+    if isinstance(func, str) or func is None:
+        return func
+    # Deferred: `dispatch` imports this module
+    from .dispatch import CostModel
+    return CostModel.key(func)
+
+
+def declare_scaling(parallel_fraction: float, func: Optional[Callable] = None):
+    """Declare how well a function uses threads.
+
+    Parameters
+    ----------
+    parallel_fraction : float
+                Share of the function's run time that is spread over threads,
+                between 0 and 1.
+    func :      callable | str, optional
+                The function, or the key it is filed under (`module.qualname`).
+                If omitted, returns a decorator.
+
+    Examples
+    --------
+    >>> from navis.compute.scaling import declare_scaling, get_scaling
+    >>> @declare_scaling(0.8)
+    ... def func(x):
+    ...     return x
+    >>> get_scaling(func)
+    Scaling(parallel_fraction=0.8, source='declared')
+
+    """
+    if not 0 <= parallel_fraction <= 1:
+        raise ValueError('`parallel_fraction` must be between 0 and 1, got '
+                         f'{parallel_fraction}')
+
+    def register(f):
+        key = _key(f)
+        with _lock:
+            # A measurement on this machine knows better than a declaration
+            if getattr(_profiles.get(key), 'source', None) != 'measured':
+                _profiles[key] = Scaling(float(parallel_fraction), 'declared')
+        return f
+
+    return register if func is None else register(func)
+
+
+def get_scaling(func) -> Optional[Scaling]:
+    """The profile of `func` (or of a key), or None if it has none."""
+    return _profiles.get(_key(func))
+
+
+def plan_split(n_cores: int, scaling: Scaling, costs: Sequence[float],
+               max_workers: int) -> Tuple[int, int]:
+    """Split `n_cores` into `(workers, threads per worker)`.
+
+    Picks the split with the shortest estimated run: the work divided over
+    the workers - but never less than the single most expensive task, which
+    one worker has to do on its own - divided by what the threads buy. Ties
+    go to more workers, so a function that gains nothing from threads is
+    split exactly as it would be without a profile.
+
+    Parameters
+    ----------
+    n_cores :   int
+                Cores to split.
+    scaling :   Scaling
+    costs :     list of float
+                Estimated cost of each task.
+    max_workers : int
+                At most this many workers.
+
+    Returns
+    -------
+    (int, int)
+
+    Examples
+    --------
+    >>> from navis.compute.scaling import Scaling, plan_split
+    >>> # Four equal tasks, 16 cores: threads beat idle workers...
+    >>> plan_split(16, Scaling(0.9), [1, 1, 1, 1], max_workers=8)
+    (4, 4)
+    >>> # ... unless the function gains nothing from them
+    >>> plan_split(16, Scaling(0.0), [1, 1, 1, 1], max_workers=8)
+    (8, 2)
+
+    """
+    n_cores = max(1, int(n_cores))
+    max_workers = max(1, int(max_workers))
+    total = float(sum(costs)) or 1.0
+    biggest = float(max(costs, default=1.0)) or 1.0
+
+    best = None
+    for w in range(1, max_workers + 1):
+        t = max(1, n_cores // w)
+        makespan = max(total / w, biggest) / scaling.speedup(t)
+        # `<=` (with some slack for rounding) so that ties go to more workers
+        if best is None or makespan <= best[0] * (1 + 1e-9):
+            best = (makespan, w, t)
+    return best[1], best[2]
+
+
+# --------------------------------------------------------------------------- #
+# Measuring
+# --------------------------------------------------------------------------- #
+def _timed(func, args, kwargs, repeats) -> float:
+    """Best of `repeats` runs of `func`, after one to warm up. In a worker."""
+    func(*args, **kwargs)
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func(*args, **kwargs)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _time_at(threads, func, args, kwargs, repeats) -> float:
+    """Time `func` in a fresh process capped at `threads` threads.
+
+    Fresh, because a thread pool cannot be resized once built - a process that
+    has run anything threaded at one cap cannot be measured at another.
+    """
+    from .dispatch import init_pool_worker
+    from .backends.base import non_forking_context
+
+    with cf.ProcessPoolExecutor(
+            1, mp_context=non_forking_context(multiprocessing),
+            initializer=functools.partial(init_pool_worker,
+                                          threads=threads)) as pool:
+        return pool.submit(_timed, func, args, kwargs, repeats).result()
+
+
+def calibrate(func: Callable, *args, threads: Optional[Sequence[int]] = None,
+              repeats: int = 3, **kwargs) -> Scaling:
+    """Measure how well `func` uses threads on this machine, and remember it.
+
+    Runs `func(*args, **kwargs)` with one thread and with more, each in a fresh
+    process, and fits the parallel fraction to the speed-up. Use input that is
+    representative of what you will run in parallel - a big neuron shows more
+    of a function's threaded part than a tiny one.
+
+    Parameters
+    ----------
+    func :      callable
+                Must be importable by name, since it runs in another process.
+    *args, **kwargs
+                Passed to `func`.
+    threads :   (int, int), optional
+                The two thread counts to compare. Defaults to one and all the
+                cores this process may use (at most 8, beyond which timings
+                mostly measure the machine rather than the function).
+    repeats :   int
+                Best-of-how-many timings at each thread count.
+
+    Returns
+    -------
+    Scaling
+
+    """
+    from .dispatch import cpu_count
+
+    if threads is None:
+        threads = (1, min(cpu_count(), 8))
+    lo, hi = (int(t) for t in threads)
+    if hi <= lo:
+        raise ValueError(f'Need two different thread counts, got {lo} and {hi} '
+                         '- on a single-core machine there is nothing to '
+                         'calibrate.')
+
+    t_lo = _time_at(lo, func, args, kwargs, repeats)
+    t_hi = _time_at(hi, func, args, kwargs, repeats)
+
+    # Amdahl, solved for p from the speed-up between the two thread counts
+    speedup = t_lo / max(t_hi, 1e-12)
+    ideal = hi / lo
+    p = (1 - 1 / speedup) / (1 - 1 / ideal)
+    scaling = Scaling(min(max(p, 0.0), 1.0), 'measured')
+
+    with _lock:
+        _profiles[_key(func)] = scaling
+    logger.debug(f'{_key(func)}: {speedup:.2f}x at {hi} vs {lo} threads, '
+                 f'parallel fraction {scaling.parallel_fraction:.2f}')
+    return scaling
+
+
+def _resolve(key: str) -> Callable:
+    """Import a function from its `module.qualname`."""
+    parts = key.split('.')
+    for i in range(len(parts) - 1, 0, -1):
+        try:
+            obj = importlib.import_module('.'.join(parts[:i]))
+        except ImportError:
+            continue
+        for name in parts[i:]:
+            obj = getattr(obj, name)
+        return obj
+    raise ImportError(f'Cannot import {key}')
+
+
+def benchmark(funcs: Optional[Sequence] = None, neurons=None, *,
+              threads: Optional[Sequence[int]] = None, repeats: int = 3,
+              path: Optional[Union[str, Path]] = None) -> Dict[str, Scaling]:
+    """Calibrate the thread scaling of several functions on this machine.
+
+    Parameters
+    ----------
+    funcs :     list of callable | str, optional
+                Functions to calibrate. Defaults to all with a declared
+                profile, skipping (with a warning) those that cannot be run
+                on neurons - the NBLAST blocks, say. Each is called as
+                `func(neurons)`.
+    neurons :   NeuronList, optional
+                What to run them on. Defaults to the example skeletons.
+    threads :   (int, int), optional
+                See [`calibrate`][navis.compute.scaling.calibrate].
+    repeats :   int
+                See [`calibrate`][navis.compute.scaling.calibrate].
+    path :      str | Path, optional
+                Save the results here; see
+                [`load_scaling`][navis.compute.scaling.load_scaling].
+
+    Returns
+    -------
+    dict
+                Function key -> measured `Scaling`.
+
+    """
+    skip_failures = funcs is None
+    if funcs is None:
+        funcs = [k for k, s in _profiles.items() if s.source == 'declared']
+    if neurons is None:
+        # Deferred: see the note at the top about `navis.core`
+        from ..data import example_neurons
+        neurons = example_neurons(kind='skeleton')
+
+    results = {}
+    for func in funcs:
+        if isinstance(func, str):
+            func = _resolve(func)
+        try:
+            results[_key(func)] = calibrate(func, neurons, threads=threads,
+                                            repeats=repeats)
+        except Exception as e:
+            if not skip_failures:
+                raise
+            logger.warning(f'Not calibrating {_key(func)}: it cannot be run '
+                           f'on neurons ({e})')
+
+    if path is not None:
+        save_scaling(path)
+    return results
+
+
+def save_scaling(path: Union[str, Path]) -> None:
+    """Save the measured profiles to a JSON file."""
+    measured = {k: s.parallel_fraction for k, s in _profiles.items()
+                if s.source == 'measured'}
+    Path(path).expanduser().write_text(json.dumps(measured, indent=2))
+
+
+def load_scaling(path: Union[str, Path]) -> None:
+    """Load profiles saved by [`save_scaling`][navis.compute.scaling.save_scaling].
+
+    They count as measured, i.e. take precedence over declared ones.
+    """
+    measured = json.loads(Path(path).expanduser().read_text())
+    with _lock:
+        for key, p in measured.items():
+            _profiles[key] = Scaling(float(p), 'measured')
@@ -0,0 +1,278 @@
+#    This script is part of navis (http://www.github.com/navis-org/navis).
+#    Copyright (C) 2018 Philipp Schlegel
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+
+"""Ship big arguments to each worker once, not once per unit of work.
+
+`nl.prune_by_volume(volume, parallel=True)` makes one task per neuron, and
+every one of them carries the same volume. Pickle deduplicates within a unit
+of work but not across them, so a 200 MB mesh goes over the wire once per
+unit - on a local pool with one task per unit, once per *neuron*.
+
+The dispatcher therefore looks for arguments that several units share (by
+identity: it is the same object in every task), and that are big enough to be
+worth the detour. Each is handed to an *object store* once; tasks carry a
+small handle instead, and each worker loads the object the first time it sees
+the handle and keeps it for the rest of the run. Where the object lives is
+the backend's business - see `ParallelBackend.object_store`:
+
+    local pools     a file in shared memory (`/dev/shm`) where there is one,
+                    else in the temp directory
+    dask            `client.scatter(..., broadcast=True)`
+    submitit        a file next to the job logs, which the jobs can see
+
+Note that a worker now holds *one* copy of the object for all its tasks. A
+function that modifies an argument in place - which none of navis' do to
+their shared arguments - would see its own modifications in the next task.
+
+Important: this module must not import from `navis.core` or `navis.utils` -
+see the note at the top of `dispatch.py`.
+
+"""
+
+import uuid
+import pickle
+import shutil
+import tempfile
+import threading
+
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+__all__ = ['SharedRef', 'ObjectStore', 'FileStore', 'share', 'unwrap',
+           'refs']
+
+#: Shared arguments smaller than this many bytes (pickled) travel inline, as
+#: before: below it, writing and re-reading the object costs more than sending
+#: it along. None turns sharing off altogether.
+MIN_SHARED_BYTES: Optional[int] = 1024 ** 2
+
+#: How many shared objects a worker keeps loaded. A warm pool's workers
+#: outlive the call that shipped them, so this bounds what they hang on to.
+CACHE_SIZE = 4
+
+#: Arguments that are never worth looking at: small by construction, and
+#: Python interns many of them, so "the same object" means nothing.
+_ATOMIC = (str, int, float, bool, complex, type(None))
+
+#: Per worker: handle key -> loaded object, least recently used first.
+_cache: 'OrderedDict[str, Any]' = OrderedDict()
+#: dask runs several tasks side by side in one worker process.
+_cache_lock = threading.Lock()
+
+
+class SharedRef:
+    """Handle for an object in a store. What tasks carry instead of it."""
+
+    __slots__ = ('key',)
+
+    def __init__(self, key: str):
+        self.key = key
+
+    def __repr__(self):
+        return f'<{type(self).__name__} {self.key}>'
+
+    def load(self):
+        """Fetch the object. Runs in the worker, once per worker."""
+        raise NotImplementedError
+
+
+class ObjectStore:
+    """Somewhere workers can fetch shared arguments from.
+
+    Lives for one call to `imap_tasks`: the dispatcher `put`s the shared
+    arguments before dispatching and `close`s the store once every result is
+    in, or the run was abandoned.
+    """
+
+    def put(self, obj, data: bytes) -> Optional[SharedRef]:
+        """Store `obj` (pickled: `data`). None means "send it inline"."""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Drop everything this store holds."""
+
+
+class FileRef(SharedRef):
+    """An object pickled to a file the worker can read."""
+
+    __slots__ = ('path',)
+
+    def __init__(self, key: str, path: str):
+        super().__init__(key)
+        self.path = path
+
+    def load(self):
+        with open(self.path, 'rb') as f:
+            return pickle.load(f)
+
+
+class FileStore(ObjectStore):
+    """Shares objects as files - for workers that share a filesystem with us.
+
+    Parameters
+    ----------
+    directory : str | Path, optional
+                Where to put the files. By default shared memory (`/dev/shm`)
+                if there is room, else the temp directory. Either way the files
+                go in a directory of their own that `close` removes.
+
+    """
+
+    def __init__(self, directory=None):
+        self.directory = directory
+        self._dirs: Dict[str, Path] = {}
+
+    def _root(self, size: int) -> str:
+        if self.directory is not None:
+            return str(self.directory)
+        # A container's `/dev/shm` is often only 64 MB - check there's room
+        # rather than finding out halfway through writing
+        for root in ('/dev/shm', tempfile.gettempdir()):
+            try:
+                if shutil.disk_usage(root).free > 2 * size:
+                    return root
+            except OSError:
+                continue
+        return tempfile.gettempdir()
+
+    def put(self, obj, data):
+        root = self._root(len(data))
+        try:
+            if root not in self._dirs:
+                self._dirs[root] = Path(tempfile.mkdtemp(prefix='navis-shared-',
+                                                         dir=root))
+            key = uuid.uuid4().hex
+            path = self._dirs[root] / f'{key}.pkl'
+            path.write_bytes(data)
+        except OSError:
+            return None
+        return FileRef(key, str(path))
+
+    def close(self):
+        for d in self._dirs.values():
+            shutil.rmtree(d, ignore_errors=True)
+        self._dirs.clear()
+
+
+def resolve(obj):
+    """`obj` itself - or, for a handle, the object it stands for."""
+    if not isinstance(obj, SharedRef):
+        return obj
+    with _cache_lock:
+        if obj.key in _cache:
+            _cache.move_to_end(obj.key)
+            return _cache[obj.key]
+    # Outside the lock: loading can take a while, and a second thread loading
+    # the same object in the meantime only costs time
+    value = obj.load()
+    with _cache_lock:
+        _cache[obj.key] = value
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return value
+
+
+def unwrap(task):
+    """Swap the handles in a `(func, args, kwargs)` task for their objects."""
+    func, args, kwargs = task
+    return (resolve(func), tuple(resolve(a) for a in args),
+            {k: resolve(v) for k, v in kwargs.items()})
+
+
+def refs(payloads) -> List[SharedRef]:
+    """The distinct handles in a list of units of work."""
+    found = {}
+    for p in payloads:
+        # Anything without the flag is not a unit of ours, or has no handles
+        if not getattr(p, 'shared', False):
+            continue
+        for task in p.tasks:
+            for obj in _candidates(task):
+                if isinstance(obj, SharedRef):
+                    found[obj.key] = obj
+    return list(found.values())
+
+
+def _candidates(task):
+    func, args, kwargs = task
+    yield func
+    yield from args
+    yield from kwargs.values()
+
+
+def share(chunks: Sequence[Sequence], store: ObjectStore,
+          min_bytes: Optional[int] = None) -> Optional[List[list]]:
+    """Move arguments that several units of work share into `store`.
+
+    Parameters
+    ----------
+    chunks :    list of list of (func, args, kwargs)
+                The tasks, bundled as they will be dispatched.
+    store :     ObjectStore
+    min_bytes : int, optional
+                Leave anything smaller inline. Defaults to `MIN_SHARED_BYTES`.
+
+    Returns
+    -------
+    list of list of (func, args, kwargs) | None
+                The tasks with handles in place of the shared arguments, or
+                None if nothing was worth sharing.
+
+    """
+    if min_bytes is None:
+        min_bytes = MIN_SHARED_BYTES
+    if min_bytes is None or len(chunks) < 2:
+        return None
+
+    # id -> [object, number of chunks it is in, last chunk it was seen in].
+    # Holding the object keeps its id from being reused under our feet.
+    seen = {}
+    for c, tasks in enumerate(chunks):
+        for task in tasks:
+            for obj in _candidates(task):
+                if isinstance(obj, _ATOMIC):
+                    continue
+                entry = seen.get(id(obj))
+                if entry is None:
+                    seen[id(obj)] = [obj, 1, c]
+                elif entry[2] != c:
+                    entry[1] += 1
+                    entry[2] = c
+
+    refs = {}
+    for key, (obj, n, _) in seen.items():
+        # Within one unit pickle already sends it once
+        if n < 2:
+            continue
+        try:
+            data = pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            # Needs a by-value serialiser: leave it to the backend's own
+            continue
+        if len(data) < min_bytes:
+            continue
+        ref = store.put(obj, data)
+        if ref is not None:
+            refs[key] = ref
+
+    if not refs:
+        return None
+
+    def swap(obj):
+        return refs.get(id(obj), obj)
+
+    return [[(swap(func), tuple(swap(a) for a in args),
+              {k: swap(v) for k, v in kwargs.items()})
+             for func, args, kwargs in tasks]
+            for tasks in chunks]
@@ -175,7 +175,9 @@ default_n_workers = None
 # multiply.
 #   "auto" (default) gives each worker `cpu_count() // n_cores` threads, i.e.
 #   divides the machine up rather than handing all of it to each worker. An int
-#   sets it explicitly. None caps nothing.
+#   sets it explicitly. None caps nothing. Where a function has a scaling
+#   profile, "auto" may also run fewer workers with more threads each - see
+#   `navis/compute/scaling.py`.
 # The name is joblib's, for the parameter that does the same job there.
 # Only applies where workers are separate processes *on this machine*: a
 # cluster worker's budget is set by whatever allocated it (see
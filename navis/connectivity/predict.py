@@ -15,12 +15,14 @@
 
 import pandas as pd
 import numpy as np
+import scipy.sparse
 import scipy.spatial
 
-from typing import Union
+from typing import Optional, Union
 from typing_extensions import Literal
 
 from ..core import Skeleton, NeuronList
+from ..compute import default_n_workers, map_tasks, resolve_backend
 from .. import config, graph, _deprecated
 
 # Set up logging
@@ -28,13 +30,30 @@ logger = config.get_logger(__name__)
 
 NeuronObject = Union[Skeleton, NeuronList]
 
+#: Above this many cells, `sparse="auto"` returns a sparse matrix. Most pairs
+#: of neurons in a large set don't come anywhere near each other, and a dense
+#: 5k x 5k matrix of mostly zeros is 200 MB.
+SPARSE_THRESHOLD = 10_000_000
+
+#: At most this many points of neurons A per unit of work. Each unit holds all
+#: its points' neighbours within `max_dist` at once, so this bounds memory
+#: rather than time.
+BLOCK_POINTS = 250_000
+
+#: Above this fraction of A's points surviving the bounding box pre-filter,
+#: `cable_overlap` queries pair by pair: see `_overlap_pairs`.
+DENSE_FRACTION = 0.5
+
 
 @_deprecated.renamed_kwargs(dist="max_dist")
 def cable_overlap(a: NeuronObject,
                   b: NeuronObject,
                   max_dist: Union[float, str] = 2,
                   method: Union[Literal['min'], Literal['max'], Literal['mean'],
-                                Literal['foward'], Literal['reverse']] = 'min'
+                                Literal['foward'], Literal['reverse']] = 'min',
+                  sparse: Union[bool, Literal['auto']] = 'auto',
+                  parallel: bool = False,
+                  n_cores: Optional[int] = None
                   ) -> pd.DataFrame:
     """Calculate the amount of cable of neuron A within distance of neuron B.
 
@@ -60,6 +79,17 @@ def cable_overlap(a: NeuronObject,
                     4. 'forward' returns 300 (i.e. A->B)
                     5. 'reverse' returns 150 (i.e. B->A)
 
+    sparse :    bool | "auto"
+                Whether to return a sparse DataFrame. "auto" does so if the
+                matrix has more than 10M cells. Most of them will be zero:
+                only neurons that come within `max_dist` of each other overlap.
+    parallel :  bool
+                If True, distribute neurons A across multiple processes. See
+                `navis.set_parallel_backend` for where they run.
+    n_cores :   int, optional
+                Number of cores to use if `parallel=True`. Defaults to half
+                the available cores.
+
     Returns
     -------
     pandas.DataFrame
@@ -118,64 +148,243 @@ def cable_overlap(a: NeuronObject,
 
     max_dist = a[0].map_units(max_dist, on_error='raise')
 
-    matrix = pd.DataFrame(np.zeros((a.shape[0], b.shape[0])),
-                          index=a.id, columns=b.id)
-
-    # Compute required props
-    treesA = []
-    lengthsA = []
-    for nA in a:
-        points, vect, length = graph.neuron2tangents(nA)
-        treesA.append(scipy.spatial.cKDTree(points))
-        lengthsA.append(length)
-
-    treesB = []
-    lengthsB = []
-    for nB in b:
-        points, vect, length = graph.neuron2tangents(nB)
-        treesB.append(scipy.spatial.cKDTree(points))
-        lengthsB.append(length)
-
-    with config.tqdm(total=len(a), desc='Calc. overlap',
-                     disable=config.pbar_hide,
-                     leave=config.pbar_leave) as pbar:
-        for i, nA in enumerate(a):
-            # Get cKDTree for nA
-            tA = treesA[i]
-
-            for k, nB in enumerate(b):
-                # Get cKDTree for nB
-                tB = treesB[k]
-
-                # Query nB -> nA
-                distA, ixA = tA.query(tB.data,
-                                      k=1,
-                                      distance_upper_bound=max_dist,
-                                      workers=-1
-                                      )
-                # Query nA -> nB
-                distB, ixB = tB.query(tA.data,
-                                      k=1,
-                                      distance_upper_bound=max_dist,
-                                      workers=-1
-                                      )
-
-                nA_lengths = lengthsA[i][ixA[distA != float('inf')]]
-                nB_lengths = lengthsB[k][ixB[distB != float('inf')]]
-
-                if method == 'mean':
-                    overlap = (nA_lengths.sum() + nB_lengths.sum()) / 2
-                elif method == 'max':
-                    overlap = max(nA_lengths.sum(), nB_lengths.sum())
-                elif method == 'min':
-                    overlap = min(nA_lengths.sum(), nB_lengths.sum())
-                elif method == 'forward':
-                    overlap = nA_lengths.sum()
-                elif method == 'reverse':
-                    overlap = nB_lengths.sum()
-
-                matrix.iloc[i, k] = overlap
-
-            pbar.update(1)
-
-    return matrix
+    # Segment midpoints and lengths of all neurons, labelled by neuron
+    pA, lA, labA = _tangents(a)
+    pB, lB, labB = (pA, lA, labA) if b is a else _tangents(b)
+
+    # Only points of A within `max_dist` of some B neuron's bounding box can
+    # have a neighbour at all. Most pairs in a large set fail this cheap test
+    # and their points are never queried.
+    query = _candidate_points(pA, labA, len(a), pB, labB, len(b), max_dist)
+
+    if len(query) and query.mean() > DENSE_FRACTION:
+        # Neurons sharing a neuropil: the filter keeps most points and their
+        # neighbours are too many to enumerate, so query each pair instead
+        bounds = np.cumsum(np.bincount(labB, minlength=len(b)))[:-1]
+        kernel = _overlap_pairs
+        shared = ([scipy.spatial.cKDTree(p) for p in np.split(pB, bounds)],
+                  *_bboxes(pB, labB, len(b)), np.split(lB, bounds))
+    else:
+        # One tree over all of B: a query then only ever visits the B neurons
+        # that are actually nearby instead of one tree per pair
+        kernel = _overlap_block
+        shared = (scipy.spatial.cKDTree(pB), labB, lB)
+
+    n_cores = n_cores or default_n_workers()
+    backend = resolve_backend(parallel=parallel, n_workers=n_cores)
+    n_blocks = (backend.worker_count(n_cores) or 1) if backend.concurrent else 1
+    blocks = _blocks(labA[query], n_blocks)
+    query = np.flatnonzero(query)
+
+    # The trees and B's labels and lengths are the same objects in every
+    # task, so the dispatcher ships them to each worker only once
+    tasks = [(kernel,
+              (pA[query[blk]], labA[query[blk]], lA[query[blk]],
+               *shared, max_dist), {})
+             for blk in blocks]
+    if len(tasks) < 2:
+        backend = resolve_backend(parallel=False)
+    res = map_tasks(tasks,
+                    backend=backend,
+                    n_workers=n_cores,
+                    # The tasks are blocks already
+                    chunksize=1,
+                    desc='Calc. overlap',
+                    disable=config.pbar_hide)
+
+    # Neurons A are never split across blocks, so every (A, B) pair comes from
+    # exactly one of them
+    rows = np.concatenate([r[0] for r in res] + [np.zeros(0, dtype=int)])
+    cols = np.concatenate([r[1] for r in res] + [np.zeros(0, dtype=int)])
+    fwd = np.concatenate([r[2] for r in res] + [np.zeros(0)])
+    rev = np.concatenate([r[3] for r in res] + [np.zeros(0)])
+
+    if method == 'mean':
+        overlap = (fwd + rev) / 2
+    elif method == 'max':
+        overlap = np.maximum(fwd, rev)
+    elif method == 'min':
+        overlap = np.minimum(fwd, rev)
+    elif method == 'forward':
+        overlap = fwd
+    elif method == 'reverse':
+        overlap = rev
+
+    matrix = scipy.sparse.csc_matrix((overlap, (rows, cols)),
+                                     shape=(len(a), len(b)))
+
+    if sparse == 'auto':
+        sparse = len(a) * len(b) > SPARSE_THRESHOLD
+
+    if sparse:
+        return pd.DataFrame.sparse.from_spmatrix(matrix, index=a.id,
+                                                 columns=b.id)
+    return pd.DataFrame(matrix.toarray(), index=a.id, columns=b.id)
+
+
+def _tangents(nl):
+    """Stack segment midpoints and lengths of all neurons in `nl`.
+
+    Returns
+    -------
+    points :    (N, 3) array
+    lengths :   (N, ) array
+    labels :    (N, ) array
+                Index of the neuron each point belongs to.
+
+    """
+    tangents = [graph.neuron2tangents(n) for n in nl]
+    points = np.concatenate([t[0] for t in tangents] + [np.zeros((0, 3))])
+    lengths = np.concatenate([t[2] for t in tangents] + [np.zeros(0)])
+    labels = np.repeat(np.arange(len(nl)), [len(t[0]) for t in tangents])
+    return points, lengths, labels
+
+
+def _bboxes(points, labels, n):
+    """Per-neuron bounding boxes. Neurons without points get an empty box.
+
+    Expects `labels` to be sorted, as `_tangents` returns them.
+    """
+    lo = np.full((n, 3), np.inf)
+    hi = np.full((n, 3), -np.inf)
+    if len(labels):
+        has, starts = np.unique(labels, return_index=True)
+        lo[has] = np.minimum.reduceat(points, starts)
+        hi[has] = np.maximum.reduceat(points, starts)
+    return lo, hi
+
+
+def _candidate_points(pA, labA, nA, pB, labB, nB, max_dist):
+    """Find points of A that could be within `max_dist` of any neuron B.
+
+    A neuron B can only overlap with A if their bounding boxes, inflated by
+    `max_dist`, intersect. And only points of A inside the part of A's box
+    covered by such candidates can have a neighbour in B.
+    """
+    loA, hiA = _bboxes(pA, labA, nA)
+    loB, hiB = _bboxes(pB, labB, nB)
+
+    # Where each neuron A's candidates are, clipped to A's own box
+    lo = np.full((nA, 3), np.inf)
+    hi = np.full((nA, 3), -np.inf)
+    # In rows of A, so the (rows, B, 3) comparison stays small
+    step = max(1, 2_000_000 // max(nB, 1))
+    for i in range(0, nA, step):
+        rlo, rhi = loA[i:i + step, None] - max_dist, hiA[i:i + step, None] + max_dist
+        cand = ((rlo <= hiB[None]) & (rhi >= loB[None])).all(axis=2)
+        lo[i:i + step] = np.where(cand[..., None], loB[None], np.inf).min(axis=1)
+        hi[i:i + step] = np.where(cand[..., None], hiB[None], -np.inf).max(axis=1)
+    lo = np.maximum(lo - max_dist, loA)
+    hi = np.minimum(hi + max_dist, hiA)
+
+    return (pA >= lo[labA]).all(axis=1) & (pA <= hi[labA]).all(axis=1)
+
+
+def _blocks(labels, n_workers):
+    """Split sorted `labels` into blocks of whole neurons.
+
+    Blocks hold at most `BLOCK_POINTS` points (unless a single neuron has more
+    than that) and there are at least `n_workers` of them where possible.
+    """
+    if not len(labels):
+        return []
+    size = max(1, min(BLOCK_POINTS, -(-len(labels) // n_workers)))
+    # Cut at the first neuron boundary at or after every `size` points
+    starts = np.flatnonzero(np.r_[True, labels[1:] != labels[:-1]])
+    at = np.searchsorted(starts, np.arange(0, len(labels), size))
+    cuts = np.unique(starts[np.minimum(at, len(starts) - 1)])
+    bounds = np.r_[cuts, len(labels)]
+    return [slice(s, e) for s, e in zip(bounds[:-1], bounds[1:])]
+
+
+def _nearest(key, dist):
+    """Positions of the smallest `dist` for each unique `key`."""
+    if not len(key):
+        return np.zeros(0, dtype=int)
+
+    # One integer sort, then the minimum per run. A lexsort over key and
+    # distance takes several times as long.
+    order = np.argsort(key)
+    key, dist = key[order], dist[order]
+    starts = np.flatnonzero(np.r_[True, key[1:] != key[:-1]])
+    closest = np.minimum.reduceat(dist, starts)
+    run = np.repeat(np.arange(len(starts)), np.diff(np.r_[starts, len(key)]))
+    is_min = np.flatnonzero(dist == closest[run])
+    # On ties take the first one
+    is_min = is_min[np.r_[True, run[is_min[1:]] != run[is_min[:-1]]]]
+    return order[is_min]
+
+
+def _overlap_block(points, labels, lengths, tree, labels_b, lengths_b,
+                   max_dist):
+    """Overlapping cable between a block of neurons A and all neurons B.
+
+    Returns
+    -------
+    rows, cols :    (N, ) arrays
+                    Indices of the neurons A and B that overlap.
+    fwd, rev :      (N, ) arrays
+                    Cable of A near B and cable of B near A, respectively.
+
+    """
+    pairs = scipy.spatial.cKDTree(points).sparse_distance_matrix(
+        tree, max_dist, output_type='ndarray')
+    # The nearest-neighbour queries this replaces only counted points strictly
+    # closer than `max_dist`
+    pairs = pairs[pairs['v'] < max_dist]
+    i = pairs['i'].astype(np.int64)
+    j = pairs['j'].astype(np.int64)
+    d = np.ascontiguousarray(pairs['v'])
+    la, lb = labels[i], labels_b[j]
+
+    # Every point of B adds the cable of its nearest point in each A it is
+    # close to and vice versa - exactly what a k=1 query per pair would see
+    fw = _nearest(j * (labels.max() + 1) + la, d)
+    rv = _nearest(i * (labels_b.max() + 1) + lb, d)
+
+    # Sum per (A, B) pair
+    radix = labels_b.max() + 1
+    codes, inv = np.unique(np.r_[la[fw], la[rv]] * radix
+                           + np.r_[lb[fw], lb[rv]], return_inverse=True)
+    fwd = np.bincount(inv[:len(fw)], weights=lengths[i[fw]],
+                      minlength=len(codes))
+    rev = np.bincount(inv[len(fw):], weights=lengths_b[j[rv]],
+                      minlength=len(codes))
+
+    rows, cols = np.divmod(codes, radix)
+    return rows, cols, fwd, rev
+
+
+def _overlap_pairs(points, labels, lengths, trees_b, lo_b, hi_b, lengths_b,
+                   max_dist):
+    """Overlapping cable between a block of neurons A and all neurons B.
+
+    Same as `_overlap_block`, but with two nearest-neighbour queries per pair
+    of neurons whose bounding boxes come within `max_dist`. For neurons that
+    overlap densely that is cheaper than listing every pair of points within
+    `max_dist`: five example neurons sharing one neuropil take 1.0s this way
+    and 1.5s with `_overlap_block`.
+    """
+    rows, cols, fwd, rev = [], [], [], []
+    starts = np.flatnonzero(np.r_[True, labels[1:] != labels[:-1]])
+    for la, pts, lens in zip(labels[starts],
+                             np.split(points, starts[1:]),
+                             np.split(lengths, starts[1:])):
+        tA = scipy.spatial.cKDTree(pts)
+        near = ((pts.min(axis=0) - max_dist <= hi_b)
+                & (pts.max(axis=0) + max_dist >= lo_b)).all(axis=1)
+        for k in np.flatnonzero(near):
+            tB = trees_b[k]
+            # Query B -> A and A -> B
+            distA, ixA = tA.query(tB.data, distance_upper_bound=max_dist)
+            distB, ixB = tB.query(pts, distance_upper_bound=max_dist)
+            f = lens[ixA[distA != np.inf]].sum()
+            r = lengths_b[k][ixB[distB != np.inf]].sum()
+            if f or r:
+                rows.append(la)
+                cols.append(k)
+                fwd.append(f)
+                rev.append(r)
+
+    return (np.array(rows, dtype=int), np.array(cols, dtype=int),
+            np.array(fwd, dtype=float), np.array(rev, dtype=float))
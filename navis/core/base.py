@@ -926,6 +926,7 @@ class BaseNeuron(UnitObject):
         axis = schema.declared_axes(self).get(axis_name)
         if axis is not None:
             self._orphan_aligned(axis, replacement)
+            schema.replace_derived(self, axis, replacement)
 
     def _attached_aligned(self, axis) -> list:
         """Attributes aligned to an axis that were attached, not declared.
@@ -28,8 +28,9 @@ from .. import config, graph, utils, core
 from ..compute.backends import resolve_backend
 # `FailedRun` lives with the dispatch machinery now, but is re-exported here
 # because that's where it has always been importable from.
-from ..compute.dispatch import (FailedRun, map_tasks, default_n_workers,  # noqa: F401
-                                picklable_by_reference)
+from ..compute import profiling
+from ..compute.dispatch import (FailedRun, map_tasks, imap_tasks,  # noqa: F401
+                                default_n_workers, picklable_by_reference)
 
 __all__ = ['make_dotprops', 'to_neuron_space', 'cast_neuron']
 
@@ -594,6 +595,30 @@ def mean_task_size(nl: 'core.NeuronList') -> float:
     return nl.memory_usage(estimate=True, sample=True) / len(nl)
 
 
+def task_sizes(nl: 'core.NeuronList') -> np.ndarray:
+    """Size of each neuron, as a proxy for how much work it makes.
+
+    Node counts for skeletons, vertices for meshes, points for dotprops and
+    voxels for voxel neurons - i.e. whatever most functions iterate over.
+    Deliberately cheap: this only needs to tell a big neuron from a small one,
+    and must not cost more than the scheduling it enables saves. See
+    [`map_tasks`][navis.compute.dispatch.map_tasks].
+    """
+    sizes = np.ones(len(nl))
+    for i, n in enumerate(nl):
+        if isinstance(n, core.Skeleton):
+            sizes[i] = len(n.nodes)
+        elif isinstance(n, core.MeshNeuron):
+            sizes[i] = len(n.vertices)
+        elif isinstance(n, core.Dotprops):
+            sizes[i] = len(n.points)
+        elif isinstance(n, core.Voxels):
+            # Don't go via `.voxels`: for a grid that materialises them
+            data = n._data
+            sizes[i] = len(data) if n._base_data_type == 'voxels' else data.size
+    return sizes
+
+
 def assemble_results(results: list, cls=None):
     """Combine per-neuron results back into a single return value.
 
@@ -615,9 +640,112 @@ def assemble_results(results: list, cls=None):
     return results
 
 
+def packed_nodes(nl: 'core.NeuronList', columns=('x', 'y', 'z')):
+    """All skeletons' node tables as one forest - for batch kernels.
+
+    navis-fastcore's DAG functions take any forest, not just a single tree. So
+    rather than calling one once per neuron, a batch kernel can pack all the
+    neurons into one forest and call it once: node IDs are shifted so that no
+    two neurons share one, and the parent IDs with them.
+
+    Parameters
+    ----------
+    nl :        NeuronList of Skeletons
+    columns :   list of str
+                Node table columns to pack.
+
+    Returns
+    -------
+    values :    (N, len(columns)) array
+                The columns of every neuron's nodes, one neuron after the other.
+    node_ids :  (N, ) int64 array
+    parent_ids : (N, ) int64 array
+                Unique across all neurons. Roots keep their parent of -1.
+    offsets :   (len(nl) + 1, ) int64 array
+                Neuron `i`'s nodes are rows `offsets[i]:offsets[i + 1]`.
+
+    """
+    tables = [n.nodes for n in nl]
+    counts = np.array([len(t) for t in tables], dtype=np.int64)
+    offsets = np.concatenate([[0], np.cumsum(counts)])
+    if not offsets[-1]:
+        empty = np.zeros(0, dtype=np.int64)
+        return np.zeros((0, len(columns))), empty, empty, offsets
+
+    # Column by column: selecting a list of columns builds a DataFrame each
+    # time, which costs more than the rest of this put together
+    values = np.concatenate([np.column_stack([t[c].to_numpy() for c in columns])
+                             for t in tables if len(t)])
+    ids = [t.node_id.to_numpy().astype(np.int64, copy=False) for t in tables]
+    pids = [t.parent_id.to_numpy().astype(np.int64, copy=False) for t in tables]
+
+    lo = np.array([i.min() if len(i) else 0 for i in ids], dtype=np.int64)
+    hi = np.array([i.max() if len(i) else 0 for i in ids], dtype=np.int64)
+    # Neuron i's IDs move to `bases[i]` onwards, so their ranges can't overlap
+    spans = [int(h) - int(l) + 1 for l, h in zip(lo, hi)]
+    if sum(spans) < np.iinfo(np.int64).max:
+        bases = np.concatenate([[0], np.cumsum(spans)[:-1]]).astype(np.int64)
+        shift = np.repeat(bases - lo, counts)
+        node_ids = np.concatenate(ids) + shift
+        parent_ids = np.concatenate(pids)
+        # A parent outside its own neuron's range would land in another's
+        outside = ((parent_ids < np.repeat(lo, counts))
+                   | (parent_ids > np.repeat(hi, counts)))
+        parent_ids = np.where(outside, -1, parent_ids + shift)
+    else:
+        # IDs too sparse to shift (e.g. 64-bit supervoxel IDs): number the
+        # nodes by row instead
+        node_ids = np.arange(offsets[-1], dtype=np.int64)
+        parent_ids = np.concatenate([
+            np.where(ix >= 0, ix + o, -1)
+            for ix, o in ((pd.Index(i).get_indexer(p), o)
+                          for i, p, o in zip(ids, pids, offsets))
+        ])
+
+    return values, node_ids, parent_ids, offsets
+
+
+def run_batch(function, nl: 'core.NeuronList', args, kwargs) -> Optional[list]:
+    """Run `function` over all of `nl` in one call, if it has a kernel for that.
+
+    See [`navis.utils.decorators.batched`][] for how a function registers one.
+
+    Returns
+    -------
+    list | None
+                One result per neuron - or None if there is no kernel, or it
+                declined (or failed on) this input, and the neurons have to be
+                processed one by one instead.
+
+    """
+    kernel = getattr(function, '__batch__', None)
+    # Nothing to gain from batching a single neuron
+    if kernel is None or len(nl) < 2:
+        return None
+
+    name = getattr(function, '__name__', str(function))
+    with profiling.span('batch', name, n_tasks=len(nl)):
+        try:
+            res = kernel(nl, *args, **kwargs)
+        except Exception as e:
+            # Per neuron, a failure is pinned to the neuron it belongs to - and
+            # dropped there, under `omit_failures=True`
+            logger.debug(f'Batch kernel of {name} failed ({e}); processing '
+                         'neurons one by one.')
+            return None
+
+    if res is NotImplemented:
+        return None
+    res = list(res)
+    if len(res) != len(nl):
+        raise ValueError(f'Batch kernel of {name} returned {len(res)} results '
+                         f'for {len(nl)} neurons.')
+    return res
+
+
 def run_tasks(tasks, *, backend, n_workers=None, chunksize=None,
               omit_failures=False, desc=None, progress=True, size_hint=None,
-              labels=None):
+              sizes=None, labels=None, on_result=None):
     """Dispatch `tasks`, keep the loggers quiet, and split off the failures.
 
     The plumbing shared by everything in navis that maps work over a collection
@@ -636,6 +764,10 @@ def run_tasks(tasks, *, backend, n_workers=None, chunksize=None,
                     message naming what failed; defaults to the task indices.
                     Pass a callable if producing them is not free - it is only
                     called when something actually failed.
+    on_result :     callable, optional
+                    Called as `on_result(index, result)` for each successful
+                    run, as soon as it completes rather than once all have.
+                    [`navis.Pipeline`][] uses this to checkpoint results.
 
     Other parameters carry the defaults of, and are handed straight to,
     [`map_tasks`][navis.compute.dispatch.map_tasks].
@@ -659,17 +791,18 @@ def run_tasks(tasks, *, backend, n_workers=None, chunksize=None,
     if level < 30:
         logger.setLevel('WARNING')
 
+    kwargs = dict(backend=backend, n_workers=n_workers, chunksize=chunksize,
+                  omit_failures=omit_failures, desc=desc, disable=disable,
+                  size_hint=size_hint, sizes=sizes)
     try:
-        res = map_tasks(
-            tasks,
-            backend=backend,
-            n_workers=n_workers,
-            chunksize=chunksize,
-            omit_failures=omit_failures,
-            desc=desc,
-            disable=disable,
-            size_hint=size_hint,
-        )
+        if on_result is None:
+            res = map_tasks(tasks, **kwargs)
+        else:
+            res = [None] * len(tasks)
+            for index, result in imap_tasks(tasks, **kwargs):
+                res[index] = result
+                if not isinstance(result, FailedRun):
+                    on_result(index, result)
     finally:
         logger.setLevel(level)
 
@@ -710,7 +843,8 @@ class NeuronProcessor:
                  omit_failures: bool = False,
                  exclude_zip: list = [],
                  desc: Optional[str] = None,
-                 backend=None):
+                 backend=None,
+                 batch: bool = True):
         if utils.is_iterable(function):
             if len(function) != len(nl):
                 raise ValueError('Number of functions must match neurons.')
@@ -733,6 +867,9 @@ class NeuronProcessor:
         self.exclude_zip = exclude_zip
         self.omit_failures = omit_failures
         self.backend = backend
+        #: Whether to use the function's batch kernel if it has one that takes
+        #: the input - see `run_batch`.
+        self.batch = batch
 
         # This makes sure that help and name match the functions being called.
         # `updated=()` skips the `__dict__` merge, which is a no-op for a plain
@@ -746,7 +883,8 @@ class NeuronProcessor:
 
     def __call__(self, *args, **kwargs):
         res = self._run(*args, **kwargs).results
-        return assemble_results(res, cls=self.nl.__class__)
+        with profiling.span('assemble', self.desc or self.__name__):
+            return assemble_results(res, cls=self.nl.__class__)
 
     def _run(self, *args, **kwargs) -> 'MapResult':
         """Run the function(s) and return results plus the failure mask.
@@ -767,6 +905,14 @@ class NeuronProcessor:
         chunksize = kwargs.pop('chunksize', self.chunksize)
         backend = kwargs.pop('backend', self.backend)
 
+        # One vectorised call beats dispatching each neuron anywhere. The first
+        # argument is the neurons themselves, which the kernel gets as `nl`.
+        if self.batch and args and all(f is self.function for f in self.funcs):
+            res = run_batch(self.function, self.nl, args[1:], kwargs)
+            if res is not None:
+                return MapResult(results=res, neurons=list(self.nl),
+                                 failed=np.zeros(len(self.nl), dtype=bool))
+
         # We will check, for each argument, if it matches the number of
         # functions to run. If they it does, we will zip the values
         # with the neurons
@@ -818,6 +964,8 @@ class NeuronProcessor:
             desc=self.desc,
             progress=self.progress,
             size_hint=self._size_hint,
+            # Lazy, like the size hint: only concurrent backends schedule by it
+            sizes=lambda: task_sizes(self.nl),
             # Lazy: `NeuronList.id` goes through `__getattr__`, which walks the
             # neurons several times over (4.4 ms at 10k) for a message that is
             # only printed when something failed.
@@ -41,17 +41,25 @@ here, and neither is obvious from this file alone:
 
 import difflib
 import functools
+import hashlib
 import inspect
+import json
+import operator
+import os
+import pickle
 
 from collections.abc import Iterator
 from dataclasses import dataclass
-from typing import Any, Callable, Optional, Tuple
+from pathlib import Path
+from typing import Any, Callable, Optional, Tuple, Union
 
 import numpy as np
 
 from .. import config, utils
+from ..compute import profiling
 from ..compute.backends import resolve_backend
-from ..compute.dispatch import default_n_workers, picklable_by_reference
+from ..compute.dispatch import (FailedRun, default_n_workers,
+                                picklable_by_reference, stream_tasks)
 
 logger = config.get_logger(__name__)
 
@@ -63,6 +71,10 @@ __all__ = ['Pipeline', 'PipelineStepError']
 #:   'once' - always call once, with the whole value
 MODES = ('auto', 'each', 'once')
 
+#: `Pipeline.stream` keeps this many neurons per worker in flight by default:
+#: enough that a worker rarely waits for the next, few enough to stay small.
+STREAM_PER_WORKER = 4
+
 #: Stands in for the value flowing through the pipeline when we check a step's
 #: arguments against its signature at construction time.
 _PLACEHOLDER = object()
@@ -219,6 +231,15 @@ class _ChainRunner:
     def __repr__(self):
         return f'_ChainRunner({" | ".join(s.name for s in self.steps)})'
 
+    @property
+    def __cost_key__(self):
+        """What the cost model files this chain's timings under.
+
+        A fresh runner is built for every run, so the instance can't be the
+        key - but the same steps make the same work.
+        """
+        return f'pipeline:{" | ".join(s.name for s in self.steps)}'
+
     def __call__(self, value):
         # Workers only want the result; the parent uses `run` for the ownership
         # it has to carry into the next segment.
@@ -227,6 +248,8 @@ class _ChainRunner:
     def run(self, value) -> Tuple[Any, bool]:
         """Run the steps in sequence. Returns `(result, do_we_own_it)`."""
         owns = self.owns_input
+        # Looked up once per run, so that not profiling costs nothing per step
+        records = profiling.recording()
         for i, step in enumerate(self.steps):
             index = self.offset + i
 
@@ -245,6 +268,8 @@ class _ChainRunner:
                     and 'inplace' not in step.kwargs):
                 kwargs = {**kwargs, 'inplace': True}
 
+            if records is not None:
+                span = profiling.Span('step', step.name, index=index)
             try:
                 out = step.func(value, *step.args, **kwargs)
             except Exception as e:
@@ -254,6 +279,8 @@ class _ChainRunner:
                     f'Pipeline step {index} ({step.name}) failed: '
                     f'{type(e).__name__}: {e}',
                     index, step.name, repr(e)) from e
+            if records is not None:
+                span.stop(records)
 
             # Some functions return nothing when told to work in place
             if out is None and kwargs.get('inplace', False):
@@ -270,12 +297,190 @@ class _ChainRunner:
         return value, owns
 
 
+def _run_batched(step, value, index, owns, elide) -> Optional[Tuple[Any, bool]]:
+    """Run one step over a whole NeuronList through its batch kernel.
+
+    Same contract as running it per neuron through `_ChainRunner.run`. Returns
+    None if the step has no kernel for this input.
+    """
+    from .core_utils import assemble_results, run_batch
+
+    kwargs = step.kwargs
+    # Same elision as per neuron - see `_ChainRunner.run`
+    if elide and owns and step.takes_inplace and 'inplace' not in kwargs:
+        kwargs = {**kwargs, 'inplace': True}
+
+    res = run_batch(step.func, value, step.args, kwargs)
+    if res is None:
+        return None
+    # Some functions return nothing when told to work in place
+    if kwargs.get('inplace', False):
+        res = [n if r is None else r for n, r in zip(value, res)]
+
+    owns = owns or not _shares_objects(value, res)
+    return _as_collection(assemble_results(res, cls=type(value))), owns
+
+
 def _shares_objects(before, after) -> bool:
     """Whether any object in `after` also appears in `before`."""
     seen = {id(o) for o in before}
     return any(id(o) in seen for o in after)
 
 
+# --------------------------------------------------------------------------- #
+# Checkpoints
+# --------------------------------------------------------------------------- #
+class _Checkpoint:
+    """Per-element results of one fanned-out segment, persisted as they land.
+
+    Layout is one directory per pipeline fingerprint with one pickle per
+    element, named after a hash of the element's key (usually the neuron ID):
+
+        checkpoint/
+            3f9c.../
+                manifest.json       # the steps, for humans
+                0a1b....pkl
+                ...
+
+    The fingerprint covers every step up to and including this segment - what
+    came before shapes what this segment is handed - but *not* the input data:
+    a neuron ID is taken to name the same neuron from one run to the next.
+    """
+
+    def __init__(self, directory, steps):
+        self.fingerprint = _fingerprint(steps)
+        self.dir = Path(directory).expanduser() / self.fingerprint
+        self.dir.mkdir(parents=True, exist_ok=True)
+
+        manifest = self.dir / 'manifest.json'
+        if not manifest.exists():
+            manifest.write_text(json.dumps(
+                {'fingerprint': self.fingerprint,
+                 'steps': [s.name for s in steps]}, indent=2))
+
+    def path(self, key) -> Path:
+        # Hashed because IDs can be anything - including things that are not
+        # valid (or not unique once case-folded) as file names.
+        return self.dir / f'{hashlib.sha1(key.encode()).hexdigest()}.pkl'
+
+    def load(self, keys) -> dict:
+        """Finished results as `{position: result}`."""
+        done = {}
+        for i, key in enumerate(keys):
+            f = self.path(key)
+            if not f.is_file():
+                continue
+            try:
+                with open(f, 'rb') as fh:
+                    done[i] = pickle.load(fh)
+            except Exception as e:
+                # A half-written file can't happen (see `save`), but a file
+                # from an incompatible version of a class can. Just redo it.
+                logger.warning(f'Ignoring unreadable checkpoint for "{key}": {e}')
+        return done
+
+    def save(self, key, result):
+        """Write one result. Atomic: a reader sees the whole file or none."""
+        f = self.path(key)
+        tmp = f.with_suffix(f'.{os.getpid()}.tmp')
+        with open(tmp, 'wb') as fh:
+            pickle.dump(result, fh, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, f)
+
+
+def _element_keys(value) -> list:
+    """A stable key per element of `value` to file its checkpoint under."""
+    from .base import BaseNeuron
+
+    keys, seen = [], {}
+    for i, el in enumerate(value):
+        if isinstance(el, BaseNeuron):
+            key = f'id:{el.id}'
+        elif isinstance(el, (str, int, np.integer)):
+            key = f'{type(el).__name__}:{el}'
+        else:
+            # Nothing better to go by: the position, which holds up as long as
+            # the input does
+            key = f'#{i}'
+        # Repeated IDs are legal in a NeuronList; the n-th repeat is keyed as such
+        n = seen[key] = seen.get(key, -1) + 1
+        keys.append(f'{key}~{n}' if n else key)
+    return keys
+
+
+def _fingerprint(steps) -> str:
+    """Hash what the steps do - functions, arguments and modes."""
+    h = hashlib.sha1()
+    for step in steps:
+        for part in (step.mode, _func_identity(step.func),
+                     _arg_bytes(step.args), _arg_bytes(step.kwargs)):
+            h.update(part if isinstance(part, bytes) else str(part).encode())
+            h.update(b'\0')
+    return h.hexdigest()[:16]
+
+
+def _func_identity(func, _seen=None) -> bytes:
+    """Name, code and closure of `func`, so that editing a step invalidates it.
+
+    Bytecode alone is not enough: `lambda n: n.prune_twigs(5)` and
+    `lambda n: n.prune_twigs(10)` only differ in their constants, and two
+    closures made by the same factory only in their cells.
+    """
+    if isinstance(func, functools.partial):
+        return (_func_identity(func.func, _seen) + _arg_bytes(func.args)
+                + _arg_bytes(func.keywords))
+    if isinstance(func, Pipeline):
+        return _fingerprint(func._steps).encode()
+
+    name = '{}.{}'.format(getattr(func, '__module__', None),
+                          getattr(func, '__qualname__', type(func).__qualname__))
+    func = inspect.unwrap(func)
+    code = getattr(func, '__code__', None)
+    if code is None:
+        return name.encode()
+
+    # A closure can refer to itself (e.g. a recursive inner function)
+    _seen = set() if _seen is None else _seen
+    if id(func) in _seen:
+        return name.encode()
+    _seen.add(id(func))
+
+    parts = [name.encode(), _code_bytes(code)]
+    for cell in getattr(func, '__closure__', None) or ():
+        try:
+            value = cell.cell_contents
+        except ValueError:  # cell not yet filled
+            parts.append(b'<empty>')
+            continue
+        if callable(value) and hasattr(inspect.unwrap(value), '__code__'):
+            parts.append(_func_identity(value, _seen))
+        else:
+            parts.append(_arg_bytes(value))
+    return b'\0'.join(parts)
+
+
+def _code_bytes(code) -> bytes:
+    """Bytecode, constants and names of a code object and those nested in it."""
+    parts = [code.co_code, repr(code.co_names).encode()]
+    for const in code.co_consts:
+        if inspect.iscode(const):
+            parts.append(_code_bytes(const))
+        elif isinstance(const, frozenset):
+            # Set order depends on string hashing, which differs between runs
+            parts.append(repr(sorted(map(repr, const))).encode())
+        else:
+            parts.append(repr(const).encode())
+    return b'\0'.join(parts)
+
+
+def _arg_bytes(args) -> bytes:
+    """Arguments as bytes. Pickle where we can, `repr` where we can't."""
+    try:
+        return pickle.dumps(args, protocol=4)
+    except Exception:
+        return repr(args).encode()
+
+
 # --------------------------------------------------------------------------- #
 # The pipeline
 # --------------------------------------------------------------------------- #
@@ -552,7 +757,8 @@ class Pipeline:
                  backend=None,
                  progress: bool = True,
                  omit_failures: bool = False,
-                 inplace: bool = False):
+                 inplace: bool = False,
+                 checkpoint: Optional[Union[str, Path]] = None):
         """Run the pipeline.
 
         Parameters
@@ -582,6 +788,17 @@ class Pipeline:
         inplace :       bool
                         If True, write the results back into `x` and return it.
                         Requires `x` to be a `NeuronList`.
+        checkpoint :    str | Path, optional
+                        A directory to save each neuron's result to as soon as
+                        it is done. Running the same pipeline again with the
+                        same `checkpoint` picks up the finished results instead
+                        of recomputing them - e.g. after a crash, or to retry
+                        what failed with `omit_failures=True`. Results are keyed
+                        by neuron ID plus a fingerprint of the steps (functions,
+                        their code and arguments): change a step and it starts
+                        afresh. Changing a neuron without changing its ID does
+                        *not* invalidate its result. Only per-neuron steps are
+                        checkpointed.
 
         Returns
         -------
@@ -631,7 +848,7 @@ class Pipeline:
                 value, self._steps[i:j], offset=i, owns=owns,
                 parallel=parallel, n_cores=n_cores, chunksize=chunksize,
                 backend=backend, progress=progress,
-                omit_failures=omit_failures)
+                omit_failures=omit_failures, checkpoint=checkpoint)
             fanned_out = True
             i = j
 
@@ -649,11 +866,24 @@ class Pipeline:
         return value
 
     def _fanout(self, value, steps, *, offset, owns, parallel, n_cores,
-                chunksize, backend, progress, omit_failures):
+                chunksize, backend, progress, omit_failures, checkpoint=None):
         """Run `steps` over the elements of `value`, in parallel if asked."""
-        from .core_utils import assemble_results, mean_task_size, run_tasks
+        from .core_utils import (assemble_results, mean_task_size, run_tasks,
+                                 task_sizes)
         from .neuronlist import NeuronList
 
+        # Leading steps with a list-level kernel run over the whole list in one
+        # call each, right here; the rest fuse into one task per neuron as
+        # usual. Not under `checkpoint`, which keeps its results per neuron.
+        while (steps and checkpoint is None and isinstance(value, NeuronList)):
+            out = _run_batched(steps[0], value, offset, owns, self._elide_copies)
+            if out is None:
+                break
+            value, owns = out
+            steps, offset = steps[1:], offset + 1
+        if not steps:
+            return value, owns
+
         be = resolve_backend(
             backend,
             parallel=parallel,
@@ -667,31 +897,217 @@ class Pipeline:
         # A worker in its own process is handed a copy, so it owns it no matter
         # what we own out here - the same trade the @map_neuronlist decorator
         # makes. On threads (or when this degraded to running inline) "in place"
-        # would mean the caller's own neurons, so we must not.
+        # would mean the caller's own neurons, so we must not. Nor may a worker
+        # whose copy is read-only (see `writable_payloads`).
         runner = _ChainRunner(steps, offset=offset,
-                              owns_input=owns or be.isolated,
+                              owns_input=(be.owns_payloads if be.isolated
+                                          else owns),
                               elide=self._elide_copies)
 
         is_nl = isinstance(value, NeuronList)
-        res, failed = run_tasks(
-            # One runner shared by every task: pickle stores it once per chunk
-            [(runner, (el,), {}) for el in value],
-            backend=be,
-            n_workers=n_cores,
-            chunksize=chunksize,
-            omit_failures=omit_failures,
-            desc=self._desc or _segment_desc(steps),
-            progress=progress,
-            size_hint=(lambda: mean_task_size(value)) if is_nl else None,
-            # Lazy - see the same call in `NeuronProcessor._run`
-            labels=(lambda: value.id) if is_nl else None,
-        )
+        elements = list(value)
+        todo = list(range(len(elements)))
+        done = {}
+
+        if checkpoint is not None:
+            # Everything up to here went into what this segment is handed
+            ckpt = _Checkpoint(checkpoint, self._steps[:offset + len(steps)])
+            keys = _element_keys(elements)
+            done = ckpt.load(keys)
+            todo = [i for i in todo if i not in done]
+            if done:
+                logger.info(f'Resuming from checkpoint: {len(done)} of '
+                            f'{len(elements)} already done.')
+
+            def on_result(k, result):
+                ckpt.save(keys[todo[k]], result)
+
+        res = [None] * len(elements)
+        for i, result in done.items():
+            res[i] = result
+
+        if todo:
+            if len(todo) == len(elements):
+                subset = value
+            else:
+                subset = value[todo] if is_nl else [elements[i] for i in todo]
+            computed, failed = run_tasks(
+                # One runner shared by every task: pickle stores it once per chunk
+                [(runner, (elements[i],), {}) for i in todo],
+                backend=be,
+                n_workers=n_cores,
+                chunksize=chunksize,
+                omit_failures=omit_failures,
+                desc=self._desc or _segment_desc(steps),
+                progress=progress,
+                size_hint=(lambda: mean_task_size(subset)) if is_nl else None,
+                sizes=(lambda: task_sizes(subset)) if is_nl else None,
+                # Lazy - see the same call in `NeuronProcessor._run`
+                labels=(lambda: subset.id) if is_nl else None,
+                on_result=on_result if checkpoint is not None else None,
+            )
+            for i, result in zip((i for i, f in zip(todo, failed) if not f),
+                                 computed):
+                res[i] = result
+            failed_at = {i for i, f in zip(todo, failed) if f}
+            res = [r for i, r in enumerate(res) if i not in failed_at]
 
         # Anything that came back from another process is a fresh object; on a
         # shared-memory backend we have to look.
         owns = owns or be.isolated or not _shares_objects(value, res)
 
-        return assemble_results(res, cls=type(value) if is_nl else None), owns
+        with profiling.span('assemble', self._desc or _segment_desc(steps)):
+            res = assemble_results(res, cls=type(value) if is_nl else None)
+
+        return res, owns
+
+    def stream(self, source, *,
+               sink: Optional[Callable] = None,
+               max_in_flight: Optional[int] = None,
+               ordered: bool = True,
+               parallel: bool = False,
+               n_cores: Optional[int] = None,
+               chunksize: Optional[int] = None,
+               backend=None,
+               progress: bool = True,
+               omit_failures: bool = False):
+        """Run the pipeline over a stream of inputs without collecting them.
+
+        Calling the pipeline gathers every result before returning, so a chain
+        ending in e.g. a write holds all of its outputs in memory at once. This
+        instead pulls inputs from `source` as it goes and hands results on as
+        they are done: no more than `max_in_flight` inputs and their results
+        are held at any one time, however long `source` is. A new input is
+        started as soon as a result is handed on, so one slow input does not
+        keep the other workers waiting.
+
+        Every step is applied to each element of `source` - one neuron, one
+        filename, one ID - so steps that need the whole collection (see
+        [`add_once`][navis.Pipeline.add_once]) can't be streamed.
+
+        Parameters
+        ----------
+        source :        iterable
+                        Inputs for the first step. Can be a generator, e.g. one
+                        reading neurons file by file.
+        sink :          callable, optional
+                        If given, called with each result as it is done, e.g. a
+                        [`navis.ParquetSink`][] to append them to a file - which
+                        collects them into row groups itself. The stream then
+                        runs to completion and the number of results handed to
+                        the sink is returned. The sink is not closed.
+        max_in_flight : int, optional
+                        Maximum number of inputs being worked on at any one
+                        time. Defaults to a few per worker.
+        ordered :       bool
+                        If True, results come out in the order of `source`. If
+                        False, in the order they complete - which saves holding
+                        finished results back for a slow one.
+        parallel :      bool
+                        Whether to distribute the work across multiple cores.
+        n_cores :       int, optional
+                        Number of cores to use. Defaults to half of them.
+        chunksize :     int, optional
+                        Inputs to hand a worker at a time. Defaults to one: the
+                        length of the stream is not known up front, so there
+                        is nothing to size larger chunks by.
+        backend :       str | ParallelBackend | concurrent.futures.Executor, optional
+                        Where to run. Defaults to
+                        [`navis.set_parallel_backend`][]'s setting.
+        progress :      bool
+                        Whether to show a progress bar.
+        omit_failures : bool
+                        If True, skip inputs whose chain raised instead of
+                        propagating the error.
+
+        Returns
+        -------
+        generator
+                        Yields one result per input. Only if no `sink` is given.
+        int
+                        Number of results handed to `sink`.
+
+        Examples
+        --------
+        >>> import navis
+        >>> pipe = navis.Pipeline().prune_twigs(5000).resample_skeleton(1000)
+        >>> neurons = (n for n in navis.example_neurons(3, kind='skeleton'))
+        >>> with navis.ParquetSink(tmp_dir / 'resampled.parquet') as sink:
+        ...     n = pipe.stream(neurons, sink=sink, progress=False)
+        >>> n
+        3
+
+        """
+        if not len(self._steps):
+            raise ValueError('This pipeline has no steps. Add some with e.g. '
+                             '`pipeline.add(navis.prune_twigs, 5000)`.')
+
+        once = [s.name for s in self._steps if s.mode == 'once']
+        if once:
+            raise ValueError('Pipelines with whole-collection steps can not be '
+                             f'streamed: {", ".join(once)}')
+
+        n_cores = n_cores or default_n_workers()
+        if max_in_flight is None:
+            max_in_flight = n_cores * STREAM_PER_WORKER if parallel else 1
+        max_in_flight = max(1, int(max_in_flight))
+
+        results = self._stream(
+            source, max_in_flight=max_in_flight, ordered=ordered,
+            parallel=parallel, n_cores=n_cores, chunksize=chunksize,
+            backend=backend, progress=progress, omit_failures=omit_failures)
+
+        if sink is None:
+            return results
+
+        n = 0
+        for result in results:
+            sink(result)
+            n += 1
+        return n
+
+    def _stream(self, source, *, max_in_flight, ordered, parallel, n_cores,
+                chunksize, backend, progress, omit_failures):
+        """Generator behind `stream`."""
+        be = resolve_backend(
+            backend,
+            parallel=parallel,
+            n_tasks=max_in_flight,
+            n_workers=n_cores,
+            by_value=not picklable_by_reference(self),
+        )
+        # A stream is never `inplace`: what we are handed belongs to the caller
+        runner = _ChainRunner(self._steps, offset=0,
+                              owns_input=be.owns_payloads,
+                              elide=self._elide_copies)
+
+        source = iter(source)
+        total = operator.length_hint(source) or None
+        desc = self._desc or _segment_desc(self._steps)
+        n_failed = 0
+
+        with config.tqdm(total=total, desc=desc,
+                         disable=config.pbar_hide or not progress,
+                         leave=config.pbar_leave) as pbar:
+            for _, result in stream_tasks(
+                    ((runner, (el,), {}) for el in source),
+                    backend=be,
+                    max_in_flight=max_in_flight,
+                    n_workers=n_cores,
+                    chunksize=chunksize,
+                    ordered=ordered,
+                    omit_failures=omit_failures,
+                    desc=desc):
+                pbar.update(1)
+                if isinstance(result, FailedRun):
+                    n_failed += 1
+                    continue
+                yield result
+
+        if n_failed:
+            logger.warning(f'{n_failed} input(s) failed and were skipped. Set '
+                           'logging to debug (`navis.set_loggers("DEBUG")`) or '
+                           'repeat with `omit_failures=False` for details.')
 
 
 class _BoundPipeline(Pipeline):
@@ -724,7 +1140,7 @@ class _BoundPipeline(Pipeline):
 
         Takes the same keyword arguments as [`navis.Pipeline.__call__`][] -
         `parallel`, `n_cores`, `chunksize`, `backend`, `progress`,
-        `omit_failures` and `inplace`.
+        `omit_failures`, `inplace` and `checkpoint`.
         """
         return self(self._nl, **kwargs)
 
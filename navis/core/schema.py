@@ -51,6 +51,8 @@ Axes come in two flavours, and the distinction drives everything below:
 """
 
 import hashlib
+import importlib
+import sys
 
 from collections import deque
 from contextlib import contextmanager
@@ -60,7 +62,7 @@ from typing import Any, Dict, FrozenSet, List, Optional, Sequence, Tuple
 import numpy as np
 import pandas as pd
 
-from .. import config
+from .. import config, utils
 
 try:
     import xxhash
@@ -127,6 +129,61 @@ def _check_rebuild_policy(policy: str, allowed: Tuple[str, ...] = REBUILD_REFS)
         )
 
 
+#: How far an edit to an axis' tree reaches into a column derived from it - see
+#: `Derived`. It decides how much of the column the next refresh recomputes.
+REACHES = (
+    #: The value sums up the tree *below* an element: a Strahler index. An edit
+    #: invalidates the elements whose children it changed and everything
+    #: upstream of them - which is most of the tree for any edit near a leaf, so
+    #: a stale column is recomputed in full. On 533k nodes a compiled pass over
+    #: the whole tree takes 0.08-0.10s; finding the ancestors and updating only
+    #: them took several times that.
+    "subtree",
+    #: The value is measured against the whole of an element's fragment: flow
+    #: centrality counts leafs on either side of a node. An edit invalidates
+    #: every fragment it touched, and only those are recomputed.
+    "component",
+)
+
+
+@dataclass(frozen=True)
+class Derived:
+    """A column of an axis' table computed from the axis' tree.
+
+    Selections carry such a column along with everything else in the table, but
+    an edit to the tree can leave its values wrong. Declaring the column lets
+    edits mark it stale, and the next read recompute it once for however many
+    edits came before - only as far as they reached (`reach`). See
+    `invalidate_derived` and `refresh_derived`.
+
+    Parameters
+    ----------
+    column :        str
+                    Column of the axis' primary table.
+    reach :         "subtree" | "component"
+                    Which elements an edit invalidates; see `REACHES`.
+    refresh :       str
+                    `"module:function"` computing the column for some rows of
+                    the table: called as `refresh(table, stale, **params)` with
+                    a boolean mask over the rows and the parameters the column
+                    was computed with (`record_derived`), and returns the new
+                    values for the masked rows. A name rather than the function
+                    because the functions live in `navis.morpho`, which imports
+                    the neuron classes declaring them.
+
+    """
+
+    column: str
+    reach: str
+    refresh: str
+
+    def __post_init__(self):
+        if self.reach not in REACHES:
+            raise ValueError(
+                f'Unknown reach "{self.reach}", expected one of {REACHES}'
+            )
+
+
 @dataclass(frozen=True)
 class Ref:
     """Something whose *values* point at elements of an axis.
@@ -214,6 +271,13 @@ class Axis:
                     elements it kept rather than drop - i.e. those attached with
                     `on_rebuild="carry"`. Everything else in `data` is dropped by
                     a rebuild; see `REBUILDS`.
+    parents :       str, optional
+                    Column of `data[0]` holding each element's parent ID, for an
+                    axis whose elements form a forest (a skeleton's nodes).
+    derived :       tuple of Derived
+                    Columns of `data[0]` computed from that forest, which edits
+                    keep up to date rather than carry as they were. Requires
+                    `parents`.
 
     """
 
@@ -223,6 +287,8 @@ class Axis:
     refs: Tuple[Ref, ...] = ()
     invalidates: Tuple[str, ...] = ()
     carried: FrozenSet[str] = frozenset()
+    parents: Optional[str] = None
+    derived: Tuple[Derived, ...] = ()
 
     @property
     def positional(self) -> bool:
@@ -546,6 +612,16 @@ def apply_selection(
     # meshes.
     links = [e for e in (links or ()) if e.link.attr not in skip]
 
+    # Whether an edit reached a derived column is judged by comparing the tree
+    # before and after, so the before has to be taken now - unless nothing is dropped, in which case
+    # there is no after to compare. A caller passing `survivors` has already
+    # replaced the data, and with it the only record of what it was.
+    before = None
+    if survivors is not None:
+        forget_derived(neuron, axis)
+    elif not np.all(keep):
+        before = capture_tree(neuron, axis)
+
     if survivors is None:
         subset_axis_data(neuron, axis, keep, skip=skip)
         # For an id-bearing axis the survivors are read back off the subsetted
@@ -564,6 +640,10 @@ def apply_selection(
         )
 
     repair_refs(neuron, axis, survivors, skip=skip)
+    # After the repair: a node whose parent was dropped is only a root once
+    # its `parent_id` says so
+    if before is not None:
+        invalidate_derived(neuron, axis, before, kept=np.flatnonzero(keep))
     carry_provenance(neuron, axis, survivors)
     follow_links(neuron, axis, links, keep, survivors)
     return survivors
@@ -789,6 +869,361 @@ _REF_READERS = {
 }
 
 
+# ---------------------------------------------------------------------------
+# Derived columns
+#
+# A skeleton's Strahler indices are a column of its node table, so a selection
+# carries them like any other - and every edit that changes the tree can leave
+# them wrong. Recomputing after each edit would make a proofreading loop pay for
+# the column once per cut, when the only values anybody looks at are the ones
+# after the last. So an edit merely notes which columns it invalidated, and how
+# far (`invalidate_derived`); the column is recomputed once, when it is next read
+# (`refresh_derived`). Telling whether an edit reached a column at all takes the
+# tree as it was and as it is now, which is why this sits here:
+# `apply_selection` has both.
+#
+# Only columns navis computed are maintained, and `record_derived` is how it says
+# so - along with the parameters it used, which the update has to reuse. A column
+# that merely shares the name (read from a file, put there by hand) is carried as
+# it always was.
+# ---------------------------------------------------------------------------
+
+
+def record_derived(neuron, column: str, **params) -> None:
+    """Mark a declared `Derived` column as computed, with these parameters.
+
+    Called by whatever computed it. Recording again replaces the parameters,
+    so a column recomputed differently is maintained the new way - and is no
+    longer stale, whatever edits came before.
+    """
+    neuron.__dict__.setdefault("_derived", {})[column] = params
+    _settled(neuron, {column})
+
+
+def forget_derived(neuron, axis: Axis) -> None:
+    """Stop maintaining an axis' derived columns, leaving their values alone.
+
+    For edits that cannot say how the tree changed. The values are then as good
+    as whoever made the edit left them, which is what they always were.
+    """
+    recorded = neuron.__dict__.get("_derived")
+    if recorded:
+        for derived in axis.derived:
+            recorded.pop(derived.column, None)
+    _settled(neuron, {d.column for d in axis.derived})
+
+
+def _live_derived(neuron, axis: Axis, table=None) -> List[Derived]:
+    """Declared derived columns that were recorded and are still in the table."""
+    recorded = neuron.__dict__.get("_derived")
+    if not recorded or not axis.derived:
+        return []
+    if table is None:
+        table = getattr(neuron, axis.data[0])
+    return [
+        d for d in axis.derived if d.column in recorded and d.column in table.columns
+    ]
+
+
+def has_stale_derived(neuron) -> bool:
+    """Whether any derived column is waiting for `refresh_derived`."""
+    return bool(neuron.__dict__.get("_derived_stale"))
+
+
+def capture_tree(neuron, axis: Axis) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """An axis' tree as `(ids, parents)`, if it has derived columns to maintain.
+
+    Take it before an edit and hand it to `invalidate_derived` afterwards.
+    Returns `None` - and costs nothing - when there is nothing to maintain.
+    """
+    if not _live_derived(neuron, axis):
+        return None
+    table = getattr(neuron, axis.data[0])
+    return table[axis.ids].to_numpy(), table[axis.parents].to_numpy()
+
+
+def invalidate_derived(neuron, axis: Axis, before, table=None, kept=None) -> None:
+    """Mark an axis' derived columns stale where an edit changed the tree.
+
+    Nothing is recomputed here - see `refresh_derived`. A column the edit did
+    not reach is not marked at all, and neither is an edit that left the tree as
+    it was.
+
+    Parameters
+    ----------
+    before :    (ids, parents)
+                The tree before the edit, from `capture_tree`.
+    table :     pandas.DataFrame, optional
+                The table after the edit. Defaults to the axis' primary; the
+                `.nodes` setter passes the one it is about to install.
+    kept :      np.ndarray, optional
+                For each row of the table, the row of the tree in `before` it
+                was. A selection knows this, and saying so spares looking
+                every element up by its ID.
+
+    """
+    if table is None:
+        table = getattr(neuron, axis.data[0])
+    live = _live_derived(neuron, axis, table)
+    if not live or not len(table):
+        return
+
+    ids = table[axis.ids].to_numpy()
+    parents = table[axis.parents].to_numpy()
+    touched, moved = _edited(ids, parents, *before, kept=kept)
+
+    for derived in live:
+        _invalidate(neuron, derived, ids, touched, moved)
+
+
+def merge_derived(parent, child, axis: Axis, before, theirs) -> None:
+    """Mark derived columns stale after `merge_selection`.
+
+    Every element is judged against the parent's tree as it was, and the
+    child's elements against the child's tree too: their values were computed
+    on a tree that stopped at the edge of the selection, so a node there is
+    stale once the rest of the neuron hangs off it again. Values the child did
+    not maintain - maintained with other parameters, or left stale itself -
+    count as changed outright.
+
+    Parameters
+    ----------
+    before :    (ids, parents)
+                The parent's tree before the merge, from `capture_tree`.
+    theirs :    (ids, parents)
+                The child's tree. Its elements are the last rows of the merged
+                table, which is where `_concat_axis_data` puts them.
+
+    """
+    table = getattr(parent, axis.data[0])
+    live = _live_derived(parent, axis, table)
+    if not live or not len(table):
+        return
+
+    ids = table[axis.ids].to_numpy()
+    parents = table[axis.parents].to_numpy()
+    ours = _edited(ids, parents, *before)
+    others = _edited(ids, parents, *theirs)
+    mine = np.zeros(len(ids), dtype=bool)
+    mine[: len(ids) - len(theirs[0])] = True
+
+    # Everything compared with the parent's tree, since that is where the
+    # merged one came from - plus, for the child's elements, with the tree
+    # their values were computed on
+    recorded = child.__dict__.get("_derived") or {}
+    stale = child.__dict__.get("_derived_stale") or {}
+    for derived in live:
+        if derived.column not in stale and _same(
+            recorded.get(derived.column), parent._derived[derived.column]
+        ):
+            theirs_touched, theirs_moved = others[0] & ~mine, others[1] & ~mine
+        else:
+            theirs_touched = theirs_moved = ~mine
+        _invalidate(
+            parent,
+            derived,
+            ids,
+            ours[0] | theirs_touched,
+            ours[1] | theirs_moved,
+        )
+
+
+def _same(a, b) -> bool:
+    """Whether two sets of parameters are equal - "cannot tell" counts as no."""
+    try:
+        return bool(a == b)
+    except ValueError:
+        # Arrays compare element-wise, inside a dict too
+        return False
+
+
+def _invalidate(neuron, derived: Derived, ids, touched, moved) -> None:
+    """Note what an edit left stale in one derived column.
+
+    A "subtree" column is recomputed in full, so all there is to note is that
+    it is stale (`True`). A "component" column notes the IDs of the elements the
+    edit touched or re-hung: between them they sit in every fragment it split,
+    joined or shrank, and whatever fragments they sit in when the column is next
+    read are the ones to recompute. A later edit that moves one of them elsewhere
+    touches both its old and its new neighbours, so nothing falls through.
+    """
+    if derived.reach == "subtree":
+        if not touched.any():
+            return
+        seeds = True
+    else:
+        hit = touched | moved
+        if not hit.any():
+            return
+        seeds = ids[hit]
+
+    # A new dict every time: `copy()` shares the old one with the copy
+    pending = dict(neuron.__dict__.get("_derived_stale") or {})
+    had = pending.get(derived.column)
+    if had is True:
+        seeds = True
+    elif had is not None:
+        seeds = np.union1d(had, seeds)
+    pending[derived.column] = seeds
+    neuron.__dict__["_derived_stale"] = pending
+
+
+def _settled(neuron, columns) -> None:
+    """Drop the stale marks of these columns."""
+    pending = neuron.__dict__.get("_derived_stale")
+    if pending and not columns.isdisjoint(pending):
+        pending = {c: s for c, s in pending.items() if c not in columns}
+        neuron.__dict__["_derived_stale"] = pending or None
+
+
+def refresh_derived(neuron, axis: Optional[Axis] = None) -> None:
+    """Recompute derived columns where edits since the last refresh left them stale.
+
+    However many edits came in between, each stale column is recomputed once -
+    and only where it is stale: a "subtree" column in full, a "component" column
+    for the fragments an edit reached. Everything else keeps its values.
+
+    Reading a skeleton's `.nodes` from outside navis calls this, so there is
+    rarely a reason to call it by hand - except from inside navis, whose own
+    reads do not (see `settle_for_reader`).
+
+    Parameters
+    ----------
+    axis :      Axis, optional
+                Only refresh this axis' columns. Defaults to all of them.
+
+    """
+    pending = neuron.__dict__.get("_derived_stale")
+    if not pending:
+        return
+
+    done = set()
+    for ax in [axis] if axis is not None else declared_axes(neuron).values():
+        columns = {d.column for d in ax.derived}.intersection(pending)
+        if not columns:
+            continue
+        table = getattr(neuron, ax.data[0])
+        if len(table):
+            ids = table[ax.ids].to_numpy()
+            parents = table[ax.parents].to_numpy()
+            for derived in _live_derived(neuron, ax, table):
+                if derived.column in columns:
+                    stale = _stale(derived.reach, ids, parents, pending[derived.column])
+                    _refresh_column(neuron, table, derived, stale)
+        # Columns no longer live are dropped along with the rest: nothing to do
+        done |= columns
+    _settled(neuron, done)
+
+
+def settle_for_reader(neuron) -> None:
+    """`refresh_derived`, unless it is navis itself reading the table.
+
+    Called by the accessors of an axis' table. A read from inside navis is
+    mostly an edit looking at the tree, and settling there would recompute the
+    column between every two edits again - so only reads that reach the table
+    through nothing but the neuron classes count: `n.nodes`, `n.leafs` and
+    `nl.nodes` alike. The few functions elsewhere in navis that read a derived
+    column call `refresh_derived` themselves.
+
+    Whose read it is goes by the frames' modules, as in
+    `_deprecated.caller_stacklevel`.
+    """
+    frame = sys._getframe(1)
+    while frame is not None:
+        module = frame.f_globals.get("__name__", "")
+        if module.partition(".")[0] != _ROOT_PACKAGE:
+            break
+        if not module.startswith(_CORE_PACKAGE):
+            return
+        frame = frame.f_back
+    refresh_derived(neuron)
+
+
+_CORE_PACKAGE = __name__.rpartition(".")[0] + "."
+_ROOT_PACKAGE = __name__.partition(".")[0]
+
+
+def _refresh_column(neuron, table, derived: Derived, stale) -> None:
+    """Recompute one derived column for the `stale` rows, in place."""
+    if not stale.any():
+        return
+    module, name = derived.refresh.split(":")
+    refresh = getattr(importlib.import_module(module), name)
+    values = table[derived.column].to_numpy(copy=True)
+    values[stale] = refresh(table, stale, **neuron._derived[derived.column])
+    table[derived.column] = values
+
+
+def replace_derived(neuron, axis: Axis, replacement) -> None:
+    """Deal with derived columns before an axis' table is replaced outright.
+
+    The counterpart to `_orphan_aligned` and the same bargain: only a
+    replacement whose elements were all there before can be compared with what
+    it replaces - `remove_nodes` rewiring around the nodes it drops, say.
+    Anything else brings its own values, and they are no longer ours.
+    """
+    before = capture_tree(neuron, axis)
+    if before is None:
+        return
+    if np.isin(replacement[axis.ids].to_numpy(), before[0]).all():
+        invalidate_derived(neuron, axis, before, table=replacement)
+    else:
+        forget_derived(neuron, axis)
+
+
+def _edited(
+    ids, parents, old_ids, old_parents, kept=None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Masks of the elements whose children, or whose parent, an edit changed.
+
+    An element is new, or hangs off a different parent than it did; either way
+    both its old and its new parent have a different set of children now - as
+    does the parent of an element that is gone. New elements count as touched
+    themselves, since nothing was ever computed for them.
+    """
+    old_parents = np.asarray(old_parents)
+    if kept is not None:
+        where = np.asarray(kept)
+        gone = np.ones(len(old_ids), dtype=bool)
+        gone[where] = False
+    else:
+        old = pd.Index(old_ids)
+        if not old.is_unique:
+            # No way to say which element was which - so all of them changed
+            everything = np.ones(len(ids), dtype=bool)
+            return everything, everything
+        where = old.get_indexer(ids)
+        gone = pd.Index(ids).get_indexer(old_ids) < 0
+
+    new = where < 0
+    was = np.where(new, parents, old_parents[where])
+    moved = new | (was != parents)
+
+    changed = np.concatenate(
+        (
+            parents[moved],
+            was[moved & ~new],
+            old_parents[gone],
+            ids[new],
+        )
+    )
+    return np.isin(ids, changed), moved
+
+
+def _stale(reach: str, ids, parents, seeds) -> np.ndarray:
+    """Which elements a column of this reach has to recompute - see `_invalidate`."""
+    if reach == "subtree" or seeds is True:
+        # Everything: see `REACHES`
+        return np.ones(len(ids), dtype=bool)
+
+    # "component": the fragments the seeds sit in now
+    hit = np.isin(ids, seeds)
+    if not hit.any():
+        return hit
+    comp = utils.fastcore.connected_components(ids, parents)
+    return np.isin(comp, comp[hit])
+
+
 # ---------------------------------------------------------------------------
 # Rebuilding
 #
@@ -986,6 +1421,10 @@ def apply_rebuild(neuron, state: RebuildState, rebuild: Rebuild) -> None:
     """
     axis = get_axis(neuron, state.axis.name)
 
+    # A rebuild re-makes the tree itself, so there is no before to compare a
+    # derived column against - whatever values it holds are the rebuild's now
+    forget_derived(neuron, axis)
+
     # One translator per policy: `"snap"` follows the rebuild, `"drop"` treats
     # the old element as gone, exactly as a selection would.
     translators = {
@@ -1400,6 +1839,12 @@ def merge_selection(
     """
     # Before the merge rebuilds the axis underneath them
     live = snapshot_links(parent, axis)
+    # Derived columns are judged against both trees as they were - the
+    # child's may well not maintain any itself, so it is not asked
+    before = capture_tree(parent, axis)
+    if before is not None:
+        table = getattr(child, axis.data[0])
+        theirs = table[axis.ids].to_numpy(), table[axis.parents].to_numpy()
 
     if axis.positional:
         survivors = _merge_positional(parent, child, axis, origin, covered)
@@ -1408,6 +1853,8 @@ def merge_selection(
 
     repair_refs(parent, axis, survivors)
     repair_links(parent, axis, live, survivors)
+    if before is not None:
+        merge_derived(parent, child, axis, before, theirs)
 
 
 def _merge_by_id(parent, child, axis: Axis, covered: np.ndarray) -> Survivors:
@@ -34,7 +34,7 @@ from .. import _deprecated
 from .. import io  # type: ignore # double import
 
 from .base import BaseNeuron
-from .schema import CONNECTOR_AXIS, Axis, Ref, axes, connector_link, links
+from .schema import CONNECTOR_AXIS, Axis, Derived, Ref, axes, connector_link, links
 from .core_utils import temp_property, add_units
 
 try:
@@ -172,6 +172,15 @@ class Skeleton(BaseNeuron):
                 Ref('tags', kind='id_lists', on_rebuild='snap'),
                 Ref('_soma', kind='scalar', on_rebuild='snap'),
             ),
+            parents='parent_id',
+            # Node metrics that edits mark stale, to be recomputed on the next
+            # read instead of carried wrong - see `schema.refresh_derived`.
+            derived=(
+                Derived('strahler_index', reach='subtree',
+                        refresh='navis.morpho.mmetrics:_refresh_strahler'),
+                Derived('flow_centrality', reach='component',
+                        refresh='navis.morpho.mmetrics:_refresh_flow'),
+            ),
         ),
         CONNECTOR_AXIS,
     )
@@ -539,6 +548,11 @@ class Skeleton(BaseNeuron):
     @property
     def nodes(self) -> pd.DataFrame:
         """Node table."""
+        # Edits leave derived columns (Strahler index & co) stale rather than
+        # recompute them, so that a loop of edits pays for one recompute - here,
+        # once somebody looks
+        if core.schema.has_stale_derived(self):
+            core.schema.settle_for_reader(self)
         return self._get_nodes()
 
     def _get_nodes(self) -> pd.DataFrame:
@@ -2273,6 +2273,11 @@ def reroot_skeleton(
     # Keep track of parent ID dtype
     parentid_dtype = x.nodes.parent_id.dtype
 
+    # Rerooting reverses the path between the old and the new root, which
+    # leaves derived node metrics along it stale
+    axis = core.schema.get_axis(x, "nodes")
+    before = core.schema.capture_tree(x, axis)
+
     # One call per root, not one call with every root: `new_root` is documented to
     # reroot "in sequence", so two roots naming the *same* component must leave the
     # second one as that component's root. Passing both at once would instead have
@@ -2292,6 +2297,9 @@ def reroot_skeleton(
     if x.nodes.parent_id.dtype != parentid_dtype:
         x.nodes["parent_id"] = x.nodes.parent_id.astype(parentid_dtype)
 
+    if before is not None:
+        core.schema.invalidate_derived(x, axis, before)
+
     # Node types are stale for the old and new roots - let them be recomputed
     x._clear_temp_attr()
 
@@ -20,7 +20,9 @@ from .rda_io import read_rda, read_rds, write_rda, write_rds
 from .nmx_io import read_nmx, read_nml
 from .mesh_io import read_mesh, write_mesh
 from .tiff_io import read_tiff
-from .pq_io import read_parquet, write_parquet, scan_parquet
+from .pq_io import read_parquet, write_parquet, scan_parquet, ParquetSink
+from .arrow_io import read_arrow, write_arrow
+from .archive_index import index_archive
 
 __all__ = ['read_json', 'write_json',
            'read_swc', 'write_swc',
@@ -31,4 +33,6 @@ __all__ = ['read_json', 'write_json',
            'read_rda', 'read_rds', 'write_rda', 'write_rds',
            'read_nmx', 'read_nml',
            'read_mesh', 'write_mesh',
-           'read_parquet', 'write_parquet', 'scan_parquet']
+           'read_parquet', 'write_parquet', 'scan_parquet', 'ParquetSink',
+           'read_arrow', 'write_arrow',
+           'index_archive']
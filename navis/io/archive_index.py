@@ -0,0 +1,344 @@
+#    This script is part of navis (http://www.github.com/navis-org/navis).
+#    Copyright (C) 2018 Philipp Schlegel
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+
+"""Random-access indices for zip and tar archives.
+
+Reading a handful of neurons out of a large archive should not mean reading all
+of it. The two formats fail at this in different ways:
+
+  - a tar has no table of contents at all, so finding a member means walking
+    every header before it - for a 40 GB archive, that is reading 40 GB;
+  - a zip does have one (the central directory), but `zipfile` parses all of
+    it every time the archive is opened. Each parallel read re-opens the
+    archive, so with 500k members the parsing quickly dwarfs the reading.
+
+An index records, once, where each member's bytes live. It is written next to
+the archive (`<archive>.navis-index`), picked up automatically by the readers,
+and ignored as soon as the archive changes. With it, a read is one `seek` and
+one `read`, and parallel workers read disjoint members concurrently instead of
+each scanning the archive.
+
+"""
+
+import os
+import bz2
+import json
+import zlib
+import struct
+import tarfile
+import zipfile
+
+from pathlib import Path
+from typing import List, NamedTuple, Optional, Union
+
+from .. import config
+
+__all__ = ["index_archive"]
+
+logger = config.get_logger(__name__)
+
+#: Suffix of the sidecar file the index is written to.
+INDEX_SUFFIX = ".navis-index"
+#: Bump this if the layout of the sidecar changes. Indices with a different
+#: version are ignored (and rebuilt by `index_archive`).
+INDEX_VERSION = 1
+
+#: Compression methods we can decompress ourselves, straight from the member's
+#: bytes. Anything else (e.g. LZMA, which zip wraps in a header of its own) is
+#: read through `zipfile` instead.
+STORED = zipfile.ZIP_STORED
+DEFLATED = zipfile.ZIP_DEFLATED
+BZIP2 = zipfile.ZIP_BZIP2
+
+#: Layout of a zip member's local file header (APPNOTE 4.3.7): signature,
+#: versions, flags, method, time, date, CRC, sizes, and the lengths of the
+#: filename (byte 26) and extra field (byte 28) that follow it.
+ZIP_LOCAL_HEADER = "<4s2B4HL2L2H"
+ZIP_LOCAL_HEADER_SIZE = struct.calcsize(ZIP_LOCAL_HEADER)
+ZIP_LOCAL_SIGNATURE = b"PK\x03\x04"
+
+
+class IndexEntry(NamedTuple):
+    """Where one member's bytes live inside an archive.
+
+    Module level and a plain tuple so that it pickles cheaply: these are what
+    parallel readers ship to their workers.
+    """
+
+    #: Full path of the member inside the archive.
+    name: str
+    #: Byte offset of the member's (possibly compressed) data.
+    offset: int
+    #: Size of the member once decompressed.
+    size: int
+    #: Size of the member's data inside the archive.
+    compressed_size: int
+    #: zip compression method. Always `STORED` for a tar.
+    compress_type: int
+
+
+class ArchiveIndex:
+    """Index of an archive's members.
+
+    Use [`navis.index_archive`][] to build one, and `load_index` to get the
+    index for an archive if there is a valid one.
+
+    Parameters
+    ----------
+    path :      str | Path
+                Path to the archive.
+    kind :      "zip" | "tar"
+    entries :   list of IndexEntry
+    stat :      (int, int)
+                Size and modification time (ns) of the archive the index was
+                built from. An index whose archive no longer matches is stale.
+
+    """
+
+    def __init__(self, path, kind, entries, stat):
+        self.path = Path(path)
+        self.kind = kind
+        self.entries = list(entries)
+        self.stat = tuple(stat)
+
+    def __repr__(self):
+        return f"<ArchiveIndex {self.kind} '{self.path.name}' ({len(self)} members)>"
+
+    def __len__(self):
+        return len(self.entries)
+
+    @property
+    def sidecar(self) -> Path:
+        """Path of the file this index is cached in."""
+        return sidecar_path(self.path)
+
+    def is_stale(self) -> bool:
+        """Whether the archive has changed since the index was built."""
+        try:
+            return _stat(self.path) != self.stat
+        except OSError:
+            return True
+
+    @classmethod
+    def build(cls, path: Union[str, Path]) -> "ArchiveIndex":
+        """Build an index by scanning the archive once."""
+        path = Path(path).expanduser()
+        stat = _stat(path)
+
+        if zipfile.is_zipfile(path):
+            return cls(path, "zip", _scan_zip(path), stat)
+
+        try:
+            # "r:" - *only* uncompressed: a compressed tar is one stream, and
+            # the offsets of its members mean nothing without decompressing
+            # everything in front of them
+            with tarfile.open(path, "r:") as tf:
+                entries = [
+                    IndexEntry(t.name, t.offset_data, t.size, t.size, STORED)
+                    for t in tf
+                    if t.isfile()
+                ]
+        except tarfile.ReadError:
+            raise ValueError(
+                f'Unable to index "{path.name}": only zip archives and '
+                "uncompressed tar archives support random access. A compressed "
+                "tar (e.g. .tar.gz) has to be decompressed from the start to "
+                "reach any member - consider re-packing it as a zip."
+            ) from None
+
+        return cls(path, "tar", entries, stat)
+
+    def save(self) -> Path:
+        """Write the index to its sidecar file.
+
+        Written to a temporary file and moved into place, so a reader never
+        sees half an index.
+        """
+        data = {
+            "version": INDEX_VERSION,
+            "kind": self.kind,
+            "stat": list(self.stat),
+            "entries": [list(e) for e in self.entries],
+        }
+        tmp = self.sidecar.with_name(self.sidecar.name + f".{os.getpid()}.tmp")
+        with open(tmp, "w") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp, self.sidecar)
+        return self.sidecar
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> Optional["ArchiveIndex"]:
+        """Load the index for `path`, or None if there is no valid one."""
+        path = Path(path).expanduser()
+        sidecar = sidecar_path(path)
+        if not sidecar.is_file():
+            return None
+
+        try:
+            with open(sidecar, "r") as f:
+                data = json.load(f)
+            if data.get("version") != INDEX_VERSION:
+                return None
+            index = cls(
+                path,
+                data["kind"],
+                [IndexEntry(*e) for e in data["entries"]],
+                data["stat"],
+            )
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning(f'Ignoring unreadable archive index "{sidecar}": {e}')
+            return None
+
+        if index.is_stale():
+            logger.warning(
+                f'Ignoring archive index for "{path.name}": the archive has '
+                "changed since it was indexed. Rebuild it with "
+                "`navis.index_archive(..., overwrite=True)`."
+            )
+            return None
+
+        return index
+
+
+def sidecar_path(path: Union[str, Path]) -> Path:
+    """Path of the index file for the archive at `path`."""
+    path = Path(path).expanduser()
+    return path.with_name(path.name + INDEX_SUFFIX)
+
+
+def load_index(path: Union[str, Path]) -> Optional[ArchiveIndex]:
+    """Return the index for the archive at `path`, or None if there is none.
+
+    Stale and unreadable indices are ignored (with a warning) rather than
+    raising: an index is an optimisation, and the archive can always be read
+    without it.
+    """
+    return ArchiveIndex.load(path)
+
+
+def index_archive(fpath: Union[str, Path], overwrite: bool = False) -> ArchiveIndex:
+    """Index a zip or tar archive for random access.
+
+    The index records where in the archive each file lives and is saved next to
+    it as `<archive>.navis-index`. Readers such as [`navis.read_swc`][] pick it
+    up automatically, which makes
+
+      - reading a subset of files (via `limit`) a matter of seeking straight to
+        them instead of scanning the archive, and
+      - reading in parallel scale: workers read disjoint files concurrently
+        rather than each re-opening and parsing the archive.
+
+    The index is ignored once the archive is modified. Note that compressed tar
+    archives (e.g. `.tar.gz`) cannot be indexed: a member can only be reached by
+    decompressing everything in front of it.
+
+    Parameters
+    ----------
+    fpath :     str | Path
+                Path to a `.zip` or uncompressed `.tar` archive.
+    overwrite : bool
+                If False and there already is an up-to-date index, return that
+                instead of re-scanning the archive.
+
+    Returns
+    -------
+    ArchiveIndex
+
+    Examples
+    --------
+    >>> import navis
+    >>> idx = navis.index_archive('skeletons.tar')           # doctest: +SKIP
+    >>> # This now seeks straight to the 10 requested files
+    >>> nl = navis.read_swc('skeletons.tar', limit=slice(1000, 1010))  # doctest: +SKIP
+
+    """
+    if not overwrite:
+        index = ArchiveIndex.load(fpath)
+        if index is not None:
+            return index
+
+    index = ArchiveIndex.build(fpath)
+    try:
+        index.save()
+    except OSError as e:
+        # e.g. a read-only data directory - the index still works for this
+        # session, it just can't be cached
+        logger.warning(f'Unable to save archive index to "{index.sidecar}": {e}')
+    return index
+
+
+def read_entry(path: Union[str, Path], entry: IndexEntry) -> bytes:
+    """Read a single member of an indexed archive.
+
+    Module level and stateless, so that workers can call it with nothing but a
+    path and an `IndexEntry`: opening a file is cheap, it is parsing the archive
+    that the index saves us.
+    """
+    if entry.compress_type not in (STORED, DEFLATED, BZIP2):
+        with zipfile.ZipFile(path) as zf:
+            return zf.read(entry.name)
+
+    with open(path, "rb") as f:
+        f.seek(entry.offset)
+        data = f.read(entry.compressed_size)
+
+    if entry.compress_type == DEFLATED:
+        # Raw deflate stream, i.e. no zlib header - hence the negative wbits
+        data = zlib.decompress(data, -zlib.MAX_WBITS)
+    elif entry.compress_type == BZIP2:
+        data = bz2.decompress(data)
+
+    if len(data) != entry.size:
+        raise OSError(
+            f'Read {len(data)} bytes for "{entry.name}" but expected '
+            f"{entry.size} - is the archive index out of date?"
+        )
+    return data
+
+
+def _scan_zip(path: Path) -> List[IndexEntry]:
+    """List a zip's members and the offsets of their data."""
+    entries = []
+    with zipfile.ZipFile(path) as zf, open(path, "rb") as f:
+        for info in zf.infolist():
+            if info.is_dir():
+                continue
+            # `header_offset` points at the member's local header, which is
+            # followed by a filename and an extra field of its own. Their
+            # lengths can differ from the central directory's, so the data
+            # offset has to be read from the local header itself.
+            f.seek(info.header_offset)
+            header = struct.unpack(ZIP_LOCAL_HEADER, f.read(ZIP_LOCAL_HEADER_SIZE))
+            if header[0] != ZIP_LOCAL_SIGNATURE:
+                raise zipfile.BadZipFile(
+                    f'No local header for "{info.filename}" at offset '
+                    f"{info.header_offset}"
+                )
+            # The last two fields: lengths of the filename and the extra field
+            offset = info.header_offset + ZIP_LOCAL_HEADER_SIZE + sum(header[-2:])
+            entries.append(
+                IndexEntry(
+                    info.filename,
+                    offset,
+                    info.file_size,
+                    info.compress_size,
+                    info.compress_type,
+                )
+            )
+    return entries
+
+
+def _stat(path: Path):
+    """What identifies a particular version of an archive."""
+    st = os.stat(path)
+    return (st.st_size, st.st_mtime_ns)
@@ -0,0 +1,559 @@
+#    This script is part of navis (http://www.github.com/navis-org/navis).
+#    Copyright (C) 2018 Philipp Schlegel
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#    GNU General Public License for more details.
+
+"""Memory-mappable neuron containers (Arrow IPC files).
+
+Parquet and HDF5 are storage formats: every read decodes (and typically
+decompresses) the data into freshly allocated arrays. That is fine for reading
+a library once, but workers that load the same reference library over and over
+pay for the decoding every time - and each process ends up holding its own
+copy of what is, byte for byte, the same data.
+
+An uncompressed Arrow IPC file stores arrays exactly as they are laid out in
+memory. Reading it means memory-mapping the file and pointing numpy at the
+mapped bytes: nothing is decoded or copied, and the operating system keeps a
+single page-cached copy that all processes on the host share.
+
+Layout
+------
+One row per neuron. Each array a neuron is made of is stored in its own
+`large_list` column, flattened (e.g. a mesh's `(N, 3)` vertices become one list
+of `3N` values) and named after where it lives on the neuron:
+
+  - Skeletons: `nodes.<column>` for each node table column
+  - Dotprops: `points`, `vect` and `alpha`
+  - MeshNeurons: `vertices` and `faces`
+  - Voxels: `voxels` and `values`, or `grid` for grid-backed neurons
+  - Connectors (any type): `connectors.<column>`
+
+Columns a neuron does not have hold an empty list. A JSON-encoded `meta` column
+records the neuron's type, ID, properties and the shapes needed to turn the
+flat lists back into arrays.
+
+"""
+
+import json
+import numbers
+
+import numpy as np
+import pandas as pd
+
+from pathlib import Path
+from typing import List, Optional, Union
+
+from .. import config, core
+
+__all__ = ["read_arrow", "write_arrow"]
+
+# Set up logging
+logger = config.get_logger(__name__)
+
+# Version of the layout described above, stored in the schema's metadata
+ARROW_VERSION = "1"
+
+META_DATA = ("name", "units", "soma")  # meta data to write for each neuron
+
+# Number of neurons per record batch. Batches are the unit `read_arrow` works
+# in, so this mostly bounds how much meta data is parsed to find a `subset`.
+BATCH_SIZE = 1000
+
+# Neuron types we know how to write, with the name stored in the meta data.
+# Classes by name because `navis.core` is not fully initialized at import time.
+KINDS = {
+    "Skeleton": "skeleton",
+    "Dotprops": "dotprops",
+    "MeshNeuron": "mesh",
+    "Voxels": "voxels",
+}
+
+# Columns derived on construction that are not worth writing
+SKIP_COLUMNS = {"nodes.type"}
+
+
+def _import_pyarrow(action: str):
+    """Import pyarrow or raise an informative error."""
+    try:
+        import pyarrow as pa
+    except ModuleNotFoundError:
+        raise ModuleNotFoundError(
+            f"{action} Arrow files requires the pyarrow library:\n"
+            " pip3 install pyarrow"
+        )
+    return pa
+
+
+def write_arrow(
+    x: "core.NeuronObject",
+    filepath: Union[str, Path],
+    write_meta: bool = True,
+    write_connectors: bool = True,
+) -> None:
+    """Write neuron(s) to a memory-mappable Arrow IPC file.
+
+    Unlike [`navis.write_parquet`][], this writes all neuron types (and any
+    mix thereof) and stores the data uncompressed, exactly as it is laid out in
+    memory. Reading it back with [`navis.read_arrow`][] is close to free: the
+    file is memory-mapped and the neurons' arrays point straight at it, so
+    processes on the same host that read the same file share one copy of it.
+
+    The price is file size: expect files several times larger than parquet.
+
+    Parameters
+    ----------
+    x :                 Neuron | NeuronList
+                        Neuron(s) to save. Can be any mix of Skeletons,
+                        Dotprops, MeshNeurons and Voxels.
+    filepath :          str | pathlib.Path
+                        Destination for the file. Conventionally ends in
+                        `.arrow`.
+    write_meta :        bool | list of str
+                        Whether to also write neuron properties to file. By
+                        default this is `.name`, `.units` and `.soma`. You can
+                        change which properties are written by providing them as
+                        list of strings. Properties must be JSON-serializable
+                        (numpy types are fine).
+    write_connectors :  bool
+                        Whether to write the neurons' connector tables.
+
+    See Also
+    --------
+    [`navis.read_arrow`][]
+                        Read neurons from an Arrow file.
+    [`navis.write_parquet`][]
+                        Write neurons to the (smaller but slower to read)
+                        parquet format.
+
+    Examples
+    --------
+    >>> import navis
+    >>> nl = navis.example_neurons(3, kind='skeleton')
+    >>> navis.write_arrow(nl, tmp_dir / 'skeletons.arrow')
+    >>> nl2 = navis.read_arrow(tmp_dir / 'skeletons.arrow')
+    >>> len(nl2)
+    3
+
+    """
+    pa = _import_pyarrow("Writing")
+
+    filepath = Path(filepath).expanduser()
+    neurons = core.NeuronList(x)
+
+    rows = [_neuron_to_row(n, write_meta, write_connectors) for n in neurons]
+    dtypes = _column_dtypes(rows)
+
+    fields = [pa.field("meta", pa.string())]
+    for col, dtype in dtypes.items():
+        fields.append(pa.field(col, pa.large_list(_arrow_type(dtype))))
+    schema = pa.schema(
+        fields, metadata={"navis:format": "arrow", "navis:version": ARROW_VERSION}
+    )
+
+    # Compression would defeat the purpose: compressed buffers have to be
+    # decompressed into memory before anything can point at them
+    options = pa.ipc.IpcWriteOptions(compression=None)
+    with pa.OSFile(str(filepath), "wb") as sink:
+        with pa.ipc.new_file(sink, schema, options=options) as writer:
+            for i in range(0, max(len(rows), 1), BATCH_SIZE):
+                batch = rows[i : i + BATCH_SIZE]
+                writer.write_batch(_rows_to_batch(batch, schema, dtypes))
+
+
+def read_arrow(
+    f: Union[str, Path],
+    subset: Optional[List[Union[str, int]]] = None,
+    limit: Optional[int] = None,
+    mmap: bool = True,
+    read_connectors: bool = True,
+    progress: bool = True,
+) -> "core.NeuronObject":
+    """Read neuron(s) from an Arrow IPC file.
+
+    By default the file is memory-mapped and the neurons' arrays (nodes,
+    vertices, points, voxels, ...) are zero-copy views into the mapping:
+    reading is near-instant regardless of file size, data is only paged in
+    once it's actually used, and processes on the same host reading the same
+    file share one page-cached copy of it.
+
+    Note that memory-mapped arrays are **read-only**. Functions that return a
+    modified copy of a neuron (the default for most of navis) are unaffected
+    but modifying a neuron in place - e.g. `n.nodes.loc[0, 'x'] = 0` - raises
+    an error. Use `n.copy()` first or read with `mmap=False`.
+
+    Parameters
+    ----------
+    f :                 str | pathlib.Path
+                        File written by [`navis.write_arrow`][].
+    subset :            str | int | list thereof, optional
+                        IDs of the neurons to read.
+    limit :             int, optional
+                        Read only the first `limit` neurons.
+    mmap :              bool
+                        If True (default), memory-map the file and return
+                        neurons backed by the mapping. If False, read the file
+                        into regular (writable) memory instead.
+    read_connectors :   bool
+                        Whether to read the neurons' connector tables.
+
+    Returns
+    -------
+    Neuron
+                        If the file contains a single neuron.
+    NeuronList
+                        If the file contains multiple neurons or if
+                        `limit`/`subset` were used.
+
+    See Also
+    --------
+    [`navis.write_arrow`][]
+                        Write neurons to an Arrow file.
+
+    Examples
+    --------
+    See [`navis.write_arrow`][] for examples.
+
+    """
+    pa = _import_pyarrow("Reading")
+
+    f = Path(f).expanduser()
+    if not f.is_file():
+        raise FileNotFoundError(f'File "{f}" does not exist.')
+
+    if limit is not None and subset not in (None, False):
+        raise ValueError("You can provide either a `subset` or a `limit` but not both.")
+
+    if isinstance(subset, pd.Series):
+        subset = subset.values
+    if subset is False:
+        subset = None
+    filtered = subset is not None or limit is not None
+    if subset is not None:
+        if isinstance(subset, (str, numbers.Number)):
+            subset = [subset]
+        # IDs go through JSON, so compare as strings
+        subset = {str(s) for s in subset}
+
+    if mmap:
+        source = pa.memory_map(str(f), "r")
+    else:
+        source = pa.OSFile(str(f), "rb")
+
+    reader = pa.ipc.open_file(source)
+    if reader.schema.metadata is None or b"navis:format" not in reader.schema.metadata:
+        raise ValueError(f'"{f.name}" does not appear to be a navis Arrow file.')
+
+    neurons = []
+    with config.tqdm(
+        total=reader.num_record_batches,
+        disable=not progress or reader.num_record_batches < 2,
+        leave=False,
+        desc="Reading",
+    ) as pbar:
+        for i in range(reader.num_record_batches):
+            if limit is not None and len(neurons) >= limit:
+                break
+            batch = reader.get_batch(i)
+            metas = [json.loads(m) for m in batch.column("meta").to_pylist()]
+
+            rows = range(len(metas))
+            if subset is not None:
+                rows = [r for r in rows if str(metas[r]["id"]) in subset]
+            if limit is not None:
+                rows = rows[: limit - len(neurons)]
+
+            if len(rows):
+                columns = _ColumnViews(batch, copy=not mmap)
+                for r in rows:
+                    neurons.append(
+                        _row_to_neuron(metas[r], columns, r, read_connectors)
+                    )
+            pbar.update()
+
+    # Return a single neuron only if that's all the file contains
+    if len(neurons) == 1 and not filtered:
+        return neurons[0]
+    return core.NeuronList(neurons)
+
+
+###############################################################################
+#                                  Writing                                    #
+###############################################################################
+
+
+def _neuron_to_row(n, write_meta, write_connectors):
+    """Break a neuron into its meta data and named arrays."""
+    kind = next((v for k, v in KINDS.items() if isinstance(n, getattr(core, k))), None)
+    if kind is None:
+        raise TypeError(f'Unable to write "{type(n)}" to Arrow file.')
+
+    meta = {"type": kind, "id": _to_json(n.id)}
+    arrays = {}
+
+    if kind == "skeleton":
+        arrays.update(_table_arrays(n.nodes, "nodes", meta))
+    elif kind == "dotprops":
+        arrays["points"] = n.points
+        if n.vect is not None:
+            arrays["vect"] = n.vect
+        if n.alpha is not None:
+            arrays["alpha"] = n.alpha
+        meta["k"] = _to_json(n.k)
+    elif kind == "mesh":
+        arrays["vertices"] = n.vertices
+        arrays["faces"] = n.faces
+        if getattr(n, "soma_pos", None) is not None:
+            meta["soma_pos"] = _to_json(n.soma_pos)
+    elif kind == "voxels":
+        if n._base_data_type == "grid":
+            arrays["grid"] = n.grid
+        else:
+            arrays["voxels"] = n.voxels
+            if getattr(n, "_values", None) is not None:
+                arrays["values"] = n.values
+            if getattr(n, "_canvas_shape", None) is not None:
+                meta["canvas_shape"] = _to_json(n._canvas_shape)
+        meta["offset"] = _to_json(n.offset)
+
+    if write_connectors and n.has_connectors:
+        arrays.update(_table_arrays(n.connectors, "connectors", meta))
+
+    if write_meta:
+        attrs = (
+            write_meta
+            if isinstance(write_meta, (list, np.ndarray, tuple))
+            else META_DATA
+        )
+        for p in attrs:
+            if p == "units":
+                # Store the string(s) the neuron keeps rather than the pint
+                # Quantity - same as the neuron itself does for pickling
+                value = getattr(n, "_unit_str", None)
+            else:
+                try:
+                    value = getattr(n, p, None)
+                except NotImplementedError:
+                    # e.g. `.soma` for Voxels
+                    continue
+            if value is None:
+                continue
+            meta.setdefault("props", {})[p] = _to_json(value)
+
+    # Arrays are written flat - record what it takes to restore their shape
+    meta["shapes"] = {k: list(v.shape[1:]) for k, v in arrays.items() if v.ndim > 1}
+
+    return meta, arrays
+
+
+def _table_arrays(table, prefix, meta):
+    """Split a DataFrame into one array per column."""
+    arrays = {}
+    for col in table.columns:
+        name = f"{prefix}.{col}"
+        if name in SKIP_COLUMNS:
+            continue
+        values = table[col]
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            # Written as their values: remember to turn them back into categories
+            meta.setdefault("categorical", []).append(name)
+        arrays[name] = np.asarray(values)
+    meta.setdefault("columns", {})[prefix] = [
+        str(c) for c in table.columns if f"{prefix}.{c}" in arrays
+    ]
+    return arrays
+
+
+def _column_dtypes(rows):
+    """Find one dtype per column that can hold every neuron's array."""
+    dtypes = {}
+    for _, arrays in rows:
+        for name, arr in arrays.items():
+            dtype = _storage_dtype(arr.dtype)
+            if name not in dtypes:
+                dtypes[name] = dtype
+            elif dtypes[name] != dtype:
+                if object in (dtypes[name], dtype):
+                    dtypes[name] = np.dtype(object)
+                else:
+                    dtypes[name] = np.result_type(dtypes[name], dtype)
+
+    # Note which neurons need casting back into their original dtype on read
+    for meta, arrays in rows:
+        for name, arr in arrays.items():
+            if arr.dtype != dtypes[name] and arr.dtype != object:
+                meta.setdefault("dtypes", {})[name] = arr.dtype.str
+    return dtypes
+
+
+def _storage_dtype(dtype):
+    """Dtype an array is stored as: numbers and bools as-is, anything else as strings."""
+    if dtype.kind in "biuf":
+        return dtype
+    return np.dtype(object)
+
+
+def _arrow_type(dtype):
+    """Arrow type for the values of a column."""
+    import pyarrow as pa
+
+    if dtype == object:
+        return pa.large_string()
+    return pa.from_numpy_dtype(dtype)
+
+
+def _rows_to_batch(rows, schema, dtypes):
+    """Turn neurons' arrays into a record batch."""
+    import pyarrow as pa
+
+    columns = [pa.array([json.dumps(meta) for meta, _ in rows], type=pa.string())]
+    for col, dtype in dtypes.items():
+        parts = []
+        for _, arrays in rows:
+            arr = arrays.get(col)
+            if arr is None:
+                parts.append(np.zeros(0, dtype=dtype))
+            elif dtype == object:
+                parts.append(_to_strings(arr))
+            else:
+                parts.append(np.asarray(arr).ravel().astype(dtype, copy=False))
+
+        offsets = np.zeros(len(parts) + 1, dtype=np.int64)
+        np.cumsum([len(p) for p in parts], out=offsets[1:])
+        values = np.concatenate(parts)
+        if dtype == object:
+            values = pa.array(values, type=pa.large_string())
+        else:
+            values = pa.array(values)
+        columns.append(pa.LargeListArray.from_arrays(pa.array(offsets), values))
+
+    return pa.RecordBatch.from_arrays(columns, schema=schema)
+
+
+def _to_strings(arr):
+    """Turn an array into strings, keeping missing values missing."""
+    arr = pd.Series(np.asarray(arr, dtype=object).ravel())
+    return arr.astype(str).where(arr.notnull(), None).values
+
+
+def _to_json(x):
+    """Turn numpy types into something `json` can serialize."""
+    if isinstance(x, np.ndarray):
+        return x.tolist()
+    if isinstance(x, np.generic):
+        return x.item()
+    if isinstance(x, (list, tuple)):
+        return [_to_json(v) for v in x]
+    return x
+
+
+###############################################################################
+#                                  Reading                                    #
+###############################################################################
+
+
+class _ColumnViews:
+    """Per-neuron views into the columns of a record batch.
+
+    The values of all neurons in a column share one buffer: a neuron's array is
+    a slice of it, so nothing is copied unless `copy=True`.
+    """
+
+    def __init__(self, batch, copy=False):
+        self.batch = batch
+        self.copy = copy
+        self._columns = {}
+
+    def get(self, name, row):
+        import pyarrow as pa
+
+        if name not in self._columns:
+            if name not in self.batch.schema.names:
+                return None
+            col = self.batch.column(name)
+            values = col.values
+            if values.null_count == 0 and not pa.types.is_large_string(values.type):
+                # Zero-copy for numbers; bools are bit-packed in Arrow and
+                # can't be viewed, so those are unpacked into a new array
+                values = values.to_numpy(zero_copy_only=False)
+            else:
+                values = np.asarray(values.to_pylist(), dtype=object)
+            self._columns[name] = (values, col.offsets.to_numpy())
+        values, offsets = self._columns[name]
+        arr = values[offsets[row] : offsets[row + 1]]
+        return arr.copy() if self.copy else arr
+
+
+def _row_to_neuron(meta, columns, row, read_connectors):
+    """Build a neuron from its meta data and its slices of the columns."""
+    shapes = meta.get("shapes", {})
+    dtypes = meta.get("dtypes", {})
+
+    def array(name):
+        arr = columns.get(name, row)
+        if arr is None:
+            return None
+        if name in dtypes:
+            arr = arr.astype(dtypes[name])
+        if name in shapes:
+            arr = arr.reshape(-1, *shapes[name])
+        return arr
+
+    def table(prefix):
+        cols = meta.get("columns", {}).get(prefix, [])
+        if not cols:
+            return None
+        # `copy=False` keeps each column a view - the default would
+        # consolidate them into one newly allocated block
+        df = pd.DataFrame({c: array(f"{prefix}.{c}") for c in cols}, copy=False)
+        for name in meta.get("categorical", []):
+            if name.startswith(f"{prefix}."):
+                c = name[len(prefix) + 1 :]
+                df[c] = df[c].astype("category")
+        return df
+
+    kind = meta["type"]
+    if kind == "skeleton":
+        n = core.Skeleton(table("nodes"))
+    elif kind == "dotprops":
+        n = core.Dotprops(
+            array("points"), k=meta.get("k"), vect=array("vect"), alpha=array("alpha")
+        )
+    elif kind == "mesh":
+        n = core.MeshNeuron((array("vertices"), array("faces")), process=False)
+        if meta.get("soma_pos") is not None:
+            n.soma_pos = meta["soma_pos"]
+    elif kind == "voxels":
+        if "grid" in shapes:
+            n = core.Voxels(array("grid"), sparsify=False)
+        else:
+            n = core.Voxels(array("voxels"), sparsify=False)
+            values = array("values")
+            if values is not None and len(values) == len(n.voxels):
+                n._values = values
+            if meta.get("canvas_shape") is not None:
+                n._canvas_shape = tuple(meta["canvas_shape"])
+        n.offset = meta.get("offset")
+    else:
+        raise ValueError(f'Unknown neuron type "{kind}" in Arrow file.')
+
+    n.id = meta["id"]
+    for k, v in meta.get("props", {}).items():
+        try:
+            setattr(n, k, v)
+        except AttributeError:
+            logger.warning(f"Unable to set neuron's `{k}` attribute.")
+
+    if read_connectors:
+        connectors = table("connectors")
+        if connectors is not None:
+            n.connectors = connectors
+
+    return n
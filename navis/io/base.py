@@ -13,8 +13,11 @@
 
 import io
 import os
+import contextlib
 import re
 import fnmatch
+import collections
+import itertools
 import tarfile
 import datetime
 import requests
@@ -32,11 +35,12 @@ from functools import partial, wraps
 from importlib.util import find_spec
 from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import urlparse, unquote
-from typing import List, Union, Iterable, Dict, Optional, Any, IO
+from typing import List, Union, Iterable, Iterator, Dict, Optional, Any, IO
 
 from .. import config, utils, core
 from ..compute.dispatch import default_n_workers, worker_initializer
-from ..utils import http
+from .archive_index import IndexEntry, load_index, read_entry
+from ..utils import http, fetch
 
 try:
     import zlib
@@ -65,6 +69,16 @@ PARALLEL_THRESHOLD_URL = 5
 # deliberately modest: many of the servers we read from (e.g. NeuroMorpho, the
 # Brain Image Library) are public academic services.
 URL_THREADS_DEFAULT = 8
+# Whether to read many URLs via the asyncio engine in `navis.utils.fetch`
+# (requires `aiohttp`; we fall back to threads if it isn't installed). With it,
+# `parallel` caps the connections *per host* rather than the number of threads,
+# and requests to different hosts run concurrently on top of that.
+URL_ASYNC = True
+
+# How many reads per worker `parallel_iread` keeps in flight or waiting to be
+# consumed. Two keeps every worker busy while the consumer is handed a result;
+# more only buys memory.
+LOOKAHEAD_PER_WORKER = 2
 
 # Regular expression to figure out if a string is a regex pattern
 rgx = re.compile(r"[\\\.\?\[\]\+\^\$\*]")
@@ -431,7 +445,7 @@ class BaseReader(ABC):
         """Return true if file should be considered for reading."""
         if isinstance(file, ZipInfo):
             file = file.filename
-        elif isinstance(file, tarfile.TarInfo):
+        elif isinstance(file, (tarfile.TarInfo, IndexEntry)):
             file = file.name
         elif isinstance(file, Path):
             file = file.name
@@ -534,6 +548,53 @@ class BaseReader(ABC):
 
         return self.format_output(neurons)
 
+    def read_from_index(
+        self,
+        entries: Union[IndexEntry, List[IndexEntry]],
+        archive: os.PathLike,
+        attrs: Optional[Dict[str, Any]] = None,
+    ) -> "core.NeuronList":
+        """Read given members of an indexed archive into a NeuronList.
+
+        Counterpart to `read_from_zip` for archives with an index (see
+        [`navis.index_archive`][]): each member is read with a direct
+        seek instead of opening and parsing the archive.
+
+        Parameters
+        ----------
+        entries :   IndexEntry | list thereof
+                    Members of the archive to read.
+        archive :   str | os.PathLike
+                    Path to the zip or tar archive.
+        attrs :     dict or None
+                    Arbitrary attributes to include in the neurons.
+
+        Returns
+        -------
+        core.NeuronList
+
+        """
+        p = Path(archive)
+        if isinstance(entries, IndexEntry):
+            entries = [entries]
+
+        neurons = []
+        for entry in entries:
+            props = self.parse_filename(entry.name)
+            props["origin"] = str(p)
+            try:
+                n = self.read_bytes(
+                    read_entry(p, entry), attrs=merge_dicts(props, attrs)
+                )
+                neurons.append(n)
+            except BaseException:
+                if self.errors == "ignore":
+                    logger.warning(f'Failed to read "{entry.name}" from archive.')
+                else:
+                    raise
+
+        return self.format_output(neurons)
+
     def read_zip(
         self,
         fpath: os.PathLike,
@@ -560,22 +621,71 @@ class BaseReader(ABC):
 
         """
         fpath = Path(fpath).expanduser()
-        read_fn = partial(self.read_from_zip, zippath=fpath, attrs=attrs)
+        index = load_index(fpath)
+        if index is not None:
+            read_fn = partial(self.read_from_index, archive=fpath, attrs=attrs)
+        else:
+            read_fn = partial(self.read_from_zip, zippath=fpath, attrs=attrs)
         neurons = parallel_read_archive(
             read_fn=read_fn,
             fpath=fpath,
             file_ext=self.is_valid_file,
             limit=limit,
             parallel=parallel,
+            index=index,
         )
         return self.format_output(neurons)
 
+    def iter_zip(
+        self,
+        fpath: os.PathLike,
+        parallel="auto",
+        limit: Optional[int] = None,
+        attrs: Optional[Dict[str, Any]] = None,
+        batch_size: Optional[int] = None,
+    ) -> Iterator["core.NeuronObject"]:
+        """Lazily read files from a zip archive.
+
+        Same as `read_zip` but yields neurons as they are read instead of
+        collecting them into a NeuronList first.
+
+        Parameters
+        ----------
+        fpath :         str | os.PathLike
+                        Path to zip file.
+        limit :         int, optional
+                        Limit the number of files read from this directory.
+        attrs :         dict or None
+                        Arbitrary attributes to include in the neurons.
+        batch_size :    int, optional
+                        If given, yield NeuronLists of up to this many neurons
+                        instead of single neurons.
+
+        Yields
+        ------
+        core.BaseNeuron | core.NeuronList
+
+        """
+        fpath = Path(fpath).expanduser()
+        index = load_index(fpath)
+        if index is not None:
+            read_fn = partial(self.read_from_index, archive=fpath, attrs=attrs)
+        else:
+            read_fn = partial(self.read_from_zip, zippath=fpath, attrs=attrs)
+        to_read = zip_members(
+            fpath, file_ext=self.is_valid_file, limit=limit, index=index
+        )
+        yield from self._batched(
+            parallel_iread(read_fn, to_read, parallel), batch_size
+        )
+
     def read_tar(
         self,
         fpath: os.PathLike,
         limit: Optional[int] = None,
         attrs: Optional[Dict[str, Any]] = None,
         ignore_hidden: bool = True,
+        parallel="auto",
     ) -> "core.NeuronList":
         """Read files from a tar archive into a NeuronList.
 
@@ -587,15 +697,76 @@ class BaseReader(ABC):
                     Limit the number of files read from this directory.
         attrs :     dict or None
                     Arbitrary attributes to include in the Skeleton.
+        parallel :  str | bool | int
+                    Only used if the archive has been indexed (see
+                    `navis.index_archive`). Without an index, tar archives
+                    can only be read sequentially.
 
         Returns
         -------
         core.NeuronList
 
+        """
+        p = Path(fpath).expanduser()
+        index = load_index(p)
+        if index is not None:
+            neurons = parallel_read_archive(
+                read_fn=partial(self.read_from_index, archive=p, attrs=attrs),
+                fpath=p,
+                file_ext=self.is_valid_file,
+                limit=limit,
+                parallel=parallel,
+                ignore_hidden=ignore_hidden,
+                index=index,
+            )
+            return self.format_output(neurons)
+
+        return self.format_output(
+            list(
+                self.iter_tar(
+                    p, limit=limit, attrs=attrs, ignore_hidden=ignore_hidden
+                )
+            )
+        )
+
+    def files_in_tar(
+        self,
+        fpath: os.PathLike,
+        limit: Optional[int] = None,
+        ignore_hidden: bool = True,
+    ) -> List[str]:
+        """List the files in a tar archive that `read_tar` would read.
+
+        Parameters
+        ----------
+        fpath :     str | os.PathLike
+                    Path to tar file.
+        limit :     int | list | slice | str, optional
+                    Limit the files read from this archive.
+
+        Returns
+        -------
+        list of str
+                    Full paths of the members inside the archive.
+
         """
         p = Path(fpath).expanduser()
         file_ext = self.is_valid_file
 
+        # If the archive is indexed, we don't have to scan it
+        index = load_index(p)
+        if index is not None:
+            return [
+                e.name
+                for e in filter_members(
+                    index.entries,
+                    file_ext,
+                    limit=limit,
+                    ignore_hidden=ignore_hidden,
+                    name_func=lambda f: f.name,
+                )
+            ]
+
         # Check the content of the tar file
         # N.B. the TarInfo objects are hashable but the hash changes
         # when the archive is re-opened. Therefore, we track the
@@ -631,6 +802,66 @@ class BaseReader(ABC):
             else:
                 to_read = [f for f in to_read if limit in f.split("/")[-1]]
 
+        return to_read
+
+    def iter_tar(
+        self,
+        fpath: os.PathLike,
+        limit: Optional[int] = None,
+        attrs: Optional[Dict[str, Any]] = None,
+        ignore_hidden: bool = True,
+        batch_size: Optional[int] = None,
+        parallel="auto",
+    ) -> Iterator["core.NeuronObject"]:
+        """Lazily read files from a tar archive.
+
+        Same as `read_tar` but yields neurons as they are read instead of
+        collecting them into a NeuronList first.
+
+        Parameters
+        ----------
+        fpath :         str | os.PathLike
+                        Path to tar file.
+        limit :         int, optional
+                        Limit the number of files read from this directory.
+        attrs :         dict or None
+                        Arbitrary attributes to include in the neurons.
+        batch_size :    int, optional
+                        If given, yield NeuronLists of up to this many neurons
+                        instead of single neurons.
+        parallel :      str | bool | int
+                        Only used if the archive has been indexed (see
+                        `navis.index_archive`).
+
+        Yields
+        ------
+        core.BaseNeuron | core.NeuronList
+
+        """
+        p = Path(fpath).expanduser()
+        index = load_index(p)
+        if index is not None:
+            to_read = filter_members(
+                index.entries,
+                self.is_valid_file,
+                limit=limit,
+                ignore_hidden=ignore_hidden,
+                name_func=lambda f: f.name,
+            )
+            read_fn = partial(self.read_from_index, archive=p, attrs=attrs)
+            yield from self._batched(
+                parallel_iread(read_fn, to_read, parallel), batch_size
+            )
+            return
+
+        to_read = self.files_in_tar(p, limit=limit, ignore_hidden=ignore_hidden)
+
+        yield from self._batched(
+            self._iter_tar_members(p, to_read, attrs=attrs), batch_size
+        )
+
+    def _iter_tar_members(self, p, to_read, attrs=None):
+        """Read the given members from a tar archive, in archive order."""
         # Wrapper for progess bar
         prog = partial(
             config.tqdm,
@@ -647,8 +878,10 @@ class BaseReader(ABC):
         # iterate through the files in sequence and exract if the file is requested.
         # This is also why we are not using parallel processing here.
         # See also https://tinyurl.com/5n8wz54m (links to StackOverflow)
-        neurons = []
         to_read = set(to_read)  # faster lookup
+        if not to_read:
+            return
+
         with prog() as pbar:
             # Open the tar file in streaming mode with transparent compression
             with tarfile.open(p, "r|*") as tf:
@@ -663,21 +896,23 @@ class BaseReader(ABC):
                             tf.extractfile(t).read(),
                             attrs=merge_dicts(props, attrs),
                         )
-                        neurons.append(n)
-                        to_read.remove(t.name)
-                        pbar.update()
                     except BaseException as e:
                         if self.errors == "ignore":
                             logger.warning(f'Failed to read "{t.name}" from tar.')
+                            n = None
                         else:
                             raise
+                    to_read.remove(t.name)
+                    pbar.update()
+
+                    # Hand the neuron over before reading on, so a consumer
+                    # that streams never holds more than one of them
+                    yield n
 
                     # If we have read all (requested) files we can stop
                     if not len(to_read):
                         break
 
-        return self.format_output(neurons)
-
     def read_ftp(
         self,
         url,
@@ -909,11 +1144,59 @@ class BaseReader(ABC):
         core.NeuronList
 
         """
-        files = list(self.files_in_dir(Path(path), include_subdirs))
+        files = self._limit_files(self.files_in_dir(Path(path), include_subdirs), limit)
+
+        read_fn = partial(self.read_file_path, attrs=attrs)
+        neurons = parallel_read(read_fn, files, parallel)
+        return self.format_output(neurons)
 
+    def iter_directory(
+        self,
+        path: os.PathLike,
+        include_subdirs=DEFAULT_INCLUDE_SUBDIRS,
+        parallel="auto",
+        limit: Optional[int] = None,
+        attrs: Optional[Dict[str, Any]] = None,
+        batch_size: Optional[int] = None,
+    ) -> Iterator["core.NeuronObject"]:
+        """Lazily read a directory of files.
+
+        Same as `read_directory` but yields neurons as they are read instead
+        of collecting them into a NeuronList first.
+
+        Parameters
+        ----------
+        path :              str | os.PathLike
+                            Path to directory containing files.
+        include_subdirs :   bool, optional
+                            Whether to descend into subdirectories, default False.
+        parallel :          str | bool | "auto"
+        limit :             int, optional
+                            Limit the number of files read from this directory.
+        attrs :             dict or None
+                            Arbitrary attributes to include in the neurons.
+        batch_size :        int, optional
+                            If given, yield NeuronLists of up to this many
+                            neurons instead of single neurons.
+
+        Yields
+        ------
+        core.BaseNeuron | core.NeuronList
+
+        """
+        files = self._limit_files(self.files_in_dir(Path(path), include_subdirs), limit)
+
+        read_fn = partial(self.read_file_path, attrs=attrs)
+        yield from self._batched(parallel_iread(read_fn, files, parallel), batch_size)
+
+    def _limit_files(self, files: Iterable[Path], limit) -> List[Path]:
+        """Apply `limit` to the files found in a directory."""
         if isinstance(limit, int):
-            files = files[:limit]
-        elif isinstance(limit, list):
+            # No need to walk a huge directory just to throw most of it away
+            return list(itertools.islice(files, limit))
+
+        files = list(files)
+        if isinstance(limit, list):
             files = filter_by_limit_list(files, limit)
         elif isinstance(limit, slice):
             files = files[limit]
@@ -923,10 +1206,7 @@ class BaseReader(ABC):
                 files = [f for f in files if re.search(limit, str(f.name))]
             else:
                 files = [f for f in files if limit in str(f)]
-
-        read_fn = partial(self.read_file_path, attrs=attrs)
-        neurons = parallel_read(read_fn, files, parallel)
-        return self.format_output(neurons)
+        return files
 
     def read_url(
         self, url: str, attrs: Optional[Dict[str, Any]] = None
@@ -955,15 +1235,37 @@ class BaseReader(ABC):
         # the wrong format.
         with get_session().get(url, stream=False) as r:
             r.raise_for_status()
-            # N.B. we must not simply use `url.split("/")[-1]` here: that would
-            # drag any query string into the filename (e.g. "n.swc?token=abc",
-            # which in turn makes the file extension "swc?token=abc") and would
-            # leave percent-encoding (e.g. "%20") in the neuron's name.
-            props = self.parse_filename(unquote(Path(urlparse(url).path).name))
-            props["origin"] = url  # keep the full URL as the origin
-            return self.read_buffer(
-                io.BytesIO(r.content), attrs=merge_dicts(props, attrs)
-            )
+            return self.read_url_content(url, r.content, attrs=attrs)
+
+    def read_url_content(
+        self, url: str, content: bytes, attrs: Optional[Dict[str, Any]] = None
+    ) -> "core.BaseNeuron":
+        """Read already downloaded content of a URL into a neuron.
+
+        This is the second half of `read_url`, split out so that URLs can be
+        downloaded elsewhere (see `navis.utils.fetch`) and parsed here.
+
+        Parameters
+        ----------
+        url :       str
+                    URL the content was downloaded from. Used to parse the
+                    filename and as the neuron's origin.
+        content :   bytes
+                    Body of the response.
+        attrs :     dict or None
+                    Arbitrary attributes to include in the neuron.
+
+        Returns
+        -------
+        core.BaseNeuron
+        """
+        # N.B. we must not simply use `url.split("/")[-1]` here: that would
+        # drag any query string into the filename (e.g. "n.swc?token=abc",
+        # which in turn makes the file extension "swc?token=abc") and would
+        # leave percent-encoding (e.g. "%20") in the neuron's name.
+        props = self.parse_filename(unquote(Path(urlparse(url).path).name))
+        props["origin"] = url  # keep the full URL as the origin
+        return self.read_buffer(io.BytesIO(content), attrs=merge_dicts(props, attrs))
 
     def read_string(
         self, s: str, attrs: Optional[Dict[str, Any]] = None
@@ -1159,7 +1461,10 @@ class BaseReader(ABC):
 
         if new_objs:
             read_fn = partial(self.read_any_single, attrs=attrs)
-            neurons += parallel_read(read_fn, new_objs, parallel)
+            url_reader = partial(self.read_url_content, attrs=attrs)
+            neurons += parallel_read(
+                read_fn, new_objs, parallel, url_reader=url_reader
+            )
 
         return self.format_output(neurons)
 
@@ -1207,7 +1512,9 @@ class BaseReader(ABC):
                         obj, parallel=parallel, limit=limit, attrs=attrs
                     )
                 if os.path.isfile(os.path.expanduser(obj)) and ".tar" in str(obj):
-                    return self.read_tar(obj, limit=limit, attrs=attrs)
+                    return self.read_tar(
+                        obj, limit=limit, attrs=attrs, parallel=parallel
+                    )
                 if isinstance(obj, str) and obj.startswith("ftp://"):
                     return self.read_ftp(
                         obj, parallel=parallel, limit=limit, attrs=attrs
@@ -1220,6 +1527,175 @@ class BaseReader(ABC):
                 pass
             return self.read_any_single(obj, attrs=attrs)
 
+    def iter_any(
+        self,
+        obj,
+        include_subdirs=DEFAULT_INCLUDE_SUBDIRS,
+        parallel="auto",
+        limit=None,
+        attrs: Optional[Dict[str, Any]] = None,
+        batch_size: Optional[int] = None,
+    ) -> Iterator["core.NeuronObject"]:
+        """Lazily read an arbitrary object into neurons.
+
+        The streaming counterpart of `read_any`: instead of returning a
+        NeuronList once everything has been read, this yields neurons as they
+        come in. Only the neurons that have been read but not yet consumed are
+        held in memory - in parallel mode that is a bounded look-ahead of
+        `LOOKAHEAD_PER_WORKER` reads per worker.
+
+        Directories, zip and tar archives and lists of files/URLs are streamed.
+        FTP servers and Google Storage buckets are read as a whole and then
+        handed out one neuron at a time.
+
+        Parameters
+        ----------
+        obj :           typing.IO | str | os.PathLike | pandas.DataFrame
+                        Buffer, path to file or directory, URL, string, or
+                        dataframe.
+        batch_size :    int, optional
+                        If given, yield NeuronLists of up to this many neurons
+                        instead of single neurons.
+
+        Yields
+        ------
+        core.BaseNeuron | core.NeuronList
+
+        """
+        if utils.is_iterable(obj) and not hasattr(obj, "read"):
+            yield from self.iter_any_multi(
+                obj,
+                parallel=parallel,
+                include_subdirs=include_subdirs,
+                attrs=attrs,
+                batch_size=batch_size,
+            )
+            return
+
+        try:
+            if is_dir(obj):
+                yield from self.iter_directory(
+                    obj,
+                    include_subdirs,
+                    parallel=parallel,
+                    limit=limit,
+                    attrs=attrs,
+                    batch_size=batch_size,
+                )
+                return
+        except TypeError:
+            pass
+
+        try:
+            is_file = os.path.isfile(os.path.expanduser(obj))
+        except TypeError:
+            is_file = False
+
+        if is_file and str(obj).endswith(".zip"):
+            yield from self.iter_zip(
+                obj, parallel=parallel, limit=limit, attrs=attrs, batch_size=batch_size
+            )
+        elif is_file and ".tar" in str(obj):
+            yield from self.iter_tar(
+                obj,
+                limit=limit,
+                attrs=attrs,
+                batch_size=batch_size,
+                parallel=parallel,
+            )
+        else:
+            # Everything else is either a single neuron or can't be streamed
+            res = self.read_any(
+                obj,
+                include_subdirs=include_subdirs,
+                parallel=parallel,
+                limit=limit,
+                attrs=attrs,
+            )
+            yield from self._batched([res], batch_size)
+
+    def iter_any_multi(
+        self,
+        objs,
+        include_subdirs=DEFAULT_INCLUDE_SUBDIRS,
+        parallel="auto",
+        attrs: Optional[Dict[str, Any]] = None,
+        batch_size: Optional[int] = None,
+    ) -> Iterator["core.NeuronObject"]:
+        """Lazily read a sequence of objects into neurons.
+
+        The streaming counterpart of `read_any_multi`. See `iter_any`.
+
+        Yields
+        ------
+        core.BaseNeuron | core.NeuronList
+
+        """
+        if not utils.is_iterable(objs):
+            objs = [objs]
+
+        new_objs = []
+        new_objs_gs = []
+        for obj in objs:
+            try:
+                if is_dir(obj):
+                    new_objs.extend(self.files_in_dir(obj, include_subdirs))
+                    continue
+            except TypeError:
+                pass
+
+            if isinstance(obj, str) and obj.startswith("gs://"):
+                new_objs_gs.append(obj)
+            else:
+                new_objs.append(obj)
+
+        if new_objs_gs:
+            yield from self._batched(
+                [self.read_gs(new_objs_gs, parallel=parallel, attrs=attrs)],
+                batch_size,
+            )
+
+        if new_objs:
+            read_fn = partial(self.read_any_single, attrs=attrs)
+            url_reader = partial(self.read_url_content, attrs=attrs)
+            yield from self._batched(
+                parallel_iread(read_fn, new_objs, parallel, url_reader=url_reader),
+                batch_size,
+            )
+
+    def _batched(self, results: Iterable, batch_size: Optional[int] = None):
+        """Flatten reader results into neurons, optionally grouped into batches.
+
+        Results can be neurons, NeuronLists (e.g. from `read_from_zip`), lists
+        (e.g. for raw image output) or `None` for files that failed with
+        `errors="log"`/`"ignore"`.
+        """
+        if batch_size is not None and int(batch_size) < 1:
+            raise ValueError(f"`batch_size` must be >= 1, got {batch_size}")
+
+        batch = []
+        for res in results:
+            if res is None:
+                continue
+            # N.B. we check for `list` rather than `is_iterable`: a neuron is
+            # not iterable but a raw `(image, header)` tuple is - and must be
+            # passed on as a whole
+            if not isinstance(res, (core.NeuronList, list)):
+                res = [res]
+            for n in res:
+                if n is None:
+                    continue
+                if batch_size is None:
+                    yield n
+                    continue
+                batch.append(n)
+                if len(batch) >= batch_size:
+                    yield self.format_output(batch)
+                    batch = []
+
+        if batch:
+            yield self.format_output(batch)
+
     def parse_filename(self, filename: str) -> dict:
         """Extract properties from filename according to specified formatter.
 
@@ -1299,14 +1775,21 @@ class BaseReader(ABC):
 
 
 class ImageReader(BaseReader):
-    """Reader for image data."""
+    """Reader for image data.
 
-    def __init__(self, output, thin, threshold, dotprop_kwargs, **kwargs):
+    Subclasses that can read their images in blocks (see `convert_blocks`)
+    should do so when `block_size` is set.
+    """
+
+    def __init__(
+        self, output, thin, threshold, dotprop_kwargs, block_size=None, **kwargs
+    ):
         super().__init__(**kwargs)
         self.output = output
         self.thin = thin
         self.threshold = threshold
         self.dotprop_kwargs = dotprop_kwargs
+        self.block_size = parse_block_size(block_size)
 
     def convert_image(self, data, attrs, header, voxdim, units, space_units):
         """Convert image data to desired output.
@@ -1382,12 +1865,7 @@ class ImageReader(BaseReader):
                     f"Dotprops, got {data.ndim}"
                 )
 
-            # Set units from space_units (points are already in physical space)
-            if space_units:
-                if isinstance(space_units, str):
-                    x.units = f"1 {space_units}"
-                elif len(space_units) == 3:
-                    x.units = [f"1 {s}" for s in space_units]
+            _set_space_units(x, space_units)
         else:
             if data.ndim == 2:
                 logger.warning(
@@ -1397,6 +1875,92 @@ class ImageReader(BaseReader):
                 )
             x = core.Voxels(data, units=units)
 
+        return self._finalize_image(x, attrs, header)
+
+    def convert_blocks(
+        self, blocks, shape, attrs, header, voxdim, units, space_units
+    ):
+        """Convert an image read block by block to desired output.
+
+        The chunked counterpart of `convert_image`: instead of one dense array,
+        this takes the image as a sequence of slabs along the z-axis and keeps
+        only their non-zero (or above-threshold) voxels. Peak memory is a
+        single block plus the sparse voxels found so far - not the image.
+
+        The results are the same as with `convert_image` with two caveats:
+        Voxels are always sparse, and with `thin=True` the thinning runs on a
+        dense crop of the foreground's bounding box (which needs to fit into
+        memory).
+
+        Parameters
+        ----------
+        blocks :        callable
+                        Returns a (fresh) iterator of `(z, block)` tuples where
+                        `block` is a `(X, Y, dz)` array of the image's slices
+                        `z` to `z + dz`. Called twice if `threshold` is a
+                        fraction of the image's maximum (which we need to find
+                        first).
+        shape :         (int, int, int)
+                        Shape of the full image in x/y/z order.
+
+        See `convert_image` for the other parameters.
+
+        """
+        threshold = None
+        if self.output == "dotprops":
+            threshold = self.threshold
+            if threshold and 0 < threshold < 1:
+                # A relative threshold needs the global maximum - an extra pass
+                # over the image, but one that only holds a block at a time
+                threshold = threshold * max(b.max() for _, b in blocks())
+            elif threshold and threshold < 0:
+                raise ValueError(
+                    f"Threshold must be either >=1 or 0-1, got {self.threshold}"
+                )
+
+        coords, values = [], []
+        for z, block in blocks():
+            mask = block >= threshold if threshold else block != 0
+            xyz = np.nonzero(mask)
+            coords.append(
+                np.stack((xyz[0], xyz[1], xyz[2] + z), axis=1).astype(np.int64)
+            )
+            if self.output != "dotprops":
+                values.append(block[mask])
+            # Drop our references so the next block can reuse the memory
+            del mask, block
+
+        coords = np.concatenate(coords) if coords else np.zeros((0, 3), np.int64)
+        # Blocks come in z order but a dense read gives C order (x, then y,
+        # then z) - sort so that both give identical neurons
+        order = np.lexsort(coords.T[::-1])
+        coords = coords[order]
+
+        if self.output == "dotprops":
+            if self.thin and len(coords):
+                coords = _thin_sparse(coords)
+
+            if not len(coords):
+                raise ValueError(
+                    f"No points extracted from {self.name_fallback} file. Try lowering the threshold?"
+                )
+
+            # Note we need to multiply units before creating the Dotprops
+            # - otherwise the KNN will be wrong
+            x = core.make_dotprops(coords * voxdim, **self.dotprop_kwargs)
+            _set_space_units(x, space_units)
+        else:
+            values = np.concatenate(values)[order] if values else np.zeros(0)
+            x = core.Voxels(coords, units=units)
+            x.values = values
+            # Keep the full canvas: otherwise the shape would be derived from
+            # the voxels and shrink whenever the trailing planes are empty
+            x._canvas_shape = tuple(int(s) for s in shape)
+
+        return self._finalize_image(x, attrs, header)
+
+    def _finalize_image(self, x, attrs, header):
+        """Attach header and attributes to a freshly converted image."""
         # Header is special - we do not want to register it
         setattr(x, f"{self.name_fallback.lower()}_header", header)
 
@@ -1415,12 +1979,54 @@ class ImageReader(BaseReader):
         return x
 
 
-def parallel_read(read_fn, objs, parallel="auto") -> List["core.NeuronList"]:
+def parse_block_size(block_size) -> Optional[int]:
+    """Parse `block_size` (int bytes or e.g. "256MB") into bytes."""
+    if block_size is None or block_size is False:
+        return None
+    if isinstance(block_size, str):
+        block_size = config.ureg(block_size).to("bytes").magnitude
+    block_size = int(block_size)
+    if block_size <= 0:
+        raise ValueError(f"`block_size` must be positive, got {block_size}")
+    return block_size
+
+
+def slices_per_block(block_size, shape, dtype) -> int:
+    """How many z-slices of an image fit into `block_size` bytes (at least 1)."""
+    slice_bytes = int(shape[0]) * int(shape[1]) * np.dtype(dtype).itemsize
+    return max(1, block_size // max(slice_bytes, 1))
+
+
+def _set_space_units(x, space_units):
+    """Set units from space_units (points are already in physical space)."""
+    if space_units:
+        if isinstance(space_units, str):
+            x.units = f"1 {space_units}"
+        elif len(space_units) == 3:
+            x.units = [f"1 {s}" for s in space_units]
+
+
+def _thin_sparse(coords):
+    """Thin sparse foreground voxels via their dense bounding box."""
+    from skimage.morphology import skeletonize
+
+    # Pad by one voxel so that foreground touching the crop's edges is thinned
+    # the same way as in the full image
+    lo = coords.min(axis=0) - 1
+    crop = np.zeros(coords.max(axis=0) - lo + 2, dtype=bool)
+    crop[tuple((coords - lo).T)] = True
+    return np.argwhere(skeletonize(crop)) + lo
+
+
+def parallel_read(
+    read_fn, objs, parallel="auto", url_reader=None
+) -> List["core.NeuronList"]:
     """Read neurons from some objects with the given reader function,
     potentially in parallel.
 
-    URLs are read in a thread pool, everything else in a process pool - so
-    `read_fn` must be picklable unless all `objs` are URLs.
+    URLs are downloaded concurrently (see `_iread_urls`), everything else is
+    read in a process pool - so `read_fn` must be picklable unless all `objs`
+    are URLs.
 
     Parameters
     ----------
@@ -1431,6 +2037,11 @@ def parallel_read(read_fn, objs, parallel="auto") -> List["core.NeuronList"]:
                     otherwise int for number of jobs, or False for serial. Can
                     also be a `(mode, threshold)` tuple to override at what
                     number of objects "auto" switches to parallel.
+    url_reader :    Callable, optional
+                    Takes a URL and its downloaded content and returns a neuron
+                    (e.g. `BaseReader.read_url_content`). If given, URLs are
+                    downloaded with the asyncio engine in `navis.utils.fetch`
+                    (if available) instead of calling `read_fn` in threads.
 
     Returns
     -------
@@ -1459,6 +2070,177 @@ def parallel_read(read_fn, objs, parallel="auto") -> List["core.NeuronList"]:
         leave=config.pbar_leave,
     )
 
+    n_workers = _n_parallel(parallel, length, is_urls)
+
+    if not n_workers:
+        return [read_fn(obj) for obj in prog(objs)]
+
+    if is_urls and _use_async(url_reader):
+        with prog() as pbar:
+            return list(_iread_urls(url_reader, objs, n_workers, pbar))
+
+    if is_urls:
+        # Reading URLs is network- not CPU-bound, so we use threads.
+        # Note we hand `read_fn` the URL and *not* the downloaded bytes: it has
+        # to go through `read_url` for the filename to be parsed into
+        # `name`/`id`/`origin` and for `fmt` to be applied.
+        with ThreadPoolExecutor(max_workers=n_workers) as executor:
+            # `.map` preserves the order of the inputs
+            return list(prog(executor.map(read_fn, objs)))
+
+    with _process_pool(read_fn, n_workers) as submit:
+        futures = [submit(obj) for obj in objs]
+        return list(prog(f.result() for f in futures))
+
+
+@contextlib.contextmanager
+def _process_pool(read_fn, n_workers):
+    """`submit(obj) -> Future` for `read_fn` on the `processes` backend's pool.
+
+    The same long-lived pool `parallel=True` runs on (see
+    [`navis.warm_pool`][]), so a read does not start - and then tear down -
+    workers of its own. Sized and capped the way `map_tasks` would ask for it,
+    so that reading and processing in turn keep reusing one pool. Submitted
+    the same way, too: workers report their memory with each read, so
+    `MAX_WORKER_MEMORY` recycles workers that reading has bloated.
+    """
+    from ..compute.backends import get_backend
+    from ..compute.dispatch import resolve_thread_cap
+
+    be = get_backend("processes")
+    with be.submitter(
+        read_fn, n_workers=n_workers, threads=resolve_thread_cap(be, n_workers)
+    ) as submit:
+        yield submit
+
+
+def parallel_iread(read_fn, objs, parallel="auto", url_reader=None) -> Iterator[Any]:
+    """Lazily read neurons from some objects, potentially in parallel.
+
+    The streaming counterpart of `parallel_read`: results are yielded in input
+    order as they become available. In parallel mode at most
+    `LOOKAHEAD_PER_WORKER` reads per worker are in flight or waiting to be
+    consumed, so a slow consumer throttles the workers instead of having
+    finished neurons pile up in memory.
+
+    Parameters
+    ----------
+    read_fn :       Callable
+    objs :          Iterable
+    parallel :      str | bool | int | (str, int)
+                    See `parallel_read`.
+    url_reader :    Callable, optional
+                    See `parallel_read`.
+
+    Yields
+    ------
+    Whatever `read_fn` returns for each object.
+
+    """
+    # The objects are paths, URLs or `ZipInfo`s - cheap to hold even for very
+    # large collections, and we need their number to decide on "auto"
+    objs = list(objs)
+
+    if not objs:
+        return
+
+    is_urls = all(
+        isinstance(obj, str) and obj.startswith(("http://", "https://"))
+        for obj in objs
+    )
+
+    n_workers = _n_parallel(parallel, len(objs), is_urls)
+
+    with config.tqdm(
+        desc="Importing",
+        total=len(objs),
+        disable=config.pbar_hide,
+        leave=config.pbar_leave,
+    ) as pbar:
+        if not n_workers:
+            for obj in objs:
+                res = read_fn(obj)
+                pbar.update()
+                yield res
+            return
+
+        window = n_workers * LOOKAHEAD_PER_WORKER
+        if is_urls and _use_async(url_reader):
+            yield from _iread_urls(url_reader, objs, n_workers, pbar)
+        elif is_urls:
+            # See `parallel_read` for why URLs are read in threads
+            with ThreadPoolExecutor(max_workers=n_workers) as executor:
+                yield from _sliding_window(
+                    lambda obj: executor.submit(read_fn, obj).result,
+                    objs,
+                    window,
+                    pbar,
+                )
+        else:
+            # N.B. the pool outlives this generator: if the consumer stops
+            # early, the (at most `window`) reads in flight finish unobserved
+            with _process_pool(read_fn, n_workers) as submit:
+                yield from _sliding_window(
+                    lambda obj: submit(obj).result,
+                    objs,
+                    window,
+                    pbar,
+                )
+
+
+def _use_async(url_reader) -> bool:
+    """Whether URLs should be downloaded with the asyncio engine."""
+    return url_reader is not None and URL_ASYNC and fetch.is_available()
+
+
+def _iread_urls(url_reader, urls, per_host, pbar):
+    """Download URLs on an event loop and parse them in input order.
+
+    Unlike threads - where `parallel` caps how many downloads are in flight -
+    the event loop keeps up to `per_host` connections open to each host (and
+    `fetch.DEFAULT_MAX_CONNECTIONS` in total), reusing them across requests.
+    Downloads are bounded by the same kind of sliding window as
+    `parallel_iread`, so a slow consumer does not have finished downloads
+    pile up in memory. Parsing happens in the calling thread as results come in.
+
+    Each body is downloaded in full before it is parsed - decoding is not
+    streamed - so peak memory is about `window` response bodies.
+    """
+    with fetch.Fetcher(
+        per_host=per_host, max_connections=max(per_host, fetch.DEFAULT_MAX_CONNECTIONS)
+    ) as fetcher:
+        window = fetcher.max_connections * LOOKAHEAD_PER_WORKER
+        contents = _sliding_window(
+            lambda url: fetcher.submit(url).result, urls, window, pbar
+        )
+        for url, content in zip(urls, contents):
+            yield url_reader(url, content)
+
+
+def _sliding_window(submit, objs, window, pbar):
+    """Keep up to `window` reads in flight and yield results in order.
+
+    `submit` takes an object and returns a callable that blocks until its
+    result is available. Unlike `Pool.imap` - which queues every task up front
+    and buffers results for as long as the consumer takes - nothing is
+    submitted beyond the window, so memory is bounded by its size.
+    """
+    pending = collections.deque()
+    for obj in objs:
+        pending.append(submit(obj))
+        if len(pending) >= window:
+            res = pending.popleft()()
+            pbar.update()
+            yield res
+
+    while pending:
+        res = pending.popleft()()
+        pbar.update()
+        yield res
+
+
+def _n_parallel(parallel, length, is_urls=False) -> int:
+    """Number of workers to read `length` objects with. 0 means serial."""
     # `parallel` can be ("auto", threshold) in which case `threshold`
     # determines at what length we use parallel processing
     if isinstance(parallel, tuple):
@@ -1470,32 +2252,100 @@ def parallel_read(read_fn, objs, parallel="auto") -> List["core.NeuronList"]:
         parallel = False
 
     if not parallel:
-        return [read_fn(obj) for obj in prog(objs)]
-
-    if is_urls:
-        # Reading URLs is network- not CPU-bound, so we use threads.
-        # Note we hand `read_fn` the URL and *not* the downloaded bytes: it has
-        # to go through `read_url` for the filename to be parsed into
-        # `name`/`id`/`origin` and for `fmt` to be applied.
-        # Do not swap this as `isinstance(True, int)` returns `True`
-        if isinstance(parallel, (bool, str)):
-            n_threads = URL_THREADS_DEFAULT
-        else:
-            n_threads = int(parallel)
-
-        with ThreadPoolExecutor(max_workers=n_threads) as executor:
-            # `.map` preserves the order of the inputs
-            return list(prog(executor.map(read_fn, objs)))
+        return 0
 
     # Do not swap this as `isinstance(True, int)` returns `True`
     if isinstance(parallel, (bool, str)):
-        n_cores = default_n_workers()
-    else:
-        n_cores = int(parallel)
+        return URL_THREADS_DEFAULT if is_urls else default_n_workers()
+    return int(parallel)
+
+
+def zip_members(
+    fpath, file_ext, limit=None, ignore_hidden=True, index=None
+) -> List[Union[ZipInfo, IndexEntry]]:
+    """List the members of a ZIP archive that should be read.
+
+    See `parallel_read_archive` for the parameters.
+
+    Returns
+    -------
+    list of zipfile.ZipInfo | list of IndexEntry
+                    The latter if an `index` is given.
+
+    """
+    if index is not None:
+        # The index already has the listing - no need to open the archive
+        return filter_members(
+            index.entries,
+            file_ext,
+            limit=limit,
+            ignore_hidden=ignore_hidden,
+            name_func=lambda f: f.name,
+        )
+
+    with ZipFile(Path(fpath), "r") as zip:
+        members = zip.filelist
+
+    return filter_members(
+        members,
+        file_ext,
+        limit=limit,
+        ignore_hidden=ignore_hidden,
+        name_func=lambda f: f.filename,
+    )
 
-    with mp.Pool(processes=n_cores,
-                 initializer=worker_initializer(n_cores)) as pool:
-        return list(prog(pool.imap(read_fn, objs)))
+
+def filter_members(
+    members, file_ext, limit=None, ignore_hidden=True, name_func=str
+) -> list:
+    """Filter archive members by file extension and `limit`.
+
+    Parameters
+    ----------
+    members :       iterable
+                    Members of an archive, e.g. `ZipInfo` or `IndexEntry`.
+    name_func :     callable
+                    Returns the full path of a member inside the archive.
+
+    See `parallel_read_archive` for the other parameters.
+
+    Returns
+    -------
+    list
+                    Subset of `members`.
+
+    """
+    to_read = []
+    for i, file in enumerate(members):
+        name = name_func(file)
+        fname = name.split("/")[-1]
+        if ignore_hidden and fname.startswith("._"):
+            continue
+        if callable(file_ext):
+            if file_ext(file):
+                to_read.append(file)
+        elif file_ext == "*":
+            to_read.append(file)
+        elif file_ext and fname.endswith(file_ext):
+            to_read.append(file)
+        elif "." not in name:
+            to_read.append(file)
+
+        if isinstance(limit, int) and i >= limit:
+            break
+
+    if isinstance(limit, list):
+        to_read = filter_by_limit_list(to_read, limit, path_func=name_func)
+    elif isinstance(limit, slice):
+        to_read = to_read[limit]
+    elif isinstance(limit, str):
+        # Check if limit is a regex
+        if rgx.search(limit):
+            to_read = [f for f in to_read if re.search(limit, name_func(f))]
+        else:
+            to_read = [f for f in to_read if limit in name_func(f)]
+
+    return to_read
 
 
 def parallel_read_archive(
@@ -1506,6 +2356,7 @@ def parallel_read_archive(
     limit=None,
     parallel="auto",
     ignore_hidden=True,
+    index=None,
 ) -> List["core.NeuronList"]:
     """Read neurons from a ZIP archive, potentially in parallel.
 
@@ -1533,44 +2384,24 @@ def parallel_read_archive(
                     you might also find a `__MACOSX/._123456.swc`. Reading the
                     latter will result in an error. If ignore_hidden=True
                     we will simply ignore all file that starts with "._".
+    index :         ArchiveIndex, optional
+                    Index of the archive (see `navis.index_archive`). If
+                    given, members are listed from the index and `read_fn`
+                    is called with `IndexEntry` instead of `ZipInfo` objects.
+                    This also works for uncompressed tar archives.
 
     Returns
     -------
     core.NeuronList
 
     """
-    # Check zip content
-    p = Path(fpath)
-    to_read = []
-    with ZipFile(p, "r") as zip:
-        for i, file in enumerate(zip.filelist):
-            fname = file.filename.split("/")[-1]
-            if ignore_hidden and fname.startswith("._"):
-                continue
-            if callable(file_ext):
-                if file_ext(file):
-                    to_read.append(file)
-            elif file_ext == "*":
-                to_read.append(file)
-            elif file_ext and fname.endswith(file_ext):
-                to_read.append(file)
-            elif "." not in file.filename:
-                to_read.append(file)
-
-            if isinstance(limit, int) and i >= limit:
-                break
-
-    if isinstance(limit, list):
-        # N.B. `to_read` are `ZipInfo` objects, not strings
-        to_read = filter_by_limit_list(to_read, limit, path_func=lambda f: f.filename)
-    elif isinstance(limit, slice):
-        to_read = to_read[limit]
-    elif isinstance(limit, str):
-        # Check if limit is a regex
-        if rgx.search(limit):
-            to_read = [f for f in to_read if re.search(limit, f.filename)]
-        else:
-            to_read = [f for f in to_read if limit in f.filename]
+    to_read = zip_members(
+        fpath,
+        file_ext=file_ext,
+        limit=limit,
+        ignore_hidden=ignore_hidden,
+        index=index,
+    )
 
     prog = partial(
         config.tqdm,
@@ -1601,10 +2432,9 @@ def parallel_read_archive(
         else:
             n_cores = int(parallel)
 
-        with mp.Pool(processes=n_cores,
-                     initializer=worker_initializer(n_cores)) as pool:
-            results = pool.imap(read_fn, to_read)
-            neurons = list(prog(results))
+        with _process_pool(read_fn, n_cores) as submit:
+            futures = [submit(obj) for obj in to_read]
+            neurons = list(prog(f.result() for f in futures))
     else:
         neurons = [read_fn(obj) for obj in prog(to_read)]
 
@@ -1799,6 +2629,17 @@ def parse_precision(precision: Optional[int]):
         )
 
 
+def stream_batch_size(stream: Union[bool, int]) -> Optional[int]:
+    """Turn a reader's `stream` parameter into a `batch_size` for `iter_any`.
+
+    `True` streams single neurons, an integer streams NeuronLists of that size.
+    """
+    # Do not swap this as `isinstance(True, int)` returns `True`
+    if isinstance(stream, bool):
+        return None
+    return int(stream)
+
+
 class ReadError(Exception):
     """Error raised when reading a file fails."""
 
@@ -15,9 +15,10 @@ import h5py
 import os
 import pickle
 import pint
+import shutil
+import tempfile
 import warnings
 
-import multiprocessing as mp
 import numpy as np
 import pandas as pd
 
@@ -25,7 +26,16 @@ from abc import ABC, abstractmethod
 from typing import Union, Iterable, Dict, Optional, Any
 
 from .. import config, utils, core
-from ..compute.dispatch import cpu_count, worker_initializer
+from ..compute import cpu_count, imap_tasks, map_tasks, resolve_backend
+
+#: Below this many neurons, `parallel="auto"` reads and writes in this process:
+#: starting workers costs more than it saves.
+PARALLEL_THRESHOLD = 200
+
+#: At most this many neurons per unit of parallel work. A worker opens the file
+#: once per unit, so bigger is cheaper - up to the point where a unit's neurons,
+#: all held until the unit is done, weigh on the worker's memory.
+BATCH_SIZE = 25
 
 
 class BaseH5Reader(ABC):
@@ -522,7 +532,8 @@ class H5WriterV1(BaseH5Writer):
             for n in config.tqdm(neuron, desc='Writing',
                                  leave=False,
                                  disable=config.pbar_hide):
-                self.write_neurons(n, overwrite=overwrite,
+                self.write_neurons(n, serialized=serialized, raw=raw,
+                                   overwrite=overwrite,
                                    annotations=annotations, **kwargs)
             return
 
@@ -691,6 +702,43 @@ class H5WriterV1(BaseH5Writer):
                 data = getattr(neuron, d)
                 me_grp.create_dataset(d, data=data, compression='gzip')
 
+    def merge(self, other, overwrite=True):
+        """Copy the neurons from another (open) file into this one.
+
+        Same rules as writing the neurons here directly: a representation
+        replaces an existing one wholesale, annotations are replaced table by
+        table - or, with `overwrite=False`, either raises. Datasets are copied
+        as they are stored, i.e. without compressing them again.
+        """
+        for id, src in other.items():
+            # Skip if not a group
+            if not isinstance(src, h5py.Group):
+                continue
+
+            neuron_grp = self.f.require_group(id)
+            for k, v in src.attrs.items():
+                neuron_grp.attrs[k] = v
+
+            for rep, data in src.items():
+                if rep != 'annotations':
+                    if rep in neuron_grp:
+                        if not overwrite:
+                            raise ValueError(f'File already contains {rep} '
+                                             f'for neuron {id}')
+                        del neuron_grp[rep]
+                    other.copy(data, neuron_grp)
+                    continue
+
+                for an, an_grp in data.items():
+                    target = neuron_grp.require_group('annotations').require_group(an)
+                    for c, ds in an_grp.items():
+                        if c in target:
+                            if not overwrite:
+                                raise ValueError(f'Dataset {c} already exists '
+                                                 f'in group "{target}"')
+                            del target[c]
+                        other.copy(ds, target)
+
 
 def read_h5(filepath: str,
             read='mesh->skeleton->dotprops',
@@ -701,7 +749,8 @@ def read_h5(filepath: str,
             reader='auto',
             on_error='stop',
             ret_errors=False,
-            parallel='auto') -> 'core.NeuronObject':
+            parallel='auto',
+            backend=None) -> 'core.NeuronObject':
     """Read Neuron/List from Hdf5 file.
 
     This import is following the schema specified
@@ -748,7 +797,14 @@ def read_h5(filepath: str,
                         considerably slower for imports of small numbers of
                         neurons. Integer will be interpreted as the
                         number of cores (otherwise defaults to two fewer than
-                        the available cores).
+                        the available cores). Each worker reads neurons in
+                        batches, opening the file once per batch.
+    backend :           str | ParallelBackend, optional
+                        Where to read in parallel - see
+                        [`navis.set_parallel_backend`][]. Defaults to
+                        `navis.config.default_parallel_backend`. Workers
+                        elsewhere (e.g. on a cluster) must be able to see
+                        `filepath`.
     on_error :          "stop" | "warn" | "ignore"
                         What to do if a neuron can not be parsed: "stop" and
                         raise an exception, "warn" and keep going or silently
@@ -841,28 +897,18 @@ def read_h5(filepath: str,
         raise TypeError('If provided, the reader must be a subclass of '
                         f'BaseH5Reader - got "{type(reader)}"')
 
-    # By default only use parallel if there are more than 200 neurons
-    if parallel == 'auto':
-        if len(info['neurons']) > 200:
-            parallel = True
-        else:
-            parallel = False
+    n_workers = _n_workers(parallel, len(info['neurons']))
 
-    if not parallel:
+    if not n_workers:
         # This opens the file
         with reader(filepath) as r:
             nl, errors = r.read_neurons(subset=subset,
                                         read=read,
                                         strict=strict,
+                                        prefer_raw=prefer_raw,
                                         on_error=on_error,
                                         annotations=annotations)
     else:
-        # Do not swap this as `isinstance(True, int)` returns `True`
-        if isinstance(parallel, (bool, str)):
-            n_cores = max(1, cpu_count() - 2)
-        else:
-            n_cores = int(parallel)
-
         # If subset not specified, fetch all neurons
         if isinstance(subset, type(None)):
             subset = list(info['neurons'])
@@ -872,28 +918,25 @@ def read_h5(filepath: str,
             # Make sure it's an iterable and strings
             subset = utils.make_iterable(subset).astype(str)
 
-        # Just to leave note that I tried splitting the array into
-        # `n_cores` chunks but that caused massive memory usage in the
-        # spawned processes without being any faster - reading and returning
-        # one neuron at a time seems to be the most efficient way
-        reader = READERS[info['format_spec']]
-        with mp.Pool(processes=n_cores,
-                     initializer=worker_initializer(n_cores)) as pool:
-            futures = pool.imap(_h5_reader_worker, [dict(reader=reader,
-                                                         filepath=filepath,
-                                                         read=read,
-                                                         strict=strict,
-                                                         prefer_raw=prefer_raw,
-                                                         on_error=on_error,
-                                                         annotations=annotations,
-                                                         subset=[x]) for x in subset],
-                                chunksize=1)
-
-            # Wait for results and show progress bar althewhile
-            # Do not close the pool before doing this
-            res = list(config.tqdm(futures,
-                                   desc='Reading',
-                                   total=len(subset)))
+        # One neuron per task - as this used to be - has every task open the
+        # file and parse its metadata all over again, which for small neurons
+        # is most of the work. One batch per worker, on the other hand, has
+        # each worker sit on all of its neurons until the last one is read.
+        batches = _batches(subset, n_workers)
+        be = resolve_backend(backend, n_tasks=len(batches), n_workers=n_workers)
+        res = map_tasks([(_h5_read_batch, (reader, filepath, ids),
+                          dict(read=read,
+                               strict=strict,
+                               prefer_raw=prefer_raw,
+                               on_error=on_error,
+                               annotations=annotations))
+                         for ids in batches],
+                        backend=be,
+                        n_workers=n_workers,
+                        # The tasks are batches already
+                        chunksize=1,
+                        desc='Reading',
+                        disable=config.pbar_hide)
 
         # Unpack results
         nl = []
@@ -903,7 +946,7 @@ def read_h5(filepath: str,
             errors.update(e)
 
         # Warnings will not have propagated
-        if on_error == 'warn':
+        if on_error == 'warn' and be.isolated:
             for e in errors:
                 warnings.warn(f"Error reading neuron {e}: {errors[e]}")
 
@@ -913,25 +956,33 @@ def read_h5(filepath: str,
         return core.NeuronList(nl)
 
 
-def _h5_reader_worker(kwargs):
-    """Trigger reading neurons from H5 file."""
-    reader = kwargs['reader']
-    filepath = kwargs['filepath']
-    read = kwargs['read']
-    subset = kwargs['subset']
-    annotations = kwargs['annotations']
-    strict = kwargs['strict']
-    on_error = kwargs['on_error']
-    prefer_raw = kwargs['prefer_raw']
+def _n_workers(parallel, n_neurons) -> int:
+    """Number of workers for `n_neurons`. 0 means in this process."""
+    # By default only use parallel if there are more than 200 neurons
+    if parallel == 'auto':
+        parallel = n_neurons > PARALLEL_THRESHOLD
+
+    if not parallel:
+        return 0
+
+    # Do not swap this as `isinstance(True, int)` returns `True`
+    if isinstance(parallel, (bool, str)):
+        return max(1, cpu_count() - 2)
+    return int(parallel)
+
+
+def _batches(items, n_workers) -> list:
+    """Split `items` into batches of at most `BATCH_SIZE`, at least one each
+    for `n_workers` workers."""
+    size = max(1, min(BATCH_SIZE, -(-len(items) // max(1, n_workers))))
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def _h5_read_batch(reader, filepath, ids, **kwargs):
+    """Read a batch of neurons from an HDF5 file. Runs in a worker."""
     # This opens the file
     with reader(filepath) as r:
-        return r.read_neurons(subset=subset,
-                              read=read,
-                              strict=strict,
-                              on_error=on_error,
-                              prefer_raw=prefer_raw,
-                              progress=False,
-                              annotations=annotations)
+        return r.read_neurons(subset=ids, progress=False, **kwargs)
 
 
 def write_h5(n: 'core.NeuronObject',
@@ -941,7 +992,9 @@ def write_h5(n: 'core.NeuronObject',
              annotations: Optional[Union[str, list]] = None,
              format: str = 'latest',
              append: bool = True,
-             overwrite_neurons: bool = False) -> 'core.NeuronObject':
+             overwrite_neurons: bool = False,
+             parallel='auto',
+             backend=None) -> 'core.NeuronObject':
     """Write Neuron/List to Hdf5 file.
 
     Note that the `annotations` and `format` parameters are only relevant
@@ -979,6 +1032,23 @@ def write_h5(n: 'core.NeuronObject',
                         specs in the same HDF5 file. So if you want to write
                         to a file which already contains data in a given
                         format, you have to use that format.
+    parallel :          "auto" | bool | int
+                        Whether to prepare the neurons' data in parallel. Each
+                        worker writes a batch of neurons - compressing the raw
+                        data as it goes - to a shard file next to `filepath`,
+                        and the shards are then copied into `filepath` one at
+                        a time. Only `raw` data gains from this: serialized
+                        neurons are pickled either way, and sending them to
+                        the workers does that already. Hence `auto` only uses
+                        parallel processing with `raw=True` and more than 200
+                        neurons. Integer will be interpreted as the number of
+                        cores (otherwise defaults to two fewer than the
+                        available cores).
+    backend :           str | ParallelBackend, optional
+                        Where to write in parallel - see
+                        [`navis.set_parallel_backend`][]. Workers elsewhere
+                        (e.g. on a cluster) must be able to write to the
+                        directory `filepath` is in.
 
     Returns
     -------
@@ -1013,14 +1083,72 @@ def write_h5(n: 'core.NeuronObject',
     # Get the writer for the specified format
     writer = WRITERS[format]
 
+    opts = dict(raw=raw,
+                serialized=serialized,
+                overwrite=overwrite_neurons,
+                annotations=annotations)
+
+    n_workers = 0
+    if isinstance(n, core.NeuronList):
+        n_workers = _n_workers(False if parallel == 'auto' and not raw
+                               else parallel, len(n))
+
     # This opens the file
     with writer(filepath, mode='a' if append else 'w') as w:
         w.write_base_info()
-        w.write_neurons(n,
-                        raw=raw,
-                        serialized=serialized,
-                        overwrite=overwrite_neurons,
-                        annotations=annotations)
+        if not n_workers:
+            w.write_neurons(n, **opts)
+        else:
+            _write_sharded(w, n, opts, n_workers, backend)
+
+
+def _write_sharded(w, nl, opts, n_workers, backend):
+    """Write neurons to shard files in parallel and merge them into `w`.
+
+    HDF5 has no parallel writes to one file (short of MPI), so this is the one
+    way of spreading the work: the workers write - and compress - a batch each
+    to a file of its own, and `w` stays the one and only writer to `filepath`.
+    Shards are merged in input order, so that a neuron appearing twice ends up
+    the way it would have written one after the other.
+    """
+    batches = _batches(nl, n_workers)
+    be = resolve_backend(backend, n_tasks=len(batches), n_workers=n_workers)
+
+    # Next to the target: same file system, and visible to workers elsewhere
+    # wherever the target is
+    tmp = tempfile.mkdtemp(prefix='.navis_h5_',
+                           dir=os.path.dirname(os.path.abspath(w.filepath)))
+    try:
+        tasks = [(_h5_write_shard,
+                  (type(w), os.path.join(tmp, f'{i}.h5'), batch), opts)
+                 for i, batch in enumerate(batches)]
+        done, merged = {}, 0
+        for i, shard in imap_tasks(tasks,
+                                   backend=be,
+                                   n_workers=n_workers,
+                                   # The tasks are batches already
+                                   chunksize=1,
+                                   desc='Writing',
+                                   disable=config.pbar_hide):
+            # Merge whatever is next in line while the rest keep writing
+            done[i] = shard
+            while merged in done:
+                shard = done.pop(merged)
+                with h5py.File(shard, 'r') as f:
+                    w.merge(f, overwrite=opts['overwrite'])
+                os.remove(shard)
+                merged += 1
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def _h5_write_shard(writer, filepath, neurons, **kwargs):
+    """Write a batch of neurons to a new HDF5 file. Runs in a worker."""
+    # This opens the file
+    with writer(filepath, mode='w') as w:
+        w.write_base_info()
+        w.write_neurons(neurons, **kwargs)
+    return filepath
 
 
 def inspect_h5(filepath, inspect_neurons=True, inspect_annotations=True):
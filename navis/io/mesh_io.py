@@ -127,6 +127,7 @@ def read_mesh(
     errors: Literal["raise", "log", "ignore"] = "raise",
     limit: Optional[int] = None,
     fmt: str = "{name}.",
+    stream: Union[bool, int] = False,
     **kwargs,
 ) -> "core.NeuronObject":
     """Load mesh file into Neuron/List.
@@ -167,6 +168,12 @@ def read_mesh(
                            that range
                          - a list is expected to be a list of filenames to read from
                            the folder/archive
+    stream :            bool | int
+                        If True, return a generator that yields neurons one at
+                        a time as they are read instead of a NeuronList. If an
+                        integer, yield NeuronLists of up to that many neurons.
+                        Use this to process large collections without holding
+                        all of them in memory at once.
     **kwargs
                         Keyword arguments passed to [`navis.Mesh`][]
                         or [`navis.Volume`][]. You can use this to e.g.
@@ -217,6 +224,14 @@ def read_mesh(
     )
 
     reader = MeshReader(fmt=fmt, output=output, errors=errors, attrs=kwargs)
+    if stream:
+        return reader.iter_any(
+            f,
+            include_subdirs,
+            parallel,
+            limit=limit,
+            batch_size=base.stream_batch_size(stream),
+        )
     return reader.read_any(f, include_subdirs, parallel, limit=limit)
 
 
@@ -190,6 +190,7 @@ def read_nmx(
     precision: int = 32,
     limit: Optional[int] = None,
     errors: str = "raise",
+    stream: Union[bool, int] = False,
     **kwargs,
 ) -> "core.NeuronObject":
     """Read NMX files into Neuron/Lists.
@@ -230,6 +231,12 @@ def read_nmx(
                            that range
                          - a list is expected to be a list of filenames to read from
                            the folder/archive
+    stream :            bool | int
+                        If True, return a generator that yields neurons one at
+                        a time as they are read instead of a NeuronList. If an
+                        integer, yield NeuronLists of up to that many neurons.
+                        Use this to process large collections without holding
+                        all of them in memory at once.
     errors :            "raise" | "log" | "ignore"
                         If "log" or "ignore", errors will not be raised and the
                         mesh will be skipped. Can result in empty output.
@@ -249,6 +256,17 @@ def read_nmx(
 
     """
     reader = NMXReader(precision=precision, errors=errors, attrs=kwargs)
+    if stream:
+        return _drop_empty(
+            reader.iter_any(
+                f,
+                parallel=parallel,
+                limit=limit,
+                include_subdirs=include_subdirs,
+                batch_size=base.stream_batch_size(stream),
+            )
+        )
+
     # Read neurons
     neurons = reader.read_any(
         f, parallel=parallel, limit=limit, include_subdirs=include_subdirs
@@ -261,12 +279,25 @@ def read_nmx(
     return neurons
 
 
+def _drop_empty(neurons):
+    """Remove the empty neurons failed reads produce from a stream."""
+    for n in neurons:
+        if isinstance(n, core.NeuronList):
+            n = n[n.has_nodes]
+            if not len(n):
+                continue
+        elif not n.has_nodes:
+            continue
+        yield n
+
+
 def read_nml(
     f: Union[str, pd.DataFrame, Iterable],
     include_subdirs: bool = False,
     parallel: Union[bool, int] = "auto",
     precision: int = 32,
     limit: Optional[int] = None,
+    stream: Union[bool, int] = False,
     **kwargs,
 ) -> "core.NeuronObject":
     """Read xml-based NML files into Neuron/Lists.
@@ -303,6 +334,12 @@ def read_nml(
                            that range
                          - a list is expected to be a list of filenames to read from
                            the folder/archive
+    stream :            bool | int
+                        If True, return a generator that yields neurons one at
+                        a time as they are read instead of a NeuronList. If an
+                        integer, yield NeuronLists of up to that many neurons.
+                        Use this to process large collections without holding
+                        all of them in memory at once.
     **kwargs
                         Keyword arguments passed to the construction of
                         `navis.Skeleton`. You can use this to e.g. set
@@ -319,6 +356,15 @@ def read_nml(
 
     """
     reader = NMLReader(precision=precision, attrs=kwargs)
+    if stream:
+        return reader.iter_any(
+            f,
+            parallel=parallel,
+            limit=limit,
+            include_subdirs=include_subdirs,
+            batch_size=base.stream_batch_size(stream),
+        )
+
     # Read neurons
     neurons = reader.read_any(
         f, parallel=parallel, limit=limit, include_subdirs=include_subdirs
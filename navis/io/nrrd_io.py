@@ -13,6 +13,9 @@
 
 import nrrd
 import io
+import os
+import bz2
+import gzip
 
 import numpy as np
 
@@ -40,6 +43,7 @@ class NrrdReader(base.ImageReader):
         fmt: str = DEFAULT_FMT,
         attrs: Optional[Dict[str, Any]] = None,
         errors: str = "raise",
+        block_size: Optional[Union[int, str]] = None,
     ):
         if not fmt.endswith(".nrrd"):
             raise ValueError('`fmt` must end with ".nrrd"')
@@ -55,6 +59,7 @@ class NrrdReader(base.ImageReader):
             thin=thin,
             dotprop_kwargs=dotprop_kwargs,
             errors=errors,
+            block_size=block_size,
         )
 
     def format_output(self, x):
@@ -92,10 +97,17 @@ class NrrdReader(base.ImageReader):
             f = io.BytesIO(f)
 
         header = nrrd.read_header(f)
-        data = nrrd.read_data(header, f)
 
-        if self.output == "raw":
-            return data, header
+        if self.block_size and self.output != "raw":
+            blocks = nrrd_blocks(f, header, self.block_size)
+        else:
+            blocks = None
+
+        if blocks is None:
+            data = nrrd.read_data(header, f)
+
+            if self.output == "raw":
+                return data, header
 
         # Try parsing units - this is modelled after the nrrd files you get from
         # Virtual Fly Brain (VFB)
@@ -113,9 +125,101 @@ class NrrdReader(base.ImageReader):
         else:
             units = voxdim
 
+        if blocks is not None:
+            return self.convert_blocks(
+                blocks, header["sizes"], attrs, header, voxdim, units, space_units
+            )
+
         return self.convert_image(data, attrs, header, voxdim, units, space_units)
 
 
+def nrrd_blocks(f, header, block_size):
+    """Prepare reading the data of a 3D NRRD file in blocks of z-slices.
+
+    Raw data in a file on disk is memory-mapped, compressed data is decompressed
+    as a stream - either way only a block is ever held in memory. The NRRD
+    format stores the first axis (x) fastest, so a block of consecutive
+    z-slices is a contiguous run of bytes.
+
+    Parameters
+    ----------
+    f :             IO
+                    Binary buffer positioned at the start of the data (i.e.
+                    right after the header).
+    header :        dict
+                    Header as returned by `nrrd.read_header`.
+    block_size :    int
+                    Maximum size of a block in bytes.
+
+    Returns
+    -------
+    callable | None
+                    Returns a fresh iterator over `(z, block)` tuples when
+                    called (see `ImageReader.convert_blocks`). None if the data
+                    can not be read in blocks (e.g. not 3D, text encoding or
+                    detached data), in which case it should be read in full.
+
+    """
+    encoding = header.get("encoding")
+    if (
+        header.get("dimension") != 3
+        or encoding not in ("raw", "gzip", "gz", "bzip2", "bz2")
+        or any(
+            header.get(k, 0)
+            for k in ("datafile", "data file", "lineskip", "line skip",
+                      "byteskip", "byte skip")
+        )
+    ):
+        logger.debug("Unable to read NRRD in blocks - reading in full instead.")
+        return None
+
+    try:
+        # pynrrd does not expose this publicly
+        from nrrd.reader import _determine_datatype
+
+        dtype = _determine_datatype(header)
+    except (ImportError, nrrd.NRRDError):
+        return None
+
+    shape = tuple(int(s) for s in header["sizes"])
+    nz = base.slices_per_block(block_size, shape, dtype)
+    slice_bytes = shape[0] * shape[1] * dtype.itemsize
+    start = f.tell()
+
+    # Raw data in an actual file: memory-map and hand out views
+    if encoding == "raw" and os.path.isfile(getattr(f, "name", "") or ""):
+        data = np.memmap(
+            f.name, dtype=dtype, mode="r", offset=start, shape=shape[::-1]
+        )
+
+        def blocks():
+            for z in range(0, shape[2], nz):
+                # (dz, y, x) -> (x, y, dz)
+                yield z, data[z : z + nz].T
+
+        return blocks
+
+    def blocks():
+        f.seek(start)
+        if encoding in ("gzip", "gz"):
+            stream = gzip.GzipFile(fileobj=f, mode="rb")
+        elif encoding in ("bzip2", "bz2"):
+            stream = bz2.BZ2File(f, mode="rb")
+        else:
+            stream = f
+
+        for z in range(0, shape[2], nz):
+            dz = min(nz, shape[2] - z)
+            buffer = stream.read(dz * slice_bytes)
+            if len(buffer) != dz * slice_bytes:
+                raise nrrd.NRRDError(
+                    "Size of the data does not match the dimensions in the header."
+                )
+            yield z, np.frombuffer(buffer, dtype).reshape(dz, shape[1], shape[0]).T
+
+    return blocks
+
+
 def write_nrrd(
     x: "core.NeuronObject",
     filepath: Union[str, Path],
@@ -243,6 +347,8 @@ def read_nrrd(
     fmt: str = "{name}.nrrd",
     limit: Optional[int] = None,
     errors: str = "raise",
+    stream: Union[bool, int] = False,
+    block_size: Optional[Union[int, str]] = None,
     **dotprops_kwargs,
 ) -> "core.NeuronObject":
     """Create Neuron/List from NRRD file.
@@ -318,9 +424,24 @@ def read_nrrd(
                            that range
                          - a list is expected to be a list of filenames to read from
                            the folder/archive
+    stream :            bool | int
+                        If True, return a generator that yields neurons one at
+                        a time as they are read instead of a NeuronList. If an
+                        integer, yield NeuronLists of up to that many neurons.
+                        Use this to process large collections without holding
+                        all of them in memory at once.
     errors :            "raise" | "log" | "ignore"
                         If "log" or "ignore", errors will not be raised and the
                         mesh will be skipped. Can result in empty output.
+    block_size :        int | str, optional
+                        If set, read 3D images in blocks of at most this many
+                        bytes (e.g. `"256 MB"`) instead of all at once, keeping
+                        only the non-zero (or above `threshold`) voxels of each
+                        block. Peak memory then depends on the block size and
+                        the number of voxels kept rather than on the size of
+                        the image. Raw data is memory-mapped, gzip/bzip2 data
+                        is decompressed as a stream. Voxels are returned sparse.
+                        Ignored for `output='raw'`.
     **dotprops_kwargs
                         Keyword arguments passed to [`navis.make_dotprops`][]
                         if `output='dotprops'`. Use this to adjust e.g. the
@@ -371,6 +492,20 @@ def read_nrrd(
         parallel = ("auto", 10)
 
     reader = NrrdReader(
-        output=output, threshold=threshold, thin=thin, fmt=fmt, errors=errors, dotprop_kwargs=dotprops_kwargs
+        output=output,
+        threshold=threshold,
+        thin=thin,
+        fmt=fmt,
+        errors=errors,
+        dotprop_kwargs=dotprops_kwargs,
+        block_size=block_size,
     )
+    if stream:
+        return reader.iter_any(
+            f,
+            include_subdirs,
+            parallel,
+            limit=limit,
+            batch_size=base.stream_batch_size(stream),
+        )
     return reader.read_any(f, include_subdirs, parallel, limit=limit)
@@ -21,7 +21,7 @@ from typing import List, Union, Optional
 
 from .. import config, core, utils
 
-__all__ = ["read_parquet", "write_parquet", "scan_parquet"]
+__all__ = ["read_parquet", "write_parquet", "scan_parquet", "ParquetSink"]
 
 # Set up logging
 logger = config.get_logger(__name__)
@@ -852,6 +852,216 @@ def _write_connectors(x, filepath, write_meta, write_connectors, spec, samples):
     _write_table(table, cn_file, metadata)
 
 
+class ParquetSink:
+    """Append neurons to a parquet file one batch at a time.
+
+    [`navis.write_parquet`][] needs all neurons in memory at once. A sink
+    instead collects the rows of the neurons it is handed until there are
+    `row_group_size` of them, writes those out as a row group and only
+    finalises the file - footer and per-neuron meta data - when closed. The
+    neurons themselves can be dropped as soon as they are handed over. The result is a regular
+    navis-format parquet file for [`navis.read_parquet`][]. Its main use is as
+    the `sink` of [`navis.Pipeline.stream`][].
+
+    Parameters
+    ----------
+    filepath :          str | pathlib.Path
+                        Destination for the file. Overwritten if it exists.
+    write_meta :        bool | list of str
+                        Which neuron properties to write - see
+                        [`navis.write_parquet`][].
+    write_connectors :  bool
+                        Whether to write the neurons' connector tables to the
+                        sidecar file.
+    row_group_size :    int
+                        Number of rows (nodes or points, and connectors) to
+                        collect before writing them out. Larger row groups
+                        compress and read better; smaller ones hold less in
+                        memory.
+
+    Examples
+    --------
+    >>> import navis
+    >>> with navis.ParquetSink(tmp_dir / 'streamed.parquet') as sink:
+    ...     for n in navis.example_neurons(3, kind='skeleton'):
+    ...         sink.write(n)
+    >>> len(navis.read_parquet(tmp_dir / 'streamed.parquet'))
+    3
+
+    """
+
+    def __init__(
+        self,
+        filepath: Union[str, Path],
+        write_meta: bool = True,
+        write_connectors: bool = True,
+        row_group_size: int = 2**20,
+    ):
+        _import_pyarrow("Writing")
+        self.filepath = Path(filepath).expanduser()
+        self.write_meta = write_meta
+        self.write_connectors = write_connectors
+        self.row_group_size = max(1, int(row_group_size))
+        self.closed = False
+
+        self._type = None
+        self._ids = set()
+        # One writer per file; both are opened on the first batch that has
+        # something for them, because that is where their schema comes from
+        self._node_writer = None
+        self._connector_writer = None
+        # Tables waiting to be written, per file
+        self._node_rows = []
+        self._connector_rows = []
+        self._meta = {}
+
+    def __repr__(self):
+        state = "closed" if self.closed else "open"
+        return f"<ParquetSink {self.filepath} ({len(self._ids)} neurons, {state})>"
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __call__(self, x):
+        self.write(x)
+
+    def write(self, x: "core.NeuronObject") -> None:
+        """Add Skeleton(s) or Dotprops to the file.
+
+        Their rows are written out once `row_group_size` of them have been
+        collected, or when the sink is closed.
+        """
+        if self.closed:
+            raise ValueError(f"{self!r} has already been closed.")
+
+        x = core.NeuronList(x)
+        if not len(x):
+            return
+
+        types = x.types
+        if len(types) != 1 or types[0] not in (core.Skeleton, core.Dotprops):
+            raise TypeError(
+                "Can only write either Skeletons or Dotprops to parquet, "
+                f"got {types}"
+            )
+        if self._type is None:
+            self._type = types[0]
+        elif types[0] is not self._type:
+            raise TypeError(
+                f"This file holds {self._type.__name__}s, can't add "
+                f"{types[0].__name__}s"
+            )
+
+        ids = set(x.id)
+        if x.is_degenerated or ids & self._ids:
+            raise ValueError("Neurons written to a parquet file must have unique IDs")
+        self._ids |= ids
+
+        to_table = (
+            _skeletons_to_table if self._type is core.Skeleton else _dotprops_to_table
+        )
+        self._node_rows.append(to_table(x))
+        self._meta.update(_compile_meta(x, write_meta=self.write_meta))
+
+        if self.write_connectors:
+            cn = _connectors_to_table(x)
+            if cn is not None and not cn.empty:
+                self._connector_rows.append(cn)
+
+        self._flush(force=False)
+
+    def _flush(self, force: bool) -> None:
+        """Write out the collected rows if there are enough of them (or `force`)."""
+        if self._node_rows and (
+            force or sum(map(len, self._node_rows)) >= self.row_group_size
+        ):
+            self._node_writer = _append(
+                self._node_writer, _concat(self._node_rows), self.filepath
+            )
+            self._node_rows = []
+        if self._connector_rows and (
+            force or sum(map(len, self._connector_rows)) >= self.row_group_size
+        ):
+            self._connector_writer = _append(
+                self._connector_writer,
+                _concat(self._connector_rows),
+                _connectors_filepath(self.filepath),
+            )
+            self._connector_rows = []
+
+    def close(self) -> None:
+        """Write the meta data and finalise the file(s)."""
+        if self.closed:
+            return
+        self.closed = True
+        self._flush(force=True)
+
+        cn_file = _connectors_filepath(self.filepath)
+        if self._connector_writer is None and cn_file.is_file():
+            # Same rule as `write_parquet`: never leave a stale sidecar behind
+            logger.info(f"Removing stale connector file {cn_file}")
+            cn_file.unlink()
+
+        if self._node_writer is None:
+            logger.warning(f"Nothing was written to {self.filepath}")
+            return
+
+        # The meta data lives in the footer, so it can be added right up until
+        # the file is closed
+        for writer in (self._node_writer, self._connector_writer):
+            if writer is not None:
+                writer.add_key_value_metadata(self._meta)
+                writer.close()
+
+
+def _concat(dfs):
+    """Concatenate tables of nodes or connectors for one row group."""
+    return dfs[0] if len(dfs) == 1 else pd.concat(dfs, ignore_index=True)
+
+
+def _append(writer, df, filepath):
+    """Append `df` to `writer` as a row group, opening the writer if needed.
+
+    The first table fixes the schema; later ones are brought in line with it,
+    e.g. a batch of neurons without a "label" column gets a column of nulls.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    table = pa.Table.from_pandas(df, preserve_index=False).replace_schema_metadata()
+    # Pooling several neurons makes e.g. the "neuron" column categorical, a
+    # single one leaves it as is. Decode so both make the same schema.
+    for i, f in enumerate(table.schema):
+        if pa.types.is_dictionary(f.type):
+            table = table.set_column(i, f.name, table[i].cast(f.type.value_type))
+    if writer is None:
+        # No embedded arrow schema: readers would take the meta data from it
+        # rather than from the footer, where `close` adds it
+        writer = pq.ParquetWriter(filepath, table.schema, store_schema=False)
+    else:
+        schema = writer.schema
+        extra = [c for c in table.column_names if c not in schema.names]
+        if extra:
+            logger.warning(
+                "Dropping column(s) not in the first batch written to "
+                f"{filepath.name}: {', '.join(extra)}"
+            )
+        table = pa.Table.from_arrays(
+            [
+                table[f.name].cast(f.type)
+                if f.name in table.column_names
+                else pa.nulls(len(table), f.type)
+                for f in schema
+            ],
+            schema=schema,
+        )
+    writer.write_table(table)
+    return writer
+
+
 def _read_connectors(filepath, neurons, table, samples, filtered=False):
     """Read the sidecar connector file (if any) and attach to `neurons`."""
     cn_file = _connectors_filepath(filepath)
@@ -245,6 +245,7 @@ def read_precomputed(
     limit: Optional[int] = None,
     parallel: Union[bool, int] = "auto",
     errors: Literal["raise", "log", "ignore"] = "raise",
+    stream: Union[bool, int] = False,
     **kwargs,
 ) -> "core.NeuronObject":
     """Read skeletons and meshes from neuroglancer's precomputed format.
@@ -305,6 +306,12 @@ def read_precomputed(
                            that range
                          - a list is expected to be a list of filenames to read from
                            the folder/archive
+    stream :            bool | int
+                        If True, return a generator that yields neurons one at
+                        a time as they are read instead of a NeuronList. If an
+                        integer, yield NeuronLists of up to that many neurons.
+                        Use this to process large collections without holding
+                        all of them in memory at once.
     parallel :          "auto" | bool | int
                         Defaults to `auto` which means only use parallel
                         processing if more than 200 files are imported. Spawning
@@ -407,6 +414,14 @@ def read_precomputed(
     else:
         reader = PrecomputedMeshReader(fmt=fmt, errors=errors, attrs=kwargs)
 
+    if stream:
+        return reader.iter_any(
+            f,
+            include_subdirs,
+            parallel,
+            limit=limit,
+            batch_size=base.stream_batch_size(stream),
+        )
     return reader.read_any(f, include_subdirs, parallel, limit=limit)
 
 
@@ -271,6 +271,7 @@ def read_swc(
     read_meta: bool = True,
     limit: Optional[int] = None,
     errors: str = "raise",
+    stream: Union[bool, int] = False,
     **kwargs,
 ) -> "core.NeuronObject":
     """Create Neuron/List from SWC file.
@@ -359,6 +360,12 @@ def read_swc(
                            that range
                          - a list is expected to be a list of filenames to read from
                            the folder/archive
+    stream :            bool | int
+                        If True, return a generator that yields neurons one at
+                        a time as they are read instead of a NeuronList. If an
+                        integer, yield NeuronLists of up to that many neurons.
+                        Use this to process large collections without holding
+                        all of them in memory at once.
     errors :            "raise" | "log" | "ignore"
                         If "log" or "ignore", errors will not be raised and the
                         mesh will be skipped. Can result in empty output.
@@ -429,26 +436,49 @@ def read_swc(
         errors=errors,
         attrs=kwargs,
     )
+    if stream:
+        return _warn_unattached(
+            reader.iter_any(
+                f,
+                include_subdirs,
+                parallel,
+                limit=limit,
+                batch_size=base.stream_batch_size(stream),
+            )
+        )
+
     res = reader.read_any(f, include_subdirs, parallel, limit=limit)
 
-    failed = []
-    for n in core.NeuronList(res):
-        if not hasattr(n, "meta"):
-            continue
-        failed += list(n.meta.keys())
-
-    if failed:
-        failed = list(set(failed))
-        logger.warning(
-            "Some meta data could not be directly attached to the "
-            "neuron(s) - probably some clash with intrinsic "
-            "properties. You can find these data attached as "
-            "`.meta` dictionary."
-        )
+    if _has_unattached(res):
+        _warn_meta()
 
     return res
 
 
+def _has_unattached(neurons) -> bool:
+    """Whether any neuron kept meta data in `.meta` rather than as attributes."""
+    return any(getattr(n, "meta", None) for n in core.NeuronList(neurons))
+
+
+def _warn_meta():
+    logger.warning(
+        "Some meta data could not be directly attached to the "
+        "neuron(s) - probably some clash with intrinsic "
+        "properties. You can find these data attached as "
+        "`.meta` dictionary."
+    )
+
+
+def _warn_unattached(neurons):
+    """Pass a stream through, warning about unattached meta data once."""
+    warned = False
+    for n in neurons:
+        if not warned and _has_unattached(n):
+            _warn_meta()
+            warned = True
+        yield n
+
+
 def write_swc(
     x: "core.NeuronObject",
     filepath: Union[str, Path],
@@ -39,6 +39,7 @@ class TiffReader(base.ImageReader):
         fmt: str = DEFAULT_FMT,
         errors: str = "raise",
         attrs: Optional[Dict[str, Any]] = None,
+        block_size: Optional[Union[int, str]] = None,
     ):
         if not fmt.endswith(".tif") and not fmt.endswith(".tiff"):
             raise ValueError('`fmt` must end with ".tif" or ".tiff"')
@@ -54,6 +55,7 @@ class TiffReader(base.ImageReader):
             thin=thin,
             dotprop_kwargs=dotprop_kwargs,
             errors=errors,
+            block_size=block_size,
         )
         self.channel = channel
 
@@ -109,6 +111,17 @@ class TiffReader(base.ImageReader):
             # Z = slices, C = channels, Y = rows, X = columns, S = color(?), Q = empty(?)
             axes = tif.series[0].axes
 
+            if self.block_size and self.output != "raw":
+                blocks = self.tiff_blocks(tif)
+                if blocks is not None:
+                    voxdim, units, space_units = _parse_units(header)
+                    shape = tif.series[0].shape
+                    shape = (shape[axes.index("X")], shape[axes.index("Y")],
+                             shape[axes.index("Z")])
+                    return self.convert_blocks(
+                        blocks, shape, attrs, header, voxdim, units, space_units
+                    )
+
             # Generate volume
             data = tif.asarray()
 
@@ -142,22 +155,94 @@ class TiffReader(base.ImageReader):
         if order:
             data = np.transpose(data, order)
 
-        # Try parsing units - this is modelled after the tif files you get from ImageJ
-        units = None
-        space_units = None
-        voxdim = np.array([1, 1, 1], dtype=np.float64)
-        if "spacing" in header:
-            voxdim[2] = header["spacing"]
-        if "xy_spacing" in header:
-            voxdim[:2] = header["xy_spacing"]
-        if "unit" in header:
-            space_units = header["unit"]
-            units = [f"{m} {space_units}" for m in voxdim]
-        else:
-            units = voxdim
+        voxdim, units, space_units = _parse_units(header)
 
         return self.convert_image(data, attrs, header, voxdim, units, space_units)
 
+    def tiff_blocks(self, tif):
+        """Prepare reading a TIFF's pages in blocks of z-slices.
+
+        Each page of a TIFF holds a single 2D (YX) plane, so reading a few
+        pages at a time means only a block is ever held in memory.
+
+        Parameters
+        ----------
+        tif :       tifffile.TiffFile
+
+        Returns
+        -------
+        callable | None
+                    Returns a fresh iterator over `(z, block)` tuples when
+                    called (see `ImageReader.convert_blocks`). None if the image
+                    can not be read page by page (e.g. RGB data or files that
+                    do not index all their pages), in which case it should be
+                    read in full.
+
+        """
+        series = tif.series[0]
+        axes, shape = series.axes, series.shape
+
+        # Leading axes are what the pages are indexed by
+        lead_axes, lead_shape = axes[:-2], shape[:-2]
+        if (
+            not axes.endswith("YX")
+            or "Z" not in lead_axes
+            or any(a not in "ZCQ" for a in lead_axes)
+            or any(n != 1 for a, n in zip(lead_axes, lead_shape) if a == "Q")
+            or len(series.pages) != int(np.prod(lead_shape))
+        ):
+            logger.debug("Unable to read TIFF in blocks - reading in full instead.")
+            return None
+
+        channel = self.channel
+        if "C" in lead_axes:
+            n_c = lead_shape[lead_axes.index("C")]
+            if not -n_c <= channel < n_c:
+                raise IndexError(
+                    f"Channel {channel} out of range for image with {n_c} channels."
+                )
+            channel = channel % n_c  # e.g. -1 for the last channel
+
+        n_z = lead_shape[lead_axes.index("Z")]
+        n_y, n_x = shape[-2:]
+        nz = base.slices_per_block(self.block_size, (n_x, n_y), series.dtype)
+
+        def page_index(z):
+            idx = [
+                z if a == "Z" else channel if a == "C" else 0
+                for a in lead_axes
+            ]
+            return int(np.ravel_multi_index(idx, lead_shape))
+
+        def blocks():
+            for z in range(0, n_z, nz):
+                pages = [page_index(i) for i in range(z, min(z + nz, n_z))]
+                data = tif.asarray(key=pages, series=0)
+                # (dz, y, x) -> (x, y, dz)
+                yield z, data.reshape(len(pages), n_y, n_x).T
+
+        return blocks
+
+
+def _parse_units(header):
+    """Parse voxel dimensions and units from a TIFF's header.
+
+    This is modelled after the tif files you get from ImageJ.
+    """
+    units = None
+    space_units = None
+    voxdim = np.array([1, 1, 1], dtype=np.float64)
+    if "spacing" in header:
+        voxdim[2] = header["spacing"]
+    if "xy_spacing" in header:
+        voxdim[:2] = header["xy_spacing"]
+    if "unit" in header:
+        space_units = header["unit"]
+        units = [f"{m} {space_units}" for m in voxdim]
+    else:
+        units = voxdim
+    return voxdim, units, space_units
+
 
 def read_tiff(
     f: Union[str, Iterable],
@@ -170,6 +255,8 @@ def read_tiff(
     fmt: str = "{name}.tif",
     limit: Optional[int] = None,
     errors: str = "raise",
+    stream: Union[bool, int] = False,
+    block_size: Optional[Union[int, str]] = None,
     **dotprops_kwargs,
 ) -> "core.NeuronObject":
     """Create Neuron/List from TIFF file.
@@ -239,10 +326,23 @@ def read_tiff(
                            that range
                          - a list is expected to be a list of filenames to read from
                            the folder/archive
+    stream :            bool | int
+                        If True, return a generator that yields neurons one at
+                        a time as they are read instead of a NeuronList. If an
+                        integer, yield NeuronLists of up to that many neurons.
+                        Use this to process large collections without holding
+                        all of them in memory at once.
     errors :            "raise" | "log" | "ignore"
                         If "log" or "ignore", errors will not be raised and the
                         mesh will be skipped. Can result in empty output.
-
+    block_size :        int | str, optional
+                        If set, read the image a few pages (i.e. z-slices) at a
+                        time, in blocks of at most this many bytes (e.g.
+                        `"256 MB"`), keeping only the non-zero (or above
+                        `threshold`) voxels of each block. Peak memory then
+                        depends on the block size and the number of voxels kept
+                        rather than on the size of the image. Voxels are
+                        returned sparse. Ignored for `output='raw'`.
     **dotprops_kwargs
                         Keyword arguments passed to [`navis.make_dotprops`][]
                         if `output='dotprops'`. Use this to adjust e.g. the
@@ -290,5 +390,14 @@ def read_tiff(
         fmt=fmt,
         dotprop_kwargs=dotprops_kwargs,
         errors=errors,
+        block_size=block_size,
     )
+    if stream:
+        return reader.iter_any(
+            f,
+            include_subdirs,
+            parallel,
+            limit=limit,
+            batch_size=base.stream_batch_size(stream),
+        )
     return reader.read_any(f, include_subdirs, parallel, limit=limit)
@@ -30,6 +30,7 @@ from .persistence import (persistence_points, persistence_vectors,
                           persistence_distances)
 from .fq import form_factor
 from .ivscc import ivscc_features
+from .batch import batch_metrics, batch_sholl
 from .images import smooth_voxels, thin_voxels
 
 
@@ -43,5 +44,6 @@ __all__ = ['strahler_index', 'bending_flow', 'flow_centrality', 'synapse_flow_ce
            'subset_neuron', 'merge_subset', 'smooth_voxels', 'sholl_analysis',
            'persistence_points', 'betweenness_centrality',
            'persistence_vectors', 'persistence_distances', 'combine_neurons',
-           'segment_analysis', 'form_factor', 'ivscc_features', "thin_voxels",
+           'segment_analysis', 'form_factor', 'ivscc_features', 'batch_metrics', 'batch_sholl',
+           "thin_voxels",
            'branch_angles', 'path_angles', 'root_angles', 'soma_exit_angles']
@@ -0,0 +1,366 @@
+#    This script is part of navis (http://www.github.com/navis-org/navis).
+#    Copyright (C) 2018 Philipp Schlegel
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+
+"""Many morphometrics per neuron in one pass.
+
+Asking `cable_length`, `strahler_index`, `tortuosity` & co. one after the other
+has each of them re-derive the same things from the node table: parent
+distances, who is whose parent, the linear segments, distances to the root.
+For a handful of neurons that hardly matters; for 100k it is most of the work.
+[`navis.batch_metrics`][] builds those intermediates once per neuron - lazily,
+so a metric nobody asked for costs nothing - and computes every requested
+metric from them.
+"""
+
+import numpy as np
+import pandas as pd
+
+from typing import Optional, Sequence
+
+from .. import config, core, utils
+from . import ivscc
+from .mmetrics import _flat_segments, _segment_sums, _sholl_counts, _sholl_table
+
+# Set up logging
+logger = config.get_logger(__name__)
+
+__all__ = sorted(["batch_metrics", "batch_sholl"])
+
+
+class MetricContext:
+    """Per-neuron intermediates shared between metrics.
+
+    Each is computed on first use and kept for the next metric.
+
+    Attributes
+    ----------
+    neuron :        Skeleton
+    node_ids :      (N, ) array
+    parent_ids :    (N, ) array
+    xyz :           (N, 3) float array
+
+    """
+
+    def __init__(self, neuron: "core.Skeleton"):
+        nodes = neuron.nodes
+        self.neuron = neuron
+        self.node_ids = nodes.node_id.values
+        self.parent_ids = nodes.parent_id.values
+        self.xyz = nodes[["x", "y", "z"]].values.astype(np.float64)
+
+        self._parent_pos = None
+        self._parent_dist = None
+        self._dist_to_root = None
+        self._segments = None
+        self._strahler = None
+
+    @property
+    def parent_pos(self) -> np.ndarray:
+        """Row of each node's parent in the node table (`-1` for roots)."""
+        if self._parent_pos is None:
+            self._parent_pos = pd.Index(self.node_ids).get_indexer(self.parent_ids)
+        return self._parent_pos
+
+    @property
+    def parent_dist(self) -> np.ndarray:
+        """Distance from each node to its parent (`0` for roots)."""
+        if self._parent_dist is None:
+            self._parent_dist = utils.fastcore.dag.parent_dist(
+                self.node_ids, self.parent_ids, self.xyz, root_dist=0
+            )
+        return self._parent_dist
+
+    @property
+    def dist_to_root(self) -> np.ndarray:
+        """Geodesic distance from each node to its root."""
+        if self._dist_to_root is None:
+            self._dist_to_root = utils.fastcore.dag.dist_to_root(
+                self.node_ids, self.parent_ids, weights=self.parent_dist
+            )
+        return self._dist_to_root
+
+    @property
+    def segments(self):
+        """The small segments, flattened: `(rows, offsets)`.
+
+        See `navis.morpho.mmetrics._flat_segments`.
+        """
+        if self._segments is None:
+            self._segments = _flat_segments(self.neuron)
+        return self._segments
+
+    @property
+    def segment_lengths(self) -> np.ndarray:
+        """Geodesic length of each small segment."""
+        return _segment_sums(self.parent_dist, *self.segments)
+
+    @property
+    def strahler(self) -> np.ndarray:
+        """Strahler index of each node."""
+        if self._strahler is None:
+            self._strahler = utils.fastcore.strahler_index(
+                self.node_ids, self.parent_ids
+            )
+        return self._strahler
+
+
+def _basic(ctx, **kwargs):
+    types = ctx.neuron.nodes.type.values
+    return {
+        "n_nodes": len(ctx.node_ids),
+        "n_branches": int((types == "branch").sum()),
+        "n_leafs": int((types == "end").sum()),
+    }
+
+
+def _cable_length(ctx, **kwargs):
+    return {"cable_length": float(ctx.parent_dist.sum())}
+
+
+def _strahler_index(ctx, **kwargs):
+    si = ctx.strahler
+    return {"strahler_index": int(np.nanmax(si)) if len(si) else np.nan}
+
+
+def _tortuosity(ctx, **kwargs):
+    rows, offsets = ctx.segments
+    if not len(rows):
+        return {"tortuosity": np.nan}
+    L = ctx.segment_lengths
+    R = np.linalg.norm(ctx.xyz[rows[offsets[:-1]]] - ctx.xyz[rows[offsets[1:] - 1]],
+                       axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return {"tortuosity": float(np.mean(L / R))}
+
+
+def _segments(ctx, **kwargs):
+    L = ctx.segment_lengths
+    return {
+        "n_segments": len(L),
+        "mean_segment_length": float(L.mean()) if len(L) else np.nan,
+        "max_root_dist": float(ctx.dist_to_root.max()) if len(ctx.node_ids) else np.nan,
+    }
+
+
+def _sholl(ctx, radii=None, center="centermass", **kwargs):
+    if radii is None or not utils.is_iterable(radii):
+        raise ValueError("The 'sholl' metric needs a list of `radii`: each "
+                         "radius becomes a column.")
+    radii = np.asarray(radii, dtype=np.float64)
+
+    if utils.is_iterable(center):
+        center = np.asarray(center, dtype=np.float64)
+    elif center == "centermass":
+        center = ctx.xyz.mean(axis=0)
+    elif center == "root":
+        center = ctx.xyz[ctx.parent_pos < 0][0]
+    elif center == "soma":
+        if not ctx.neuron.has_soma:
+            raise ValueError(f"Neuron {ctx.neuron.id} has no soma.")
+        soma = utils.make_iterable(ctx.neuron.soma)[0]
+        center = ctx.xyz[ctx.node_ids == soma][0]
+    else:
+        raise ValueError('`center` must be "centermass", "root", "soma" or a '
+                         f'(3, ) x/y/z coordinate. Got "{center}"')
+
+    dists = np.linalg.norm(ctx.xyz - center, axis=1)
+    not_root = ctx.parent_pos >= 0
+    crossings, _, _ = _sholl_counts(
+        dists[not_root], dists[ctx.parent_pos[not_root]],
+        ctx.parent_dist[not_root], np.zeros(not_root.sum(), dtype=bool), radii
+    )
+    return {f"sholl_{r:g}": int(c) for r, c in zip(radii, crossings)}
+
+
+def _ivscc(ctx, features=None, **kwargs):
+    nctx = ivscc.NeuronContext(ctx.neuron)
+    # Already rooted at the soma (or there is none): our distances are the ones
+    # it would compute
+    if nctx.neuron is ctx.neuron:
+        nctx._dist_to_root = pd.Series(ctx.dist_to_root, index=ctx.node_ids)
+
+    row = {}
+    for feat in features or ivscc.DEFAULT_FEATURES:
+        try:
+            row.update(feat(nctx).extract_features())
+        except ivscc.CompartmentNotFoundError:
+            # As `ivscc_features(missing_compartments="ignore")`
+            continue
+    return row
+
+
+#: Metric name -> function taking a `MetricContext` (plus the options given to
+#: `batch_metrics`) and returning a dict of column -> value.
+METRICS = {
+    "basic": _basic,
+    "cable_length": _cable_length,
+    "strahler_index": _strahler_index,
+    "tortuosity": _tortuosity,
+    "segments": _segments,
+    "sholl": _sholl,
+    "ivscc": _ivscc,
+}
+
+DEFAULT_METRICS = ("basic", "cable_length", "strahler_index", "tortuosity")
+
+
+@utils.map_neuronlist_df(desc="Measuring", allow_parallel=True)
+@utils.meshneuron_skeleton(method="pass_through", reroot_soma=True)
+def batch_metrics(
+    x: "core.NeuronObject",
+    metrics: Sequence[str] = DEFAULT_METRICS,
+    radii: Optional[Sequence[float]] = None,
+    center="centermass",
+    features=None,
+) -> pd.DataFrame:
+    """Calculate many morphometrics for neuron(s) in one pass.
+
+    Intermediates that several metrics need - parent distances, distances to
+    the root, the linear segments, Strahler indices - are built once per
+    neuron and shared, instead of once per metric as when calling e.g.
+    [`navis.morpho.cable_length`][] and [`navis.tortuosity`][] one after the other.
+
+    Parameters
+    ----------
+    x :         Skeleton | Mesh | NeuronList
+                Neuron(s) to measure. Meshes are skeletonized.
+    metrics :   list of str
+                Which metrics to calculate:
+
+                  - "basic": `n_nodes`, `n_branches` (branch points) and
+                    `n_leafs`
+                  - "cable_length": as [`navis.morpho.cable_length`][]
+                  - "strahler_index": the highest Strahler index, see
+                    [`navis.strahler_index`][]
+                  - "tortuosity": as [`navis.tortuosity`][] without a
+                    `seg_length`
+                  - "segments": `n_segments`, `mean_segment_length` and the
+                    longest geodesic distance to the root (`max_root_dist`),
+                    see [`navis.segment_analysis`][]
+                  - "sholl": Sholl intersections at each of `radii`, one
+                    column (`sholl_{radius}`) per radius - see
+                    [`navis.sholl_analysis`][]
+                  - "ivscc": IVSCC features, see [`navis.ivscc_features`][];
+                    missing compartments are ignored
+
+                Defaults to "basic", "cable_length", "strahler_index" and
+                "tortuosity".
+    radii :     list of float, optional
+                Radii for "sholl". Must be a list so that every neuron gets
+                the same columns.
+    center :    "centermass" | "root" | "soma" | list-like
+                Center for "sholl".
+    features :  list of Features, optional
+                Feature classes for "ivscc". Defaults to all.
+
+    Returns
+    -------
+    pandas.DataFrame
+                One row per neuron, one column per metric. For a NeuronList the
+                `neuron` column holds each neuron's ID. With `parallel=True`
+                neurons are processed on the configured parallel backend (see
+                [`navis.set_parallel_backend`][]) and their rows collected as
+                they arrive.
+
+    See Also
+    --------
+    [`navis.segment_analysis`][]
+                Per-segment rather than per-neuron morphometrics.
+
+    Examples
+    --------
+    >>> import navis
+    >>> nl = navis.example_neurons(3, kind='skeleton')
+    >>> m = navis.batch_metrics(nl, metrics=['cable_length', 'sholl'],
+    ...                         radii=[1000, 5000])
+    >>> m.columns.tolist()
+    ['neuron', 'cable_length', 'sholl_1000', 'sholl_5000']
+
+    """
+    utils.eval_param(x, name="x", allowed_types=(core.Skeleton,))
+
+    metrics = utils.make_iterable(metrics)
+    unknown = [m for m in metrics if m not in METRICS]
+    if unknown:
+        raise ValueError(f"Unknown metric(s): {', '.join(map(str, unknown))}. "
+                         f"Available: {', '.join(METRICS)}")
+
+    ctx = MetricContext(x)
+    row = {}
+    for m in metrics:
+        row.update(METRICS[m](ctx, radii=radii, center=center,
+                              features=features))
+
+    return pd.DataFrame([row])
+
+
+def batch_sholl(
+    x: "core.NeuronObject",
+    radii=10,
+    center="centermass",
+    geodesic: bool = False,
+) -> pd.DataFrame:
+    """Run Sholl analysis for many neurons into one table.
+
+    Same results as [`navis.sholl_analysis`][], but as a single tidy table
+    rather than one DataFrame per neuron - and computed for all neurons
+    together: their distances to the center, Euclidean or geodesic, come out
+    of one pass over all nodes instead of one per neuron.
+
+    Parameters
+    ----------
+    x :         Skeleton | Mesh | NeuronList
+                Neuron(s) to analyze. Meshes are skeletonized.
+    radii :     int | list-like
+                If integer, will produce N evenly spaced radii per neuron,
+                covering the distance between the center and its most distal
+                node. Alternatively, a list of radii (in ascending order) to
+                use for all neurons.
+    center :    "centermass" | "root" | "soma" | int | list-like
+                See [`navis.sholl_analysis`][].
+    geodesic :  bool
+                If True, will use geodesic (along-the-arbor) instead of
+                Euclidean distances. Requires `center` to be a node.
+
+    Returns
+    -------
+    pandas.DataFrame
+                One row per neuron and radius, with columns `neuron` (the
+                neuron's ID), `radius`, `intersections`, `cable_length` and
+                `branch_points`.
+
+    See Also
+    --------
+    [`navis.sholl_analysis`][]
+                One DataFrame per neuron.
+
+    Examples
+    --------
+    >>> import navis
+    >>> nl = navis.example_neurons(3, kind='skeleton')
+    >>> sha = navis.batch_sholl(nl, radii=[1000, 5000, 20000], center='root',
+    ...                         geodesic=True)
+    >>> sha.shape
+    (9, 5)
+    >>> profile = sha.pivot(index='radius', columns='neuron',
+    ...                     values='intersections')
+
+    """
+    nl = core.NeuronList(x)
+    neurons = [n.skeleton if isinstance(n, core.Mesh) else n for n in nl]
+    for n in neurons:
+        utils.eval_param(n, name="x", allowed_types=(core.Skeleton,))
+
+    table = _sholl_table(neurons, radii, center, geodesic)
+    table["neuron"] = np.asarray(nl.id)[table.neuron.values]
+    return table
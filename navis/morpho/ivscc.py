@@ -16,11 +16,13 @@ import numpy as np
 
 
 from abc import ABC, abstractmethod
-from itertools import combinations, permutations
+from typing import Optional
+from itertools import permutations
 from scipy.stats import wasserstein_distance
 
 from .. import config, core, utils
 from .angles import _angle_between
+from .mmetrics import _segment_sums
 from .subset import subset_neuron
 
 # Set up logging
@@ -78,25 +80,126 @@ def _mean(values):
     return float(values.mean()) if values.size else np.nan
 
 
-def _parent_dist(neuron):
-    """Distance from each node to its parent (`0` for roots)."""
-    nodes = neuron.nodes
-    return utils.fastcore.dag.parent_dist(
-        nodes.node_id.values,
-        nodes.parent_id.values,
-        nodes[["x", "y", "z"]].values,
-        root_dist=0,
-    )
+class Arbor:
+    """Node arrays of a neuron - or of one compartment - and what derives from them.
 
+    Feature groups used to work on Skeletons: every compartment was subset out
+    into a neuron of its own (copying its node table, classifying its nodes,
+    ...) and every group then re-derived parent distances, branch points and
+    segments from that. An `Arbor` is just the arrays, and each derived one is
+    computed on first use and then shared by every feature that needs it.
 
-def _node_pos(neuron):
-    """Map node IDs to their positional index in the node table."""
-    return pd.Series(
-        np.arange(len(neuron.nodes)), index=neuron.nodes.node_id.values
-    )
+    A compartment is a mask over the whole neuron's nodes (see `subset`). As in
+    [`navis.subset_neuron`][], nodes whose parent falls outside the mask become
+    roots. Node order is that of the node table.
+
+    Attributes
+    ----------
+    node_ids :      (N, ) array
+    parent_ids :    (N, ) array
+                    `-1` for roots.
+    coords :        (N, 3) array
+    radius :        (N, ) array | None
+                    `None` if the node table has no `radius` column.
+    rows :          (N, ) int array
+                    Rows of these nodes in the whole neuron's node table.
+    parent_row :    (N, ) int array
+                    Row of each node's parent in these arrays (`-1` for roots).
+
+    """
+
+    def __init__(self, nodes: pd.DataFrame):
+        self.node_ids = nodes.node_id.values
+        self.coords = nodes[["x", "y", "z"]].values
+        self.radius = nodes.radius.values if "radius" in nodes.columns else None
+        self.rows = np.arange(len(nodes))
+        self.parent_row = pd.Index(self.node_ids).get_indexer(nodes.parent_id.values)
+        self.parent_ids = np.where(self.parent_row >= 0, nodes.parent_id.values, -1)
+
+        # The arbor this one was subset from - see `subset`
+        self._whole = None
+        self._pdist = None
+        self._n_children = None
+        self._types = None
+        self._segments = None
+
+    def __len__(self):
+        return len(self.node_ids)
+
+    def subset(self, mask: np.ndarray) -> "Arbor":
+        """The nodes in `mask` (a boolean mask over this arbor) as an arbor."""
+        sub = object.__new__(Arbor)
+        sub.rows = self.rows[mask]
+        sub.node_ids = self.node_ids[mask]
+        sub.coords = self.coords[mask]
+        sub.radius = None if self.radius is None else self.radius[mask]
+
+        # Parents that are not in the subset make their children roots
+        new_row = np.full(len(self), -1)
+        new_row[mask] = np.arange(mask.sum())
+        parent_row = self.parent_row[mask]
+        sub.parent_row = np.where(parent_row >= 0, new_row[parent_row], -1)
+        sub.parent_ids = np.where(sub.parent_row >= 0, self.parent_ids[mask], -1)
+
+        sub._whole = (self, mask)
+        sub._pdist = None
+        sub._n_children = None
+        sub._types = None
+        sub._segments = None
+        return sub
+
+    @property
+    def pdist(self) -> np.ndarray:
+        """Distance from each node to its parent (`0` for roots)."""
+        if self._pdist is None:
+            if self._whole is not None:
+                # Same as the whole arbor's, except for the new roots
+                whole, mask = self._whole
+                self._pdist = np.where(self.parent_row >= 0, whole.pdist[mask], 0)
+            else:
+                self._pdist = utils.fastcore.dag.parent_dist(
+                    self.node_ids, self.parent_ids, self.coords, root_dist=0
+                )
+        return self._pdist
+
+    @property
+    def n_children(self) -> np.ndarray:
+        """Number of children of each node."""
+        if self._n_children is None:
+            has_parent = self.parent_row >= 0
+            self._n_children = np.bincount(
+                self.parent_row[has_parent], minlength=len(self)
+            )
+        return self._n_children
+
+    @property
+    def types(self) -> np.ndarray:
+        """Node types as fastcore codes: 0 = root, 1 = leaf, 2 = branch, 3 = slab."""
+        if self._types is None:
+            self._types = utils.fastcore.classify_nodes(self.node_ids, self.parent_ids)
+        return self._types
+
+    @property
+    def segments(self):
+        """The small segments, flattened: `(rows, offsets)`.
 
+        Segment `i` is `rows[offsets[i]:offsets[i + 1]]`, ordered distal ->
+        proximal - i.e. the parent of each node is the next one - as in
+        `navis.morpho.mmetrics._flat_segments`.
+        """
+        if self._segments is None:
+            segs = utils.fastcore.break_segments(self.node_ids, self.parent_ids)
+            offsets = np.zeros(len(segs) + 1, dtype=np.int64)
+            np.cumsum([len(s) for s in segs], out=offsets[1:])
+            if len(segs):
+                rows = pd.Index(self.node_ids).get_indexer(np.concatenate(segs))
+            else:
+                rows = np.zeros(0, dtype=np.int64)
+            self._segments = (rows, offsets)
+        return self._segments
 
-def _branch_nodes(neuron, exclude=None):
+
+def _branch_nodes(arbor, exclude=None):
     """Boolean mask of the nodes with 2+ children.
 
     Unlike the node table's `type` column this also flags *roots* with multiple
@@ -106,56 +209,36 @@ def _branch_nodes(neuron, exclude=None):
     the neurites leaving the soma are a different quantity, see
     [`navis.soma_exit_angles`][].
     """
-    nodes = neuron.nodes
-    parent_ids = nodes.parent_id.values
-    has_parent = parent_ids >= 0
-
-    n_childs = np.bincount(
-        _node_pos(neuron).loc[parent_ids[has_parent]].values, minlength=len(nodes)
-    )
-    mask = n_childs >= 2
+    mask = arbor.n_children >= 2
 
     if exclude is not None:
-        mask &= nodes.node_id.values != exclude
+        mask &= arbor.node_ids != exclude
 
     return mask
 
 
-def _segment_metrics(neuron, pdist):
+def _segment_metrics(arbor):
     """Geodesic length `L` and end-to-end distance `R` for each small segment.
 
-    `.small_segments` come back ordered distal -> proximal, i.e. the parent of
-    `seg[i]` is `seg[i + 1]`. The geodesic length is therefore the sum of the
-    parent distances of all but the last (proximal) node.
+    Segments come ordered distal -> proximal, i.e. the parent of `seg[i]` is
+    `seg[i + 1]`. The geodesic length is therefore the sum of the parent
+    distances of all but the last (proximal) node - single-node segments (which
+    can occur for isolated fragments) contribute no cable at all.
     """
-    segments = neuron.small_segments
-    if not len(segments):
+    rows, offsets = arbor.segments
+    if not len(rows):
         return np.zeros(0), np.zeros(0)
 
-    pos = _node_pos(neuron)
-    coords = neuron.nodes[["x", "y", "z"]].values
-
-    # Number of edges contributed by each segment. Single-node segments (which
-    # can occur for isolated fragments) contribute no cable at all.
-    counts = np.array([len(s) - 1 for s in segments])
-    flat = np.concatenate([np.asarray(s)[:-1] for s in segments])
-    if len(flat):
-        L = np.bincount(
-            np.repeat(np.arange(len(segments)), counts),
-            weights=pdist[pos.loc[flat].values].astype(np.float64),
-            minlength=len(segments),
-        )
-    else:
-        L = np.zeros(len(segments))
+    L = _segment_sums(arbor.pdist, rows, offsets)
 
-    starts = coords[pos.loc[[s[0] for s in segments]].values]
-    ends = coords[pos.loc[[s[-1] for s in segments]].values]
+    starts = arbor.coords[rows[offsets[:-1]]]
+    ends = arbor.coords[rows[offsets[1:] - 1]]
     R = np.linalg.norm(starts - ends, axis=1)
 
     return L, R
 
 
-def _bifurcation_angles(neuron, exclude=None, degrees=True):
+def _bifurcation_angles(arbor, exclude=None, degrees=True):
     """Local and remote bifurcation angles.
 
     At each branch point we measure the angle between its child branches, once
@@ -168,40 +251,49 @@ def _bifurcation_angles(neuron, exclude=None, degrees=True):
     -------
     local, remote : (N, ) arrays
     """
-    # Group segments by their proximal end - a node with 2+ segments hanging
-    # off it is a branch point
-    by_prox = {}
-    for s in neuron.small_segments:
-        if len(s) < 2:
-            continue
-        by_prox.setdefault(s[-1], []).append(s)
-
-    # Collect (branch point, near/far end of branch A, near/far end of branch B)
-    # for every pair of branches, then look up all coordinates in one go
-    pairs = []
-    for prox, segs in by_prox.items():
-        if len(segs) < 2 or prox == exclude:
-            continue
-        for i, j in combinations(range(len(segs)), 2):
-            pairs.append(
-                (prox, segs[i][-2], segs[i][0], segs[j][-2], segs[j][0])
-            )
+    rows, offsets = arbor.segments
+    lengths = np.diff(offsets)
+
+    # Each segment of 2+ nodes is a branch hanging off its proximal end: we
+    # need that end, the node next to it and the segment's distal end
+    keep = lengths >= 2
+    prox = rows[offsets[1:][keep] - 1]
+    near = rows[offsets[1:][keep] - 2]
+    far = rows[offsets[:-1][keep]]
+    if exclude is not None:
+        not_excl = arbor.node_ids[prox] != exclude
+        prox, near, far = prox[not_excl], near[not_excl], far[not_excl]
 
-    if not pairs:
+    # Group the branches by their proximal end - in order of first appearance,
+    # and segment order within - and pair up the branches of each group
+    _, first, inv, counts = np.unique(
+        prox, return_index=True, return_inverse=True, return_counts=True
+    )
+    order = np.lexsort((np.arange(len(prox)), first[inv]))
+    group_size = counts[np.argsort(first)]
+    group_start = np.cumsum(group_size) - group_size
+
+    a, b, rank = [], [], []
+    for k in np.unique(group_size[group_size >= 2]):
+        i, j = np.triu_indices(k, 1)
+        starts = group_start[group_size == k]
+        a.append((starts[:, None] + i).ravel())
+        b.append((starts[:, None] + j).ravel())
+        rank.append(np.repeat(starts, len(i)))
+
+    if not a:
         return np.zeros(0), np.zeros(0)
 
-    pairs = np.asarray(pairs)
-    coords = neuron.nodes.set_index("node_id")[["x", "y", "z"]]
-    origin = coords.reindex(pairs[:, 0]).values
+    # Pairs ordered by group (a stable sort keeps the within-group order)
+    rank = np.concatenate(rank)
+    by_group = np.argsort(rank, kind="stable")
+    a = order[np.concatenate(a)[by_group]]
+    b = order[np.concatenate(b)[by_group]]
 
-    local = _angle_between(
-        coords.reindex(pairs[:, 1]).values - origin,
-        coords.reindex(pairs[:, 3]).values - origin,
-    )
-    remote = _angle_between(
-        coords.reindex(pairs[:, 2]).values - origin,
-        coords.reindex(pairs[:, 4]).values - origin,
-    )
+    coords = arbor.coords
+    origin = coords[prox[a]]
+    local = _angle_between(coords[near[a]] - origin, coords[near[b]] - origin)
+    remote = _angle_between(coords[far[a]] - origin, coords[far[b]] - origin)
 
     if degrees:
         local, remote = np.degrees(local), np.degrees(remote)
@@ -209,35 +301,31 @@ def _bifurcation_angles(neuron, exclude=None, degrees=True):
     return local, remote
 
 
-def _branch_orders(neuron, branches):
+def _branch_orders(arbor, branches):
     """Branch order for every node - `1` at the root, `+1` at each branch point."""
-    nodes = neuron.nodes
-    node_ids = nodes.node_id.values
-    parent_ids = nodes.parent_id.values
-
     # Weight each child -> parent edge by whether the *parent* is a branch
     # point. The distance to the root is then simply the number of branch
     # points passed on the way there.
-    weights = np.zeros(len(node_ids), dtype=np.float64)
-    has_parent = parent_ids >= 0
-    weights[has_parent] = branches[_node_pos(neuron).loc[parent_ids[has_parent]].values]
+    weights = np.zeros(len(arbor), dtype=np.float64)
+    has_parent = arbor.parent_row >= 0
+    weights[has_parent] = branches[arbor.parent_row[has_parent]]
 
-    orders = utils.fastcore.dag.dist_to_root(node_ids, parent_ids, weights=weights)
+    orders = utils.fastcore.dag.dist_to_root(
+        arbor.node_ids, arbor.parent_ids, weights=weights
+    )
 
-    return pd.Series(orders + 1, index=node_ids)
+    return np.asarray(orders) + 1
 
 
-def _surface_and_volume(neuron, pdist):
+def _surface_and_volume(arbor):
     """Lateral surface area and volume of the cable, modelled as tapered cylinders."""
-    nodes = neuron.nodes
-    not_root = nodes.parent_id.values >= 0
+    not_root = arbor.parent_row >= 0
     if not not_root.any():
         return 0.0, 0.0
 
-    radii = nodes.set_index("node_id").radius
-    r1 = radii.reindex(nodes.node_id.values[not_root]).values.astype(np.float64)
-    r2 = radii.reindex(nodes.parent_id.values[not_root]).values.astype(np.float64)
-    h = pdist[not_root].astype(np.float64)
+    r1 = arbor.radius[not_root].astype(np.float64)
+    r2 = arbor.radius[arbor.parent_row[not_root]].astype(np.float64)
+    h = arbor.pdist[not_root].astype(np.float64)
 
     surface = (np.pi * (r1 + r2) * np.sqrt((r1 - r2) ** 2 + h**2)).sum()
     volume = (np.pi / 3 * (r1**2 + r1 * r2 + r2**2) * h).sum()
@@ -251,6 +339,8 @@ class NeuronContext:
     Rerooting the neuron and measuring the distance from every node to the soma
     are the expensive parts of the IVSCC pipeline. Building this context once
     per neuron - instead of once per feature class - keeps them to a single pass.
+    The same goes for the node arrays of the neuron and its compartments (see
+    `arbor` and `compartment`), from which the feature classes work.
 
     Attributes
     ----------
@@ -280,6 +370,8 @@ class NeuronContext:
 
         self._dist_to_root = None
         self._has_radii = None
+        self._arbor = None
+        self._compartments = {}
 
         if soma is None:
             self.soma_pos = None
@@ -318,16 +410,33 @@ class NeuronContext:
     def dist_to_root(self) -> pd.Series:
         """Geodesic distance from each node to the root (i.e. the soma)."""
         if self._dist_to_root is None:
-            nodes = self.neuron.nodes
-            node_ids = nodes.node_id.values
+            arbor = self.arbor
             dists = utils.fastcore.dag.dist_to_root(
-                node_ids,
-                nodes.parent_id.values,
-                weights=_parent_dist(self.neuron),
+                arbor.node_ids, arbor.parent_ids, weights=arbor.pdist
             )
-            self._dist_to_root = pd.Series(dists, index=node_ids)
+            self._dist_to_root = pd.Series(dists, index=arbor.node_ids)
         return self._dist_to_root
 
+    @property
+    def arbor(self) -> Arbor:
+        """The whole neuron's node arrays."""
+        if self._arbor is None:
+            self._arbor = Arbor(self.neuron.nodes)
+        return self._arbor
+
+    def compartment(self, compartment) -> Arbor:
+        """The node arrays of one compartment (by name or label ID).
+
+        Built on first use and shared by every feature class that asks for it.
+        Empty if the neuron has no such compartment.
+        """
+        compartment = label_to_comp.get(compartment, compartment)
+        if compartment not in self._compartments:
+            self._compartments[compartment] = self.arbor.subset(
+                _compartment_mask(self.neuron.nodes, compartment)
+            )
+        return self._compartments[compartment]
+
 
 class Features(ABC):
     """Base class for a group of IVSCC features.
@@ -340,6 +449,9 @@ class Features(ABC):
     def __init__(self, ctx: "NeuronContext", label=None):
         self.ctx = ctx
         self.neuron = ctx.neuron
+        # What the features are computed from - the whole neuron here, a
+        # compartment in `CompartmentFeatures`
+        self.arbor = ctx.arbor
         self.verbose = ctx.verbose
 
         if label is None:
@@ -369,7 +481,7 @@ class Features(ABC):
 
     def _warn(self, msg):
         if self.verbose:
-            logger.warning(f"Neuron {self.neuron.id}: {msg}")
+            logger.warning(f"Neuron {self.ctx.neuron.id}: {msg}")
 
     @abstractmethod
     def extract_features(self) -> dict:
@@ -382,49 +494,48 @@ class BasicFeatures(Features):
 
     def extract_features(self):
         """Extract basic features."""
-        nodes = self.neuron.nodes
-        coords = nodes[["x", "y", "z"]].values
-        pdist = _parent_dist(self.neuron)
+        arbor = self.arbor
+        coords = arbor.coords
+        pdist = arbor.pdist
 
         # Branch points: note that for a compartment the subset's root can be a
         # branch point too, which the node table's `type` column would miss
-        branches = _branch_nodes(self.neuron, exclude=self.soma)
-        branch_ids = nodes.node_id.values[branches]
+        branches = _branch_nodes(arbor, exclude=self.soma)
 
         # Size
-        self.record_feature("num_nodes", len(nodes))
+        self.record_feature("num_nodes", len(arbor))
         self.record_feature("total_length", float(pdist.astype(np.float64).sum()))
         for axis, extent in zip("xyz", coords.max(axis=0) - coords.min(axis=0)):
             self.record_feature(f"extent_{axis}", float(extent))
 
         # Topology
-        self.record_feature("num_branches", len(self.neuron.small_segments))
+        self.record_feature("num_branches", len(arbor.segments[1]) - 1)
         self.record_feature("num_branch_points", int(branches.sum()))
-        self.record_feature("num_tips", int((nodes.type == "end").sum()))
+        self.record_feature("num_tips", int((arbor.types == 1).sum()))
         self.record_feature(
-            "max_branch_order", int(_branch_orders(self.neuron, branches).max())
+            "max_branch_order", int(_branch_orders(arbor, branches).max())
         )
 
         # Shape: contraction is the ratio of the end-to-end distance of a
         # segment to its geodesic length, i.e. the inverse of tortuosity. The
         # ratio can't exceed 1 - clip to absorb float32 rounding in `pdist`.
-        L, R = _segment_metrics(self.neuron, pdist)
+        L, R = _segment_metrics(arbor)
         with np.errstate(invalid="ignore", divide="ignore"):
             contraction = np.where(L > 0, np.minimum(R / L, 1), np.nan)
         self.record_feature("mean_contraction", _mean(contraction))
 
-        local, remote = _bifurcation_angles(self.neuron, exclude=self.soma)
+        local, remote = _bifurcation_angles(arbor, exclude=self.soma)
         self.record_feature("bifurcation_angle_local", _mean(local))
         self.record_feature("bifurcation_angle_remote", _mean(remote))
 
         # Radius-derived features
         if self.ctx.has_radii:
-            self.record_feature("mean_diameter", _mean(nodes.radius.values) * 2)
-            surface, volume = _surface_and_volume(self.neuron, pdist)
+            self.record_feature("mean_diameter", _mean(arbor.radius) * 2)
+            surface, volume = _surface_and_volume(arbor)
             self.record_feature("total_surface", surface)
             self.record_feature("total_volume", volume)
             self.record_feature(
-                "parent_daughter_ratio", self._parent_daughter_ratio(branch_ids)
+                "parent_daughter_ratio", self._parent_daughter_ratio(branches)
             )
         else:
             self._warn("no usable radii, skipping radius-based features.")
@@ -435,30 +546,19 @@ class BasicFeatures(Features):
 
         # x/y bias from soma: how lopsided the arbor is around the soma.
         # Note: this is absolute for x and relative for y
+        x, y = coords[:, 0], coords[:, 1]
         self.record_feature(
             "bias_x",
-            float(
-                abs(
-                    (nodes.x.max() - self.soma_pos[0])
-                    - (self.soma_pos[0] - nodes.x.min())
-                )
-            ),
+            float(abs((x.max() - self.soma_pos[0]) - (self.soma_pos[0] - x.min()))),
         )
         self.record_feature(
             "bias_y",
-            float(
-                (nodes.y.max() - self.soma_pos[1])
-                - (self.soma_pos[1] - nodes.y.min())
-            ),
+            float((y.max() - self.soma_pos[1]) - (self.soma_pos[1] - y.min())),
         )
 
         # Fraction of nodes above the soma
-        self.record_feature(
-            "soma_percentile_x", float((nodes.x.values > self.soma_pos[0]).mean())
-        )
-        self.record_feature(
-            "soma_percentile_y", float((nodes.y.values > self.soma_pos[1]).mean())
-        )
+        self.record_feature("soma_percentile_x", float((x > self.soma_pos[0]).mean()))
+        self.record_feature("soma_percentile_y", float((y > self.soma_pos[1]).mean()))
 
         # Distances from soma
         self.record_feature(
@@ -468,41 +568,40 @@ class BasicFeatures(Features):
         # Note: distances to root are measured on the full neuron, so for a
         # compartment this is the path length from the soma - not the length of
         # the path within the compartment
-        max_path_length = float(
-            self.ctx.dist_to_root.reindex(nodes.node_id.values).max()
-        )
+        dist = self.ctx.dist_to_root.values[arbor.rows]
+        max_path_length = float(dist.max())
         self.record_feature("max_path_length", max_path_length)
 
         # How early the first branch point occurs, relative to the arbor's reach
         self.record_feature(
-            "early_branch_path", self._early_branch_path(branch_ids, max_path_length)
+            "early_branch_path",
+            self._early_branch_path(dist[branches], max_path_length),
         )
 
         return self.features
 
-    def _parent_daughter_ratio(self, branch_ids):
+    def _parent_daughter_ratio(self, branches):
         """Mean ratio of daughter to parent radius across branch points."""
-        nodes = self.neuron.nodes
-        daughters = nodes[nodes.parent_id.isin(branch_ids)]
+        arbor = self.arbor
+        has_parent = arbor.parent_row >= 0
+        daughters = np.where(has_parent)[0]
+        daughters = daughters[branches[arbor.parent_row[daughters]]]
 
-        if daughters.empty:
+        if not len(daughters):
             return np.nan
 
-        radii = nodes.set_index("node_id").radius
         with np.errstate(invalid="ignore", divide="ignore"):
             ratio = (
-                radii.reindex(daughters.node_id.values).values
-                / radii.reindex(daughters.parent_id.values).values
+                arbor.radius[daughters] / arbor.radius[arbor.parent_row[daughters]]
             )
         return _mean(ratio)
 
-    def _early_branch_path(self, branch_ids, max_path_length):
+    def _early_branch_path(self, branch_dists, max_path_length):
         """Path length to the first branch point over the maximum path length."""
-        if not len(branch_ids) or not max_path_length > 0:
+        if not len(branch_dists) or not max_path_length > 0:
             return np.nan
 
-        first = float(self.ctx.dist_to_root.reindex(branch_ids).min())
-        return first / max_path_length
+        return float(branch_dists.min()) / max_path_length
 
 
 class CompartmentFeatures(BasicFeatures):
@@ -510,7 +609,10 @@ class CompartmentFeatures(BasicFeatures):
 
     The compartment is extracted as a subset of the neuron but we keep a handle
     on the full neuron (via `self.ctx`) because some features are only defined
-    relative to the rest of the cell.
+    relative to the rest of the cell. The features themselves are computed from
+    the compartment's node arrays (`self.arbor`); `self.neuron` - the
+    compartment as a Skeleton of its own - is only built if something asks for
+    it.
     """
 
     # The compartment to extract - set by the subclasses below
@@ -533,8 +635,8 @@ class CompartmentFeatures(BasicFeatures):
                 "can't tell compartments apart."
             )
 
-        mask = _compartment_mask(ctx.neuron.nodes, compartment)
-        if not mask.any():
+        arbor = ctx.compartment(compartment)
+        if not len(arbor):
             raise CompartmentNotFoundError(
                 f"No {compartment} ({comp_to_label.get(compartment, compartment)}) "
                 f"compartments found in neuron {ctx.neuron.id}"
@@ -544,11 +646,27 @@ class CompartmentFeatures(BasicFeatures):
         super().__init__(ctx, label=compartment)
 
         self.compartment = compartment
+        self.arbor = arbor
         # Mask into the *full* node table - kept for the soma-relative features
-        self.mask = mask
-        # Now subset the neuron to this compartment. Note that node IDs survive
-        # this, so we can still index into the context's full-neuron measures.
-        self.neuron = subset_neuron(ctx.neuron, mask)
+        self.mask = np.zeros(len(ctx.arbor), dtype=bool)
+        self.mask[arbor.rows] = True
+        self._neuron = None
+
+    @property
+    def neuron(self) -> "core.Skeleton":
+        """The compartment as a neuron of its own.
+
+        Note that node IDs survive the subsetting, so they still index into the
+        context's full-neuron measures.
+        """
+        if self._neuron is None:
+            self._neuron = subset_neuron(self.ctx.neuron, self.mask)
+        return self._neuron
+
+    @neuron.setter
+    def neuron(self, value):
+        # `Features.__init__` sets the whole neuron - ours is the compartment
+        self._neuron = None if value is self.ctx.neuron else value
 
     def extract_features(self):
         # Extract basic features via the parent class
@@ -560,16 +678,16 @@ class CompartmentFeatures(BasicFeatures):
         # Number of stems, i.e. neurites of this compartment sprouting from the
         # soma. This has to be counted on the *full* neuron: in the subset the
         # soma is gone and the stems have been rewired into roots.
-        parents = self.ctx.neuron.nodes.parent_id.values
+        parents = self.ctx.arbor.parent_ids
         self.record_feature("num_stems", int((parents[self.mask] == self.soma).sum()))
 
         # Where this compartment leaves the soma. A compartment can have several
         # roots (multiple stems, or fragmentation), so we use the one closest to
         # the soma and measure both features at that same node.
-        roots = self.neuron.nodes[self.neuron.nodes.type == "root"]
-        dists = np.linalg.norm(roots[["x", "y", "z"]].values - self.soma_pos, axis=1)
+        roots = self.arbor.coords[self.arbor.types == 0]
+        dists = np.linalg.norm(roots - self.soma_pos, axis=1)
         closest = int(np.argmin(dists))
-        exit_node = roots.iloc[closest]
+        exit_x, exit_y = roots[closest, 0], roots[closest, 1]
 
         # Distance between the compartment's root and the soma *surface*. If we
         # don't know the soma radius we measure from its centre instead.
@@ -580,9 +698,7 @@ class CompartmentFeatures(BasicFeatures):
         self.record_feature(
             "exit_theta",
             float(
-                np.arctan2(
-                    exit_node.y - self.soma_pos[1], exit_node.x - self.soma_pos[0]
-                )
+                np.arctan2(exit_y - self.soma_pos[1], exit_x - self.soma_pos[0])
             ),
         )
 
@@ -619,7 +735,7 @@ class SomaFeatures(Features):
         self.record_feature("soma_surface", float(4 * np.pi * self.soma_radius**2))
 
         # Number of neurites leaving the soma (across all compartments)
-        parents = self.ctx.neuron.nodes.parent_id.values
+        parents = self.ctx.arbor.parent_ids
         self.record_feature("num_stems", int((parents == self.soma).sum()))
 
         return self.features
@@ -636,14 +752,12 @@ class OverlapFeatures(Features):
             self._warn("no 'label' column, skipping overlap features.")
             return self.features
 
-        nodes = self.ctx.neuron.nodes
-
         # Depth (y) of the nodes of each compartment that is actually present
         depth = {}
         for c in self.compartments:
-            mask = _compartment_mask(nodes, c)
-            if mask.any():
-                depth[c] = nodes.y.values[mask]
+            arbor = self.ctx.compartment(c)
+            if len(arbor):
+                depth[c] = arbor.coords[:, 1]
 
         for c1, c2 in permutations(depth, 2):
             y1, y2 = depth[c1], depth[c2]
@@ -682,6 +796,8 @@ def ivscc_features(
     missing_compartments: str = "ignore",
     verbose: bool = False,
     progress: bool = True,
+    parallel: bool = False,
+    n_cores: Optional[int] = None,
 ) -> pd.DataFrame:
     """Calculate IVSCC features for neuron(s).
 
@@ -725,6 +841,13 @@ def ivscc_features(
                             skipped (e.g. because a neuron has no soma).
     progress :              bool
                             Whether to show a progress bar.
+    parallel :              bool
+                            If True, distribute the neurons across multiple
+                            processes. See `navis.set_parallel_backend` for
+                            where they run.
+    n_cores :               int, optional
+                            Number of cores to use if `parallel=True`. Defaults
+                            to half the available cores.
 
     Returns
     -------
@@ -809,32 +932,60 @@ def ivscc_features(
     if features is None:
         features = DEFAULT_FEATURES
 
-    ids, rows = [], []
-    for n in config.tqdm(
-        x, desc="Calculating IVSCC features", disable=not progress or config.pbar_hide
-    ):
-        # Everything the feature classes share about this neuron
-        ctx = NeuronContext(n, verbose=verbose)
-
-        row, skip = {}, False
-        for feat in features:
-            try:
-                row.update(feat(ctx).extract_features())
-            except CompartmentNotFoundError as e:
-                if missing_compartments == "ignore":
-                    if verbose:
-                        logger.warning(str(e))
-                    continue
-                elif missing_compartments == "skip":
-                    if verbose:
-                        logger.warning(f"Skipping neuron {n.id}: {e}")
-                    skip = True
-                    break
-                else:
-                    raise
-
-        if not skip:
-            ids.append(n.id)
-            rows.append(row)
+    rows = _ivscc_row(
+        x,
+        features=features,
+        missing_compartments=missing_compartments,
+        verbose=verbose,
+        progress=progress,
+        parallel=parallel,
+        n_cores=n_cores,
+    )
+
+    # A run that produced nothing but `None` (every neuron skipped) comes back
+    # as a single `None`
+    rows = rows or [None] * len(x)
+    ids = [n.id for n, r in zip(x, rows) if r is not None]
+    rows = [r for r in rows if r is not None]
 
     return pd.DataFrame(rows, index=pd.Index(ids, name="id"))
+
+
+@utils.map_neuronlist(desc="Calculating IVSCC features", allow_parallel=True)
+def _ivscc_row(x, features, missing_compartments, verbose):
+    """IVSCC features of a single neuron - see `ivscc_features`.
+
+    Parameters
+    ----------
+    x :                     Skeleton
+    features :              Sequence[Features]
+    missing_compartments :  "ignore" | "skip" | "raise"
+    verbose :               bool
+
+    Returns
+    -------
+    dict | None
+                            Feature -> value, or `None` if the neuron is to be
+                            skipped.
+
+    """
+    # Everything the feature classes share about this neuron
+    ctx = NeuronContext(x, verbose=verbose)
+
+    row = {}
+    for feat in features:
+        try:
+            row.update(feat(ctx).extract_features())
+        except CompartmentNotFoundError as e:
+            if missing_compartments == "ignore":
+                if verbose:
+                    logger.warning(str(e))
+                continue
+            elif missing_compartments == "skip":
+                if verbose:
+                    logger.warning(f"Skipping neuron {x.id}: {e}")
+                return None
+            else:
+                raise
+
+    return row
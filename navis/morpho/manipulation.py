@@ -19,7 +19,7 @@ import numpy as np
 import sparsecubes
 import trimesh as tm
 
-from typing import Union, Optional, Sequence, List, Set, Callable
+from typing import Union, Optional, Sequence, List, Callable
 from typing_extensions import Literal
 
 import scipy.spatial
@@ -27,6 +27,7 @@ import scipy.spatial
 from . import mmetrics, subset
 from .. import graph, utils, config, core, _deprecated
 from ..core import schema
+from ..compute.scaling import declare_scaling
 
 # Set up logging
 logger = config.get_logger(__name__)
@@ -245,6 +246,7 @@ def prune_by_strahler(
 
     if "strahler_index" not in neuron.nodes or force_strahler_update:
         mmetrics.strahler_index(neuron)
+    schema.refresh_derived(neuron)
 
     # Prepare indices
     if isinstance(to_prune, int) and to_prune < 0:
@@ -760,6 +762,7 @@ def split_axon_dendrite(
     # Add metric if not already present
     if metric not in x.nodes.columns:
         _ = FUNCS[metric](x)
+    schema.refresh_derived(x)
 
     # We can lock this neuron indefinitely since we are not returning it
     x._lock = 1
@@ -770,30 +773,30 @@ def split_axon_dendrite(
 
     # The first step is to remove the linker -> that's the bit that connects
     # the axon and dendrite
-    is_linker = x.nodes[metric] >= x.nodes[metric].max() * flow_thresh
-    linker = set(x.nodes.loc[is_linker, "node_id"].values)
-
-    # We try to perform processing on the graph to avoid overhead from
-    # (re-)generating neurons. Note we work off the neuron's igraph: building the
-    # networkx graph (and then copying it via `to_undirected`) costs more than
-    # everything we do with it.
-    keep = x.nodes.node_id.values[~x.nodes.node_id.isin(linker).values]
-
-    # Break into connected components. As sets, because everything below works
-    # by unioning and subtracting them.
-    cc = [set(c.tolist()) for c in graph._component_ids(x, mask=keep)]
+    node_ids = x.nodes.node_id.values
+    is_linker = (x.nodes[metric] >= x.nodes[metric].max() * flow_thresh).values
+
+    # Break the rest into connected components. We keep them as a component
+    # label per node (-1 for the linker) and everything below works off masks
+    # over the node table: per-component counts are a single `np.bincount`
+    # instead of one pass over all synapses per component - and a neuron with
+    # many little flow-free fragments has a lot of components.
+    labels, n_cc = graph.graph_utils._natural_component_labels(
+        x, None, None, ~is_linker
+    )
 
     # Figure out which one is which
-    axon = set()
-    dendrite = set()
+    is_axon = np.zeros(len(node_ids), dtype=bool)
+    is_dend = np.zeros(len(node_ids), dtype=bool)
     if split == "prepost":
         # Collect # of pre- and postsynapses on each of the connected components
         sm = pd.DataFrame()
-        sm["n_nodes"] = [len(c) for c in cc]
-        pre = x.presynapses
-        post = x.postsynapses
-        sm["n_pre"] = [pre[pre.node_id.isin(c)].shape[0] for c in cc]
-        sm["n_post"] = [post[post.node_id.isin(c)].shape[0] for c in cc]
+        sm["n_nodes"] = np.bincount(labels[labels >= 0], minlength=n_cc)
+        index = pd.Index(node_ids)
+        for col, cn in (("n_pre", x.presynapses), ("n_post", x.postsynapses)):
+            rows = index.get_indexer(cn.node_id.values)
+            cn_labels = labels[rows[rows >= 0]]
+            sm[col] = np.bincount(cn_labels[cn_labels >= 0], minlength=n_cc)
         sm["prepost_ratio"] = sm.n_pre / sm.n_post
         sm["frac_post"] = sm.n_post / sm.n_post.sum()
         sm["frac_pre"] = sm.n_pre / sm.n_pre.sum()
@@ -824,65 +827,58 @@ def split_axon_dendrite(
         # of flow:
         # - prepost < 1 = dendritic
         # - prepost > 1 = axonic
-        dendrite = [cc[i] for i in sm[sm.frac_prepost < split_val].index.values]
-        if len(dendrite):
-            dendrite = set.union(*dendrite)
-        axon = [cc[i] for i in sm[sm.frac_prepost >= split_val].index.values]
-        if len(axon):
-            axon = set.union(*axon)
+        is_dend = np.isin(labels, sm.index.values[sm.frac_prepost < split_val])
+        is_axon = np.isin(labels, sm.index.values[sm.frac_prepost >= split_val])
     else:
-        for c in cc:
-            # If original root present assume it's the proximal dendrites
-            if x.root[0] in c:
-                dendrite = c
-            else:
-                axon = axon | c
+        # If original root present assume it's the proximal dendrites
+        root_label = labels[node_ids == x.root[0]][0]
+        is_dend = (labels == root_label) & (labels >= 0)
+        is_axon = (labels >= 0) & ~is_dend
 
     # Now that we have in principle figured out what's what we need to do some
     # clean-up
     # First: it is quite likely that the axon(s) and/or the dendrites fragmented
     # and we need to stitch them back together using linker but not dendrites!
-    g = graph.subset_igraph(x, np.append(list(axon), list(linker)))
-    axon = set(graph.connecting_nodes(g, axon)[0])
+    g = graph.subset_igraph(x, node_ids[is_axon | is_linker])
+    is_axon = np.isin(node_ids, graph.connecting_nodes(g, node_ids[is_axon])[0])
 
     # Remove nodes that were re-assigned to axon from linker
-    linker = linker - axon
+    is_linker &= ~is_axon
 
-    g = graph.subset_igraph(x, np.append(list(dendrite), list(linker)))
-    dendrite = set(graph.connecting_nodes(g, dendrite)[0])
+    g = graph.subset_igraph(x, node_ids[is_dend | is_linker])
+    is_dend = np.isin(node_ids, graph.connecting_nodes(g, node_ids[is_dend])[0])
 
-    # Remove nodes that were re-assigned to axon from linker
-    linker = linker - set(dendrite)
+    # Remove nodes that were re-assigned to dendrite from linker
+    is_linker &= ~is_dend
 
     # Next up: finding the CBF
     # The CBF is defined as the part of the neuron between the soma (or root)
     # and the first branch point with sizeable synapse flow
-    cbf = set()
+    is_cbf = np.zeros(len(node_ids), dtype=bool)
     if cellbodyfiber and (np.any(x.soma) or cellbodyfiber == "root"):
         # To excise the CBF, we subset the neuron to those parts with
         # no/hardly any flow and find the part that contains the soma
-        no_flow = x.nodes[x.nodes[metric] <= x.nodes[metric].max() * 0.05]
-
-        # Find the connected component containing the soma. As sets, matching
-        # `cc` above - everything here is set arithmetic on node IDs.
-        for c in graph._component_ids(x, mask=no_flow.node_id.values):
-            cbf = set(c.tolist())
-            if x.root[0] in cbf:
-                dendrite = dendrite - cbf
-                axon = axon - cbf
-                linker = linker - cbf
-                break
-            cbf = set()
+        no_flow = (x.nodes[metric] <= x.nodes[metric].max() * 0.05).values
+        cbf_labels, _ = graph.graph_utils._natural_component_labels(
+            x, None, None, no_flow
+        )
+        root_label = cbf_labels[node_ids == x.root[0]][0]
+        if root_label >= 0:
+            is_cbf = cbf_labels == root_label
+            is_dend &= ~is_cbf
+            is_axon &= ~is_cbf
+            is_linker &= ~is_cbf
 
     # See if we lost any nodes on the way
-    miss = set(original.nodes.node_id.values) - linker - axon - dendrite - cbf
-    miss = np.array(list(miss))
+    assigned = node_ids[is_linker | is_axon | is_dend | is_cbf]
+    miss = original.nodes.node_id.values
+    miss = miss[~np.isin(miss, assigned)]
 
     # From hereon we can use lists
-    linker = list(linker)
-    axon = list(axon)
-    cbf = list(cbf)
-    dendrite = list(dendrite)
+    linker = node_ids[is_linker].tolist()
+    axon = node_ids[is_axon].tolist()
+    cbf = node_ids[is_cbf].tolist()
+    dendrite = node_ids[is_dend].tolist()
 
     # If we have, assign these nodes to the closest node with a compartment
     if len(miss):
@@ -1066,15 +1062,10 @@ def split_axon_dendrite_prop(
         else:
             pre_nodes = np.array([], dtype=int)
 
-        pre_nodes_unique, pre_count = np.unique(pre_nodes, return_counts=True)
-        post_nodes_unique, post_count = np.unique(post_nodes, return_counts=True)
-
+        # Synapses per node/vertex
         n = len(x.nodes) if isinstance(x, core.Skeleton) else len(x.vertices)
-        pre_weights = np.zeros(n, dtype=np.float32)
-        post_weights = np.zeros(n, dtype=np.float32)
-
-        pre_weights[pre_nodes_unique] = pre_count
-        post_weights[post_nodes_unique] = post_count
+        pre_weights = np.bincount(pre_nodes, minlength=n).astype(np.float32)
+        post_weights = np.bincount(post_nodes, minlength=n).astype(np.float32)
 
         # Create label array
         prepost = np.full(n, np.nan, dtype=object)
@@ -1370,107 +1361,100 @@ def stitch_skeletons(
     # Compile list of individual neurons
     neurons = utils.unpack_neurons(x)
 
-    # Use copies of the original neurons!
-    nl = core.NeuronList(neurons).copy()
+    nl = core.NeuronList(neurons)
 
     if len(nl) < 2:
         logger.warning(f"Need at least 2 neurons to stitch, found {len(nl)}")
-        return nl[0]
+        return nl[0].copy()
 
     # `max_dist` may be given as a unit string, e.g. "2 microns"
     if max_dist is not None:
         max_dist = nl[0].map_units(max_dist, on_error="raise")
 
-    # If no soma, switch to largest
-    if master == "SOMA" and not any(nl.has_soma):
-        master = "LARGEST"
-
     # First find master
+    m_ix = 0  # "FIRST": pick the first neuron
     if master == "SOMA":
-        # Pick the first neuron with a soma
-        m_ix = [i for i, n in enumerate(nl) if n.has_soma][0]
-    elif master == "LARGEST":
-        # Pick the largest neuron
-        m_ix = sorted(list(range(len(nl))), key=lambda x: nl[x].n_nodes, reverse=True)[
-            0
-        ]
-    else:
-        # Pick the first neuron
-        m_ix = 0
-    m = nl[m_ix]
-
-    # Check if we need to make any node IDs unique
-    if nl.nodes.duplicated(subset="node_id").sum() > 0:
-        # Master neuron will not be changed
-        seen_tn: Set[int] = set(m.nodes.node_id)
-        for i, n in enumerate(nl):
-            # Skip the master neuron
-            # Note we're using the index in case we have two neurons that are
-            # equal (by our definition) - happens e.g. if a neuron has been
-            # mirrored
-            if i == m_ix:
-                continue
-
-            # Grab nodes
-            this_tn = set(n.nodes.node_id)
-
-            # Get duplicate node IDs
-            non_unique = seen_tn & this_tn
-
-            # Add this neuron's existing nodes to seen
-            seen_tn = seen_tn | this_tn
-            if non_unique:
-                # Generate new, unique node IDs
-                new_tn = np.arange(0, len(non_unique)) + max(seen_tn) + 1
-
-                # Generate new map
-                new_map = dict(zip(non_unique, new_tn))
-
-                # Remap node IDs - if no new value, keep the old
-                n.nodes["node_id"] = n.nodes.node_id.map(lambda x: new_map.get(x, x))
-
-                if n.has_connectors:
-                    n.connectors["node_id"] = n.connectors.node_id.map(
-                        lambda x: new_map.get(x, x)
-                    )
-
-                if getattr(n, "tags", None) is not None:
-                    n.tags = {new_map.get(k, k): v for k, v in n.tags.items()}  # type: ignore
-
-                # Remap parent IDs
-                new_map[None] = -1  # type: ignore
-                n.nodes["parent_id"] = n.nodes.parent_id.map(
-                    lambda x: new_map.get(x, x)
-                ).astype(int)
-
-                # Add new nodes to seen
-                seen_tn = seen_tn | set(new_tn)
-
-                # Make sure the graph is updated
-                n._clear_temp_attr()
+        # Pick the first neuron with a soma. Finding a soma is not free, so we
+        # stop at the first one; if there is none, switch to largest
+        m_ix = next((i for i, n in enumerate(nl) if n.has_soma), None)
+        if m_ix is None:
+            master = "LARGEST"
+    if master == "LARGEST":
+        # Pick the largest neuron (the first one on ties)
+        m_ix = int(np.argmax([n.n_nodes for n in nl]))
+
+    # Only the master is copied: everything else goes into the combined tables
+    # straight from the fragments, which stay untouched - so there is no need
+    # to pay for a copy of every one of them.
+    m = nl[m_ix].copy()
+    frags = [m if i == m_ix else n for i, n in enumerate(nl)]
 
     # We will start by simply merging all neurons into one
     nodes = pd.concat(
-        [n.nodes for n in nl],  # type: ignore  # no stubs for concat
+        [n.nodes for n in frags],  # type: ignore  # no stubs for concat
         ignore_index=True,
     )
+    frag_ix = np.repeat(np.arange(len(frags)), [len(n.nodes) for n in frags])
+
+    # Check if we need to make any node IDs unique. A node ID already used by
+    # an earlier fragment - the master counts as first, so it never changes -
+    # gets a new one, and so do its fragment's references to it. That is one
+    # pass over all nodes rather than a set of seen IDs grown fragment by
+    # fragment, which is quadratic in the number of fragments.
+    node_ids = nodes.node_id.values
+    first = np.argsort(np.where(frag_ix == m_ix, -1, frag_ix), kind="stable")
+    dup = np.zeros(len(nodes), dtype=bool)
+    dup[first] = pd.Series(node_ids[first]).duplicated().values
+
+    if dup.any():
+        new_ids = np.arange(dup.sum()) + node_ids.max() + 1
+        remapped = pd.MultiIndex.from_arrays([frag_ix[dup], node_ids[dup]])
+
+        def remap(frag, ids):
+            ix = remapped.get_indexer(pd.MultiIndex.from_arrays([frag, ids]))
+            return np.where(ix >= 0, new_ids[ix], ids)
+
+        nodes["node_id"] = remap(frag_ix, node_ids)
+        nodes["parent_id"] = remap(frag_ix, nodes.parent_id.values)
+
     # The result is made of several neurons' elements, so data attached to the
     # master describes only some of them - and no correspondence says which.
     m._replacing("nodes", nodes)
     m._nodes = nodes
 
-    if any(nl.has_connectors):
-        m._connectors = pd.concat(
-            [n.connectors for n in nl],  # type: ignore  # no stubs for concat
+    with_cn = [i for i, n in enumerate(frags) if n.has_connectors]
+    if with_cn:
+        connectors = pd.concat(
+            [frags[i].connectors for i in with_cn],  # type: ignore
             ignore_index=True,
         )
+        if dup.any():
+            cn_frag = np.repeat(with_cn, [len(frags[i].connectors) for i in with_cn])
+            connectors["node_id"] = remap(cn_frag, connectors.node_id.values)
+        m._connectors = connectors
 
     if not m.has_tags or not isinstance(m.tags, dict):
         m.tags = {}  # type: ignore  # Skeleton has no tags
 
-    for n in nl:
-        for k, v in (getattr(n, "tags", None) or {}).items():
-            m.tags[k] = m.tags.get(k, []) + list(utils.make_iterable(v))
+    # Tags point to node IDs, so they follow the remapping too - collected
+    # first so that all of them are remapped in one go. The master's tags are
+    # already there.
+    tags = [
+        (i, k, list(utils.make_iterable(v)))
+        for i, n in enumerate(frags)
+        if i != m_ix
+        for k, v in (getattr(n, "tags", None) or {}).items()
+    ]
+    n_tagged = [len(v) for _, _, v in tags]
+    if sum(n_tagged) and dup.any():
+        ids = remap(
+            np.repeat([i for i, _, _ in tags], n_tagged),
+            np.concatenate([v for _, _, v in tags if len(v)]),
+        )
+        ids = np.split(ids, np.cumsum(n_tagged)[:-1])
+        tags = [(i, k, v.tolist()) for (i, k, _), v in zip(tags, ids)]
+    for _, k, v in tags:
+        m.tags[k] = m.tags.get(k, []) + v
 
     # Reset temporary attributes of our final neuron
     m._clear_temp_attr()
@@ -1486,11 +1470,12 @@ def stitch_skeletons(
     else:
         nodes, mask = method, None
 
+    # `m` is our own copy, so there is no need for another
     return _stitch_mst(
         m,
         nodes=nodes,
         mask=mask,
-        inplace=False,
+        inplace=True,
         max_dist=max_dist,
         min_size=min_size,
         use_radius=use_radius,
@@ -2084,6 +2069,10 @@ def split_components(
     )
 
 
+# Nearly all of the time goes into fastcore's threaded MST: a few big neurons
+# are better off with fewer workers and more threads. Conservative - run
+# `navis.compute.calibrate` to measure it on your machine.
+@declare_scaling(0.8)
 @utils.map_neuronlist(desc="Healing", allow_parallel=True)
 @_deprecated.renamed_kwargs(drop_disc="keep_largest")
 def heal_skeleton(
@@ -15,17 +15,15 @@
 """This module contains functions to analyse and manipulate neuron morphology."""
 
 import math
-import itertools
-import scipy
 import warnings
 
 import pandas as pd
 import numpy as np
 
-from typing import Union, Optional, Sequence
+from typing import Union, Optional, Sequence, Tuple
 from typing_extensions import Literal
 
-from .. import config, graph, sampling, core, utils, _deprecated
+from .. import config, graph, core, utils, _deprecated
 
 # Set up logging
 logger = config.get_logger(__name__)
@@ -81,6 +79,90 @@ def _component_counts(
     return comp.loc[index].map(per_frag).fillna(0).astype(int)
 
 
+def _parent_index(x: "core.Skeleton") -> Tuple[np.ndarray, np.ndarray]:
+    """Row of each node's parent (-1 for roots) and each node's number of children."""
+    parent = pd.Index(x.nodes.node_id.values).get_indexer(x.nodes.parent_id.values)
+    n_children = np.bincount(parent[parent >= 0], minlength=len(parent))
+    return parent, n_children
+
+
+def _follow(step: np.ndarray) -> np.ndarray:
+    """Follow `step` pointers to where they stop (`step[i] == i`).
+
+    By pointer doubling, i.e. in log2 of the longest run vectorised steps.
+    """
+    for _ in range(int(np.log2(max(len(step), 1))) + 2):
+        jumped = step[step]
+        if np.array_equal(jumped, step):
+            return step
+        step = jumped
+    raise ValueError("Neuron must not have cycles")
+
+
+def _distal_start(
+    parent: np.ndarray, n_children: np.ndarray, stop: np.ndarray
+) -> np.ndarray:
+    """For each node, the row where the unbranched run through it starts.
+
+    That is the first node distal to it (or itself) that is a leaf, has more
+    than one child or is in `stop`.
+    """
+    step = np.arange(len(parent))
+    child = np.flatnonzero(parent >= 0)
+    only = child[(n_children[parent[child]] == 1) & ~stop[parent[child]]]
+    step[parent[only]] = only
+    return _follow(step)
+
+
+def _proximal_stop(parent: np.ndarray, stop: np.ndarray) -> np.ndarray:
+    """For each node, the row of the closest node in `stop` at or proximal to it.
+
+    Roots must be in `stop`.
+    """
+    return _follow(np.where(stop, np.arange(len(parent)), parent))
+
+
+def _max_of_children(
+    values: np.ndarray, parent: np.ndarray, which: np.ndarray
+) -> np.ndarray:
+    """For the nodes in `which`, the maximum of their children's `values`."""
+    child = np.flatnonzero(parent >= 0)
+    child = child[which[parent[child]]]
+    top = values.copy()
+    top[which] = np.iinfo(np.int64).min
+    np.maximum.at(top, parent[child], values[child])
+    return top
+
+
+def _subtree_sums(
+    node_ids: np.ndarray, parent_ids: np.ndarray, weights: np.ndarray
+) -> np.ndarray:
+    """Sum of (non-negative integer) `weights` at or distal to each node.
+
+    `descendant_counts` counts nodes rather than adding weights up. Counting the
+    nodes that have each bit of their weight set and adding those counts up
+    bit by bit gets the sums from it all the same: one O(N) pass per bit.
+    """
+    weights = np.asarray(weights, dtype=np.int64)
+    sums = weights.copy()
+    for bit in range(int(weights.max(initial=0)).bit_length()):
+        has = ((weights >> bit) & 1).astype(bool)
+        below = utils.fastcore.descendant_counts(
+            node_ids, parent_ids, targets=node_ids[has]
+        )
+        sums += below.astype(np.int64) << bit
+    return sums
+
+
+def _synapse_counts(x: "core.Skeleton", kind) -> np.ndarray:
+    """Number of connectors of type `kind` at each node, aligned with `x.nodes`."""
+    cn = x.connectors
+    rows = pd.Index(x.nodes.node_id.values).get_indexer(
+        cn.node_id.values[(cn.type == kind).values]
+    )
+    return np.bincount(rows[rows >= 0], minlength=len(x.nodes))
+
+
 def parent_dist(
     x: Union["core.Skeleton", pd.DataFrame], root_dist: Optional[int] = None
 ) -> None:
@@ -117,6 +199,46 @@ def parent_dist(
     )
 
 
+def _flat_segments(x: "core.Skeleton"):
+    """`x`'s small segments, flattened.
+
+    A list of arrays - one per segment - means a Python loop for everything
+    done per segment. Back to back in one array, per-segment sums, minima and
+    maxima are each a single `np.<ufunc>.reduceat` instead.
+
+    Returns
+    -------
+    rows :      (M, ) int array
+                Node table rows of all segments back to back, each segment
+                ordered distal -> proximal.
+    offsets :   (S + 1, ) int array
+                Segment `i` is `rows[offsets[i]:offsets[i + 1]]`. Segments have
+                at least one node, so offsets are strictly increasing - which is
+                what `reduceat` needs.
+
+    """
+    segs = x.small_segments
+    offsets = np.zeros(len(segs) + 1, dtype=np.int64)
+    np.cumsum([len(s) for s in segs], out=offsets[1:])
+    if not len(segs):
+        return np.zeros(0, dtype=np.int64), offsets
+    rows = pd.Index(x.nodes.node_id.values).get_indexer(np.concatenate(segs))
+    return rows, offsets
+
+
+def _segment_sums(values: np.ndarray, rows: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+    """Per-segment sum of a per-node edge property (e.g. parent distances).
+
+    The most proximal node of each segment is left out: its edge leads to the
+    parent *segment*.
+    """
+    if not len(rows):
+        return np.zeros(0)
+    v = values[rows].astype(np.float64)
+    v[offsets[1:] - 1] = 0
+    return np.add.reduceat(v, offsets[:-1])
+
+
 @utils.map_neuronlist(desc="Calc. SI", allow_parallel=True)
 @utils.meshneuron_skeleton(
     method="node_properties", reroot_soma=True, node_props=["strahler_index"]
@@ -192,9 +314,40 @@ def strahler_index(
     ).astype(np.int16)
     x.nodes["strahler_index"] = x.nodes.strahler_index.fillna(1)
 
+    # Lets edits update the column rather than leave it stale
+    core.schema.record_derived(
+        x,
+        "strahler_index",
+        method=method,
+        to_ignore=to_ignore,
+        min_twig_size=min_twig_size,
+    )
+
     return x
 
 
+def _refresh_strahler(
+    nodes: pd.DataFrame,
+    stale: np.ndarray,
+    method: str = "standard",
+    to_ignore: list = [],
+    min_twig_size: Optional[int] = None,
+) -> np.ndarray:
+    """Strahler indices of the `stale` rows of a node table.
+
+    The refresh behind the skeleton's `strahler_index` column (see
+    `schema.Derived`). A "subtree" column is stale everywhere once an edit
+    reached it, so this is simply the whole thing again.
+    """
+    return utils.fastcore.strahler_index(
+        nodes.node_id.values,
+        nodes.parent_id.values,
+        method=method,
+        to_ignore=to_ignore,
+        min_twig_size=min_twig_size,
+    )[stale]
+
+
 @utils.map_neuronlist_df(desc="Analyzing", allow_parallel=True, reset_index=True)
 @utils.meshneuron_skeleton(method="pass_through", reroot_soma=True)
 def segment_analysis(x: "core.NeuronObject") -> "core.NeuronObject":
@@ -292,58 +445,57 @@ def segment_analysis(x: "core.NeuronObject") -> "core.NeuronObject":
 
     if "strahler_index" not in x.nodes:
         strahler_index(x)
+    core.schema.refresh_derived(x)
 
-    # Get small segments for this neuron
-    segs = graph._break_segments(x)
-
-    # For each segment get the SI
-    nodes = x.nodes.set_index("node_id")
-    SI = nodes.loc[[s[0] for s in segs], "strahler_index"].values
-
-    # Get segment lengths (builds the node lookup once, not once per segment)
-    seg_lengths = graph.segment_lengths(x, segs)
+    nodes = x.nodes
+    node_ids = nodes.node_id.values
+    parent_ids = nodes.parent_id.values
+    xyz = nodes[["x", "y", "z"]].values.astype(np.float64)
 
-    # Get tortuosity
-    start = nodes.loc[[s[0] for s in segs], ["x", "y", "z"]].values
-    end = nodes.loc[[s[-1] for s in segs], ["x", "y", "z"]].values
-    L = np.sqrt(((start - end) ** 2).sum(axis=1))
-    tort = seg_lengths / L
+    # Small segments, flattened: per-segment values are reductions over
+    # `rows` rather than a Python loop over segments
+    rows, offsets = _flat_segments(x)
+    first, last = rows[offsets[:-1]], rows[offsets[1:] - 1]
 
-    # Get distance from root
-    root_dists_dict = graph.dist_to_root(x, weight="weight")
-    root_dists = np.array([root_dists_dict[s[-1]] for s in segs])
+    h = parent_dist(x, root_dist=0)
+    seg_lengths = _segment_sums(h, rows, offsets)
 
     # Compile results
     res = pd.DataFrame()
     res["length"] = seg_lengths
-    res["tortuosity"] = tort
-    res["root_dist"] = root_dists
-    res["strahler_index"] = SI
+    # Tortuosity is the arc-chord ratio
+    with np.errstate(divide="ignore", invalid="ignore"):
+        res["tortuosity"] = seg_lengths / np.linalg.norm(xyz[first] - xyz[last], axis=1)
+    # Distance from root of the segment's proximal end
+    res["root_dist"] = utils.fastcore.dag.dist_to_root(
+        node_ids, parent_ids, weights=h
+    )[last]
+    res["strahler_index"] = nodes.strahler_index.values[first]
 
     if "radius" in nodes:
-        # Generate radius dict
-        radii = nodes.radius.to_dict()
-
-        seg_radii = [[radii.get(n, 0) for n in s] for s in segs]
-        res["radius_mean"] = [np.nanmean(s) for s in seg_radii]
-        res["radius_min"] = [np.nanmin(s) for s in seg_radii]
-        res["radius_max"] = [np.nanmax(s) for s in seg_radii]
-
-        # Get radii for each cylinder
-        r1 = nodes.index.map(radii).values
-        r2 = nodes.parent_id.map(radii)  # Note we keep the Series here to avoid "read-only" errors when trying to replace NaNs
-        r2.iloc[np.isnan(r2)] = 0
-        r2 = r2.values
-
-        # Get the height for each node -> parent cylinder
-        h = parent_dist(x, root_dist=0)
-
-        # Radii for top and bottom of tapered cylinder
+        radii = nodes.radius.values.astype(np.float64)
+
+        # NaN-aware min/max/mean per segment: `fmin`/`fmax` skip NaNs, and
+        # the mean is the sum over the count of non-NaN radii
+        seg_radii = radii[rows]
+        valid = ~np.isnan(seg_radii)
+        starts = offsets[:-1]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            res["radius_mean"] = (np.add.reduceat(np.where(valid, seg_radii, 0), starts)
+                                  / np.add.reduceat(valid, starts))
+        res["radius_min"] = np.fmin.reduceat(seg_radii, starts)
+        res["radius_max"] = np.fmax.reduceat(seg_radii, starts)
+
+        # Volume of the tapered cylinder between each node and its parent
+        # (roots have none: no parent, `h` = 0)
+        parent = pd.Index(node_ids).get_indexer(parent_ids)
+        r1 = radii
+        r2 = np.where(parent >= 0, radii[parent], 0)
+        r2[np.isnan(r2)] = 0
         vols = 1 / 3 * np.pi * (r1**2 + r1 * r2 + r2**2) * h
-        vols_dict = dict(zip(nodes.index.values, vols))
 
         # For each segment get the volume
-        res["volume"] = [np.nansum([vols_dict.get(n, 0) for n in s[:-1]]) for s in segs]
+        res["volume"] = _segment_sums(np.nan_to_num(vols), rows, offsets)
 
     return res
 
@@ -588,9 +740,9 @@ def bending_flow(x: "core.NeuronObject") -> "core.NeuronObject":
     This is a variation of the algorithm for calculating synapse flow from
     Schneider-Mizell et al. (eLife, 2016).
 
-    The way this implementation works is by iterating over each branch point
-    and counting the number of pre->post synapse paths that "flow" from one
-    child branch to the other(s).
+    The way this implementation works is by counting, at each branch point,
+    the number of pre->post synapse paths that "flow" from one child branch to
+    the other(s).
 
     Notes
     -----
@@ -640,87 +792,42 @@ def bending_flow(x: "core.NeuronObject") -> "core.NeuronObject":
     if np.any(x.soma) and not np.all(np.isin(x.soma, x.root)):
         logger.warning(f"Neuron {x.id} is not rooted to its soma!")
 
-    # We will be processing a super downsampled version of the neuron to speed
-    # up calculations
-    with config.quiet_logger():
-        y = x.downsample(factor=float("inf"), preserve_nodes="connectors",
-                         inplace=False)
-
     # Figure out how connector types are labeled
-    cn_types = y.connectors.type.unique()
+    cn_types = x.connectors.type.unique()
     if all(np.isin(["pre", "post"], cn_types)):
         pre, post = "pre", "post"
     elif all(np.isin([0, 1], cn_types)):
         pre, post = 0, 1
     else:
-        raise ValueError(f"Unable to parse connector types for neuron {y.id}")
-
-    # Get list of nodes with pre/postsynapses
-    pre_node_ids = y.connectors[y.connectors.type == pre].node_id.values
-    post_node_ids = y.connectors[y.connectors.type == post].node_id.values
-
-    # Get list of branch_points
-    bp_node_ids = y.nodes[y.nodes.type == "branch"].node_id.values.tolist()
-
-    # Child lists come straight off the node table - no need to build a graph just
-    # to ask it for `degree` and `in_edges`.
-    all_childs = graph.generate_list_of_childs(y)
-
-    # Add root if it is also a branch point. A root has no parent, so its degree is
-    # simply its number of children.
-    for root in y.root:
-        if len(all_childs[root]) > 1:
-            bp_node_ids += [root]
-
-    # Get a list of childs of each branch point
-    bp_childs = {t: all_childs[t] for t in bp_node_ids}
-    childs = [tn for l in bp_childs.values() for tn in l]
-
-    # Get number of pre/postsynapses distal to each branch's childs
-    dists = graph.geodesic_matrix(
-        y,
-        from_=np.append(pre_node_ids, post_node_ids),
-        to_=childs,
-        directed=True,
-        weight=None,
-    )
-    distal = dists < np.inf
-
-    # Since nodes can have multiple pre-/postsynapses but they show up only
-    # once in distal, we have to reindex to reflect the correct
-    # number of synapes
-    distal_pre = distal.loc[pre_node_ids]
-    distal_post = distal.loc[post_node_ids]
-
-    # Sum up columns: now each row represents the number of pre/postsynapses
-    # distal to that node
-    distal_pre_sum = distal_pre.sum(axis=0)
-    distal_post_sum = distal_post.sum(axis=0)
-
-    # Now go over all branch points and check flow between branches
-    # (centrifugal) vs flow from branches to root (centripetal)
-    flow = {bp: 0 for bp in bp_childs}
-    for bp in bp_childs:
-        # We will use left/right to label the different branches here
-        # (even if there is more than two)
-        for left, right in itertools.permutations(bp_childs[bp], r=2):
-            flow[bp] += distal_post_sum.loc[left] * distal_pre_sum.loc[right]
-
-    # At this point there are only flows for the childs of branch points.
-    # Let's complete that mapping by adding flow for the nodes
-    # between branch points.
-    for s in x.small_segments:
-        # Segments' orientation goes from distal -> proximal
-        # Drop first (distal) node if it is not a leaf
-        if s[0] in flow:
-            s = s[1:]
-
-        # Update remaining nodes with the flow of the first child
-        this_flow = flow.get(s[-1], 0)
-        flow.update({n: this_flow for n in s})
+        raise ValueError(f"Unable to parse connector types for neuron {x.id}")
 
-    # Set flow centrality to None for all nodes
-    x.nodes["bending_flow"] = x.nodes.node_id.map(flow)
+    node_ids = x.nodes.node_id.values
+    parent_ids = x.nodes.parent_id.values
+    parent, n_children = _parent_index(x)
+    is_root = parent < 0
+
+    # Number of pre/postsynapses at or distal to each node
+    distal_pre = _subtree_sums(node_ids, parent_ids, _synapse_counts(x, pre))
+    distal_post = _subtree_sums(node_ids, parent_ids, _synapse_counts(x, post))
+
+    # Flow across a branch point goes from each child branch to each of the
+    # others: summed over ordered pairs of children, that is all postsynapses
+    # times all presynapses minus each child's flow into itself. Roots with
+    # several children count as branch points here.
+    is_bp = n_children > 1
+    child = np.flatnonzero(~is_root)
+    child = child[is_bp[parent[child]]]
+    post_sum = np.zeros(len(node_ids), dtype=np.int64)
+    pre_sum = np.zeros(len(node_ids), dtype=np.int64)
+    within = np.zeros(len(node_ids), dtype=np.int64)
+    np.add.at(post_sum, parent[child], distal_post[child])
+    np.add.at(pre_sum, parent[child], distal_pre[child])
+    np.add.at(within, parent[child], distal_post[child] * distal_pre[child])
+    flow = post_sum * pre_sum - within
+
+    # All other nodes have the flow of the closest branch point proximal to
+    # them - none if that is a root which does not branch
+    x.nodes["bending_flow"] = flow[_proximal_stop(parent, is_bp | is_root)]
 
     return x
 
@@ -939,23 +1046,13 @@ def synapse_flow_centrality(
             f'Unable to parse connector types "{cn_types}" for neuron {x.id}'
         )
 
-    x.nodes["synapse_flow_centrality"] = utils.fastcore.synapse_flow_centrality(
+    flow = utils.fastcore.synapse_flow_centrality(
         node_ids=x.nodes.node_id.values,
         parent_ids=x.nodes.parent_id.values,
-        presynapses=x.nodes.node_id.map(
-            x.connectors[(x.connectors.type == pre)].node_id.value_counts()
-        )
-        .fillna(0)
-        .astype(int)
-        .values,
-        postsynapses=x.nodes.node_id.map(
-            x.connectors[(x.connectors.type == post)].node_id.value_counts()
-        )
-        .fillna(0)
-        .astype(int)
-        .values,
+        presynapses=_synapse_counts(x, pre),
+        postsynapses=_synapse_counts(x, post),
         mode=mode,
-    )
+    ).astype(np.int64)
     # Add info on method/mode used for flow centrality
     x.centrality_method = mode  # type: ignore
 
@@ -964,12 +1061,10 @@ def synapse_flow_centrality(
     # the cell body fiber because the flow doesn't go "through" it in
     # child -> parent direction but rather "across" it from one child to the
     # other
-    is_bp = x.nodes["type"] == "branch"
-    bp = x.nodes.loc[is_bp, "node_id"].values
-    bp_childs = x.nodes[x.nodes.parent_id.isin(bp)]
-    max_flow = bp_childs.groupby("parent_id").synapse_flow_centrality.max()
-    x.nodes.loc[is_bp, "synapse_flow_centrality"] = max_flow.loc[bp].values
-    x.nodes["synapse_flow_centrality"] = x.nodes.synapse_flow_centrality.astype(int)
+    is_bp = (x.nodes["type"] == "branch").values
+    parent, _ = _parent_index(x)
+    flow[is_bp] = _max_of_children(flow, parent, is_bp)[is_bp]
+    x.nodes["synapse_flow_centrality"] = flow.astype(int)
 
     return x
 
@@ -1033,62 +1128,70 @@ def flow_centrality(x: "core.NeuronObject") -> "core.NeuronObject":
     if np.any(x.soma) and not np.all(np.isin(x.soma, x.root)):
         logger.warning(f"Neuron {x.id} is not rooted to its soma!")
 
-    # Get list of leafs
-    leafs = x.leafs.node_id.values
+    x.nodes["flow_centrality"] = _flow_centrality(x)
 
-    # Get list of points to calculate flow centrality for:
-    calc_node_ids = x.branch_points.node_id.values
+    # Lets edits update the column rather than leave it stale
+    core.schema.record_derived(x, "flow_centrality")
 
-    # Note these are per-fragment totals - see `_component_counts`
-    total_leafs = _component_counts(x, leafs, calc_node_ids)
-
-    # We will be processing a super downsampled version of the neuron to
-    # speed up calculations
-    with config.quiet_logger(pbars=True):
-        y = sampling.downsample_neuron(
-            x=x,
-            downsampling_factor=float("inf"),
-            inplace=False,
-            preserve_nodes=calc_node_ids,
-        )
-
-    # Get number of leafs distal to each branch's childs
-    dists = graph.geodesic_matrix(
-        y, from_=leafs, to_=calc_node_ids, directed=True, weight=None
-    )
-    distal = (dists < np.inf).sum(axis=0)
-
-    # Calculate the flow
-    flow = {n: (total_leafs[n] - distal[n]) * distal[n] for n in calc_node_ids}
+    return x
 
-    # At this point there is only flow for branch points and connectors nodes.
-    # Let's complete that mapping by adding flow for the nodes between branch points.
-    for s in x.small_segments:
-        # Segments' orientation goes from distal -> proximal
 
-        # If first node in the segment has no flow, set to 0
-        flow[s[0]] = flow.get(s[0], 0)
+def _flow_centrality(x: "core.Skeleton") -> np.ndarray:
+    """Morphology-only flow for each node, aligned with `x.nodes`."""
+    node_ids = x.nodes.node_id.values
+    parent, n_children = _parent_index(x)
+    is_bp = (n_children > 1) & (parent >= 0)
 
-        # For each node get the flow of its child
-        for i in range(1, len(s)):
-            if s[i] not in flow:
-                flow[s[i]] = flow[s[i - 1]]
+    # Flow only ever starts at a branch point, so without any there is none
+    if not is_bp.any():
+        return np.zeros(len(node_ids), dtype=int)
 
-    x.nodes["flow_centrality"] = x.nodes.node_id.map(flow).fillna(0).astype(int)
+    # Leafs distal to each branch point vs. the rest of its fragment. Note
+    # these are per-fragment totals - see `_component_counts`
+    leafs = x.leafs.node_id.values
+    distal = utils.fastcore.descendant_counts(
+        node_ids, x.nodes.parent_id.values, targets=leafs
+    )[is_bp]
+    total_leafs = _component_counts(x, leafs, node_ids[is_bp]).values
+
+    flow = np.zeros(len(node_ids), dtype=np.int64)
+    flow[is_bp] = (total_leafs - distal) * distal
+
+    # Nodes between branch points take the flow of the branch point (or of the
+    # leaf, i.e. none) that their run starts at distally
+    start = _distal_start(parent, n_children, is_bp)
+    carried = flow[start]
+
+    # A root with several children is where several runs end. It takes the one
+    # `small_segments` lists first, i.e. whose start comes first in the table.
+    fork = (n_children > 1) & (parent < 0)
+    if fork.any():
+        child = np.flatnonzero(parent >= 0)
+        child = child[fork[parent[child]]]
+        first = np.full(len(node_ids), len(node_ids))
+        np.minimum.at(first, parent[child], start[child])
+        carried[fork] = flow[first[fork]]
 
     # We need to add a restriction: a branchpoint cannot have a lower
     # flow than its highest child -> this happens at the main branch point to
     # the cell body fiber because the flow doesn't go "through" it in
     # child -> parent direction but rather "across" it from one child to the
     # other
-    is_bp = x.nodes["type"] == "branch"
-    bp = x.nodes.loc[is_bp, "node_id"].values
-    bp_childs = x.nodes[x.nodes.parent_id.isin(bp)]
-    max_flow = bp_childs.groupby("parent_id").flow_centrality.max()
-    x.nodes.loc[is_bp, "flow_centrality"] = max_flow.loc[bp].values
-    x.nodes["flow_centrality"] = x.nodes.flow_centrality.astype(int)
+    carried[is_bp] = _max_of_children(carried, parent, is_bp)[is_bp]
 
-    return x
+    return carried.astype(int)
+
+
+def _refresh_flow(nodes: pd.DataFrame, stale: np.ndarray) -> np.ndarray:
+    """Flow centrality of the `stale` rows of a node table.
+
+    The refresh behind the skeleton's `flow_centrality` column (see
+    `schema.Derived`). Flow is counted within a fragment and `stale` is always
+    whole fragments, so they can be computed as a neuron of their own.
+    """
+    sub = core.Skeleton(nodes.loc[stale, ["node_id", "parent_id", "x", "y", "z"]])
+    flow = _flow_centrality(sub)
+    return flow[pd.Index(sub.nodes.node_id.values).get_indexer(nodes.node_id.values[stale])]
 
 
 def tortuosity(
@@ -1190,22 +1293,19 @@ def tortuosity(
 
 def _tortuosity_simple(x: "core.Skeleton") -> float:
     """Calculate tortuosity for neuron as-is."""
-    # Iterate over segments
-    locs = x.nodes.set_index("node_id")[["x", "y", "z"]].astype(float)
-    T_all = []
-    for i, seg in enumerate(x.small_segments):
-        # Get coordinates
-        coords = locs.loc[seg].values
+    rows, offsets = _flat_segments(x)
+    if not len(rows):
+        return np.nan
+    xyz = x.nodes[["x", "y", "z"]].values.astype(np.float64)
 
-        # Calculate geodesic distance for this segment
-        L = np.linalg.norm(np.diff(coords.T), axis=0).sum()
+    # Geodesic length of each segment
+    L = _segment_sums(parent_dist(x, root_dist=0), rows, offsets)
 
-        # Calculate Euclidean distance for this segment
-        R = np.linalg.norm(coords[0] - coords[-1])
-        T = L / R
-        T_all.append(T)
+    # Euclidean distance between its ends
+    R = np.linalg.norm(xyz[rows[offsets[:-1]]] - xyz[rows[offsets[1:] - 1]], axis=1)
 
-    return np.mean(T_all)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.mean(L / R)
 
 
 def _tortuosity_segmented(x: "core.Skeleton", seg_length: Union[int, float, str]) -> float:
@@ -1222,51 +1322,256 @@ def _tortuosity_segmented(x: "core.Skeleton", seg_length: Union[int, float, str]
             f"resolution of the neuron ({res:.2f})."
         )
 
-    # Iterate over segments
-    locs = x.nodes.set_index("node_id")[["x", "y", "z"]].astype(float)
-    T_all = []
-    for i, seg in enumerate(x.small_segments):
-        # Get coordinates
-        coords = locs.loc[seg].values
+    rows, offsets = _flat_segments(x)
+    if not len(rows):
+        return np.nan
+    xyz = x.nodes[["x", "y", "z"]].values.astype(np.float64)
+    n_segs = len(offsets) - 1
+    seg = np.repeat(np.arange(n_segs), np.diff(offsets))
+
+    # Distance along its segment of each node, from the segment's distal end:
+    # a running sum of the edges before it, restarted at every segment
+    edges = parent_dist(x, root_dist=0)[rows].astype(np.float64)
+    edges[offsets[1:] - 1] = 0
+    run = np.concatenate([[0], np.cumsum(edges)])
+    along = run[:-1] - run[offsets[:-1]][seg]
+    total = along[offsets[1:] - 1]
+
+    # Sample each segment every `seg_length`, starting at its distal end.
+    # Segments no longer than `seg_length` have nothing to compare.
+    n_samples = np.where(total > seg_length, np.ceil(total / seg_length), 0).astype(np.int64)
+    if not n_samples.any():
+        return np.nan
+    q_seg = np.repeat(np.arange(n_segs), n_samples)
+    q_start = np.concatenate([[0], np.cumsum(n_samples)[:-1]])
+    q_along = (np.arange(n_samples.sum()) - np.repeat(q_start, n_samples)) * seg_length
+
+    # For each sample, the last node at or before it on its segment: sort the
+    # nodes and samples together by (segment, distance) - nodes first on ties
+    # - and count the nodes ahead of each sample
+    is_q = np.r_[np.zeros(len(rows), dtype=bool), np.ones(len(q_seg), dtype=bool)]
+    order = np.lexsort((is_q, np.r_[along, q_along], np.r_[seg, q_seg]))
+    n_before = np.cumsum(~is_q[order])
+    lo = np.empty(len(q_seg), dtype=np.int64)
+    lo[order[is_q[order]] - len(rows)] = n_before[is_q[order]] - 1
+
+    # Interpolate linearly between that node and the next
+    hi = np.minimum(lo + 1, offsets[1:][q_seg] - 1)
+    span = along[hi] - along[lo]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        frac = np.where(span > 0, (q_along - along[lo]) / span, 0)
+    pts = xyz[rows[lo]] + (xyz[rows[hi]] - xyz[rows[lo]]) * frac[:, None]
+
+    # Each pair of consecutive samples is exactly `seg_length` apart along
+    # the arbor; compare that to how far apart they are in space
+    same = q_seg[1:] == q_seg[:-1]
+    R = np.linalg.norm(pts[1:][same] - pts[:-1][same], axis=1)
+    with np.errstate(divide="ignore"):
+        return (seg_length / R).mean()
+
+
+def _sholl_counts(dists, pdists, le, is_branch, radii):
+    """Sholl intersections, cable and branch points at all radii at once.
 
-        # Vecs between subsequently measured points
-        vecs = np.diff(coords.T)
+    Parameters
+    ----------
+    dists, pdists : (N, ) arrays
+                    Distance of each edge's child and parent from the center.
+    le :            (N, ) array
+                    Length of each edge.
+    is_branch :     (N, ) bool array
+                    Whether each edge's child is a branch point.
+    radii :         (M, ) array
+                    In ascending order.
 
-        # path: cum distance along points (norm from first to Nth point)
-        dist = np.cumsum(np.linalg.norm(vecs, axis=0))
-        dist = np.insert(dist, 0, 0)
+    Returns
+    -------
+    intersections, cable, branch_points : (M, ) arrays
+                    Intersections are at each radius; cable and branch points
+                    in the bin between the previous radius and this one (i.e.
+                    zero at the first).
 
-        # Skip if segment too short
-        if dist[-1] <= seg_length:
-            continue
+    """
+    # An edge intersects the sphere of radius `r` if exactly one of its ends
+    # is inside it, i.e. if `near <= r < far`. Counting the edges with
+    # `near <= r` and taking away those with `far <= r` does all radii with
+    # one sort rather than one pass over all edges per radius.
+    near = np.sort(np.minimum(dists, pdists))
+    far = np.sort(np.maximum(dists, pdists))
+    crossings = np.searchsorted(near, radii, side="right") - np.searchsorted(
+        far, radii, side="right"
+    )
 
-        # New partitions
-        new_dist = np.arange(0, dist[-1], seg_length)
+    # Cable and branch points go by the child's distance into the open bin
+    # between two consecutive radii - a node exactly on a sphere is in neither
+    lo = np.searchsorted(radii, dists, side="left")
+    inside = (lo == np.searchsorted(radii, dists, side="right")) & (lo > 0)
+    inside &= lo < len(radii)
+    bins = lo[inside]
 
-        try:
-            sampleX = scipy.interpolate.interp1d(dist, coords[:, 0], kind="linear")
-            sampleY = scipy.interpolate.interp1d(dist, coords[:, 1], kind="linear")
-            sampleZ = scipy.interpolate.interp1d(dist, coords[:, 2], kind="linear")
-        except ValueError:
-            continue
+    cable = np.bincount(bins, weights=le[inside], minlength=len(radii))
+    branches = np.bincount(bins[is_branch[inside]], minlength=len(radii))
+    return crossings, cable.astype(le.dtype), branches
 
-        # Sample each dim
-        xnew = sampleX(new_dist)
-        ynew = sampleY(new_dist)
-        znew = sampleZ(new_dist)
 
-        # We know that each child -> parent pair was originally exactly
-        # `seg_length` geodesic distance apart. Now we need to find out
-        # how far they are apart in Euclidean distance
-        new_coords = np.array([xnew, ynew, znew]).T
+def _sholl_center(x, center, geodesic):
+    """Resolve `center` for a single neuron to `(row, xyz)`.
 
-        R = np.linalg.norm(new_coords[:-1] - new_coords[1:], axis=1)
-        T = seg_length / R
-        T_all.append(T)
+    `row` is the center node's row in the node table, `xyz` a coordinate;
+    both are None for "centermass", which is worked out for all neurons at
+    once.
+    """
+    if geodesic and len(x.root) > 1:
+        raise ValueError(
+            "Unable to use `geodesic=True` with fragmented "
+            "neurons. Use `navis.heal_fragmented_neuron` first."
+        )
 
-    if not T_all:
-        return np.nan
-    return np.concatenate(T_all).mean()
+    # Note that we must check for coordinates/node IDs before comparing
+    # against the string presets: `center` may be an array and
+    # `array == "soma"` is an elementwise comparison, not a scalar `False`.
+    node_ids = x.nodes.node_id.values
+    if utils.is_iterable(center):
+        center_xyz = np.asarray(center, dtype=float)
+        if center_xyz.ndim != 1 or len(center_xyz) != 3:
+            raise ValueError(
+                "`center` must be (3, ) list-like when providing "
+                f"a coordinate. Got {center_xyz.shape}"
+            )
+        if geodesic:
+            raise ValueError(
+                "Must not provide a `center` as coordinate when geodesic=True"
+            )
+        return None, center_xyz
+    elif isinstance(center, (int, np.integer)):
+        if center not in node_ids:
+            raise ValueError(f"{center} is not a valid node ID.")
+        center_node = center
+    elif center == "soma":
+        if not x.has_soma:
+            raise ValueError(f"Neuron {x.id} has no soma.")
+        center_node = utils.make_iterable(x.soma)[0]
+    elif center == "root":
+        if len(x.root) > 1:
+            raise ValueError(
+                f"Neuron {x.id} has multiple roots. Please specify "
+                "which node/coordinate to use as center."
+            )
+        center_node = utils.make_iterable(x.root)[0]
+    elif center == "centermass":
+        if geodesic:
+            raise ValueError(
+                "`geodesic=True` requires `center` to be 'root', 'soma' or a "
+                "node ID - 'centermass' is a coordinate."
+            )
+        return None, None
+    else:
+        raise ValueError(
+            '`center` must be "centermass", "root", "soma", a node ID or a '
+            f'(3, ) x/y/z coordinate. Got "{center}"'
+        )
+
+    return np.flatnonzero(node_ids == center_node)[0], None
+
+
+def _sholl_table(neurons, radii, center, geodesic) -> pd.DataFrame:
+    """Sholl analysis of several skeletons in one go.
+
+    All neurons are packed into one forest, so that their distances come out
+    of one fastcore call. Binning them is then a sort and a few searches per
+    neuron (see `_sholl_counts`).
+
+    Returns
+    -------
+    pd.DataFrame
+                Columns "neuron" (the position in `neurons`), "radius",
+                "intersections", "cable_length" and "branch_points", one neuron
+                after the other.
+
+    """
+    centers = [_sholl_center(x, center, geodesic) for x in neurons]
+
+    xyz, node_ids, parent_ids, offsets = core.core_utils.packed_nodes(neurons)
+    n = len(neurons)
+    owner = np.repeat(np.arange(n), np.diff(offsets))
+    ppos = pd.Index(node_ids).get_indexer(parent_ids)
+    le = utils.fastcore.dag.parent_dist(node_ids, parent_ids, xyz, root_dist=0)
+
+    # Distance of each node from its neuron's center
+    if not geodesic:
+        xyz = xyz.astype(np.float64)
+        center_xyz = np.empty((n, 3))
+        for i, (r, c) in enumerate(centers):
+            if r is not None:
+                center_xyz[i] = xyz[offsets[i] + r]
+            elif c is not None:
+                center_xyz[i] = c
+            elif offsets[i + 1] > offsets[i]:
+                center_xyz[i] = xyz[offsets[i]:offsets[i + 1]].mean(axis=0)
+        dists = np.sqrt(((xyz - center_xyz[owner]) ** 2).sum(axis=1))
+    else:
+        # From the center `c` to node `v` is `v`'s distance to the root plus
+        # `c`'s, minus twice that of where their paths to the root meet. With
+        # the edges on `c`'s path to the root weighted zero, a node's distance
+        # to the root becomes its distance to that meeting point - for all
+        # neurons in one call.
+        rows = offsets[:-1] + np.array([r for r, _ in centers], dtype=np.int64)
+        dtr = utils.fastcore.dag.dist_to_root(node_ids, parent_ids, weights=le)
+        on_path = np.zeros(len(node_ids), dtype=bool)
+        cur = rows
+        while len(cur):
+            on_path[cur] = True
+            cur = ppos[cur]
+            cur = cur[cur >= 0]
+        up = utils.fastcore.dag.dist_to_root(
+            node_ids, parent_ids, weights=np.where(on_path, 0, le)
+        )
+        dists = 2 * up + dtr[rows][owner] - dtr
+
+    edge = ppos >= 0
+    edge_owner = owner[edge]
+    d, pd_ = dists[edge], dists[ppos[edge]]
+
+    # Generate radii for the Sholl spheres
+    if isinstance(radii, (int, np.integer)):
+        dmax = np.full(n, -np.inf)
+        np.maximum.at(dmax, edge_owner, d)
+        if n and not np.isfinite(dmax).all():
+            empty = neurons[int(np.argmin(dmax))]
+            raise ValueError(f"Neuron {empty.id} has no cable to place radii on.")
+        radii = np.linspace(0, dmax, radii + 1, axis=1)
+    else:
+        radii = np.asarray(radii)
+        if radii[0] != 0:
+            radii = np.insert(radii, 0, 0)
+        if (np.diff(radii) < 0).any():
+            raise ValueError("`radii` must be in ascending order.")
+        radii = np.tile(radii, (n, 1))
+
+    # Sorting is what it takes, so each neuron sorts its own edges: sorting
+    # them all at once would need its neuron as an extra sort key, which costs
+    # more than the loop
+    is_branch = np.concatenate([x.nodes.type.values == "branch" for x in neurons])
+    le, is_branch = le[edge], is_branch[edge]
+    bounds = np.searchsorted(edge_owner, np.arange(n + 1))
+    counts = [
+        _sholl_counts(d[i:j], pd_[i:j], le[i:j], is_branch[i:j], r)
+        for i, j, r in zip(bounds[:-1], bounds[1:], radii)
+    ]
+
+    # The first radius (0) only opens the first bin
+    crossings, cable, branches = (
+        np.concatenate([c[k][1:] for c in counts]) for k in range(3)
+    )
+    return pd.DataFrame(
+        {
+            "neuron": np.repeat(np.arange(n), radii.shape[1] - 1),
+            "radius": radii[:, 1:].ravel(),
+            "intersections": crossings,
+            "cable_length": cable,
+            "branch_points": branches,
+        }
+    )
 
 
 @utils.map_neuronlist(desc="Sholl analysis", allow_parallel=True)
@@ -1286,8 +1591,8 @@ def sholl_analysis(
     radii :     int | list-like
                 If integer, will produce N evenly space radii covering the
                 distance between the center and the most distal node.
-                Alternatively, you can also provide a list of radii to check.
-                If `x` is multiple neurons, must provide a list of `radii`!
+                Alternatively, you can also provide a list of radii (in
+                ascending order) to check.
     center :    "centermass" | "root" | "soma" | int | list-like
                 The center to use for Sholl analysis:
                     - "centermass" (default) uses the mean across nodes positions
@@ -1307,6 +1612,11 @@ def sholl_analysis(
                 Results contain, for each spherical bin, the number of
                 intersections, cable length and number of branch points.
 
+    See Also
+    --------
+    [`navis.batch_sholl`][]
+                The same for many neurons, as one table.
+
     References
     ----------
     See the [Wikipedia article](https://en.wikipedia.org/wiki/Sholl_analysis)
@@ -1331,106 +1641,21 @@ def sholl_analysis(
     if not isinstance(x, core.Skeleton):
         raise TypeError(f"Expected Skeleton or Mesh(s), got {type(x)}")
 
-    if geodesic and len(x.root) > 1:
-        raise ValueError(
-            "Unable to use `geodesic=True` with fragmented "
-            "neurons. Use `navis.heal_fragmented_neuron` first."
-        )
-
-    nodes = x.nodes.set_index("node_id").copy()
-
-    # Resolve `center` to either a node ID or an x/y/z coordinate. Note that we
-    # must check for coordinates/node IDs before comparing against the string
-    # presets: `center` may be an array and `array == "soma"` is an elementwise
-    # comparison, not a scalar `False`.
-    center_node = None
-    center_xyz = None
-    if utils.is_iterable(center):
-        center_xyz = np.asarray(center, dtype=float)
-        if center_xyz.ndim != 1 or len(center_xyz) != 3:
-            raise ValueError(
-                "`center` must be (3, ) list-like when providing "
-                f"a coordinate. Got {center_xyz.shape}"
-            )
-        if geodesic:
-            raise ValueError(
-                "Must not provide a `center` as coordinate when geodesic=True"
-            )
-    elif isinstance(center, (int, np.integer)):
-        if center not in nodes.index.values:
-            raise ValueError(f"{center} is not a valid node ID.")
-        center_node = center
-    elif center == "soma":
-        if not x.has_soma:
-            raise ValueError(f"Neuron {x.id} has no soma.")
-        center_node = utils.make_iterable(x.soma)[0]
-    elif center == "root":
-        if len(x.root) > 1:
-            raise ValueError(
-                f"Neuron {x.id} has multiple roots. Please specify "
-                "which node/coordinate to use as center."
-            )
-        center_node = utils.make_iterable(x.root)[0]
-    elif center == "centermass":
-        if geodesic:
-            raise ValueError(
-                "`geodesic=True` requires `center` to be 'root', 'soma' or a "
-                "node ID - 'centermass' is a coordinate."
-            )
-        center_xyz = x.nodes[["x", "y", "z"]].mean(axis=0).values.astype(float)
-    else:
-        raise ValueError(
-            '`center` must be "centermass", "root", "soma", a node ID or a '
-            f'(3, ) x/y/z coordinate. Got "{center}"'
-        )
-
-    # Calculate distances for each node
-    if not geodesic:
-        if center_xyz is None:
-            center_xyz = nodes.loc[center_node, ["x", "y", "z"]].values.astype(float)
-
-        nodes["dist"] = np.sqrt(
-            ((x.nodes[["x", "y", "z"]].values - center_xyz) ** 2).sum(axis=1)
-        )
-    else:
-        nodes["dist"] = graph.geodesic_matrix(x, from_=center_node)[
-            x.nodes.node_id.values
-        ].values[0]
-
-    not_root = nodes.parent_id >= 0
-    dists = nodes.loc[not_root, "dist"].values
-    pdists = nodes.loc[nodes[not_root].parent_id.values, "dist"].values
-    le = parent_dist(x)[not_root]
-    ty = nodes.loc[not_root, "type"].values
-
-    # Generate radii for the Sholl spheres
-    if isinstance(radii, (int, np.integer)):
-        radii = np.linspace(0, dists.max(), radii + 1)
-    else:
-        if radii[0] != 0:
-            radii = np.insert(radii, 0, 0)
-
-    data = []
-    for i in range(1, len(radii)):
-        # An edge intersects the sphere if exactly one of its two ends is inside
-        # it - hence the XOR. Note that `(dists <= r) & (pdists > r)` only counts
-        # edges crossing *inwards*, which for an arbor rooted at (or near) the
-        # center is almost none of them - and, with geodesic distances, where a
-        # child is always further from the center than its parent, exactly none.
-        crossings = ((dists <= radii[i]) != (pdists <= radii[i])).sum()
-
-        # Get the (approximate) cable length in this sphere
-        this_sphere = (dists > radii[i - 1]) & (dists < radii[i])
-        cable = le[this_sphere].sum()
+    return _sholl_table([x], radii, center, geodesic).drop(columns="neuron").set_index(
+        "radius"
+    )
 
-        # The number of branch points in this sphere
-        n_branchpoints = (ty[this_sphere] == "branch").sum()
 
-        data.append([radii[i], crossings, cable, n_branchpoints])
+@sholl_analysis.batched
+def _sholl_analysis_batch(x, radii=10, center="centermass", geodesic=False):
+    """All skeletons' Sholl analyses from one pass over the packed forest."""
+    if not all(isinstance(n, core.Skeleton) for n in x):
+        return NotImplemented
 
-    return pd.DataFrame(
-        data, columns=["radius", "intersections", "cable_length", "branch_points"]
-    ).set_index("radius")
+    table = _sholl_table(x, radii, center, geodesic)
+    bounds = np.searchsorted(table.neuron.values, np.arange(len(x) + 1))
+    table = table.drop(columns="neuron").set_index("radius")
+    return [table.iloc[i:j] for i, j in zip(bounds[:-1], bounds[1:])]
 
 
 @utils.map_neuronlist(desc="Calc. betweeness", allow_parallel=True)
@@ -1583,3 +1808,15 @@ def cable_length(x, mask=None) -> Union[int, float]:
 
     return parent_dist(nodes, root_dist=0).sum()
 
+
+@cable_length.batched
+def _cable_length_batch(x, mask=None):
+    """All skeletons' cable in one fastcore call over the packed forest."""
+    if mask is not None or not all(isinstance(n, core.Skeleton) for n in x):
+        return NotImplemented
+
+    xyz, node_ids, parent_ids, offsets = core.core_utils.packed_nodes(x)
+    dist = utils.fastcore.dag.parent_dist(node_ids, parent_ids, xyz, root_dist=0)
+    owner = np.repeat(np.arange(len(x)), np.diff(offsets))
+    return np.bincount(owner, weights=dist, minlength=len(x)).astype(dist.dtype)
+
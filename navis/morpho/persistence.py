@@ -13,13 +13,16 @@
 
 """Module to generate and analyze persistence diagrams."""
 
+import os
+
 import numpy as np
 import pandas as pd
 
 import matplotlib.pyplot as plt
 from matplotlib.collections import LineCollection
 
-from scipy.spatial.distance import pdist, cdist, squareform
+import scipy.sparse
+
 from scipy.stats import gaussian_kde
 from typing import Union, Optional
 from typing_extensions import Literal
@@ -134,11 +137,55 @@ def persistence_points(x: 'core.NeuronObject',
     return pers
 
 
+@persistence_points.batched
+def _persistence_points_batch(x, descriptor='root_dist', remove_cbf=False):
+    """All skeletons' persistence points from one pass over the packed forest."""
+    # Anything else either raises or reroots - leave that to the neuron
+    if descriptor not in ('root_dist', ):
+        return NotImplemented
+    if not all(isinstance(n, core.Skeleton) for n in x):
+        return NotImplemented
+    if remove_cbf and any(n.has_soma for n in x):
+        return NotImplemented
+
+    xyz, node_ids, parent_ids, offsets = core.core_utils.packed_nodes(x)
+    weights = utils.fastcore.dag.parent_dist(node_ids, parent_ids, xyz,
+                                             root_dist=0)
+    segs, _ = utils.fastcore.generate_segments(node_ids, parent_ids,
+                                               weights=weights)
+    dist = np.asarray(utils.fastcore.dist_to_root(node_ids, parent_ids,
+                                                  weights=weights),
+                      dtype=np.float64)
+
+    # Segments run from their distal end to their start - rows of both, in
+    # the packed tables
+    index = pd.Index(node_ids)
+    ends = index.get_indexer(np.array([s[0] for s in segs], dtype=node_ids.dtype))
+    starts = index.get_indexer(np.array([s[-1] for s in segs], dtype=node_ids.dtype))
+
+    # Segments come sorted by length across *all* neurons: a stable sort by
+    # neuron keeps each neuron's own longest-first order
+    neuron = np.searchsorted(offsets, ends, side='right') - 1
+    order = np.argsort(neuron, kind='stable')
+    ends, starts, neuron = ends[order], starts[order], neuron[order]
+    bounds = np.searchsorted(neuron, np.arange(len(x) + 1))
+
+    # Back from packed to the neurons' own node IDs
+    ids = np.concatenate([n.nodes.node_id.values for n in x])
+
+    return [pd.DataFrame({'start_node': ids[starts[i:j]],
+                          'end_node': ids[ends[i:j]],
+                          'birth': dist[starts[i:j]],
+                          'death': dist[ends[i:j]]})
+            for i, j in zip(bounds[:-1], bounds[1:])]
+
+
 def persistence_distances(q: 'core.NeuronObject',
                           t: Optional['core.NeuronObject'] = None,
                           augment: bool = True,
                           normalize: bool = True,
                           bw: float = .2,
+                          out: Optional[Union[np.ndarray, str, os.PathLike]] = None,
                           **persistence_kwargs):
     """Calculate morphological similarity using persistence diagrams.
 
@@ -163,6 +210,12 @@ def persistence_distances(q: 'core.NeuronObject',
     augment :   bool
                 Whether to augment the persistence vectors with other neuron
                 properties (number of branch points & leafs and cable length).
+    out :       np.ndarray | str | pathlib.Path, optional
+                Where to write the distances. An array of the right shape
+                (e.g. a `numpy.memmap`) is filled in place; a filepath is
+                created as a memory-mapped `.npy` file. Either way the matrix
+                is written block by block and never has to fit in memory.
+                The returned DataFrame is a view of `out`.
     **persistence_kwargs
                 Keyword arguments are passed to [`navis.persistence_points`][].
 
@@ -235,13 +288,20 @@ def persistence_distances(q: 'core.NeuronObject',
 
         vectors = np.append(vectors, vec_aug, axis=1)
 
-    if t:
-        # Extract source and target vectors
-        q_vec = vectors[:len(q)]
-        t_vec = vectors[len(q):]
-        return pd.DataFrame(cdist(q_vec, t_vec), index=q.id, columns=t.id)
-    else:
-        return pd.DataFrame(squareform(pdist(vectors)), index=q.id, columns=q.id)
+    # Extract source and target vectors
+    q_vec = vectors[:len(q)]
+    t_vec = vectors[len(q):] if t else None
+    cols = t.id if t else q.id
+
+    if isinstance(out, (str, os.PathLike)):
+        out = np.lib.format.open_memmap(out, mode='w+', dtype=np.float64,
+                                        shape=(len(q), len(cols)))
+    elif out is not None and out.shape != (len(q), len(cols)):
+        raise ValueError(f'Expected `out` of shape {(len(q), len(cols))}, '
+                         f'got {out.shape}')
+
+    dists = _euclidean(q_vec, t_vec, out=out)
+    return pd.DataFrame(dists, index=q.id, columns=cols, copy=False)
 
 
 def persistence_vectors(x,
@@ -304,7 +364,7 @@ def persistence_vectors(x,
     if isinstance(x, pd.DataFrame):
         pers = [x]
     elif isinstance(x, core.NeuronList):
-        pers = [persistence_points(n, **kwargs) for n in x]
+        pers = persistence_points(x, **kwargs)
     elif isinstance(x, list):
         if not all([isinstance(l, pd.DataFrame) for l in x]):
             raise ValueError('Expected lists to contain only DataFrames')
@@ -323,21 +383,16 @@ def persistence_vectors(x,
             )
 
     # Now get a persistence vector
-    vectors = []
+    births, weights = [], []
     for p in pers:
-        weights = p.death.values - p.birth.values
+        w = p.death.values - p.birth.values
         if threshold:
-            p = p.loc[weights >= threshold]
-            weights = weights[weights >= threshold]
-
-        # For each persistence generate a weighted Gaussian kernel
-        kernel = gaussian_kde(p.birth.values,
-                              weights=weights,
-                              bw_method=bw)
-
-        # And sample probabilities at the sample points
-        vectors.append(kernel(samples))
-    vectors = np.array(vectors)
+            births.append(p.birth.values[w >= threshold])
+            weights.append(w[w >= threshold])
+        else:
+            births.append(p.birth.values)
+            weights.append(w)
+    vectors = _weighted_kdes(births, weights, np.asarray(samples), bw)
 
     if center:
         # Shift each vector such that the highest value lies in the center.
@@ -350,6 +405,106 @@ def persistence_vectors(x,
     return vectors, samples
 
 
+def _weighted_kdes(births, weights, samples, bw, max_block=2**24):
+    """Sample one weighted Gaussian KDE per neuron - all of them at once.
+
+    This is what `scipy.stats.gaussian_kde(birth, weights=w, bw_method=bw)`
+    evaluated at `samples` gives, neuron by neuron. In 1D each kernel is just
+    a normal density with its neuron's bandwidth, so the densities of all
+    points at all samples are one (points x samples) array - and the weighted
+    sum over each neuron's points is a single sparse (neurons x points) matrix
+    product with it. Points are taken in blocks so that the array stays below
+    `max_block` elements.
+
+    Parameters
+    ----------
+    births :    list of arrays
+                Each neuron's births, i.e. the positions of its kernels.
+    weights :   list of arrays
+                Each neuron's weights (death - birth).
+    samples :   (S, ) array
+    bw :        float
+                Bandwidth factor, as `bw_method` for `gaussian_kde`.
+
+    Returns
+    -------
+    vectors :   (len(births), S) array
+
+    """
+    n_points = np.array([len(b) for b in births])
+    vectors = np.zeros((len(births), len(samples)))
+    if not len(births):
+        return vectors
+
+    x = np.concatenate(births).astype(np.float64)
+    w = np.concatenate(weights).astype(np.float64)
+    neuron = np.repeat(np.arange(len(births)), n_points)
+
+    # Weighted mean and (unbiased) variance - `np.cov` with `aweights`, which
+    # is what `gaussian_kde` bases its bandwidth on
+    w_sum = np.bincount(neuron, weights=w, minlength=len(births))
+    w_sq = np.bincount(neuron, weights=w ** 2, minlength=len(births))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = np.bincount(neuron, weights=w * x, minlength=len(births)) / w_sum
+        var = (np.bincount(neuron, weights=w * (x - mean[neuron]) ** 2,
+                           minlength=len(births))
+               / (w_sum - w_sq / w_sum))
+    var *= bw ** 2
+
+    # Too few points or no spread: `gaussian_kde` itself decides what happens
+    # then (it typically raises), so those neurons are handed to it
+    fine = (n_points > 1) & np.isfinite(var) & (var > 0)
+    for i in np.where(~fine)[0]:
+        vectors[i] = gaussian_kde(births[i], weights=weights[i],
+                                  bw_method=bw)(samples)
+
+    rows = np.where(fine[neuron])[0]
+    step = max(1, max_block // max(len(samples), 1))
+    for i in range(0, len(rows), step):
+        r = rows[i:i + step]
+        # In place: this is by far the largest array here
+        k = np.subtract.outer(x[r], samples)
+        k *= k
+        k *= (-0.5 / var[neuron[r]])[:, None]
+        np.exp(k, out=k)
+        norm = w[r] / (w_sum[neuron[r]] * np.sqrt(2 * np.pi * var[neuron[r]]))
+        weigh = scipy.sparse.csr_matrix((norm, (neuron[r], np.arange(len(r)))),
+                                        shape=(len(births), len(r)))
+        vectors += weigh @ k
+
+    return vectors
+
+
+def _euclidean(a, b=None, out=None, max_block=2**24):
+    """Euclidean distances between the rows of `a` and `b`, block by block.
+
+    `|a - b|^2 = |a|^2 + |b|^2 - 2 a.b`: the bulk of the work is one matrix
+    product per block of rows, which BLAS does far faster than `cdist`'s
+    pair-by-pair loop. Each block is written straight into `out`, so that can
+    be a memory-mapped array much larger than memory.
+
+    `b=None` is distances among `a`'s rows; the diagonal is then exactly 0.
+    """
+    self = b is None
+    if self:
+        b = a
+    if out is None:
+        out = np.empty((len(a), len(b)))
+
+    a_sq = (a ** 2).sum(axis=1)
+    b_sq = (b ** 2).sum(axis=1)
+    step = max(1, max_block // max(len(b), 1))
+    for i in range(0, len(a), step):
+        d = a_sq[i:i + step, None] + b_sq[None, :] - 2 * (a[i:i + step] @ b.T)
+        # Rounding can take distances of (near) zero below it
+        np.maximum(d, 0, out=d)
+        if self:
+            d[np.arange(len(d)), np.arange(i, i + len(d))] = 0
+        out[i:i + step] = np.sqrt(d)
+
+    return out
+
+
 def persistence_diagram(pers, ax=None, **kwargs):
     """Plot a persistence diagram.
 
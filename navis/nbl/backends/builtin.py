@@ -37,11 +37,16 @@ import numpy as np
 import pandas as pd
 
 from ... import config, utils
+from ...compute.scaling import declare_scaling
 from .base import NblastBackend
 
 logger = config.get_logger(__name__)
 
 
+# Most of a block's time goes into pykdtree's nearest-neighbour queries, which
+# run on OpenMP threads; the scoring around them does not. Conservative - run
+# `navis.compute.calibrate` to measure it on your machine.
+@declare_scaling(0.8)
 def _run_job(blaster):
     """Execute a single block's work. Runs in the worker.
 
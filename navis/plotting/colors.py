@@ -248,6 +248,7 @@ def vertex_colors(neurons, by, palette, alpha=1, use_alpha=False, vmin=None, vma
             if isinstance(n, core.Skeleton):
                 # If column exists add to values
                 if by in n.nodes.columns:
+                    core.schema.refresh_derived(n)
                     values.append(n.nodes[by].values)
                 elif na == 'raise':
                     raise ValueError(f'Column "{by}" does not exists in neuron {n.id}')
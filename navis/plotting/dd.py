@@ -1965,6 +1965,7 @@ def _taper_widths(neuron, settings):
     if kind == "strahler":
         # already computed? then respect whatever options it was computed with
         if "strahler_index" in neuron.nodes.columns:
+            core.schema.refresh_derived(neuron)
             value = neuron.nodes.strahler_index.values.astype(float)
         else:
             value = utils.fastcore.strahler_index(node_ids, parent_ids).astype(float)
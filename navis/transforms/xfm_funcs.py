@@ -106,6 +106,35 @@ def xform(x: Union['core.NeuronObject', 'pd.DataFrame', 'np.ndarray'],
     if isinstance(x, core.NeuronList):
         if len(x) == 1:
             x = x[0]
+        elif caching and len(x) and not any(isinstance(n, core.Voxels)
+                                            for n in x):
+            # Neurons' coordinates go through the transform together, a chunk
+            # of up to `_BATCH_POINTS` at a time: most transforms cost far more
+            # per call than per point (CMTK and elastix start a process, R a
+            # round trip, an H5 field a lookup setup), and an affine is one
+            # matrix product either way. Without caching we stay per neuron,
+            # which is what keeps the memory footprint down.
+            xf = [n.copy() for n in x]
+            xyz = [_gather_xyz(n) for n in xf]
+            with TransOptimizer(transform, bbox=x.bbox, caching=caching):
+                try:
+                    with config.tqdm(total=len(xf), desc='Xforming',
+                                     disable=config.pbar_hide,
+                                     leave=config.pbar_leave) as pbar:
+                        for chunk in _chunks_by_size(xyz, _BATCH_POINTS):
+                            before = [xyz[i] for i in chunk]
+                            after = xform(np.vstack(before),
+                                          transform=transform,
+                                          affine_fallback=affine_fallback)
+                            bounds = np.cumsum([len(c) for c in before])[:-1]
+                            for i, b, a in zip(chunk, before,
+                                               np.split(after, bounds)):
+                                _scatter_xyz(xf[i], b, a)
+                            pbar.update(len(chunk))
+                finally:
+                    _get_coordinates_map.cache_clear()
+
+            return x.__class__(xf)
         else:
             xf = []
             # Get the transformation sequence
@@ -139,79 +168,14 @@ def xform(x: Union['core.NeuronObject', 'pd.DataFrame', 'np.ndarray'],
         xf = x.copy()
         # We will collate spatial data to reduce overhead from calling
         # R's xform_brain
-        if isinstance(xf, core.Skeleton):
-            xyz = xf.nodes[['x', 'y', 'z']].values
-        elif isinstance(xf, core.Mesh):
-            xyz = xf.vertices
-        elif isinstance(xf, core.Dotprops):
-            xyz = xf.points
-            # If this dotprops has a `k`, we only need to transform points and
-            # can regenerate the rest. If not, we need to make helper points
-            # to carry over vectors
-            if isinstance(xf.k, type(None)) or xf.k <= 0:
-                # To avoid problems with these helpers we need to make sure
-                # they aren't too close to their cognate points (otherwise we'll
-                # get NaNs later). We can fix this by scaling the vector by the
-                # sampling resolution which should also help make things less
-                # noisy.
-                hp = xf.points + xf.vect * xf.sampling_resolution
-                xyz = np.append(xyz, hp, axis=0)
-        else:
-            raise TypeError(f"Don't know how to transform neuron of type '{type(xf)}'")
-
-        # Add connectors if they exist
-        if xf.has_connectors:
-            xyz = np.vstack([xyz, xf.connectors[['x', 'y', 'z']].values])
+        xyz = _gather_xyz(xf)
 
         # Do the xform of all spatial data
         xyz_xf = xform(xyz,
                        transform=transform,
                        affine_fallback=affine_fallback)
 
-        # Guess change in spatial units
-        if xyz.shape[0] > 1:
-            change, magnitude = _guess_change(xyz, xyz_xf, sample=1000)
-        else:
-            change, magnitude = 1, 0
-            logger.warning(f'Unable to assess change of units for neuron {x.id}: '
-                           'must have at least two nodes/points.')
-
-        # Round change -> this rounds to the first non-zero digit
-        # change = np.around(change, decimals=-magnitude)
-
-        # Map xformed coordinates back
-        if isinstance(xf, core.Skeleton):
-            xf.nodes[['x', 'y', 'z']] = xyz_xf[:xf.n_nodes]
-            # Fix radius based on our best estimate
-            if 'radius' in xf.nodes.columns:
-                xf.nodes['radius'] *= 10**magnitude
-        elif isinstance(xf, core.Dotprops):
-            xf.points = xyz_xf[:xf.points.shape[0]]
-
-            # If this dotprops has a `k`, set tangent vectors and alpha to
-            # None so they will be regenerated
-            if not isinstance(xf.k, type(None)) and xf.k > 0:
-                xf._vect = xf._alpha = None
-            else:
-                # Re-generate vectors
-                hp = xyz_xf[xf.points.shape[0]: xf.points.shape[0] * 2]
-                vect = xf.points - hp
-                vect = vect / np.linalg.norm(vect, axis=1).reshape(-1, 1)
-                xf._vect = vect
-        elif isinstance(xf, core.Mesh):
-            xf.vertices = xyz_xf[:xf.vertices.shape[0]]
-
-        if xf.has_connectors:
-            xf.connectors[['x', 'y', 'z']] = xyz_xf[-xf.connectors.shape[0]:]
-
-        # Make an educated guess as to whether the units have changed
-        if hasattr(xf, 'units') and magnitude != 0:
-            if isinstance(xf.units, (config.ureg.Unit, config.ureg.Quantity)):
-                xf.units = (xf.units / 10**magnitude).to_compact()
-
-        # Fix soma radius if applicable
-        if hasattr(xf, 'soma_radius') and isinstance(xf.soma_radius, numbers.Number):
-            xf.soma_radius *= 10**magnitude
+        _scatter_xyz(xf, xyz, xyz_xf)
 
         return xf
     elif isinstance(x, pd.DataFrame):
@@ -242,6 +206,108 @@ def xform(x: Union['core.NeuronObject', 'pd.DataFrame', 'np.ndarray'],
     return transform.xform(x, affine_fallback=affine_fallback)
 
 
+#: Most points `xform` sends through a transform in one call for a NeuronList
+_BATCH_POINTS = 1_000_000
+
+
+def _chunks_by_size(arrays: list, limit: int) -> list:
+    """Split indices into `arrays` into runs of at most `limit` rows each.
+
+    An array larger than `limit` gets a run to itself.
+    """
+    chunks, current, size = [], [], 0
+    for i, arr in enumerate(arrays):
+        if current and size + len(arr) > limit:
+            chunks.append(current)
+            current, size = [], 0
+        current.append(i)
+        size += len(arr)
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _gather_xyz(xf: 'core.BaseNeuron') -> np.ndarray:
+    """Collect all of a neuron's spatial data into one (N, 3) array."""
+    if isinstance(xf, core.Skeleton):
+        xyz = xf.nodes[['x', 'y', 'z']].values
+    elif isinstance(xf, core.Mesh):
+        xyz = xf.vertices
+    elif isinstance(xf, core.Dotprops):
+        xyz = xf.points
+        # If this dotprops has a `k`, we only need to transform points and
+        # can regenerate the rest. If not, we need to make helper points
+        # to carry over vectors
+        if isinstance(xf.k, type(None)) or xf.k <= 0:
+            # To avoid problems with these helpers we need to make sure
+            # they aren't too close to their cognate points (otherwise we'll
+            # get NaNs later). We can fix this by scaling the vector by the
+            # sampling resolution which should also help make things less
+            # noisy.
+            hp = xf.points + xf.vect * xf.sampling_resolution
+            xyz = np.append(xyz, hp, axis=0)
+    else:
+        raise TypeError(f"Don't know how to transform neuron of type '{type(xf)}'")
+
+    # Add connectors if they exist
+    if xf.has_connectors:
+        xyz = np.vstack([xyz, xf.connectors[['x', 'y', 'z']].values])
+
+    return xyz
+
+
+def _scatter_xyz(xf: 'core.BaseNeuron', xyz: np.ndarray, xyz_xf: np.ndarray) -> None:
+    """Write transformed coordinates from `_gather_xyz` back into `xf`.
+
+    `xyz` are the coordinates before the transform, from which we guess the
+    change in units.
+    """
+    # Guess change in spatial units
+    if xyz.shape[0] > 1:
+        change, magnitude = _guess_change(xyz, xyz_xf, sample=1000)
+    else:
+        change, magnitude = 1, 0
+        logger.warning(f'Unable to assess change of units for neuron {xf.id}: '
+                       'must have at least two nodes/points.')
+
+    # Round change -> this rounds to the first non-zero digit
+    # change = np.around(change, decimals=-magnitude)
+
+    # Map xformed coordinates back
+    if isinstance(xf, core.Skeleton):
+        xf.nodes[['x', 'y', 'z']] = xyz_xf[:xf.n_nodes]
+        # Fix radius based on our best estimate
+        if 'radius' in xf.nodes.columns:
+            xf.nodes['radius'] *= 10**magnitude
+    elif isinstance(xf, core.Dotprops):
+        xf.points = xyz_xf[:xf.points.shape[0]]
+
+        # If this dotprops has a `k`, set tangent vectors and alpha to
+        # None so they will be regenerated
+        if not isinstance(xf.k, type(None)) and xf.k > 0:
+            xf._vect = xf._alpha = None
+        else:
+            # Re-generate vectors
+            hp = xyz_xf[xf.points.shape[0]: xf.points.shape[0] * 2]
+            vect = xf.points - hp
+            vect = vect / np.linalg.norm(vect, axis=1).reshape(-1, 1)
+            xf._vect = vect
+    elif isinstance(xf, core.Mesh):
+        xf.vertices = xyz_xf[:xf.vertices.shape[0]]
+
+    if xf.has_connectors:
+        xf.connectors[['x', 'y', 'z']] = xyz_xf[-xf.connectors.shape[0]:]
+
+    # Make an educated guess as to whether the units have changed
+    if hasattr(xf, 'units') and magnitude != 0:
+        if isinstance(xf.units, (config.ureg.Unit, config.ureg.Quantity)):
+            xf.units = (xf.units / 10**magnitude).to_compact()
+
+    # Fix soma radius if applicable
+    if hasattr(xf, 'soma_radius') and isinstance(xf.soma_radius, numbers.Number):
+        xf.soma_radius *= 10**magnitude
+
+
 def _xform_image(x: 'core.Voxels',
                  transform: Union[BaseTransform, TransformSequence]
                  ) -> 'core.Voxels':
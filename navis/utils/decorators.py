@@ -26,7 +26,7 @@ import warnings
 import numpy as np
 import pandas as pd
 
-from functools import wraps
+from functools import partial, wraps
 from textwrap import dedent, indent
 
 from typing import Optional, Union, List, Iterable, Dict, Tuple, Any
@@ -93,6 +93,7 @@ def map_neuronlist(
         @wraps(function)
         def wrapper(*args, **kwargs):
             from .. import core, compute
+            from ..core.core_utils import assemble_results, run_batch
 
             try:
                 fnname = function.__name__
@@ -169,18 +170,33 @@ def map_neuronlist(
                     # All things failing assume it's not inplace
                     inplace = False
 
+                # Ours, not the function's
+                n_cores = kwargs.pop("n_cores", None)
+                chunksize = kwargs.pop("chunksize", None)
+                backend = kwargs.pop("backend", None)
+                progress = kwargs.pop("progress", True)
+                omit_failures = kwargs.pop("omit_failures", False)
+
+                # A list-level kernel, where the function has one that takes
+                # this input, beats any amount of dispatch - `parallel=True`
+                # included. Tried before the backend is resolved: it runs right
+                # here, so the caller's `inplace` stands as given.
+                res = run_batch(wrapper, nl, args, kwargs)
+                if res is not None:
+                    return _finish(nl, assemble_results(res, cls=nl.__class__),
+                                   inplace)
+
                 # Prepare processor. `n_cores` is defaulted here rather than
                 # left to `NeuronProcessor`, because which backend we resolve
                 # below depends on it: resolving against `None` and then running
                 # against the default can pick two *different* backends, and the
                 # `inplace` decision hangs off the one we resolve here.
-                n_cores = kwargs.pop("n_cores", None) or compute.default_n_workers()
-                chunksize = kwargs.pop("chunksize", None)
+                n_cores = n_cores or compute.default_n_workers()
 
                 # Resolve where this will run *before* deciding on `inplace`
                 # below - the two are not independent.
                 be = compute.resolve_backend(
-                    kwargs.pop("backend", None),
+                    backend,
                     parallel=parallel,
                     n_tasks=len(nl),
                     n_workers=n_cores,
@@ -191,8 +207,9 @@ def map_neuronlist(
                 # Only where they really are copied, though: on a thread pool -
                 # or when the work degraded to running inline - "in place" means
                 # the caller's own neurons, so honouring `inplace=False` there
-                # is the difference between a copy and silent mutation.
-                if parallel and be.isolated and "inplace" in sig.parameters:
+                # is the difference between a copy and silent mutation. Nor
+                # where the copy is read-only (see `writable_payloads`).
+                if parallel and be.owns_payloads and "inplace" in sig.parameters:
                     kwargs["inplace"] = True
 
                 # Keyword arguments are not zipped unless they were declared
@@ -207,25 +224,17 @@ def map_neuronlist(
                     parallel=parallel,
                     desc=desc,
                     warn_inplace=False,
-                    progress=kwargs.pop("progress", True),
-                    omit_failures=kwargs.pop("omit_failures", False),
+                    progress=progress,
+                    omit_failures=omit_failures,
                     chunksize=chunksize,
                     exclude_zip=excl,
                     n_cores=n_cores,
                     backend=be,
+                    # Already tried above, against the caller's `inplace`
+                    batch=False,
                 )
                 # Apply function
-                res = proc(nl, *args, **kwargs)
-
-                # When using parallel processing, the neurons will not actually
-                # have been modified inplace - in that case we will simply
-                # replace the neurons in `nl`
-                if inplace:
-                    nl.neurons = res.neurons
-                else:
-                    nl = res
-
-                return nl
+                return _finish(nl, proc(nl, *args, **kwargs), inplace)
             else:
                 # If single neuron just pass through
                 return function(*args, **kwargs)
@@ -239,11 +248,58 @@ def map_neuronlist(
         # under `parallel=True` - see `navis._deprecated.renamed_kwargs`.
         wrapper.__maps_neuronlist__ = True
 
+        # Where a list-level implementation registers - see `batched`
+        wrapper.batched = partial(batched, wrapper)
+
         return wrapper
 
     return decorator
 
 
+def _finish(nl, res, inplace):
+    """Hand a mapped result back the way `map_neuronlist` promises."""
+    # When using parallel processing, the neurons will not actually have been
+    # modified inplace - in that case we will simply replace the neurons in `nl`
+    if inplace:
+        nl.neurons = res.neurons
+        return nl
+    return res
+
+
+def batched(function, kernel):
+    """Register a list-level implementation of a `@map_neuronlist` function.
+
+    `@map_neuronlist` calls the function once per neuron. For cheap, array-
+    shaped work - a sum over all nodes, one transform for all coordinates - the
+    per-neuron calls cost more than the work. A *batch kernel* does the same
+    thing for the whole list in one go::
+
+        @map_neuronlist(desc="Cable length", allow_parallel=True)
+        def cable_length(x, mask=None):
+            ...
+
+        @cable_length.batched
+        def _cable_length_batch(nl, mask=None):
+            if mask is not None:
+                return NotImplemented
+            ...
+
+    The kernel gets the NeuronList and the arguments exactly as the caller
+    passed them (not zipped) and returns one result per neuron, in order -
+    or `NotImplemented` for input it does not handle, which is then run per
+    neuron as usual. It is picked by the decorator, by
+    [`NeuronProcessor`][navis.core.NeuronProcessor] and by
+    [`navis.Pipeline`][] wherever it applies, `parallel=True` or not. It
+    should not modify anything before it is sure to succeed: if it raises,
+    the neurons are processed one by one instead, so that a failure is
+    reported (or omitted) for the neuron it belongs to.
+
+    Returns the kernel, unchanged.
+    """
+    function.__batch__ = kernel
+    return kernel
+
+
 def map_neuronlist_df(
     desc: str = "",
     id_col: str = "neuron",
@@ -382,6 +438,9 @@ def map_neuronlist_df(
         # under `parallel=True` - see `navis._deprecated.renamed_kwargs`.
         wrapper.__maps_neuronlist__ = True
 
+        # Where a list-level implementation registers - see `batched`
+        wrapper.batched = partial(batched, wrapper)
+
         return wrapper
 
     return decorator
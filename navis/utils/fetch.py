@@ -0,0 +1,250 @@
+#    This script is part of navis (http://www.github.com/navis-org/navis).
+#    Copyright (C) 2018 Philipp Schlegel
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+
+"""asyncio engine for fetching many URLs at once.
+
+Reading a few thousand small files (an SWC per neuron, a precomputed fragment
+per mesh) is dominated by latency, not bandwidth: each request spends most of
+its time waiting on the server. With blocking `requests` calls, the number of
+requests in flight is the number of threads - and threads are an expensive
+way to wait. An event loop waits on hundreds of sockets for the cost of one.
+
+`Fetcher` runs an `aiohttp` session on an event loop in a background thread
+and hands out `concurrent.futures.Future`s, so synchronous code can use it
+exactly like a `ThreadPoolExecutor`. It keeps connections alive and pooled,
+caps the number of connections per host (the servers we read from are often
+small public services) and retries the same transient errors as the `requests`
+sessions in `navis.utils.http`, with the same backoff.
+
+Response bodies are downloaded in full before they are handed to a reader's
+`read_buffer` - decoding does not start while a body is still arriving. This is
+the same trade-off `BaseReader.read_url` makes (see the note there): several
+readers need a seekable buffer, and a truncated or mis-typed file fails in the
+same place either way. Memory is bounded by the number of downloads in flight,
+not by the number of URLs.
+
+`aiohttp` is optional: check `is_available()` and fall back to threads if it
+is not installed.
+"""
+
+import asyncio
+import threading
+
+import requests
+
+from concurrent.futures import Future
+from importlib.util import find_spec
+
+from .http import DEFAULT_HEADERS, DEFAULT_RETRIES, DEFAULT_BACKOFF, RETRY_STATUS
+
+__all__ = ["Fetcher", "is_available"]
+
+# Concurrent connections to any one host. Same reasoning as for the threads in
+# `navis.io.base.URL_THREADS_DEFAULT`: don't hammer academic servers.
+DEFAULT_PER_HOST = 8
+# Concurrent connections in total, across all hosts.
+DEFAULT_MAX_CONNECTIONS = 64
+# Total timeout for a single request (including reading the body), in seconds.
+DEFAULT_TIMEOUT = 300
+# Size of the chunks we read response bodies in.
+CHUNK_SIZE = 2**16
+# Cap for a server's `Retry-After` - we don't want a misconfigured server to
+# stall an import for an hour.
+MAX_RETRY_AFTER = 60
+
+
+def is_available() -> bool:
+    """Whether the asyncio engine can be used (i.e. `aiohttp` is installed)."""
+    return find_spec("aiohttp") is not None
+
+
+def _import_aiohttp():
+    try:
+        import aiohttp
+    except ModuleNotFoundError:
+        raise ModuleNotFoundError(
+            "The `aiohttp` package is required for asynchronous downloads. "
+            "Please install it via `pip install aiohttp`."
+        )
+    return aiohttp
+
+
+class Fetcher:
+    """Fetch URLs concurrently on a background event loop.
+
+    Use as a context manager: the loop, its thread and all pooled connections
+    are torn down on exit, and any downloads still in flight are cancelled.
+
+    Parameters
+    ----------
+    per_host :          int
+                        Maximum number of concurrent connections per host.
+    max_connections :   int
+                        Maximum number of concurrent connections in total.
+    retries :           int
+                        Number of retries for connection errors, timeouts and
+                        the statuses in `navis.utils.http.RETRY_STATUS`.
+    backoff_factor :    float
+                        Exponential backoff between retries, in seconds: the
+                        n-th retry waits `backoff_factor * 2 ** (n - 1)`
+                        unless the server asks for longer via `Retry-After`.
+    headers :           dict, optional
+                        Extra headers, applied on top of `DEFAULT_HEADERS`.
+    timeout :           float
+                        Total timeout for each request, in seconds.
+
+    Examples
+    --------
+    >>> from navis.utils.fetch import Fetcher
+    >>> with Fetcher() as f:                                   # doctest: +SKIP
+    ...     futures = [f.submit(url) for url in urls]
+    ...     data = [fut.result() for fut in futures]
+
+    """
+
+    def __init__(
+        self,
+        per_host=DEFAULT_PER_HOST,
+        max_connections=DEFAULT_MAX_CONNECTIONS,
+        retries=DEFAULT_RETRIES,
+        backoff_factor=DEFAULT_BACKOFF,
+        headers=None,
+        timeout=DEFAULT_TIMEOUT,
+    ):
+        self._aiohttp = _import_aiohttp()
+        self.per_host = int(per_host)
+        self.max_connections = max(int(max_connections), self.per_host)
+        self.retries = int(retries)
+        self.backoff_factor = backoff_factor
+        self.headers = {**DEFAULT_HEADERS, **(headers or {})}
+        self.timeout = timeout
+
+        self._loop = None
+        self._thread = None
+        self._session = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def start(self):
+        """Start the event loop and open the session."""
+        if self._loop is not None:
+            return
+
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._loop.run_forever, name="navis-fetch", daemon=True
+        )
+        self._thread.start()
+        # The session (and its connector) must be created on the loop it runs on
+        self._session = self._run(self._open_session())
+
+    def close(self):
+        """Cancel outstanding downloads, close connections and stop the loop."""
+        if self._loop is None:
+            return
+        try:
+            self._run(self._shutdown())
+        finally:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop.close()
+            self._loop = self._thread = self._session = None
+
+    def submit(self, url: str) -> Future:
+        """Schedule a download and return a future for its content (bytes).
+
+        The future resolves once the whole body has arrived; it is not
+        streamed to the caller.
+
+        The future raises `requests.HTTPError` for error statuses and
+        `requests.ConnectionError` if the server can't be reached - the same as
+        the `requests`-based readers would.
+        """
+        if self._loop is None:
+            raise RuntimeError("Fetcher has not been started.")
+        return asyncio.run_coroutine_threadsafe(self._fetch(url), self._loop)
+
+    def fetch(self, url: str) -> bytes:
+        """Download a single URL (blocking)."""
+        return self.submit(url).result()
+
+    def _run(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    async def _open_session(self):
+        aiohttp = self._aiohttp
+        connector = aiohttp.TCPConnector(
+            limit=self.max_connections, limit_per_host=self.per_host
+        )
+        return aiohttp.ClientSession(
+            connector=connector,
+            headers=self.headers,
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+            raise_for_status=False,
+        )
+
+    async def _shutdown(self):
+        current = asyncio.current_task()
+        tasks = [t for t in asyncio.all_tasks() if t is not current]
+        for t in tasks:
+            t.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await self._session.close()
+
+    async def _fetch(self, url):
+        aiohttp = self._aiohttp
+        attempt = 0
+        while True:
+            try:
+                async with self._session.get(url) as r:
+                    if r.status in RETRY_STATUS and attempt < self.retries:
+                        attempt += 1
+                        await asyncio.sleep(self._backoff(attempt, r))
+                        continue
+                    if r.status >= 400:
+                        raise requests.HTTPError(
+                            f"{r.status} {'Client' if r.status < 500 else 'Server'} "
+                            f"Error: {r.reason} for url: {url}"
+                        )
+                    # Collect the body in chunks as it arrives rather than
+                    # buffering the response twice. It is still held in full:
+                    # readers get it as one buffer
+                    body = bytearray()
+                    async for chunk in r.content.iter_chunked(CHUNK_SIZE):
+                        body += chunk
+                    return bytes(body)
+            except (
+                aiohttp.ClientConnectionError,
+                aiohttp.ClientPayloadError,
+                asyncio.TimeoutError,
+            ) as e:
+                if attempt >= self.retries:
+                    raise requests.ConnectionError(
+                        f"Failed to fetch {url} after {attempt + 1} attempt(s): "
+                        f"{type(e).__name__}: {e}"
+                    ) from e
+                attempt += 1
+                await asyncio.sleep(self._backoff(attempt))
+
+    def _backoff(self, attempt, response=None):
+        """Seconds to wait before the given retry."""
+        if response is not None:
+            retry_after = response.headers.get("Retry-After", "")
+            if retry_after.isdigit():
+                return min(int(retry_after), MAX_RETRY_AFTER)
+        return self.backoff_factor * 2 ** (attempt - 1)
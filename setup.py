@@ -13,11 +13,12 @@ install_requires, extras_require = parse_requirement_files(
 )
 
 dev_only = ["test-notebook", "dev", "docs"]
-# Kept out of `[all]`: needed only to point navis at a cluster, and dask pulls
-# in a sizeable dependency tree that a local install has no use for.
+# Kept out of `[all]`: needed only to point navis at a cluster, and dask (let
+# alone ray) pulls in a sizeable dependency tree that a local install has no
+# use for.
 # N.B. these are *extra* names as declared by `#extra:` in requirements.txt,
 # not distribution names - the cloud-volume package sits under `cloudvolume`.
-specialized = ["flybrains", "cloudvolume", "cluster"]
+specialized = ["flybrains", "cloudvolume", "cluster", "ray"]
 all_dev_deps = []
 all_deps = []
 for k, v in extras_require.items():
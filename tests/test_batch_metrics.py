@@ -0,0 +1,75 @@
+"""Tests for `navis.batch_metrics`.
+
+The engine computes metrics from shared intermediates instead of calling the
+standalone functions, so the ground truth here is that every metric agrees with
+the function it stands in for.
+"""
+
+import numpy as np
+import pytest
+
+import navis
+
+
+RADII = [1000, 5000, 20000]
+
+
+@pytest.fixture(scope="module")
+def nl():
+    return navis.example_neurons(3, kind="skeleton")
+
+
+def test_batch_metrics_match_standalone(nl):
+    m = navis.batch_metrics(
+        nl,
+        metrics=["basic", "cable_length", "strahler_index", "tortuosity",
+                 "segments", "sholl"],
+        radii=RADII,
+    )
+
+    assert len(m) == len(nl)
+    assert m.neuron.tolist() == nl.id.tolist()
+
+    for row, n in zip(m.itertuples(), nl):
+        assert row.n_nodes == n.n_nodes
+        assert row.n_branches == n.n_branches
+        assert row.n_leafs == n.n_leafs
+        assert np.isclose(row.cable_length, navis.morpho.cable_length(n))
+        assert np.isclose(row.tortuosity, navis.tortuosity(n))
+        assert (row.strahler_index
+                == navis.strahler_index(n.copy()).nodes.strahler_index.max())
+
+        sa = navis.segment_analysis(n.copy())
+        assert row.n_segments == len(sa)
+        assert np.isclose(row.mean_segment_length, sa.length.mean())
+
+        sholl = navis.sholl_analysis(n, radii=RADII)
+        assert [getattr(row, f"sholl_{r}") for r in RADII] == sholl.intersections.tolist()
+
+
+def test_batch_metrics_ivscc(nl):
+    n = nl[0].copy()
+    n.nodes["label"] = np.where(
+        n.nodes.y > n.soma_pos[0][1], "apical_dendrite", "basal_dendrite"
+    )
+
+    a = navis.batch_metrics(n, metrics=["ivscc"])
+    b = navis.ivscc_features(n, progress=False)
+    assert sorted(a.columns) == sorted(b.columns)
+    assert np.allclose(a[b.columns].values.astype(float),
+                       b.values.astype(float), equal_nan=True)
+
+
+def test_batch_metrics_parallel(nl):
+    serial = navis.batch_metrics(nl)
+    parallel = navis.batch_metrics(nl, parallel=True, n_cores=2,
+                                   backend="threads")
+    assert serial.equals(parallel)
+
+
+def test_batch_metrics_bad_input(nl):
+    with pytest.raises(ValueError, match="Unknown metric"):
+        navis.batch_metrics(nl, metrics=["cable_length", "nonsense"])
+    # Per-neuron linspaced radii would give every neuron different columns
+    with pytest.raises(ValueError, match="list of `radii`"):
+        navis.batch_metrics(nl[0], metrics=["sholl"], radii=10)
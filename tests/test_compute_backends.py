@@ -10,6 +10,7 @@ deterministically, which is impossible with a real pool.
 import concurrent.futures as cf
 import dataclasses
 import functools
+import json
 import subprocess
 import sys
 
@@ -555,6 +556,144 @@ def test_empty_tasks_short_circuits():
     assert not be.calls
 
 
+# --------------------------------------------------------------------------- #
+# Cost-aware scheduling
+# --------------------------------------------------------------------------- #
+@pytest.fixture
+def fresh_cost_model(monkeypatch):
+    """A cost model that has learned nothing, and forgets again afterwards."""
+    model = dispatch.CostModel()
+    monkeypatch.setattr(dispatch, 'cost_model', model)
+    return model
+
+
+def test_plan_chunks_packs_to_equal_cost():
+    # One giant and many small: counting tasks would put the giant in with
+    # three others, packing by cost gives it a unit of its own
+    costs = [100] + [10] * 30
+    plan = dispatch.plan_chunks(costs, 4)
+
+    assert sorted(i for p in plan for i in p) == list(range(len(costs)))
+    assert plan[0] == [0]
+    totals = [sum(costs[i] for i in p) for p in plan]
+    assert totals == sorted(totals, reverse=True)
+    assert max(totals) - min(totals) <= 10
+
+
+def test_largest_tasks_are_dispatched_first(tasks, fresh_cost_model):
+    be = DummyBackend(reverse=True)
+    sizes = [1, 50, 3, 1000, 2, 7, 10]
+    res = dispatch.map_tasks(tasks, backend=be, n_workers=2, sizes=sizes)
+
+    # Still input order for the caller...
+    assert res == [i * 2 for i in range(7)]
+    # ... but the work went out biggest first
+    sent = [p.tasks[0][1][0] for p in be.calls[0]['payloads']]
+    assert sent == sorted(range(7), key=lambda i: -sizes[i])
+
+
+def test_bundles_are_packed_by_cost(fresh_cost_model):
+    class Cluster(DummyBackend):
+        name = 'cluster'
+        chunks_per_worker = 2
+
+    tasks = [(double, (i,), {}) for i in range(40)]
+    sizes = [1000] * 2 + [1] * 38
+    be = Cluster()
+    res = dispatch.map_tasks(tasks, backend=be, n_workers=2, sizes=sizes)
+
+    assert res == [i * 2 for i in range(40)]
+    payloads = be.calls[0]['payloads']
+    assert len(payloads) == 4
+    # The two big tasks each get a unit of their own
+    assert [len(p.tasks) for p in payloads[:2]] == [1, 1]
+
+
+def test_explicit_chunksize_keeps_its_units(tasks, fresh_cost_model):
+    be = DummyBackend()
+    dispatch.map_tasks(tasks, backend=be, n_workers=2, chunksize=3,
+                       sizes=[1, 1, 1, 1, 1, 1, 100])
+
+    payloads = be.calls[0]['payloads']
+    assert [len(p.tasks) for p in payloads] == [1, 3, 3]
+
+
+def test_sizes_are_ignored_when_nothing_overlaps(tasks):
+    be = SerialBackend()
+    asked = []
+    res = dispatch.map_tasks(tasks, backend=be, n_workers=2,
+                             sizes=lambda: asked.append(1))
+    assert res == [i * 2 for i in range(7)]
+    assert not asked
+
+
+def test_cost_model_learns_the_exponent(fresh_cost_model):
+    model = fresh_cost_model
+    sizes = [10, 20, 40, 80, 160, 320] * 3
+    assert model.exponent('f') == 1
+
+    # Quadratic in size
+    model.record('f', sizes, [1e-3 * s ** 2 for s in sizes])
+    assert model.exponent('f') == pytest.approx(2)
+    assert model.estimate('f', [10, 100]) == pytest.approx([100, 10_000])
+
+    # Timings of other functions are filed separately
+    assert model.exponent('g') == 1
+
+
+def test_dispatch_trains_the_cost_model(tasks, fresh_cost_model, monkeypatch):
+    recorded = []
+    monkeypatch.setattr(fresh_cost_model, 'record',
+                        lambda key, s, d: recorded.append((key, list(s))))
+    dispatch.map_tasks(tasks, backend=DummyBackend(), n_workers=2,
+                       sizes=range(1, 8))
+
+    assert {k for k, _ in recorded} == {dispatch.CostModel.key(double)}
+    assert sorted(s for _, sizes in recorded for s in sizes) == list(range(1, 8))
+
+
+# --------------------------------------------------------------------------- #
+# Profiling
+# --------------------------------------------------------------------------- #
+@pytest.mark.parametrize('name', ['serial', 'threads'])
+def test_profile_records_every_task(tasks, name):
+    with navis.profile() as prof:
+        res = dispatch.map_tasks(tasks, backend=get_backend(name), n_workers=2,
+                                 chunksize=3, disable=True, desc='doubling')
+
+    assert res == [2 * i for i in range(7)]
+    df = prof.to_dataframe()
+    counts = df.kind.value_counts()
+    assert counts['dispatch'] == 1
+    assert counts['chunk'] == counts['queue'] == counts['return'] == 3
+
+    # Tasks are filed under their position in the input, not in their chunk
+    t = df[df.kind == 'task']
+    assert sorted(t.task) == list(range(7))
+    assert (t.bytes_in > 0).all() and (t.bytes_out > 0).all()
+    assert (t.wall >= 0).all() and t.name.str.endswith('double').all()
+    assert set(df[df.kind == 'chunk'].name) == {'doubling'}
+
+
+def test_profile_is_off_by_default(tasks):
+    chunk = dispatch.Chunk(index=0, context=None, catch=False,
+                           want_traceback=False, tasks=tasks)
+
+    assert dispatch.run_chunk(chunk)[3] is None
+    assert navis.compute.profiling.recording() is None
+
+
+def test_profile_chrome_trace(tasks, tmp_path):
+    with navis.profile() as prof:
+        dispatch.map_tasks(tasks, backend=get_backend('serial'), disable=True)
+
+    trace = prof.to_chrome_trace(tmp_path / 'trace.json')
+
+    assert trace == json.loads((tmp_path / 'trace.json').read_text())
+    assert len(trace['traceEvents']) == len(prof)
+    assert all(e['ph'] == 'X' and e['dur'] >= 0 for e in trace['traceEvents'])
+
+
 # --------------------------------------------------------------------------- #
 # Failure handling
 # --------------------------------------------------------------------------- #
@@ -871,3 +1010,150 @@ def test_shutdown_releases_the_pools_backends_keep_alive():
                               n_workers=2, disable=True) == [4]
     navis.compute.shutdown()
 
+
+def test_warm_pool_stays_up(monkeypatch):
+    """A warm pool has all its workers up front and ignores the idle timeout."""
+    from navis.compute.backends import local
+    monkeypatch.setattr(local, 'IDLE_TIMEOUT', 0)
+
+    try:
+        navis.warm_pool(2)
+        pool = local._POOL
+        assert len(pool._processes) == 2
+
+        assert dispatch.map_tasks([(double, (i,), {}) for i in range(4)],
+                                  backend=get_backend('processes'),
+                                  n_workers=2, disable=True) == [0, 2, 4, 6]
+        assert local._POOL is pool, 'the warm pool was not reused'
+    finally:
+        navis.compute.shutdown()
+    assert local._POOL is None
+
+
+def test_bloated_workers_are_recycled(monkeypatch):
+    from navis.compute.backends import local
+    monkeypatch.setattr(local, 'MAX_WORKER_MEMORY', 1)
+
+    try:
+        be = get_backend('processes')
+        assert dispatch.map_tasks([(double, (1,), {})] * 2, backend=be,
+                                  n_workers=2, disable=True) == [2, 2]
+        # Every worker is over one byte, so the pool was retired on release...
+        assert local._POOL is None
+        # ... and the next call simply gets a fresh one
+        assert dispatch.map_tasks([(double, (2,), {})] * 2, backend=be,
+                                  n_workers=2, disable=True) == [4, 4]
+    finally:
+        navis.compute.shutdown()
+
+
+def test_readers_recycle_bloated_workers(monkeypatch):
+    """Reads report their workers' memory like any other work."""
+    from navis.compute.backends import local
+    from navis.io.base import parallel_iread, parallel_read
+    monkeypatch.setattr(local, 'MAX_WORKER_MEMORY', 1)
+
+    try:
+        assert parallel_read(double, [1, 2, 3], parallel=2) == [2, 4, 6]
+        assert local._POOL is None
+        assert list(parallel_iread(double, [1, 2, 3], parallel=2)) == [2, 4, 6]
+        assert local._POOL is None
+    finally:
+        navis.compute.shutdown()
+
+
+def test_readers_share_the_process_pool():
+    from navis.compute.backends import local
+    from navis.io.base import parallel_read
+
+    try:
+        assert parallel_read(double, [1, 2, 3], parallel=2) == [2, 4, 6]
+        pool = local._POOL
+        assert pool is not None, 'the readers should leave the pool warm'
+
+        dispatch.map_tasks([(double, (1,), {})] * 2,
+                           backend=get_backend('processes'), n_workers=2,
+                           disable=True)
+        assert local._POOL is pool
+    finally:
+        navis.compute.shutdown()
+
+
+# --------------------------------------------------------------------------- #
+# Shared arguments
+# --------------------------------------------------------------------------- #
+def total(x, values):
+    return x + sum(values)
+
+
+def test_shared_arguments_travel_as_handles(tmp_path):
+    from navis.compute import store
+
+    values = list(range(1000))
+    chunks = [[(total, (i, values), {})] for i in range(3)]
+    fs = store.FileStore(tmp_path)
+    shared = store.share(chunks, fs, min_bytes=1)
+
+    # Each chunk carries the same handle rather than the list...
+    refs = [c[0][1][1] for c in shared]
+    assert all(isinstance(r, store.SharedRef) for r in refs)
+    assert len({r.key for r in refs}) == 1
+    # ... which stands for the original
+    func, args, kwargs = store.unwrap(shared[0][0])
+    assert func(*args, **kwargs) == sum(values)
+
+    # Closing the store is what cleans up after the run
+    assert any(tmp_path.iterdir())
+    fs.close()
+    assert not any(tmp_path.iterdir())
+
+
+def test_small_or_unshared_arguments_stay_inline(tmp_path):
+    from navis.compute import store
+
+    fs = store.FileStore(tmp_path)
+    values = list(range(1000))
+    # Too small to be worth it
+    assert store.share([[(total, (i, values), {})] for i in range(3)], fs) is None
+    # Big, but every chunk has its own. (The function is shared, but it
+    # pickles by reference - a few dozen bytes.)
+    assert store.share([[(total, (i, list(values)), {})] for i in range(3)],
+                       fs, min_bytes=1000) is None
+    # Shared, but all in one chunk: pickle already sends it once
+    assert store.share([[(total, (i, values), {}) for i in range(3)]],
+                       fs, min_bytes=1000) is None
+
+
+def test_process_pool_ships_shared_arguments_once(monkeypatch):
+    from navis.compute import store
+
+    # Above the function, which pickles by reference; below the list
+    monkeypatch.setattr(store, 'MIN_SHARED_BYTES', 1000)
+    stores = []
+
+    class Spy(store.FileStore):
+        def put(self, obj, data):
+            stores.append(self)
+            return super().put(obj, data)
+
+    monkeypatch.setattr(ProcessBackend, 'object_store', lambda self: Spy())
+
+    values = list(range(1000))
+    try:
+        got = dispatch.map_tasks([(total, (i, values), {}) for i in range(4)],
+                                 backend=get_backend('processes'), n_workers=2,
+                                 disable=True)
+    finally:
+        navis.compute.shutdown()
+
+    assert got == [i + sum(values) for i in range(4)]
+    assert len(stores) == 1, 'expected exactly one shared argument'
+    # ... and nothing is left behind in shared memory
+    assert not stores[0]._dirs
+
+
+def test_in_process_backends_do_not_share():
+    assert SerialBackend().object_store() is None
+    assert get_backend('threads').object_store() is None
+    assert isinstance(ProcessBackend().object_store(),
+                      navis.compute.store.FileStore)
@@ -1,13 +1,13 @@
-"""Tests for the cluster backends: dask.distributed and submitit.
+"""Tests for the cluster backends: dask.distributed, submitit and Ray.
 
-These run against real machinery - a local dask cluster and submitit's local
-executors - because the interesting failures are the ones a mock cannot have:
+These run against real machinery - a local dask cluster, submitit's local
+executors and a local Ray instance - because the interesting failures are the ones a mock cannot have:
 whether a neuron survives cloudpickle, whether results come back in input
 order, and whether a worker's exception reaches the caller intact. Both
 dependencies are optional, so everything here skips cleanly without them.
 
-The contract every cluster backend has to meet is parametrised over both, so a
-third one cannot be added while quietly meeting only half of it. Tests below
+The contract every cluster backend has to meet is parametrised over all of
+them, so another one cannot be added while quietly meeting only half of it. Tests below
 that are specific to one backend say so in their name.
 """
 
@@ -30,12 +30,18 @@ try:
 except ImportError:
     submitit = None
 
+try:
+    import ray
+except ImportError:
+    ray = None
+
 # Marks rather than a module-level `importorskip` so that having only one of
 # the two installed still runs that one's tests.
 requires_dask = pytest.mark.skipif(distributed is None,
                                    reason='dask.distributed not installed')
 requires_submitit = pytest.mark.skipif(submitit is None,
                                        reason='submitit not installed')
+requires_ray = pytest.mark.skipif(ray is None, reason='ray not installed')
 
 
 @pytest.fixture
@@ -60,6 +66,18 @@ def dask_client():
             yield client
 
 
+@pytest.fixture(scope='module')
+def ray_backend():
+    """A local Ray instance, two CPUs - enough to see placement at work."""
+    from navis.compute.backends import RayBackend
+
+    ray.init(num_cpus=2, include_dashboard=False, log_to_driver=False)
+    try:
+        yield RayBackend()
+    finally:
+        ray.shutdown()
+
+
 @pytest.fixture
 def local_executor(tmp_path):
     """Runs jobs as subprocesses - slower, but really does pickle and spawn."""
@@ -74,7 +92,7 @@ def debug_executor(tmp_path):
     return submitit.AutoExecutor(folder=str(tmp_path), cluster='debug')
 
 
-@pytest.fixture(params=['dask', 'submitit'])
+@pytest.fixture(params=['dask', 'submitit', 'ray'])
 def cluster(request):
     """A configured scheduler object, once per cluster backend."""
     if request.param == 'dask':
@@ -82,6 +100,11 @@ def cluster(request):
             pytest.skip('dask.distributed not installed')
         return request.getfixturevalue('dask_client')
 
+    if request.param == 'ray':
+        if ray is None:
+            pytest.skip('ray not installed')
+        return request.getfixturevalue('ray_backend')
+
     if submitit is None:
         pytest.skip('submitit not installed')
     return request.getfixturevalue('local_executor')
@@ -165,6 +188,26 @@ def test_cluster_bundles_neurons_into_fewer_units(cluster):
     assert -(-10_000 // cs) <= (be.worker_count(20) or 20) * be.chunks_per_worker
 
 
+def test_cluster_ships_a_shared_argument_once(cluster, neurons, monkeypatch):
+    """A big argument every task carries travels as a handle."""
+    import numpy as np
+    from navis.compute import store
+
+    monkeypatch.setattr(store, 'MIN_SHARED_BYTES', 1000)
+    shared = []
+    share = store.share
+    monkeypatch.setattr(store, 'share',
+                        lambda *a, **k: shared.append(share(*a, **k)) or shared[-1])
+
+    lut = np.arange(1000)
+    with navis.set_parallel_backend(cluster):
+        got = neurons.apply(lambda n, lut: int(lut[n.n_nodes % 1000]), lut=lut,
+                            parallel=True, n_cores=2, chunksize=1)
+
+    assert got == [n.n_nodes % 1000 for n in neurons]
+    assert shared and shared[0] is not None, 'the lookup table went inline'
+
+
 # --------------------------------------------------------------------------- #
 # dask
 # --------------------------------------------------------------------------- #
@@ -289,3 +332,76 @@ def test_submitit_carries_the_worker_traceback_home(local_executor, neurons):
     from navis.compute.dispatch import RemoteTraceback
     assert isinstance(exc.value.__cause__, RemoteTraceback)
     assert 'in boom' in str(exc.value.__cause__)
+
+
+# --------------------------------------------------------------------------- #
+# ray
+# --------------------------------------------------------------------------- #
+def _assigned_cpus(n):
+    return ray.get_runtime_context().get_assigned_resources().get('CPU')
+
+
+@requires_ray
+def test_ray_reserves_a_cpu_per_thread(ray_backend):
+    """The thread cap is what a unit asks Ray for, so nodes aren't overbooked."""
+    from navis.compute import dispatch
+
+    tasks = [(_assigned_cpus, (i,), {}) for i in range(2)]
+    # Under "auto" a cluster worker gets what the scheduler allots: `num_cpus`
+    assert dispatch.map_tasks(tasks, backend=ray_backend, n_workers=2,
+                              disable=True) == [1, 1]
+    # ... and an explicit cap is reserved as such
+    assert dispatch.map_tasks(tasks, backend=ray_backend, n_workers=2,
+                              threads=2, disable=True) == [2, 2]
+
+
+@requires_ray
+def test_ray_sizes_chunks_against_the_cluster(ray_backend):
+    assert ray_backend.worker_count(20) == 2
+
+
+@requires_ray
+def test_ray_results_are_writable(ray_backend, neurons):
+    """Ray's zero-copy arrays are read-only; ours must not be."""
+    with navis.set_parallel_backend(ray_backend):
+        got = navis.prune_twigs(neurons, 5000, parallel=True, inplace=False,
+                                n_cores=2)
+    got[0].nodes.loc[0, 'x'] = 0
+
+
+def _node_array_writable(n):
+    return n.nodes['x'].values.flags.writeable
+
+
+@requires_ray
+def test_ray_ships_neurons_zero_copy(ray_backend, neurons):
+    """Node tables arrive as read-only views into the object store ..."""
+    from navis.compute import dispatch
+
+    tasks = [(_node_array_writable, (n,), {}) for n in neurons[:2]]
+    assert dispatch.map_tasks(tasks, backend=ray_backend, n_workers=2,
+                              disable=True) == [False, False]
+
+
+@requires_ray
+def test_ray_steps_copy_before_they_write(ray_backend, neurons):
+    """... so a step that edits its neuron must not be told to do it in place."""
+    assert not ray_backend.owns_payloads
+
+    with navis.set_parallel_backend(ray_backend):
+        got = navis.prune_twigs(neurons, 5000, parallel=True, inplace=False,
+                                n_cores=2)
+        piped = navis.Pipeline((navis.prune_twigs, (5000,)))(
+            neurons, parallel=True, n_cores=2)
+    want = navis.prune_twigs(neurons, 5000)
+    assert [n.n_nodes for n in got] == [n.n_nodes for n in want]
+    assert [n.n_nodes for n in piped] == [n.n_nodes for n in want]
+
+
+@requires_ray
+def test_ray_without_a_cluster_says_so(monkeypatch):
+    from navis.compute.backends import RayBackend
+
+    monkeypatch.setattr(ray, 'is_initialized', lambda: False)
+    with pytest.raises(ValueError, match='ray.init'):
+        RayBackend().object_store()
@@ -14,7 +14,7 @@ import pytest
 
 import navis
 from navis import config
-from navis.compute import dispatch, threads
+from navis.compute import dispatch, scaling, threads
 from navis.compute.backends import get_backend
 
 
@@ -323,3 +323,141 @@ def test_worker_initializer_sizes_from_the_worker_count(monkeypatch):
 
     assert dispatch.worker_initializer(4).keywords['threads'] == 4
     assert dispatch.worker_initializer(16).keywords['threads'] == 1
+
+
+# --------------------------------------------------------------------------- #
+# Splitting the machine by scaling profile
+# --------------------------------------------------------------------------- #
+@pytest.fixture
+def profiles():
+    """Keep declarations made by a test out of the others."""
+    before = dict(scaling._profiles)
+    yield scaling._profiles
+    scaling._profiles.clear()
+    scaling._profiles.update(before)
+
+
+def test_few_big_tasks_get_threads_rather_than_idle_workers():
+    assert scaling.plan_split(16, scaling.Scaling(0.95), [1] * 4,
+                              max_workers=16) == (4, 4)
+    # One task dwarfs the others: nothing gained from more workers than
+    # it takes to keep up with it, so give the threads to them instead
+    workers, threads_ = scaling.plan_split(16, scaling.Scaling(0.95),
+                                           [10, 1, 1, 1], max_workers=16)
+    assert workers < 4 and threads_ > 4
+
+
+def test_no_gain_from_threads_keeps_the_workers():
+    """A profile saying "threads do nothing" must change nothing."""
+    assert scaling.plan_split(16, scaling.Scaling(0.), [1] * 4,
+                              max_workers=8) == (8, 2)
+    assert scaling.plan_split(16, scaling.Scaling(0.), [1] * 100,
+                              max_workers=8) == (8, 2)
+
+
+def test_many_tasks_keep_the_workers():
+    """With plenty of work to go round, processes beat imperfect threads."""
+    assert scaling.plan_split(16, scaling.Scaling(0.8), [1] * 100,
+                              max_workers=16) == (16, 1)
+
+
+def test_split_needs_a_profile(monkeypatch):
+    monkeypatch.setattr(dispatch, 'cpu_count', lambda: 16)
+
+    assert dispatch.resolve_split(FakeBackend(), 8, 'auto') == (8, 2)
+    assert dispatch.resolve_split(FakeBackend(), 8, 'auto',
+                                  scaling=scaling.Scaling(0.95),
+                                  costs=[1, 1]) == (2, 8)
+
+
+def test_split_respects_what_it_cannot_change(monkeypatch):
+    monkeypatch.setattr(dispatch, 'cpu_count', lambda: 16)
+    profile = scaling.Scaling(0.95)
+
+    # An explicit cap is the user's call
+    assert dispatch.resolve_split(FakeBackend(), 8, 2, scaling=profile,
+                                  costs=[1, 1]) == (8, 2)
+    # A cluster's cores are not ours to split
+    assert dispatch.resolve_split(FakeBackend(shares_machine=False), 8, 'auto',
+                                  scaling=profile, costs=[1, 1]) == (8, None)
+    # A user's executor comes with its own size
+    assert dispatch.resolve_split(FakeBackend(workers=16), 8, 'auto',
+                                  scaling=profile, costs=[1, 1]) == (8, 1)
+
+
+def test_measured_beats_declared(profiles, tmp_path):
+    scaling.declare_scaling(0.5, 'some.func')
+    assert scaling.get_scaling('some.func') == (0.5, 'declared')
+
+    (tmp_path / 'scaling.json').write_text('{"some.func": 0.9}')
+    scaling.load_scaling(tmp_path / 'scaling.json')
+    scaling.declare_scaling(0.5, 'some.func')
+    assert scaling.get_scaling('some.func') == (0.9, 'measured')
+
+    scaling.save_scaling(tmp_path / 'saved.json')
+    scaling._profiles.clear()
+    scaling.load_scaling(tmp_path / 'saved.json')
+    assert scaling.get_scaling('some.func') == (0.9, 'measured')
+
+
+def test_declaration_rejects_nonsense():
+    with pytest.raises(ValueError):
+        scaling.declare_scaling(1.5, 'some.func')
+
+
+def test_profile_reaches_the_workers(monkeypatch, profiles):
+    """End to end: two tasks of a well-threaded function on a 4-core budget
+    run as 2 workers x 2 threads, not 4 workers x 1 thread."""
+    monkeypatch.setattr(dispatch, 'cpu_count', lambda: 4)
+    nl = navis.example_neurons(2)
+
+    caps = nl.apply(probe_env, parallel=True, n_cores=4, backend='processes')
+    assert all(rayon == '1' for rayon, _ in caps)
+
+    scaling.declare_scaling(0.9, probe_env)
+    caps = nl.apply(probe_env, parallel=True, n_cores=4, backend='processes')
+    assert all(rayon == '2' for rayon, _ in caps)
+
+
+def busy(n):
+    """Something to time. Module level so it pickles."""
+    return sum(i * i for i in range(n))
+
+
+def test_calibrate_measures_and_remembers(profiles):
+    result = scaling.calibrate(busy, 20_000, threads=(1, 2), repeats=1)
+
+    assert result.source == 'measured'
+    assert 0 <= result.parallel_fraction <= 1
+    assert scaling.get_scaling(busy) == result
+
+
+def test_nblast_blocks_have_a_profile():
+    from navis.nbl.backends.builtin import _run_job
+
+    assert scaling.get_scaling(_run_job).source == 'declared'
+
+
+def test_benchmark_skips_what_it_cannot_run(monkeypatch, profiles):
+    """By default, a declared function that takes no neurons is skipped..."""
+    profiles.clear()
+    scaling.declare_scaling(0.5, busy)
+    scaling.declare_scaling(0.5, probe_env)
+
+    def calibrate(func, neurons, **kwargs):
+        if func is busy:
+            raise TypeError('not a neuron')
+        return scaling.Scaling(0.7, 'measured')
+
+    monkeypatch.setattr(scaling, 'calibrate', calibrate)
+    nl = navis.example_neurons(1)
+    assert list(scaling.benchmark(neurons=nl)) == [scaling._key(probe_env)]
+
+    # ... but asking for it by name is asking to hear why not
+    with pytest.raises(TypeError):
+        scaling.benchmark([busy], neurons=nl)
+
+
+def test_calibrate_needs_two_thread_counts():
+    with pytest.raises(ValueError):
+        scaling.calibrate(busy, 10, threads=(2, 2))
@@ -136,3 +136,87 @@ def test_neuron_connector_real(
         n = edata["weight"]
 
         assert exp[pre_skid][post_skid] == n
+
+
+def _pairwise_overlap(a, b, max_dist):
+    """Cable overlap the slow way: two nearest-neighbour queries per pair."""
+    import scipy.spatial
+
+    fwd = np.zeros((len(a), len(b)))
+    rev = np.zeros((len(a), len(b)))
+    for i, nA in enumerate(a):
+        pA, _, lA = navis.neuron2tangents(nA)
+        tA = scipy.spatial.cKDTree(pA)
+        for k, nB in enumerate(b):
+            pB, _, lB = navis.neuron2tangents(nB)
+            tB = scipy.spatial.cKDTree(pB)
+            dA, ixA = tA.query(pB, distance_upper_bound=max_dist)
+            dB, ixB = tB.query(pA, distance_upper_bound=max_dist)
+            fwd[i, k] = lA[ixA[dA != np.inf]].sum()
+            rev[i, k] = lB[ixB[dB != np.inf]].sum()
+    return fwd, rev
+
+
+@pytest.fixture(scope="module")
+def spread_out():
+    """Example neurons, some of them moved well away from the others."""
+    nl = navis.example_neurons(5).convert_units("um")
+    nl = nl.resample("1 micron", inplace=False)
+    for n, offset in zip(nl[3:], [500, 5000]):
+        n.nodes[["x", "y", "z"]] += offset
+    return nl
+
+
+@pytest.fixture(params=["pairs", "block"])
+def overlap_kernel(request, monkeypatch):
+    """Run `cable_overlap` through either kernel: these neurons are dense
+    enough that it would otherwise always query pair by pair."""
+    from navis.connectivity import predict
+
+    if request.param == "block":
+        monkeypatch.setattr(predict, "DENSE_FRACTION", 1.0)
+    else:
+        monkeypatch.setattr(predict, "DENSE_FRACTION", 0.0)
+    return request.param
+
+
+@pytest.mark.parametrize("method", ["min", "max", "mean", "forward", "reverse"])
+def test_cable_overlap(spread_out, method, overlap_kernel):
+    fwd, rev = _pairwise_overlap(spread_out[:3], spread_out, 2)
+    expected = {
+        "min": np.minimum(fwd, rev),
+        "max": np.maximum(fwd, rev),
+        "mean": (fwd + rev) / 2,
+        "forward": fwd,
+        "reverse": rev,
+    }[method]
+
+    ol = navis.cable_overlap(spread_out[:3], spread_out, max_dist=2, method=method)
+    assert (ol.index == spread_out[:3].id).all()
+    assert (ol.columns == spread_out.id).all()
+    assert np.allclose(ol.values, expected, rtol=1e-5)
+    # The neuron moved far away overlaps with nothing
+    assert (ol.values[:, -1] == 0).all()
+
+
+def test_cable_overlap_without_any_overlap(spread_out, overlap_kernel):
+    ol = navis.cable_overlap(spread_out[:3], spread_out[-1], max_dist=2)
+    assert ol.shape == (3, 1)
+    assert (ol.values == 0).all()
+
+    # Points within reach of a bounding box but not of any point
+    ol = navis.cable_overlap(spread_out[:3], spread_out[3], max_dist=0.001)
+    assert (ol.values == 0).all()
+
+
+def test_cable_overlap_sparse_and_parallel(spread_out, overlap_kernel):
+    dense = navis.cable_overlap(spread_out, spread_out, max_dist=2, sparse=False)
+
+    sparse = navis.cable_overlap(spread_out, spread_out, max_dist=2, sparse=True)
+    assert isinstance(sparse.dtypes.iloc[0], pd.SparseDtype)
+    assert np.array_equal(sparse.sparse.to_dense().values, dense.values)
+
+    par = navis.cable_overlap(
+        spread_out, spread_out, max_dist=2, parallel=True, n_cores=2
+    )
+    assert np.array_equal(par.values, dense.values)
@@ -112,3 +112,73 @@ def test_flow_centrality_connected_neuron_unchanged():
     # Root has every leaf distal and none proximal -> no flow passes through it
     assert flow.max() > 0
     assert not np.isnan(flow).any()
+
+
+# One fragment with two branch points and synapses on both sides of each:
+#   0(root) - 1 - 2 - 3 - 4,  3 - 5 - 6,  1 - 7
+#   pre@4, pre@6, post@6, post@7, post@0
+TREE = pd.DataFrame(
+    {
+        "node_id": [0, 1, 2, 3, 4, 5, 6, 7],
+        "parent_id": [-1, 0, 1, 2, 3, 3, 5, 1],
+        "x": np.arange(8.0),
+        "y": [0.0] * 8,
+        "z": [0.0] * 8,
+    }
+)
+TREE_CONNECTORS = pd.DataFrame(
+    {
+        "connector_id": [0, 1, 2, 3, 4],
+        "node_id": [4, 6, 6, 7, 0],
+        "type": ["pre", "post", "pre", "post", "post"],
+        "x": [0.0] * 5,
+        "y": [0.0] * 5,
+        "z": [0.0] * 5,
+    }
+)
+
+
+def _tree(root=None):
+    n = navis.Skeleton(TREE.copy())
+    n.connectors = TREE_CONNECTORS.copy()
+    if root is not None:
+        n.reroot(root, inplace=True)
+    return n
+
+
+@pytest.mark.parametrize(
+    "func,col,root,expected",
+    [
+        # Branch point 3 has leafs 4 and 6 distal and leaf 7 proximal -> 2 * 1.
+        # Runs take the flow of where they start distally, branch points the
+        # maximum of their children's.
+        (navis.flow_centrality, "flow_centrality", None, [0, 2, 2, 0, 0, 0, 0, 0]),
+        # Node 2 as root with two children: both runs carry 4
+        (navis.flow_centrality, "flow_centrality", 2, [0, 0, 4, 0, 0, 0, 0, 0]),
+        # At 1: (1 + 1) posts x (2 + 0) pres across its children, minus each
+        # child's own 1 * 2 + 1 * 0 -> 2. At 3: 1 * 2 - 1 -> 1. Every other node
+        # has the flow of the branch point proximal to it.
+        (navis.bending_flow, "bending_flow", None, [0, 2, 2, 1, 1, 1, 1, 2]),
+        (navis.bending_flow, "bending_flow", 2, [0, 0, 4, 1, 1, 1, 1, 0]),
+    ],
+)
+def test_flow_known_values(func, col, root, expected):
+    out = func(_tree(root)).nodes.set_index("node_id")[col]
+    assert out.loc[TREE.node_id].tolist() == expected
+
+
+@pytest.mark.parametrize(
+    "func,col",
+    [
+        (navis.flow_centrality, "flow_centrality"),
+        (navis.synapse_flow_centrality, "synapse_flow_centrality"),
+        (navis.bending_flow, "bending_flow"),
+    ],
+)
+def test_flow_parallel_matches_serial(func, col):
+    nl = navis.example_neurons(3, kind="skeleton")
+
+    serial = func(nl.copy())
+    parallel = func(nl.copy(), parallel=True, n_cores=2)
+    for a, b in zip(serial, parallel):
+        assert np.array_equal(a.nodes[col].values, b.nodes[col].values)
@@ -410,3 +410,36 @@ def test_stitch_skeletons():
     assert len(stitched.root) == 1
     assert stitched.n_nodes == a.n_nodes + b.n_nodes
     assert_valid_forest(stitched)
+
+
+def test_stitch_skeletons_duplicate_ids():
+    """Clashing node IDs are replaced and connectors and tags follow them.
+
+    The master keeps its IDs, and none of the inputs is modified.
+    """
+    a = navis.example_neurons(1, kind="skeleton")
+    a.tags = {"tip": [int(a.leafs.node_id.values[0])]}
+    b = a.copy()
+    b.nodes[["x", "y", "z"]] += 10_000
+    b.tags = {"tip": [int(a.leafs.node_id.values[1])]}
+    before = b.nodes.copy()
+
+    stitched = navis.stitch_skeletons(a, b, method="NONE", master="FIRST")
+
+    assert stitched.nodes.node_id.is_unique
+    assert stitched.n_nodes == 2 * a.n_nodes
+    assert stitched.nodes.node_id.values[: a.n_nodes].tolist() == a.nodes.node_id.tolist()
+    assert_valid_forest(stitched)
+    pd.testing.assert_frame_equal(b.nodes, before)
+
+    # Connectors and tags of the second neuron sit on nodes with its coordinates
+    xyz = stitched.nodes.set_index("node_id")[["x", "y", "z"]]
+    cn = stitched.connectors.iloc[len(a.connectors):]
+    orig = a.nodes.set_index("node_id").loc[a.connectors.node_id, ["x", "y", "z"]]
+    assert np.allclose(xyz.loc[cn.node_id].to_numpy(float),
+                       orig.to_numpy(float) + 10_000)
+
+    tip_a, tip_b = stitched.tags["tip"]
+    assert tip_a == a.tags["tip"][0]
+    tip = b.nodes.set_index("node_id").loc[b.tags["tip"][0], ["x", "y", "z"]]
+    assert np.allclose(xyz.loc[tip_b].to_numpy(float), tip.to_numpy(float))
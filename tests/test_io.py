@@ -1,5 +1,6 @@
 import navis
 import pytest
+import os
 import struct
 import tempfile
 import numpy as np
@@ -144,6 +145,77 @@ def test_read_nrrd(voxel_nrrd_path):
     navis.read_nrrd(voxel_nrrd_path, output="voxels", errors="raise")
 
 
+@pytest.mark.parametrize("encoding", ["raw", "gzip", "bzip2"])
+def test_read_nrrd_blocks(encoding):
+    """Reading in blocks must give the same neurons as reading in full."""
+    import nrrd
+
+    rng = np.random.default_rng(1985)
+    img = (rng.random((40, 30, 25)) > 0.97) * rng.integers(1, 255, (40, 30, 25))
+    img = img.astype(np.uint8)
+
+    with tempfile.TemporaryDirectory() as tempdir:
+        fp = Path(tempdir) / "image.nrrd"
+        nrrd.write(
+            str(fp),
+            img,
+            header={
+                "encoding": encoding,
+                "space directions": np.diag([0.5, 0.5, 1.0]),
+                "space units": ["um", "um", "um"],
+            },
+        )
+
+        # 3 slices per block -> many blocks, last one partial
+        block_size = 40 * 30 * 3
+
+        full = navis.read_nrrd(fp)
+        blocked = navis.read_nrrd(fp, block_size=block_size)
+        assert blocked._base_data_type == "voxels"
+        assert blocked.shape == full.shape
+        assert np.array_equal(blocked.voxels, full.voxels)
+        assert np.array_equal(blocked.values, full.values)
+        assert blocked.values.dtype == full.values.dtype
+        assert np.allclose(blocked.units_xyz.magnitude, full.units_xyz.magnitude)
+
+        # Relative thresholds need a first pass for the maximum
+        kw = dict(output="dotprops", threshold=0.5, k=5)
+        full = navis.read_nrrd(fp, **kw)
+        blocked = navis.read_nrrd(fp, block_size="2 kB", **kw)
+        assert np.array_equal(blocked.points, full.points)
+        assert np.allclose(blocked.vect, full.vect)
+
+
+def test_read_tiff_blocks():
+    tifffile = pytest.importorskip("tifffile")
+
+    rng = np.random.default_rng(1985)
+    img = (rng.random((12, 2, 20, 16)) > 0.9) * rng.integers(1, 6e4, (12, 2, 20, 16))
+    img = img.astype(np.uint16)
+
+    with tempfile.TemporaryDirectory() as tempdir:
+        fp = Path(tempdir) / "image.tif"
+        tifffile.imwrite(
+            fp,
+            img,
+            imagej=True,
+            resolution=(2, 2),
+            metadata={"spacing": 3, "unit": "um", "axes": "ZCYX"},
+        )
+
+        for channel in (0, -1):
+            full = navis.read_tiff(fp, channel=channel)
+            blocked = navis.read_tiff(fp, channel=channel, block_size=20 * 16 * 2 * 5)
+            assert blocked.shape == full.shape
+            assert np.array_equal(blocked.voxels, full.voxels)
+            assert np.array_equal(blocked.values, full.values)
+
+            kw = dict(output="dotprops", channel=channel, threshold=100, k=5)
+            full = navis.read_tiff(fp, **kw)
+            blocked = navis.read_tiff(fp, block_size=100, **kw)
+            assert np.array_equal(blocked.points, full.points)
+
+
 def test_roundtrip_nrrd(voxel_nrrd_path):
     vneuron = navis.read_nrrd(voxel_nrrd_path, output="voxels", errors="raise")
     outpath = voxel_nrrd_path.parent / "written.nrrd"
@@ -569,6 +641,41 @@ def test_parquet_dotprops_roundtrip():
             assert n.k == n2.k
 
 
+@pytest.mark.parametrize("row_group_size,row_groups", [(2**20, 1), (1, 2)])
+def test_parquet_sink(row_group_size, row_groups):
+    """Appending batch by batch reads back the same as a single write."""
+    pq = pytest.importorskip("pyarrow.parquet")
+
+    with tempfile.TemporaryDirectory() as tempdir:
+        filepath = Path(tempdir) / "streamed.parquet"
+
+        nl = navis.example_neurons(3, kind="skeleton")
+        with navis.ParquetSink(filepath, row_group_size=row_group_size) as sink:
+            sink.write(nl[0])
+            sink.write(nl[1:])
+
+            with pytest.raises(ValueError, match="unique"):
+                sink.write(nl[0])
+            with pytest.raises(TypeError):
+                sink.write(navis.make_dotprops(nl[0].copy(), k=5))
+
+        with pytest.raises(ValueError, match="closed"):
+            sink.write(nl[0])
+
+        # Rows are collected into row groups rather than written per call
+        assert pq.ParquetFile(filepath).num_row_groups == row_groups
+
+        nl2 = navis.read_parquet(filepath)
+        assert len(nl2) == len(nl)
+        for n in nl:
+            n2 = nl2.idx[n.id]
+            assert n.name == n2.name
+            assert n.units == n2.units
+            assert n.soma == n2.soma
+            assert n.n_nodes == n2.n_nodes
+            assert n.n_connectors == n2.n_connectors
+
+
 @pytest.mark.parametrize("kind", ["skeleton", "dotprops"])
 def test_parquet_neurarrow_roundtrip(kind):
     """Neurons written to the neurarrow spec must read back in.
@@ -778,3 +885,263 @@ def test_parquet_read_foreign_neurarrow():
         # Without per-neuron meta data, scanning falls back to the ID column
         assert set(navis.scan_parquet(filepath).id) == {7, 9}
         assert len(navis.read_parquet(filepath, subset=[9])) == 1
+
+
+@pytest.mark.parametrize("mmap", [True, False])
+def test_arrow_roundtrip(mmap):
+    """All neuron types - mixed in one file - must survive a round-trip."""
+    pytest.importorskip("pyarrow")
+
+    with tempfile.TemporaryDirectory() as tempdir:
+        filepath = Path(tempdir) / "neurons.arrow"
+
+        sk = navis.example_neurons(2, kind="skeleton")
+        dp = navis.make_dotprops(sk, k=5)
+        me = navis.example_neurons(1, kind="mesh")
+        vx = navis.voxelize(sk[0], pitch="2 microns")
+        sparse = vx.copy()
+        sparse.sparsify(inplace=True)
+        nl = navis.NeuronList([*sk, *dp, me, vx, sparse])
+        navis.write_arrow(nl, filepath)
+
+        nl2 = navis.read_arrow(filepath, mmap=mmap)
+        assert len(nl2) == len(nl)
+        for n, n2 in zip(nl, nl2):
+            assert type(n) is type(n2)
+            assert n.id == n2.id
+            assert n.name == n2.name
+            assert str(n.units) == str(n2.units)
+
+        for n, n2 in zip(sk, nl2[:2]):
+            assert n.nodes.drop(columns="type").equals(n2.nodes.drop(columns="type"))
+            assert n.soma == n2.soma
+            assert _sorted_connectors(n).equals(_sorted_connectors(n2))
+        for n, n2 in zip(dp, nl2[2:4]):
+            assert np.array_equal(n.points, n2.points)
+            assert np.array_equal(n.vect, n2.vect)
+            assert n.k == n2.k
+        assert np.array_equal(me.vertices, nl2[4].vertices)
+        assert np.array_equal(me.faces, nl2[4].faces)
+        assert np.array_equal(vx.grid, nl2[5].grid)
+        assert np.array_equal(sparse.voxels, nl2[6].voxels)
+        assert np.array_equal(sparse.values, nl2[6].values)
+        assert nl2[6].shape == sparse.shape
+        assert np.allclose(vx.offset, nl2[5].offset)
+
+        # Memory-mapped neurons are read-only views into the file...
+        assert nl2[0].nodes.x.values.flags.writeable is not mmap
+        assert nl2[4].vertices.flags.writeable is not mmap
+        # ... but copies are regular neurons
+        c = nl2[0].copy()
+        c.nodes.loc[0, "x"] = 0
+
+
+def test_arrow_subset():
+    pytest.importorskip("pyarrow")
+
+    with tempfile.TemporaryDirectory() as tempdir:
+        filepath = Path(tempdir) / "skeletons.arrow"
+
+        nl = navis.example_neurons(3, kind="skeleton")
+        navis.write_arrow(nl, filepath)
+
+        assert isinstance(navis.read_arrow(filepath), navis.NeuronList)
+        assert len(navis.read_arrow(filepath, limit=2)) == 2
+        sub = navis.read_arrow(filepath, subset=[nl[2].id])
+        assert isinstance(sub, navis.NeuronList) and sub[0].id == nl[2].id
+
+        # A single neuron reads back as a single neuron
+        navis.write_arrow(nl[0], filepath)
+        assert isinstance(navis.read_arrow(filepath), navis.Skeleton)
+
+
+@pytest.mark.parametrize("source", ["folder", "zip", "tar"])
+@pytest.mark.parametrize("parallel", [False, 2])
+def test_read_swc_stream(source, parallel):
+    nl = navis.example_neurons(3, kind="skeleton")
+    with tempfile.TemporaryDirectory() as tempdir:
+        tempdir = Path(tempdir)
+        navis.write_swc(nl, tempdir / "neurons.zip")
+        navis.write_swc(nl, tempdir)
+        if source == "tar":
+            import tarfile
+
+            with tarfile.open(tempdir / "neurons.tar", "w") as tf:
+                for f in tempdir.glob("*.swc"):
+                    tf.add(f, arcname=f.name)
+
+        src = {
+            "folder": tempdir,
+            "zip": tempdir / "neurons.zip",
+            "tar": tempdir / "neurons.tar",
+        }[source]
+
+        # Streaming returns a generator, not a NeuronList
+        stream = navis.read_swc(str(src), stream=True, parallel=parallel)
+        assert not isinstance(stream, navis.NeuronList)
+        streamed = list(stream)
+        assert all(isinstance(n, navis.Skeleton) for n in streamed)
+        assert sorted(n.n_nodes for n in streamed) == sorted(nl.n_nodes)
+
+        # An integer streams NeuronLists of that size
+        batches = list(navis.read_swc(str(src), stream=2, parallel=parallel))
+        assert [len(b) for b in batches] == [2, 1]
+        assert all(isinstance(b, navis.NeuronList) for b in batches)
+
+
+def test_read_swc_stream_warns_meta_once(caplog):
+    """Meta data that clashes with a property is reported for streams too."""
+    nl = navis.example_neurons(3, kind="skeleton")
+    with tempfile.TemporaryDirectory() as tempdir:
+        navis.write_swc(nl, tempdir)
+        # `cable_length` is a property and cannot be set
+        stream = navis.read_swc(tempdir, stream=True, cable_length=1)
+        with caplog.at_level("WARNING", logger="navis"):
+            streamed = list(stream)
+
+    assert all(n.meta == {"cable_length": 1} for n in streamed)
+    assert caplog.text.count("could not be directly attached") == 1
+
+
+@pytest.mark.parametrize("parallel", [False, 2])
+def test_parallel_iread_bounded(parallel):
+    """The look-ahead must not run ahead of the consumer."""
+    from navis.io import base
+
+    consumed = []
+    submitted = []
+
+    def read(x):
+        submitted.append(x)
+        return x
+
+    # URLs are read in threads, so the reader's record is ours to look at - it
+    # never downloads anything itself
+    urls = [f"https://example.org/{i}.swc" for i in range(20)]
+    # Serial reading never reads ahead at all
+    ahead = 2 * base.LOOKAHEAD_PER_WORKER if parallel else 0
+
+    for x in base.parallel_iread(read, urls, parallel=parallel):
+        consumed.append(x)
+        assert len(submitted) <= len(consumed) + ahead
+    assert consumed == urls
+    assert sorted(submitted) == sorted(urls)
+
+
+@pytest.mark.parametrize("archive", ["neurons.zip", "neurons.tar"])
+@pytest.mark.parametrize("parallel", [False, 2])
+def test_index_archive(archive, parallel):
+    import tarfile
+    from navis.io import archive_index
+
+    nl = navis.example_neurons(3, kind="skeleton")
+    with tempfile.TemporaryDirectory() as tempdir:
+        tempdir = Path(tempdir)
+        navis.write_swc(nl, tempdir / "neurons.zip")
+        navis.write_swc(nl, tempdir)
+        with tarfile.open(tempdir / "neurons.tar", "w") as tf:
+            for f in tempdir.glob("*.swc"):
+                tf.add(f, arcname=f"swc/{f.name}")
+
+        fp = tempdir / archive
+        expected = navis.read_swc(fp)
+
+        idx = navis.index_archive(fp)
+        assert len(idx) == 3
+        assert archive_index.sidecar_path(fp).is_file()
+        # Round trip through the sidecar
+        assert archive_index.load_index(fp).entries == idx.entries
+
+        # Reading via the index gives the same neurons
+        indexed = navis.read_swc(fp, parallel=parallel)
+        assert sorted(indexed.id) == sorted(expected.id)
+        assert sorted(indexed.n_nodes) == sorted(expected.n_nodes)
+
+        # ... and so does subsetting and streaming
+        subset = navis.read_swc(fp, limit=[f"{nl[1].id}.swc"])
+        assert len(subset) == 1 and str(subset[0].id) == str(nl[1].id)
+        streamed = list(navis.read_swc(fp, stream=True, parallel=parallel))
+        assert sorted(n.n_nodes for n in streamed) == sorted(expected.n_nodes)
+
+        # Modifying the archive invalidates the index
+        os.utime(fp, ns=(0, 0))
+        assert archive_index.load_index(fp) is None
+        assert len(navis.read_swc(fp)) == 3
+
+
+def test_index_archive_compressed_tar():
+    import tarfile
+
+    nl = navis.example_neurons(1, kind="skeleton")
+    with tempfile.TemporaryDirectory() as tempdir:
+        tempdir = Path(tempdir)
+        navis.write_swc(nl, tempdir)
+        with tarfile.open(tempdir / "neurons.tar.gz", "w:gz") as tf:
+            for f in tempdir.glob("*.swc"):
+                tf.add(f, arcname=f.name)
+
+        # No random access into a compressed stream
+        with pytest.raises(ValueError, match="compressed"):
+            navis.index_archive(tempdir / "neurons.tar.gz")
+
+
+def test_index_zip_extra_fields():
+    """Member data starts after the local header's own filename and extra field."""
+    import zipfile
+    from navis.io import archive_index
+
+    with tempfile.TemporaryDirectory() as tempdir:
+        fp = Path(tempdir) / "members.zip"
+        with zipfile.ZipFile(fp, "w") as zf:
+            for i, method in enumerate((zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED)):
+                info = zipfile.ZipInfo(f"member_{i}.txt")
+                info.compress_type = method
+                # An (unknown) extra field of 8 bytes: ID 0xCAFE, length 4
+                info.extra = struct.pack("<2H4s", 0xCAFE, 4, b"navi")
+                zf.writestr(info, f"member {i} " * 100)
+
+        idx = navis.index_archive(fp)
+        with zipfile.ZipFile(fp) as zf:
+            for entry in idx.entries:
+                assert archive_index.read_entry(fp, entry) == zf.read(entry.name)
+
+
+@pytest.mark.parametrize("backend", ["threads", "processes"])
+def test_h5_parallel(backend, monkeypatch):
+    from navis.io import hdf_io
+
+    # Several batches - and hence shards - even for a handful of neurons
+    monkeypatch.setattr(hdf_io, "BATCH_SIZE", 2)
+
+    sk = navis.example_neurons(5, kind="skeleton")
+    dp = navis.make_dotprops(sk, k=5)
+    with tempfile.TemporaryDirectory() as tempdir:
+        serial = os.path.join(tempdir, "serial.h5")
+        sharded = os.path.join(tempdir, "sharded.h5")
+        for fp, parallel in ((serial, False), (sharded, 2)):
+            navis.write_h5(sk, fp, raw=True, annotations="connectors",
+                           parallel=parallel, backend=backend)
+            navis.write_h5(dp, fp, raw=True, parallel=parallel,
+                           backend=backend)
+        # The shards are gone once merged
+        assert sorted(os.listdir(tempdir)) == ["serial.h5", "sharded.h5"]
+        assert (navis.io.inspect_h5(serial)
+                == navis.io.inspect_h5(sharded))
+
+        a = navis.read_h5(serial, read="skeleton,dotprops", prefer_raw=True,
+                          parallel=False)
+        b = navis.read_h5(sharded, read="skeleton,dotprops", prefer_raw=True,
+                          parallel=2, backend=backend)
+        assert [(type(x), x.id) for x in a] == [(type(x), x.id) for x in b]
+        for x, y in zip(a, b):
+            if isinstance(x, navis.Skeleton):
+                assert np.array_equal(x.nodes[["x", "y", "z"]].values,
+                                      y.nodes[["x", "y", "z"]].values)
+                assert len(x.connectors) == len(y.connectors)
+
+        # Same rules as writing directly: a representation that is already
+        # there is only replaced when asked to
+        with pytest.raises(ValueError, match="already contains"):
+            navis.write_h5(sk, sharded, raw=True, parallel=2, backend=backend)
+        navis.write_h5(sk, sharded, raw=True, parallel=2, backend=backend,
+                       overwrite_neurons=True)
@@ -15,6 +15,7 @@ Note this module must stay free of doctests - pytest runs with
 
 import navis
 import pytest
+import time
 import threading
 
 from pathlib import Path
@@ -129,3 +130,114 @@ def test_parallel_read_does_not_consume_generator():
     urls = make_urls(base.PARALLEL_THRESHOLD_URL)
 
     assert base.parallel_read(lambda obj: obj, (u for u in urls), "auto") == urls
+
+
+# ---------------------------------------------------------------------------
+# The asyncio fetch engine (`navis.utils.fetch`). Skipped without aiohttp, in
+# which case the URL readers fall back to threads.
+# ---------------------------------------------------------------------------
+
+
+@pytest.fixture
+def counting_server():
+    """HTTP/1.1 server that fails the first requests per path with 503.
+
+    Records the number of concurrent requests and the client ports it saw, so
+    we can check the per-host cap and that connections are kept alive.
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    stats = {"active": 0, "max_active": 0, "ports": set(), "hits": {}}
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive
+
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            with lock:
+                stats["active"] += 1
+                stats["max_active"] = max(stats["max_active"], stats["active"])
+                stats["ports"].add(self.client_address[1])
+                hits = stats["hits"][self.path] = stats["hits"].get(self.path, 0) + 1
+            try:
+                time.sleep(0.02)
+                if self.path.startswith("/flaky") and hits < 3:
+                    status, body = 503, b""
+                elif self.path.startswith("/missing"):
+                    status, body = 404, b""
+                else:
+                    status, body = 200, self.path.encode() * 1000
+                self.send_response(status)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            finally:
+                with lock:
+                    stats["active"] -= 1
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_port}", stats
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join(timeout=5)
+
+
+def test_fetcher_pools_and_caps_connections(counting_server):
+    pytest.importorskip("aiohttp")
+    from navis.utils.fetch import Fetcher
+
+    url, stats = counting_server
+    urls = [f"{url}/{i}" for i in range(40)]
+    with Fetcher(per_host=4) as f:
+        data = [fut.result() for fut in [f.submit(u) for u in urls]]
+
+    # Results match their requests
+    assert data == [f"/{i}".encode() * 1000 for i in range(40)]
+    # Never more than `per_host` requests at once...
+    assert stats["max_active"] <= 4
+    # ... over a handful of connections that were kept alive and reused
+    assert len(stats["ports"]) <= 4
+
+
+def test_fetcher_retries(counting_server):
+    pytest.importorskip("aiohttp")
+    import requests
+    from navis.utils.fetch import Fetcher
+
+    url, stats = counting_server
+    with Fetcher(backoff_factor=0.01) as f:
+        # Fails twice with 503, then succeeds
+        assert f.fetch(f"{url}/flaky") == b"/flaky" * 1000
+        assert stats["hits"]["/flaky"] == 3
+
+        # 404 can't be fixed by retrying: raised straight away, like `requests`
+        with pytest.raises(requests.HTTPError, match="404"):
+            f.fetch(f"{url}/missing")
+        assert stats["hits"]["/missing"] == 1
+
+    with Fetcher(retries=1, backoff_factor=0.01) as f:
+        with pytest.raises(requests.HTTPError, match="503"):
+            f.fetch(f"{url}/flaky2")
+
+
+@pytest.mark.parametrize("use_async", [True, False])
+def test_read_swc_url_async(swc_urls, use_async, monkeypatch):
+    """The asyncio engine and the thread fallback must read the same neurons."""
+    if use_async:
+        pytest.importorskip("aiohttp")
+    monkeypatch.setattr(base, "URL_ASYNC", use_async)
+
+    serial = navis.read_swc(swc_urls, parallel=False)
+    nl = navis.read_swc(swc_urls, parallel=True)
+    assert [n.origin for n in nl] == swc_urls
+    assert [n.n_nodes for n in nl] == [n.n_nodes for n in serial]
+
+    streamed = list(navis.read_swc(swc_urls, parallel=True, stream=True))
+    assert [n.origin for n in streamed] == swc_urls
@@ -13,6 +13,7 @@ import pandas as pd
 import pytest
 
 from navis.morpho.ivscc import (
+    AxonFeatures,
     BasicFeatures,
     CompartmentNotFoundError,
     NeuronContext,
@@ -399,3 +400,24 @@ def test_context_is_shared(toy):
 
     # Rooted at the soma, so the soma is at distance 0 from itself
     assert ctx.dist_to_root.loc[toy.soma] == 0
+
+
+def test_compartment_neuron_is_built_on_demand(toy):
+    """Features come from the shared arrays - a subset neuron only if asked for."""
+    ctx = NeuronContext(toy)
+    feat = AxonFeatures(ctx)
+    feat.extract_features()
+
+    assert feat._neuron is None
+    assert ctx.compartment("axon") is feat.arbor
+    assert feat.neuron.nodes.node_id.tolist() == [9, 10]
+
+
+def test_parallel(labelled_example, toy):
+    nl = navis.NeuronList([labelled_example, toy])
+
+    serial = navis.ivscc_features(nl, progress=False)
+    with navis.set_parallel_backend("threads"):
+        parallel = navis.ivscc_features(nl, progress=False, parallel=True, n_cores=2)
+
+    pd.testing.assert_frame_equal(serial, parallel)
@@ -249,3 +249,91 @@ def test_synapse_flow_centrality_is_zero_with_only_one_synapse_type():
 
     out = navis.synapse_flow_centrality(x)
     assert (out.nodes.synapse_flow_centrality.values == 0).all()
+
+
+# ------------------------------------------------------- segments & tortuosity
+
+
+@pytest.fixture
+def fork():
+    #   3 -- 2        segments: [3, 2, 1]  length 3 + 4 = 7, chord 5
+    #        |                  [4, 1]     length 2,         chord 2
+    #   0 -- 1                  [1, 0]     length 3,         chord 3
+    #        |
+    #        4
+    nodes = pd.DataFrame(
+        {
+            "node_id": [0, 1, 2, 3, 4],
+            "parent_id": [-1, 0, 1, 2, 1],
+            "x": [0.0, 3.0, 3.0, 6.0, 3.0],
+            "y": [0.0, 0.0, 4.0, 4.0, -2.0],
+            "z": [0.0] * 5,
+            "radius": [1.0] * 5,
+        }
+    )
+    return navis.Skeleton(nodes)
+
+
+def test_segment_analysis_on_a_hand_computed_tree(fork):
+    sa = navis.segment_analysis(fork).sort_values("length").reset_index(drop=True)
+
+    assert np.allclose(sa.length, [2, 3, 7])
+    assert np.allclose(sa.tortuosity, [1, 1, 7 / 5])
+    # Root distance of each segment's proximal end
+    assert np.allclose(sa.root_dist, [3, 0, 3])
+    assert sa.strahler_index.tolist() == [1, 2, 1]
+    # Constant radius 1: each edge is a cylinder of volume pi * h
+    assert np.allclose(sa.volume, np.pi * sa.length)
+    assert np.allclose(sa[["radius_mean", "radius_min", "radius_max"]], 1)
+
+
+def test_tortuosity_on_a_hand_computed_tree(fork):
+    assert np.isclose(navis.tortuosity(fork), np.mean([7 / 5, 1, 1]))
+
+    # Every 2.5 along each segment longer than that: [3, 2, 1] is sampled at
+    # (6, 4), (3.5, 4) and (3, 2); [1, 0] at (3, 0) and (0.5, 0); [4, 1] is
+    # too short
+    expected = 2.5 / np.array([2.5, np.hypot(0.5, 2), 2.5])
+    assert np.isclose(navis.tortuosity(fork, seg_length=2.5), expected.mean())
+
+
+# ------------------------------------------------------------ axon/dendrite split
+
+
+def test_split_axon_dendrite_on_a_hand_computed_tree():
+    """Removing the high-flow linker leaves one component per side; each goes by
+    its own pre-/postsynapse counts. Synapses on the linker count for neither.
+    """
+    #   0 -- 1 -- 2 -- 3 -- 4 -- 5 -- 6
+    #   root  post post  pre  .   pre pre
+    #                  linker
+    nodes = pd.DataFrame(
+        {
+            "node_id": np.arange(7),
+            "parent_id": np.arange(7) - 1,
+            "x": np.arange(7, dtype=float),
+            "y": [0.0] * 7,
+            "z": [0.0] * 7,
+            # The split uses the flow column as given
+            "synapse_flow_centrality": [0, 1, 2, 10, 2, 1, 0],
+        }
+    )
+    x = navis.Skeleton(nodes)
+    x.connectors = pd.DataFrame(
+        {
+            "connector_id": np.arange(5),
+            "node_id": [1, 2, 3, 5, 6],
+            "type": ["post", "post", "pre", "pre", "pre"],
+            "x": [1.0, 2.0, 3.0, 5.0, 6.0],
+            "y": [0.0] * 5,
+            "z": [0.0] * 5,
+        }
+    )
+
+    for split in ("prepost", "distance"):
+        out = navis.split_axon_dendrite(
+            x.copy(), split=split, cellbodyfiber=False, label_only=True
+        )
+        assert out.nodes.compartment.astype(str).tolist() == (
+            ["dendrite"] * 3 + ["linker"] + ["axon"] * 3
+        )
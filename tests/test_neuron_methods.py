@@ -245,8 +245,9 @@ def _public_functions():
 #: `limit` survives only where it never meant a distance.
 LIMIT_IS_NOT_A_DISTANCE = {
     "guess_radius",  # count of consecutive missing radii
-    "read_h5", "read_json", "read_mesh", "read_nml", "read_nmx", "read_nrrd",
-    "read_parquet", "read_precomputed", "read_rda", "read_swc", "read_tiff",
+    "read_arrow", "read_h5", "read_json", "read_mesh", "read_nml", "read_nmx",
+    "read_nrrd", "read_parquet", "read_precomputed", "read_rda", "read_swc",
+    "read_tiff",
 }
 
 
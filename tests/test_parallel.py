@@ -286,3 +286,142 @@ def test_apply_lambda_needs_a_by_value_backend(nl):
 def test_apply_lambda_works_on_by_value_backends(nl, backend):
     res = nl.apply(lambda x: x.id, parallel=True, backend=backend)
     assert list(res) == list(nl.id)
+
+
+# --------------------------------------------------------------------------- #
+# Batch kernels
+# --------------------------------------------------------------------------- #
+#: Sizes of the lists `_scale_batch` was handed. In-process only, which is
+#: where batch kernels run.
+BATCH_CALLS = []
+
+
+@navis.utils.map_neuronlist(desc='Scaling', allow_parallel=True)
+def scale(x, factor=2, inplace=False):
+    """Scale coordinates. Module level so it pickles.
+
+    Parameters
+    ----------
+    x :         Skeleton | NeuronList
+    factor :    float
+
+    Returns
+    -------
+    Skeleton | NeuronList
+
+    """
+    if not inplace:
+        x = x.copy()
+    x.nodes[['x', 'y', 'z']] *= factor
+    return x
+
+
+@scale.batched
+def _scale_batch(nl, factor=2, inplace=False):
+    BATCH_CALLS.append(len(nl))
+    if factor == 0:
+        raise ValueError('no')
+    if factor < 0:
+        return NotImplemented
+    out = nl if inplace else nl.copy()
+    for n in out:
+        n.nodes[['x', 'y', 'z']] *= factor
+    return list(out)
+
+
+@pytest.fixture
+def batch_log():
+    BATCH_CALLS.clear()
+    yield BATCH_CALLS
+    BATCH_CALLS.clear()
+
+
+def coords(nl):
+    return [n.nodes[['x', 'y', 'z']].values for n in nl]
+
+
+def test_batch_kernel_runs_once_for_the_list(nl, batch_log):
+    res = scale(nl, 3)
+
+    assert batch_log == [len(nl)]
+    assert all(np.allclose(a, b * 3) for a, b in zip(coords(res), coords(nl)))
+
+
+@pytest.mark.parametrize('parallel', [False, True])
+def test_batch_kernel_honours_inplace(nl, batch_log, parallel):
+    """It runs here, even under `parallel=True` - where `inplace=False` would
+    otherwise be relaxed for copies that live in the workers."""
+    before = coords(nl)
+    scale(nl, 3, parallel=parallel, backend='processes')
+    assert all(np.array_equal(a, b) for a, b in zip(before, coords(nl)))
+
+    scale(nl, 3, inplace=True)
+    assert all(np.allclose(a * 3, b) for a, b in zip(before, coords(nl)))
+    assert batch_log == [len(nl)] * 2
+
+
+def test_batch_kernel_may_decline(nl, batch_log):
+    res = scale(nl, -1)
+
+    assert batch_log == [len(nl)]
+    assert all(np.allclose(a, -b) for a, b in zip(coords(res), coords(nl)))
+
+
+def test_failing_batch_kernel_falls_back_per_neuron(nl, batch_log):
+    res = scale(nl, 0)
+
+    assert batch_log == [len(nl)]
+    assert all((a == 0).all() for a in coords(res))
+
+
+def test_apply_uses_the_batch_kernel(nl, batch_log):
+    nl.apply(scale, factor=2)
+    assert batch_log == [len(nl)]
+
+
+def test_cable_length_batch_matches_per_neuron(nl):
+    from navis.morpho.mmetrics import cable_length
+
+    # Node IDs so far apart that they can't be shifted into one range
+    sparse = nl.copy()
+    for n in sparse:
+        k = 2**62 // int(n.nodes.node_id.max())
+        ids = n.nodes.node_id.values.astype(np.int64) * k
+        pids = n.nodes.parent_id.values.astype(np.int64)
+        n.nodes['node_id'] = ids
+        n.nodes['parent_id'] = np.where(pids >= 0, pids * k, -1)
+
+    for x in (nl, sparse):
+        expected = [cable_length(n) for n in x]
+        assert np.allclose(cable_length(x), expected)
+
+
+
+@pytest.mark.parametrize('caching', [True, False])
+def test_xform_batches_in_bounded_chunks(nl, caching, monkeypatch):
+    from navis.transforms import xfm_funcs, AffineTransform
+
+    calls = []
+    xform = AffineTransform.xform
+
+    def counting(self, points, **kwargs):
+        calls.append(len(points))
+        return xform(self, points, **kwargs)
+
+    monkeypatch.setattr(AffineTransform, 'xform', counting)
+
+    sizes = [n.n_nodes + n.n_connectors for n in nl]
+    # Room for the first two neurons, not the third
+    monkeypatch.setattr(xfm_funcs, '_BATCH_POINTS', sizes[0] + sizes[1])
+
+    tr = AffineTransform(np.diag([8, 8, 8, 1]))
+    got = navis.xform(nl, tr, caching=caching)
+
+    if caching:
+        assert calls == [sizes[0] + sizes[1], sizes[2], sizes[3]]
+    else:
+        # Without caching, one neuron at a time - that's the memory bound
+        assert calls == sizes
+    for a, b in zip(got, nl):
+        assert np.allclose(a.nodes[['x', 'y', 'z']].values,
+                           b.nodes[['x', 'y', 'z']].values * 8)
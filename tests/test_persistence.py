@@ -0,0 +1,82 @@
+"""Tests for the persistence functions' list-level paths.
+
+`persistence_points` has a batch kernel that finds all neurons' segments in one
+packed forest, `persistence_vectors` samples all kernel densities in one go and
+`persistence_distances` computes the matrix block by block. The ground truth is
+the neuron-by-neuron way: segments of each neuron on its own, one
+`scipy.stats.gaussian_kde` per neuron and `scipy.spatial.distance.cdist`.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from scipy.spatial.distance import cdist
+from scipy.stats import gaussian_kde
+
+import navis
+
+
+@pytest.fixture(scope="module")
+def nl():
+    return navis.example_neurons(5, kind="skeleton")
+
+
+def test_persistence_points_batch_matches_single(nl):
+    batch = navis.persistence_points(nl)
+
+    assert len(batch) == len(nl)
+    for n, p in zip(nl, batch):
+        pd.testing.assert_frame_equal(p, navis.persistence_points(n))
+
+
+def test_persistence_vectors_match_gaussian_kde(nl):
+    pers = navis.persistence_points(nl)
+
+    for threshold in (None, 1000):
+        vectors, samples = navis.persistence_vectors(pers, threshold=threshold)
+
+        for p, v in zip(pers, vectors):
+            w = (p.death - p.birth).values
+            keep = w >= (threshold or 0)
+            kde = gaussian_kde(p.birth.values[keep], weights=w[keep], bw_method=0.2)
+            assert np.allclose(v, kde(samples), rtol=1e-10, atol=0)
+
+
+def test_persistence_vectors_blocks(nl):
+    """The result does not depend on how points are split into blocks."""
+    from navis.morpho.persistence import _weighted_kdes
+
+    pers = navis.persistence_points(nl)
+    births = [p.birth.values for p in pers]
+    weights = [(p.death - p.birth).values for p in pers]
+    samples = np.linspace(0, 1e5, 50)
+
+    assert np.allclose(
+        _weighted_kdes(births, weights, samples, 0.2),
+        _weighted_kdes(births, weights, samples, 0.2, max_block=123),
+        rtol=1e-12,
+    )
+
+
+def test_persistence_distances(nl, tmp_path):
+    vectors, _ = navis.persistence_vectors(nl)
+    vectors = vectors / vectors.max(axis=1).reshape(-1, 1)
+
+    d = navis.persistence_distances(nl, augment=False)
+    assert (d.index == nl.id).all() and (d.columns == nl.id).all()
+    assert (np.diag(d.values) == 0).all()
+    assert np.allclose(d.values, cdist(vectors, vectors), atol=1e-6)
+
+    qt = navis.persistence_distances(nl[:2], nl[2:], augment=False)
+    assert qt.shape == (2, 3)
+    assert np.allclose(qt.values, cdist(vectors[:2], vectors[2:]), atol=1e-6)
+
+    # Written out of core: the file holds the matrix, the frame is a view of it
+    fp = tmp_path / "dists.npy"
+    ooc = navis.persistence_distances(nl, augment=False, out=fp)
+    assert np.array_equal(np.load(fp), d.values)
+    assert np.array_equal(ooc.values, d.values)
+
+    with pytest.raises(ValueError, match="shape"):
+        navis.persistence_distances(nl, out=np.zeros((2, 2)))
@@ -1,4 +1,5 @@
 import pickle
+import time
 
 import numpy as np
 import pytest
@@ -7,6 +8,7 @@ import navis
 from navis.compute.dispatch import picklable_by_reference
 
 from .test_compute_backends import DummyBackend, registry  # noqa: F401
+from .test_parallel import BATCH_CALLS, batch_log, coords, scale  # noqa: F401
 
 
 #: Backends that need no optional dependency and so always run here. `pathos`
@@ -296,6 +298,26 @@ def test_once_step_splits_the_dispatch(nl, registry):  # noqa: F811
     assert len(res) == len(nl)
 
 
+def test_leading_batch_steps_run_over_the_whole_list(nl, batch_log,  # noqa: F811
+                                                     registry):  # noqa: F811
+    """Steps with a batch kernel are one call each; the rest still fuse."""
+    be = DummyBackend(isolated=True)
+    before = coords(nl)
+
+    pipe = navis.Pipeline((scale, (2,)), (scale, (3,)), n_nodes)
+    res = pipe(nl, parallel=True, n_cores=2, backend=be)
+
+    assert batch_log == [len(nl)] * 2
+    assert len(be.calls) == 1
+    assert len(be.calls[0]['payloads'][0].tasks[0][0]) == 1
+    assert res == [n.n_nodes for n in nl]
+    # Batched or not, the caller's neurons are left alone
+    assert all(np.array_equal(a, b) for a, b in zip(before, coords(nl)))
+
+    res = navis.Pipeline((scale, (2,)), (scale, (3,)))(nl)
+    assert all(np.allclose(a * 6, b) for a, b in zip(before, coords(res)))
+
+
 # --------------------------------------------------------------------------- #
 # Input that isn't neurons
 # --------------------------------------------------------------------------- #
@@ -527,6 +549,208 @@ def test_a_step_returning_none_names_itself(nl):
         pipe(nl)
 
 
+# --------------------------------------------------------------------------- #
+# Checkpoints
+# --------------------------------------------------------------------------- #
+#: Names of the neurons `fails_on_flag` should refuse. In-process only.
+FAIL_NAMES = set()
+
+
+def fails_on_flag(x):
+    if x.name in FAIL_NAMES:
+        raise ValueError('flagged')
+    return x.n_nodes
+
+
+def test_checkpoint_resumes_finished_work(named_nl, tmp_path):
+    """A crashed run keeps what finished; the rerun computes only the rest."""
+    pipe = navis.Pipeline((navis.prune_twigs, (5000,)), record_inplace,
+                          fails_on_flag)
+    ref = pipe(named_nl)
+
+    FAIL_NAMES.add('n1')
+    try:
+        with pytest.raises(navis.PipelineStepError):
+            pipe(named_nl, checkpoint=tmp_path)
+    finally:
+        FAIL_NAMES.clear()
+
+    INPLACE_LOG.clear()
+    res = pipe(named_nl, checkpoint=tmp_path)
+
+    assert res == ref
+    # `n0` came from the checkpoint, so only `n1` went through the steps again
+    assert [name for name, _ in INPLACE_LOG] == ['n1']
+
+    INPLACE_LOG.clear()
+    assert pipe(named_nl, checkpoint=tmp_path) == ref
+    assert not INPLACE_LOG
+
+
+def test_checkpoint_is_keyed_by_the_steps(named_nl, tmp_path):
+    navis.Pipeline((navis.prune_twigs, (5000,)), n_nodes)(named_nl,
+                                                          checkpoint=tmp_path)
+    navis.Pipeline((navis.prune_twigs, (1000,)), n_nodes)(named_nl,
+                                                          checkpoint=tmp_path)
+
+    # Different arguments, different fingerprint - nothing was reused
+    assert len(list(tmp_path.iterdir())) == 2
+
+
+def test_checkpoint_sees_edited_constants(named_nl, tmp_path):
+    """Same name and bytecode, different constant: recompute, don't reuse."""
+    first = lambda x: navis.prune_twigs(x, 5000)  # noqa: E731
+    second = lambda x: navis.prune_twigs(x, 1000)  # noqa: E731
+    assert first.__code__.co_code == second.__code__.co_code
+
+    a = navis.Pipeline(first, n_nodes)(named_nl, checkpoint=tmp_path)
+    b = navis.Pipeline(second, n_nodes)(named_nl, checkpoint=tmp_path)
+
+    assert len(list(tmp_path.iterdir())) == 2
+    assert b == navis.Pipeline(second, n_nodes)(named_nl)
+    assert a != b
+
+
+def test_checkpoint_sees_closure_cells(named_nl, tmp_path):
+    def pruner(size):
+        return lambda x: navis.prune_twigs(x, size)
+
+    navis.Pipeline(pruner(5000), n_nodes)(named_nl, checkpoint=tmp_path)
+    navis.Pipeline(pruner(1000), n_nodes)(named_nl, checkpoint=tmp_path)
+    assert len(list(tmp_path.iterdir())) == 2
+
+    # ... but the same closure again is the same step
+    navis.Pipeline(pruner(1000), n_nodes)(named_nl, checkpoint=tmp_path)
+    assert len(list(tmp_path.iterdir())) == 2
+
+
+def test_checkpoint_round_trips_neurons(nl, tmp_path):
+    pipe = navis.Pipeline(*STEPS)
+    first = pipe(nl, checkpoint=tmp_path, parallel=True, backend='processes')
+    again = pipe(nl, checkpoint=tmp_path)
+
+    assert isinstance(again, navis.NeuronList)
+    assert [n.n_nodes for n in again] == [n.n_nodes for n in first]
+    assert again.id.tolist() == nl.id.tolist()
+
+
+# --------------------------------------------------------------------------- #
+# Streaming
+# --------------------------------------------------------------------------- #
+#: IDs of the neurons `slow_id` takes its time over. In-process only.
+SLOW_IDS = set()
+
+
+def slow_id(x):
+    if x.id in SLOW_IDS:
+        time.sleep(1)
+    return x.id
+
+
+@pytest.mark.parametrize('backend', LOCAL_BACKENDS, indirect=True)
+def test_stream_matches_a_call(nl, backend):
+    pipe = navis.Pipeline(*STEPS, n_nodes)
+
+    res = pipe.stream(iter(nl), parallel=True, n_cores=2, backend=backend,
+                      max_in_flight=3, progress=False)
+
+    assert list(res) == pipe(nl)
+
+
+def test_stream_unordered_yields_everything(nl):
+    res = navis.Pipeline(n_nodes).stream(nl, ordered=False, parallel=True,
+                                         n_cores=2, backend='threads')
+
+    assert sorted(res) == sorted(n.n_nodes for n in nl)
+
+
+def test_stream_pulls_lazily(nl):
+    """Only `max_in_flight` inputs are taken from the source at a time."""
+    pulled = []
+
+    def source():
+        for n in nl:
+            pulled.append(n.id)
+            yield n
+
+    res = navis.Pipeline(n_nodes).stream(source(), max_in_flight=2,
+                                         progress=False)
+
+    assert next(res) == nl[0].n_nodes
+    assert len(pulled) == 2
+
+
+def test_stream_does_not_wait_for_a_slow_input(nl):
+    """A rolling pool: the other inputs go round the slow one's slot."""
+    SLOW_IDS.add(nl[0].id)
+    try:
+        res = navis.Pipeline(slow_id).stream(nl, ordered=False, parallel=True,
+                                             n_cores=2, max_in_flight=2,
+                                             backend='threads', progress=False)
+        res = list(res)
+    finally:
+        SLOW_IDS.clear()
+
+    assert res[-1] == nl[0].id
+    assert sorted(res) == sorted(nl.id)
+
+
+def test_stream_into_a_sink(nl, tmp_path):
+    results = []
+    pipe = navis.Pipeline((navis.prune_twigs, (5000,)))
+
+    n = pipe.stream(nl, sink=results.append, max_in_flight=3, progress=False)
+
+    # One call per result, in order - batching is the sink's business
+    assert n == len(nl)
+    assert [r.id for r in results] == list(nl.id)
+    assert all(isinstance(r, navis.Skeleton) for r in results)
+
+    with navis.ParquetSink(tmp_path / 'out.parquet') as sink:
+        pipe.stream(nl, sink=sink, max_in_flight=3, progress=False)
+
+    back = navis.read_parquet(tmp_path / 'out.parquet')
+    ref = pipe(nl)
+    assert sorted(back.n_nodes) == sorted(ref.n_nodes)
+    assert sorted(back.n_connectors) == sorted(ref.n_connectors)
+
+
+def test_stream_omit_failures(nl):
+    mixed = list(nl) + [navis.make_dotprops(nl[0], k=5)]
+    pipe = navis.Pipeline((navis.prune_twigs, (5000,)))
+
+    res = list(pipe.stream(mixed, omit_failures=True, progress=False))
+
+    assert len(res) == len(nl)
+
+
+def test_stream_refuses_whole_collection_steps(nl):
+    pipe = navis.Pipeline(n_nodes).add_once(len)
+
+    with pytest.raises(ValueError, match='len'):
+        pipe.stream(nl)
+
+
+# --------------------------------------------------------------------------- #
+# Profiling
+# --------------------------------------------------------------------------- #
+@pytest.mark.parametrize('backend', LOCAL_BACKENDS, indirect=True)
+def test_profile_times_each_step_per_neuron(nl, backend):
+    pipe = navis.Pipeline(*STEPS)
+
+    with navis.profile() as prof:
+        pipe(nl, parallel=True, n_cores=2, backend=backend, progress=False)
+
+    df = prof.to_dataframe()
+    steps = df[df.kind == 'step']
+    assert len(steps) == len(STEPS) * len(nl)
+    assert set(steps.name) == {'heal_skeleton', 'prune_twigs',
+                               'resample_skeleton'}
+    # Every neuron ran every step
+    assert (steps.groupby('task').size() == len(STEPS)).all()
+    assert (df.kind == 'assemble').sum() == 1
+
+
 # --------------------------------------------------------------------------- #
 # Reserved keyword arguments
 # --------------------------------------------------------------------------- #
@@ -61,12 +61,11 @@ def test_quiet_logger_rejects_a_bad_level():
 # The functions that silence the logger to build a throwaway downsampled copy.
 # All take a skeleton with connectors and all used to leak on failure.
 #
-# N.B. `synapse_flow_centrality` is deliberately not in this list: it hands the
-# whole computation to fastcore and never downsamples, so it no longer opens a
-# `quiet_logger` at all. It used to be here only because the pre-fastcore
-# fallback did.
-QUIETENERS = [navis.arbor_segregation_index, navis.bending_flow,
-              navis.flow_centrality]
+# N.B. `synapse_flow_centrality`, `bending_flow` and `flow_centrality` are
+# deliberately not in this list: they work on the full node table's parent
+# arrays and never downsample, so they no longer open a `quiet_logger` at all.
+# They used to be here only because their earlier implementations did.
+QUIETENERS = [navis.arbor_segregation_index]
 
 
 @pytest.mark.parametrize('func', QUIETENERS, ids=lambda f: f.__name__)
@@ -79,7 +78,7 @@ def test_failure_does_not_silence_navis(func, logger_state, monkeypatch):
     def boom(*args, **kwargs):
         raise RuntimeError('boom')
 
-    # Both spellings - two of the four go through the function, two the method
+    # Both spellings - callers go through either the function or the method
     monkeypatch.setattr(navis.sampling, 'downsample_neuron', boom)
     monkeypatch.setattr(navis.Skeleton, 'downsample', boom)
 
@@ -204,3 +204,59 @@ def test_sholl_intersections_nonzero_geodesic(n):
     res = navis.sholl_analysis(n, radii=10, center="soma", geodesic=True)
 
     assert res.intersections.sum() > 0
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        dict(),
+        dict(radii=[1000, 5000, 20000]),
+        dict(radii=20, center="root", geodesic=True),
+    ],
+    ids=["default", "radii_list", "geodesic"],
+)
+def test_sholl_batched_matches_single(kwargs):
+    """Run over a NeuronList, all neurons are done in one go - with the same results."""
+    nl = navis.example_neurons(3, kind="skeleton")
+
+    res = navis.sholl_analysis(nl, **kwargs)
+
+    for r, n in zip(res, nl):
+        pd.testing.assert_frame_equal(r, navis.sholl_analysis(n, **kwargs))
+
+
+def test_sholl_geodesic_off_root(n):
+    """Geodesic distances from a node that is not the root go both up and down the tree."""
+    center = n.nodes.node_id.values[len(n.nodes) // 3]
+    radii = [1000, 5000, 20000, 50000]
+
+    res = navis.sholl_analysis(n, radii=radii, center=center, geodesic=True)
+
+    # By hand, from the full geodesic distances
+    dist = navis.geodesic_matrix(n, from_=center)[n.nodes.node_id.values].values[0]
+    nodes = n.nodes.assign(dist=dist).set_index("node_id")
+    child = nodes[nodes.parent_id >= 0]
+    d, pd_ = child.dist.values, nodes.loc[child.parent_id, "dist"].values
+    expected = [((d <= r) != (pd_ <= r)).sum() for r in radii]
+
+    assert res.intersections.tolist() == expected
+
+
+def test_sholl_radii_must_ascend(n):
+    with pytest.raises(ValueError, match="ascending"):
+        navis.sholl_analysis(n, radii=[5000, 1000])
+
+
+def test_batch_sholl():
+    nl = navis.example_neurons(3, kind="skeleton")
+
+    res = navis.batch_sholl(nl, radii=[1000, 5000, 20000], center="root", geodesic=True)
+
+    assert list(res.columns) == ["neuron", "radius"] + COLUMNS
+    assert len(res) == 3 * len(nl)
+    for id, n in zip(nl.id, nl):
+        expected = navis.sholl_analysis(
+            n, radii=[1000, 5000, 20000], center="root", geodesic=True
+        )
+        this = res[res.neuron == id].drop(columns="neuron").set_index("radius")
+        pd.testing.assert_frame_equal(this, expected)